@@ -3,3 +3,5 @@
 use_openblas = True
 # mac-os only
 use_accelerate = False
+# OpenMP multi-threading, linux only
+use_openmp = True
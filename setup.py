@@ -14,6 +14,7 @@ from setuptools import setup
 
 from settings import use_accelerate
 from settings import use_openblas
+from settings import use_openmp
 
 try:
     from Cython.Build import cythonize
@@ -164,6 +165,11 @@ if platform.system() == "Linux":
     extra_link_args += ["-lm"]
     extra_compile_args += ["-g"]
 
+    # OpenMP for the multi-threaded simulation of spin systems.
+    if use_openmp:
+        extra_compile_args += ["-fopenmp"]
+        extra_link_args += ["-fopenmp"]
+
 include_dirs = list(set(include_dirs))
 library_dirs = list(set(library_dirs))
 libraries = list(set(libraries))
@@ -180,6 +186,8 @@ print(extra_link_args)
 
 source = [
     "src/c_lib/lib/angular_momentum.c",
+    "src/c_lib/lib/angular_momentum_simd.c",
+    "src/c_lib/lib/arena.c",
     "src/c_lib/lib/interpolation.c",
     "src/c_lib/lib/method.c",
     "src/c_lib/lib/mrsimulator.c",
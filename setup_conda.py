@@ -68,6 +68,11 @@ else:
     library_dirs += [join(conda_location, "lib")]
     extra_compile_args = ["-O3", "-ffast-math"]
 
+    # OpenMP for the multi-threaded simulation of spin systems.
+    if platform.system() == "Linux":
+        extra_compile_args += ["-fopenmp"]
+        extra_link_args += ["-fopenmp"]
+
 libraries += ["fftw3", "openblas"]
 extra_link_args += ["-lm"]
 
@@ -87,6 +92,8 @@ print(extra_link_args)
 
 source = [
     "src/c_lib/lib/angular_momentum.c",
+    "src/c_lib/lib/angular_momentum_simd.c",
+    "src/c_lib/lib/arena.c",
     "src/c_lib/lib/interpolation.c",
     "src/c_lib/lib/mrsimulator.c",
     "src/c_lib/lib/octahedron.c",
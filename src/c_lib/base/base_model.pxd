@@ -12,10 +12,18 @@ cdef extern from "angular_momentum.h":
     void wigner_d_matrices_from_exp_I_beta(int l, int n, void *exp_I_beta,
                                   double *wigner)
 
+    int MRS_simd_supported_level()
+    int MRS_set_simd_level(int level)
+    int MRS_get_simd_level()
+
 
 cdef extern from "schemes.h":
     ctypedef struct MRS_averaging_scheme:
         unsigned int total_orientations
+        unsigned int integration_density
+        unsigned int integration_volume
+        unsigned int octant_orientations
+        bool_t allow_fourth_rank
 
     ctypedef struct MRS_fftw_scheme:
         pass
@@ -24,13 +32,30 @@ cdef extern from "schemes.h":
                             unsigned int integration_density,
                             bool_t allow_fourth_rank,
                             unsigned int integration_volume)
+    MRS_averaging_scheme *MRS_create_averaging_scheme_from_alpha_beta(
+                            double *alpha, double *beta,
+                            double *weight, unsigned int n_angles,
+                            bool_t allow_fourth_rank)
     void MRS_free_averaging_scheme(MRS_averaging_scheme *scheme)
     MRS_fftw_scheme *create_fftw_scheme(unsigned int total_orientations,
-                                    unsigned int number_of_sidebands)
+                                    unsigned int number_of_sidebands,
+                                    unsigned int planner_flag)
     void MRS_free_fftw_scheme(MRS_fftw_scheme *fftw_scheme)
 
 
+cdef extern from "fftw3.h":
+    unsigned int FFTW_ESTIMATE
+    unsigned int FFTW_MEASURE
+    unsigned int FFTW_PATIENT
+    const char *fftw_version
+    int fftw_import_wisdom_from_filename(const char *filename)
+    int fftw_export_wisdom_to_filename(const char *filename)
+
+
 cdef extern from "mrsimulator.h":
+    int MRS_set_sideband_engine(int engine)
+    int MRS_get_sideband_engine()
+
     ctypedef struct MRS_plan:
         MRS_averaging_scheme *averaging_scheme
         unsigned int number_of_sidebands
@@ -43,6 +68,9 @@ cdef extern from "mrsimulator.h":
                           double rotor_angle_in_rad, double increment,
                           bool_t allow_fourth_rank)
     void MRS_free_plan(MRS_plan *plan)
+
+    ctypedef struct MRS_tensor_basis:
+        pass
     void MRS_get_amplitudes_from_plan(MRS_plan *plan, bool_t refresh)
     void MRS_get_frequencies_from_plan(MRS_plan *plan, double R0, double complex *R2,
                                   double complex *R4, bool_t refresh)
@@ -71,6 +99,17 @@ cdef extern from "object_struct.h":
         double *dipolar_eta                # Dipolar asymmetry parameter
         double *dipolar_orientation        # Dipolar tensor PAS to CRS euler angles (rad.)
 
+    ctypedef struct spin_systems_struct:
+        unsigned int number_of_spin_systems # Number of spin systems
+        int *site_offsets                  # Site offsets per spin system.
+        int *coupling_offsets              # Coupling offsets per spin system.
+        site_struct *sites                 # Sites from all spin systems.
+        coupling_struct *couplings         # Couplings from all spin systems.
+        float *transition_pathways         # Table of transition pathways.
+        int *pathway_offsets               # Offset to the first pathway per spin system.
+        int *pathway_counts                # Number of pathways per spin system.
+        double *weights                    # Spectrum scaling factor per spin system.
+
 
 cdef extern from "method.h":
     ctypedef struct MRS_event:
@@ -85,6 +124,8 @@ cdef extern from "method.h":
         double coordinates_offset       #  Start coordinate of the dimension.
         MRS_event *events               # Holds a list of events.
         unsigned int n_events           # The number of events.
+        double sideband_threshold       # Relative amplitude to skip a sideband order.
+        bool_t single_precision         # Evaluate the sideband phase in single precision.
 
     MRS_dimension *MRS_create_dimensions(
         MRS_averaging_scheme *scheme,
@@ -102,6 +143,14 @@ cdef extern from "method.h":
     void MRS_free_dimension(MRS_dimension *dimensions, int n)
 
 
+cdef extern from "arena.h":
+    ctypedef struct MRS_arena:
+        pass
+
+    MRS_arena *MRS_create_arena(size_t size)
+    void MRS_free_arena(MRS_arena *arena)
+
+
 cdef extern from "simulation.h":
     void mrsimulator_core(
         # spectrum information and related amplitude
@@ -144,4 +193,41 @@ cdef extern from "simulation.h":
         bool_t interpolation,
         bool_t *freq_contrib,
         double *affine_matrix,
+        MRS_tensor_basis *basis,      # the tensor basis of the spin system.
+        MRS_arena *arena,             # the arena for the scratch buffers.
         )
+
+    void __mrsimulator_core_batch(
+        double *spec,                 # Pointer to the spectrum array.
+        unsigned int spectrum_size,   # The number of points in the spectrum.
+        bool_t decompose,             # If true, store spectrum per spin system.
+        spin_systems_struct *spin_systems, # the packed spin systems.
+        int n_dimension,              # the number of dimensions.
+        MRS_dimension *dimensions,    # the dimensions within method.
+        MRS_fftw_scheme *fftw_scheme, # the fftw scheme
+        MRS_averaging_scheme *scheme, # the powder averaging scheme
+        bool_t interpolation,
+        bool_t *freq_contrib,
+        double *affine_matrix,
+        int n_threads,                # the number of threads.
+        ) nogil
+
+    ctypedef struct MRS_simulation_task:
+        double *spec                  # Pointer to the spectrum array.
+        unsigned int spectrum_size    # The number of points in the spectrum.
+        bool_t decompose              # If true, store spectrum per spin system.
+        spin_systems_struct *spin_systems # the packed spin systems.
+        int n_dimension               # the number of dimensions.
+        MRS_dimension *dimensions     # the dimensions within method.
+        MRS_fftw_scheme *fftw_scheme  # the fftw scheme
+        MRS_averaging_scheme *scheme  # the powder averaging scheme
+        bool_t interpolation
+        bool_t *freq_contrib
+        double *affine_matrix
+        double sideband_intensity[2]  # the skipped and the total sideband intensity.
+
+    void __mrsimulator_core_tasks(
+        MRS_simulation_task *tasks,   # Pointer to the simulation tasks.
+        int n_tasks,                  # The number of tasks.
+        int n_threads,                # the number of threads.
+        ) nogil
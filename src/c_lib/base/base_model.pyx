@@ -1,26 +1,720 @@
 cimport base_model as clib
 from libcpp cimport bool as bool_t
 from numpy cimport ndarray
+from libc.stdlib cimport malloc, free
 import numpy as np
 import cython
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from mrsimulator import sandbox as sb
+from mrsimulator.spin_system.packing import PackedSpinSystems
 
 __author__ = "Deepansh J. Srivastava"
 __email__ = "srivastava.89@osu.edu"
 
+
+cdef class _AveragingScheme:
+    """Owner of a C-level MRS_averaging_scheme. The scheme is freed on deallocation.
+    When `orientations` is a tuple of the alpha, beta, and weight arrays, the scheme is
+    created from the set of orientations, otherwise, from the octahedron."""
+    cdef clib.MRS_averaging_scheme *scheme
+    cdef readonly size_t nbytes
+
+    def __cinit__(self, unsigned int integration_density,
+                  unsigned int integration_volume, bool_t allow_fourth_rank,
+                  orientations=None):
+        cdef ndarray[double] alpha, beta, weight
+        if orientations is None:
+            self.scheme = clib.MRS_create_averaging_scheme(
+                integration_density=integration_density,
+                allow_fourth_rank=allow_fourth_rank,
+                integration_volume=integration_volume
+            )
+        else:
+            alpha, beta, weight = [
+                np.ascontiguousarray(item, dtype=np.float64) for item in orientations
+            ]
+            self.scheme = clib.MRS_create_averaging_scheme_from_alpha_beta(
+                &alpha[0], &beta[0], &weight[0], alpha.size, allow_fourth_rank
+            )
+        cdef size_t n_oct = self.scheme.octant_orientations
+        cdef size_t n_total = self.scheme.total_orientations
+        cdef size_t hemispheres = 2 if self.scheme.integration_volume == 2 else 1
+
+        # amplitudes, exp(-imα), and 2nd-rank wigner matrices and frequency buffer.
+        self.nbytes = 8 * n_oct + 64 * n_oct + 200 * n_oct * hemispheres + 80 * n_total
+        if allow_fourth_rank:
+            # 4th-rank wigner matrices and frequency buffer.
+            self.nbytes += 648 * n_oct * hemispheres + 144 * n_total
+
+    @property
+    def total_orientations(self):
+        return self.scheme.total_orientations
+
+    @property
+    def point_set(self):
+        """True if the scheme is created from a set of orientations."""
+        return self.scheme.integration_density == 0
+
+    def __dealloc__(self):
+        if self.scheme is not NULL:
+            clib.MRS_free_averaging_scheme(self.scheme)
+
+
+cdef class _FFTWScheme:
+    """Owner of a C-level MRS_fftw_scheme. The plan is destroyed on deallocation. The
+    plans from the `measure` and `patient` planners are saved to the fftw wisdom
+    file."""
+    cdef clib.MRS_fftw_scheme *scheme
+    cdef readonly size_t nbytes
+
+    def __cinit__(self, unsigned int total_orientations,
+                  unsigned int number_of_sidebands, planner="estimate"):
+        self.scheme = clib.create_fftw_scheme(
+            total_orientations, number_of_sidebands, __fftw_planners__[planner]
+        )
+        self.nbytes = 16 * total_orientations * number_of_sidebands
+        if planner != "estimate":
+            _export_fftw_wisdom()
+
+    def __dealloc__(self):
+        if self.scheme is not NULL:
+            clib.MRS_free_fftw_scheme(self.scheme)
+
+
+__fftw_planners__ = {
+    "estimate": clib.FFTW_ESTIMATE,
+    "measure": clib.FFTW_MEASURE,
+    "patient": clib.FFTW_PATIENT,
+}
+_fftw_planner = os.environ.get("MRSIMULATOR_FFTW_PLANNER", "estimate")
+_fftw_planner = _fftw_planner if _fftw_planner in __fftw_planners__ else "estimate"
+
+
+def get_fftw_planner():
+    """Return the planner of the fftw plans of the sideband amplitudes, one of
+    `estimate`, `measure`, or `patient`. Unless set with `set_fftw_planner`, the
+    planner is read from the ``MRSIMULATOR_FFTW_PLANNER`` environment variable, with a
+    default of `estimate`."""
+    return _fftw_planner
+
+
+def set_fftw_planner(planner="estimate"):
+    """Set the planner of the fftw plans of the sideband amplitudes.
+
+    The `estimate` planner chooses a plan from a heuristic, without planning time. The
+    `measure` and `patient` planners time the candidate plans of every new shape of
+    the transform, ``(total_orientations, number_of_sidebands)``, and choose the
+    fastest, at a planning time of seconds to minutes. The measured plans are saved as
+    fftw wisdom to a per-user cache file, see `get_fftw_wisdom_filename`, which is
+    loaded at import, such that a shape is only measured once per fftw version.
+
+    :ivar planner:
+        One of `estimate`, `measure`, or `patient`.
+
+    Returns:
+        The planner in use.
+    """
+    global _fftw_planner
+    if planner not in __fftw_planners__:
+        raise ValueError(
+            "Expecting the fftw planner to be one of `estimate`, `measure`, or "
+            f"`patient`, found {planner}."
+        )
+    _fftw_planner = planner
+    return _fftw_planner
+
+
+def get_fftw_wisdom_filename():
+    """Return the path of the fftw wisdom file of the installed fftw version. The file
+    is within the ``MRSIMULATOR_CACHE_DIR`` directory, when the environment variable is
+    set, otherwise, within the per-user cache directory of the platform."""
+    root = os.environ.get("MRSIMULATOR_CACHE_DIR", None)
+    if root is None:
+        home = os.path.expanduser("~")
+        if sys.platform == "win32":
+            root = os.environ.get("LOCALAPPDATA", home)
+        elif sys.platform == "darwin":
+            root = os.path.join(home, "Library", "Caches")
+        else:
+            root = os.environ.get("XDG_CACHE_HOME", os.path.join(home, ".cache"))
+        root = os.path.join(root, "mrsimulator")
+
+    version = (<bytes>clib.fftw_version).decode("ascii", "replace")
+    version = "".join(c if c.isalnum() or c in ".-" else "_" for c in version)
+    return os.path.join(root, f"{version}.wisdom")
+
+
+def _import_fftw_wisdom():
+    """Merge the wisdom from the fftw wisdom file into the fftw planner. Returns True
+    if the file is imported."""
+    filename = get_fftw_wisdom_filename()
+    if not os.path.isfile(filename):
+        return False
+    return clib.fftw_import_wisdom_from_filename(os.fsencode(filename)) == 1
+
+
+def _export_fftw_wisdom():
+    """Save the wisdom of the fftw planner, merged with the wisdom file, to the fftw
+    wisdom file. The file is replaced atomically, such that concurrent processes never
+    read a partially written file. Returns True if the file is saved."""
+    filename = get_fftw_wisdom_filename()
+    directory = os.path.dirname(filename)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        _import_fftw_wisdom()
+        handle, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(handle)
+    except OSError:
+        return False
+
+    if clib.fftw_export_wisdom_to_filename(os.fsencode(temp)) == 1:
+        os.replace(temp, filename)
+        return True
+    os.remove(temp)
+    return False
+
+
+_import_fftw_wisdom()
+
+
+class SchemeCache:
+    """A process-wide least-recently-used cache of the C-level orientation averaging
+    schemes and fftw plans.
+
+    The averaging schemes are keyed on ``(integration_density, integration_volume,
+    allow_fourth_rank)``, and the fftw plans on ``(integration_density,
+    integration_volume, allow_fourth_rank, number_of_sidebands, planner)``, where
+    ``planner`` is the fftw planner from :func:`get_fftw_planner`. The averaging
+    schemes from a set of orientations, see :mod:`mrsimulator.simulator.powder`, are
+    keyed on a digest of the orientations in place of the integration density and
+    volume. When the estimated memory of the cached objects exceeds ``max_memory``,
+    the least recently used objects are evicted. An object larger than ``max_memory``
+    is never cached.
+
+    Args:
+        int max_memory: The memory budget of the cache in bytes.
+
+    Example
+    -------
+
+    >>> from mrsimulator.base_model import scheme_cache
+    >>> scheme_cache.clear()
+    >>> scheme_cache.info()
+    {'hits': 0, 'misses': 0, 'size': 0, 'memory': 0, 'max_memory': 268435456}
+    """
+
+    def __init__(self, max_memory=256 * 1024 ** 2):
+        self._items = OrderedDict()
+        self._lock = threading.RLock()
+        self._memory = 0
+        self._max_memory = int(max_memory)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_memory(self):
+        """The memory budget of the cache in bytes."""
+        return self._max_memory
+
+    @max_memory.setter
+    def max_memory(self, value):
+        if value < 0:
+            raise ValueError(f"Expecting a non-negative integer, found {value}.")
+        with self._lock:
+            self._max_memory = int(value)
+            self._evict()
+
+    @property
+    def memory(self):
+        """The estimated memory of the cached objects in bytes."""
+        return self._memory
+
+    def __len__(self):
+        return len(self._items)
+
+    def averaging_scheme(self, integration_density, integration_volume,
+                         allow_fourth_rank, averaging_scheme="octahedron"):
+        """Return the averaging scheme for the given parameters, creating and caching
+        the scheme when not already cached."""
+        key, args = _averaging_key(
+            integration_density, integration_volume, allow_fourth_rank,
+            averaging_scheme
+        )
+        return self._get(("averaging", *key), _AveragingScheme, args)
+
+    def fftw_scheme(self, integration_density, integration_volume, allow_fourth_rank,
+                    number_of_sidebands, averaging_scheme="octahedron"):
+        """Return the fftw plan for the given parameters, creating and caching the plan
+        when not already cached."""
+        key, args = _averaging_key(
+            integration_density, integration_volume, allow_fourth_rank,
+            averaging_scheme
+        )
+        scheme = self._get(("averaging", *key), _AveragingScheme, args)
+        planner = get_fftw_planner()
+        return self._get(
+            ("fftw", *key, int(number_of_sidebands), planner),
+            _FFTWScheme,
+            (scheme.total_orientations, int(number_of_sidebands), planner),
+        )
+
+    def _get(self, key, cls, args):
+        with self._lock:
+            item = self._items.get(key, None)
+            if item is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item
+
+            self.misses += 1
+            item = cls(*args)
+            if item.nbytes > self._max_memory:
+                return item
+
+            self._items[key] = item
+            self._memory += item.nbytes
+            self._evict()
+            return item
+
+    def _evict(self):
+        while self._memory > self._max_memory and len(self._items) > 0:
+            _, item = self._items.popitem(last=False)
+            self._memory -= item.nbytes
+
+    def clear(self):
+        """Remove all objects from the cache and reset the hit and miss counters."""
+        with self._lock:
+            self._items.clear()
+            self._memory = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Return a dictionary with the hit and miss counts, the number of cached
+        objects, and the cache memory usage and budget in bytes."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._items),
+            "memory": self._memory,
+            "max_memory": self._max_memory,
+        }
+
+
+def _averaging_key(integration_density, integration_volume, allow_fourth_rank,
+                   averaging_scheme):
+    """Return the cache key and the _AveragingScheme arguments of an averaging
+    scheme."""
+    if isinstance(averaging_scheme, str) and averaging_scheme == "octahedron":
+        key = (
+            int(integration_density), int(integration_volume), bool(allow_fourth_rank)
+        )
+        return key, key
+
+    from mrsimulator.simulator.powder import get_orientations
+
+    orientations = get_orientations(averaging_scheme, integration_density)
+    digest = hashlib.blake2b(digest_size=16)
+    for item in orientations:
+        digest.update(np.ascontiguousarray(item, dtype=np.float64).tobytes())
+    key = ("points", digest.hexdigest(), bool(allow_fourth_rank))
+    return key, (0, 0, bool(allow_fourth_rank), orientations)
+
+
+scheme_cache = SchemeCache()
+
+cdef class _SpinSystemsBuffer:
+    """The packed spin systems as C structs, shared between the simulation tasks. The
+    quadrupolar tensors are zero in `sites_without_quad`, which are used when the
+    observed spin is 1/2."""
+    cdef clib.site_struct sites
+    cdef clib.site_struct sites_without_quad
+    cdef clib.coupling_struct couplings
+    cdef list arrays
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def __cinit__(self, spin_systems):
+        # sites
+        cdef ndarray[float] spin_i = spin_systems.spin
+        cdef ndarray[double] gyromagnetic_ratio_i = spin_systems.gyromagnetic_ratio
+
+        # CSA
+        cdef ndarray[double] iso_n = spin_systems.isotropic_chemical_shift
+        cdef ndarray[double] zeta_n = spin_systems.shielding_symmetric_zeta
+        cdef ndarray[double] eta_n = spin_systems.shielding_symmetric_eta
+        cdef ndarray[double] ori_n = spin_systems.shielding_orientation
+
+        # quad, only evaluated when the observed spin is a quadrupole.
+        cdef ndarray[double] Cq_e = spin_systems.quadrupolar_Cq
+        cdef ndarray[double] eta_e = spin_systems.quadrupolar_eta
+        cdef ndarray[double] ori_e = spin_systems.quadrupolar_orientation
+        cdef ndarray[double] zeros_e = np.zeros(Cq_e.size + ori_e.size + 1)
+
+        # couplings
+        cdef ndarray[int] spin_index_ij = spin_systems.site_index
+
+        # J-coupling
+        cdef ndarray[double] iso_j = spin_systems.isotropic_j
+        cdef ndarray[double] zeta_j = spin_systems.j_symmetric_zeta
+        cdef ndarray[double] eta_j = spin_systems.j_symmetric_eta
+        cdef ndarray[double] ori_j = spin_systems.j_orientation
+
+        # dipolar
+        cdef ndarray[double] D_d = spin_systems.dipolar_D
+        cdef ndarray[double] eta_d = spin_systems.dipolar_eta
+        cdef ndarray[double] ori_d = spin_systems.dipolar_orientation
+
+        # keep a reference to the arrays, which are owned by the spin systems.
+        self.arrays = [
+            spin_i, gyromagnetic_ratio_i, iso_n, zeta_n, eta_n, ori_n, Cq_e, eta_e,
+            ori_e, zeros_e, spin_index_ij, iso_j, zeta_j, eta_j, ori_j, D_d, eta_d,
+            ori_d
+        ]
+
+        # sites packed as c struct
+        self.sites.number_of_sites = spin_i.size
+        self.sites.spin = &spin_i[0]
+        self.sites.gyromagnetic_ratio = &gyromagnetic_ratio_i[0]
+
+        self.sites.isotropic_chemical_shift_in_ppm = &iso_n[0]
+        self.sites.shielding_symmetric_zeta_in_ppm = &zeta_n[0]
+        self.sites.shielding_symmetric_eta = &eta_n[0]
+        self.sites.shielding_orientation = &ori_n[0]
+
+        self.sites.quadrupolar_Cq_in_Hz = &Cq_e[0]
+        self.sites.quadrupolar_eta = &eta_e[0]
+        self.sites.quadrupolar_orientation = &ori_e[0]
+
+        self.sites_without_quad = self.sites
+        self.sites_without_quad.quadrupolar_Cq_in_Hz = &zeros_e[0]
+        self.sites_without_quad.quadrupolar_eta = &zeros_e[0]
+        self.sites_without_quad.quadrupolar_orientation = &zeros_e[0]
+
+        # couplings packed as c struct
+        self.couplings.number_of_couplings = iso_j.size
+        self.couplings.site_index = &spin_index_ij[0]
+
+        self.couplings.isotropic_j_in_Hz = &iso_j[0]
+        self.couplings.j_symmetric_zeta_in_Hz = &zeta_j[0]
+        self.couplings.j_symmetric_eta = &eta_j[0]
+        self.couplings.j_orientation = &ori_j[0]
+
+        self.couplings.dipolar_coupling_in_Hz = &D_d[0]
+        self.couplings.dipolar_eta = &eta_d[0]
+        self.couplings.dipolar_orientation = &ori_d[0]
+
+
+cdef class _SimulationTask:
+    """The C-level simulation task for the spectrum of a method from the packed spin
+    systems. The task owns the spectral dimensions, the transition pathways, and the
+    spin system weights of the method, while the sites and couplings are shared from
+    the _SpinSystemsBuffer."""
+    cdef clib.MRS_simulation_task task
+    cdef clib.spin_systems_struct spin_systems_c
+    cdef clib.MRS_dimension *dimensions
+    cdef int n_dimension
+    cdef object method, spin_systems, buffer, schemes, arrays, amp, has_channel
+    cdef object gyromagnetic_ratio, isotropic, isotropic_args
+
+    @cython.boundscheck(False)
+    def __cinit__(self, method, spin_systems, _SpinSystemsBuffer buffer,
+                  unsigned int number_of_sidebands, unsigned int integration_density,
+                  unsigned int decompose_spectrum, unsigned int integration_volume,
+                  bool_t interpolation, averaging_scheme="octahedron",
+                  double sideband_amplitude_threshold=0.0, unsigned int precision=0,
+                  double sideband_pair_threshold=0.0):
+        self.dimensions = NULL
+        self.method = method
+        self.spin_systems = spin_systems
+        self.buffer = buffer
+
+    # observed spin _______________________________________________________
+        channel = method.channels[0].symbol
+        # spin quantum number of the observed spin
+        cdef double spin_quantum_number = method.channels[0].spin
+
+        # gyromagnetic ratio
+        gyromagnetic_ratio = method.channels[0].gyromagnetic_ratio
+        self.gyromagnetic_ratio = gyromagnetic_ratio
+        cdef double factor = 1.0
+        if gyromagnetic_ratio > 0.0:
+            factor = -1.0
+
+        cdef bool_t allow_fourth_rank = 0
+        if spin_quantum_number > 0.5:
+            allow_fourth_rank = 1
+
+    # get averaging scheme from cache ______________________________________________
+        powder_scheme = averaging_scheme
+        averaging_scheme = scheme_cache.averaging_scheme(
+            integration_density, integration_volume, allow_fourth_rank, powder_scheme
+        )
+        cdef clib.MRS_averaging_scheme *the_averaging_scheme
+        the_averaging_scheme = (<_AveragingScheme>averaging_scheme).scheme
+
+    # create spectral dimensions _______________________________________________
+        cdef int n_dimension = len(method.spectral_dimensions)
+
+        total_n_points = 1
+        cdef ndarray[int] n_event
+        cdef ndarray[double] magnetic_flux_density_in_T, frac
+        cdef ndarray[double] srfiH
+        cdef ndarray[double] rair
+        cdef ndarray[int] cnt
+        cdef ndarray[double] coord_off
+        cdef ndarray[double] incre
+        freq_contrib = np.asarray([])
+
+        fr = []
+        Bo = []
+        vr = []
+        th = []
+        event_i = []
+        count = []
+        increment = []
+        coordinates_offset = []
+
+        spinning = False
+        for i, dim in enumerate(method.spectral_dimensions):
+            for event in dim.events:
+                freq_contrib = np.append(freq_contrib, event.get_value_int())
+                # A zero rotation frequency is a static event, where the frequencies
+                # are evaluated in the lab frame without sidebands. The static and
+                # spinning events may share a method, see MRS_create_dimensions.
+                if event.rotor_frequency < 1.0e-3:
+                    sample_rotation_frequency_in_Hz = 0.0
+                    rotor_angle_in_rad = 0.0
+                else:
+                    sample_rotation_frequency_in_Hz = event.rotor_frequency
+                    rotor_angle_in_rad = event.rotor_angle
+                    spinning = True
+
+                fr.append(event.fraction) # fraction
+                Bo.append(event.magnetic_flux_density)  # in T
+                vr.append(sample_rotation_frequency_in_Hz) # in Hz
+                th.append(rotor_angle_in_rad) # in rad
+
+            total_n_points *= dim.count
+
+            count.append(dim.count)
+            offset = dim.spectral_width / 2.0
+            coordinates_offset.append(-dim.reference_offset * factor - offset)
+            increment.append(dim.spectral_width / dim.count)
+            event_i.append(len(dim.events))
+
+            dim.origin_offset = np.abs(Bo[0] * gyromagnetic_ratio * 1e6)
+
+        # the static methods have a single sideband.
+        if not spinning:
+            number_of_sidebands = 1
+
+        frac = np.asarray(fr, dtype=np.float64)
+        magnetic_flux_density_in_T = np.asarray(Bo, dtype=np.float64)
+        srfiH = np.asarray(vr, dtype=np.float64)
+        rair = np.asarray(th, dtype=np.float64)
+        cnt = np.asarray(count, dtype=np.int32)
+        incre = np.asarray(increment, dtype=np.float64)
+        coord_off = np.asarray(coordinates_offset, dtype=np.float64)
+        n_event = np.asarray(event_i, dtype=np.int32)
+
+        # create spectral_dimensions
+        self.n_dimension = n_dimension
+        self.dimensions = clib.MRS_create_dimensions(the_averaging_scheme, &cnt[0],
+            &coord_off[0], &incre[0], &frac[0], &magnetic_flux_density_in_T[0],
+            &srfiH[0], &rair[0], &n_event[0], n_dimension, number_of_sidebands)
+        # the two-dimensional methods prune the pairs of sideband orders.
+        threshold = sideband_amplitude_threshold
+        if n_dimension == 2:
+            threshold = sideband_pair_threshold
+        for i in range(n_dimension):
+            self.dimensions[i].sideband_threshold = threshold
+            self.dimensions[i].single_precision = precision == 1
+
+    # normalization factor for the spectrum
+        norm = np.prod(incre)
+
+    # get fftw scheme from cache __________________________________________________
+        fftw_scheme = scheme_cache.fftw_scheme(
+            integration_density, integration_volume, allow_fourth_rank,
+            number_of_sidebands, powder_scheme
+        )
+        cdef clib.MRS_fftw_scheme *the_fftw_scheme
+        the_fftw_scheme = (<_FFTWScheme>fftw_scheme).scheme
+        self.schemes = (averaging_scheme, fftw_scheme)
+
+    # _____________________________________________________________________________
+
+    # frequency contrib
+        cdef ndarray[bool_t] freq_contrib_c = np.asarray(freq_contrib, dtype=np.bool)
+
+    # affine transformation
+        cdef ndarray[double] affine_matrix_c
+        if method.affine_matrix is None:
+            affine_matrix_c = np.asarray([1, 0, 0, 1], dtype=np.float64)
+        else:
+            increment_fraction = [incre/item for item in incre]
+            matrix = (
+                method.affine_matrix.ravel() * np.asarray(increment_fraction).ravel()
+            )
+            affine_matrix_c = np.asarray(matrix, dtype=np.float64)
+            if affine_matrix_c[2] != 0:
+                affine_matrix_c[2] /= affine_matrix_c[0]
+                affine_matrix_c[3] -=  affine_matrix_c[1]*affine_matrix_c[2]
+
+    # spin systems ____________________________________________________________________
+        cdef int n_spin_systems = spin_systems.number_of_spin_systems
+
+        # transition pathways
+        cdef ndarray[float, ndim=1] transition_pathway_c
+        cdef ndarray[int] pathway_offsets_c, pathway_counts_c
+        transition_pathway_c, pathway_offsets_c, pathway_counts_c, has_channel = (
+            _get_transition_pathway_table(method, spin_systems, channel)
+        )
+        self.has_channel = has_channel
+
+        # Spin systems with only isotropic interactions give a delta function at the
+        # same frequency over all orientations. Bin these spin systems directly, and
+        # skip them in the powder averaging.
+        isotropic = np.zeros(n_spin_systems, dtype=bool)
+        if n_dimension == 1 and n_event[0] == 1 and n_spin_systems != 0:
+            isotropic = _isotropic_spin_systems(spin_systems, spin_quantum_number)
+            isotropic &= pathway_counts_c != 0
+        isotropic_pathway_counts = pathway_counts_c * isotropic
+        pathway_counts_c = np.asarray(pathway_counts_c * ~isotropic, dtype=np.int32)
+
+        cdef ndarray[int] site_offsets_c = spin_systems.site_offsets
+        cdef ndarray[int] coupling_offsets_c = spin_systems.coupling_offsets
+
+        # spin systems packed as c struct
+        cdef ndarray[double] weights = spin_systems.abundance / norm
+        self.spin_systems_c.number_of_spin_systems = n_spin_systems
+        self.spin_systems_c.site_offsets = &site_offsets_c[0]
+        self.spin_systems_c.coupling_offsets = &coupling_offsets_c[0]
+        if spin_quantum_number > 0.5:
+            self.spin_systems_c.sites = &buffer.sites
+        else:
+            self.spin_systems_c.sites = &buffer.sites_without_quad
+        self.spin_systems_c.couplings = &buffer.couplings
+        self.spin_systems_c.transition_pathways = &transition_pathway_c[0]
+        self.spin_systems_c.pathway_offsets = &pathway_offsets_c[0]
+        self.spin_systems_c.pathway_counts = &pathway_counts_c[0]
+        self.spin_systems_c.weights = &weights[0]
+
+    # Spectrum amplitude vector _______________________________________________________
+        cdef bool_t decompose = decompose_spectrum == 1 and n_spin_systems != 0
+        cdef ndarray[double, ndim=1] amp
+        amp = np.zeros(total_n_points * (n_spin_systems if decompose else 1))
+        self.amp = amp
+
+        self.task.spec = &amp[0]
+        self.task.spectrum_size = total_n_points
+        self.task.decompose = decompose
+        self.task.spin_systems = &self.spin_systems_c
+        self.task.n_dimension = n_dimension
+        self.task.dimensions = self.dimensions
+        self.task.fftw_scheme = the_fftw_scheme
+        self.task.scheme = the_averaging_scheme
+        self.task.interpolation = interpolation
+        self.task.freq_contrib = &freq_contrib_c[0]
+        self.task.affine_matrix = &affine_matrix_c[0]
+
+        # keep a reference to the arrays of the c structs.
+        self.arrays = [
+            transition_pathway_c, pathway_offsets_c, pathway_counts_c, site_offsets_c,
+            coupling_offsets_c, weights, freq_contrib_c, affine_matrix_c
+        ]
+
+        # the weights of a set of orientations are normalized to 3π, see
+        # MRS_create_averaging_scheme_from_alpha_beta.
+        delta_amplitude = 3 * np.pi
+        if not averaging_scheme.point_set:
+            delta_amplitude = _delta_amplitude(
+                integration_density, integration_volume, number_of_sidebands
+            )
+
+        self.isotropic = isotropic
+        self.isotropic_args = (
+            spin_systems,
+            isotropic_pathway_counts,
+            transition_pathway_c,
+            pathway_offsets_c,
+            weights,
+            delta_amplitude,
+            magnetic_flux_density_in_T[0],
+            frac[0],
+            freq_contrib_c[0],
+            cnt[0],
+            coord_off[0],
+            incre[0],
+            decompose,
+        )
+
+    def __dealloc__(self):
+        if self.dimensions is not NULL:
+            clib.MRS_free_dimension(self.dimensions, self.n_dimension)
+
+    def spectrum(self):
+        """Return the spectrum of the method after the C-level simulation of the task.
+        """
+        method = self.method
+        amp = self.amp
+        decompose = self.task.decompose
+        n_spin_systems = self.spin_systems_c.number_of_spin_systems
+        total_n_points = self.task.spectrum_size
+
+        if self.isotropic.any():
+            _bin_isotropic_spin_systems(
+                amp.reshape(-1, total_n_points), *self.isotropic_args
+            )
+
+        # reverse the spectrum if gyromagnetic ratio is positive.
+        if decompose:
+            rows = amp.reshape(n_spin_systems, -1)
+            amp1 = [
+                item.reshape(method.shape()) if check else []
+                for item, check in zip(rows, self.has_channel)
+            ]
+            if self.gyromagnetic_ratio < 0:
+                amp1 = [
+                    np.fft.fftn(np.fft.ifftn(item).conj()).real
+                    if len(item) != 0 else []
+                    for item in amp1
+                ]
+        else:
+            amp1 = amp.reshape(method.shape())
+            if self.gyromagnetic_ratio < 0:
+                amp1 = np.fft.fftn(np.fft.ifftn(amp1).conj()).real
+        return amp1
+
+
 @cython.profile(False)
 @cython.boundscheck(False)
 @cython.wraparound(False)
 def one_d_spectrum(method,
-       list spin_systems,
+       spin_systems,
        int verbose=0,
        unsigned int number_of_sidebands=90,
        unsigned int integration_density=72,
        unsigned int decompose_spectrum=0,
        unsigned int integration_volume=1,
-       bool_t interpolation=True):
+       bool_t interpolation=True,
+       int n_threads=1,
+       averaging_scheme="octahedron",
+       double sideband_amplitude_threshold=0.0,
+       unsigned int precision=0,
+       double sideband_pair_threshold=0.0,
+       bool_t return_sideband_intensity=False):
     """
 
+    :ivar spin_systems:
+        A list of SpinSystem objects or the equivalent PackedSpinSystems object.
     :ivar verbose:
         The allowed values are 0, 1, and 11. When the value is 1, the output is
         printed on the screen. When the value is 11, in addition to the output
@@ -44,467 +738,378 @@ def one_d_spectrum(method,
         An unsigned integer. When value is 0, the spectum is a sum of spectrum from all
         spin systems. If value is 1, spectrum from individual spin systems is stored
         separately.
+    :ivar n_threads:
+        The number of threads. The spin systems are distributed between the threads,
+        where the simulation runs without the global interpreter lock. The default
+        value is 1.
+    :ivar averaging_scheme:
+        The powder averaging scheme, either `octahedron`, or a scheme from a set of
+        orientations, one of `zcw`, `lebedev`, `repulsion`, or a PowderScheme object,
+        see :mod:`mrsimulator.simulator.powder`. The spectrum from a set of
+        orientations is evaluated by binning the frequency at every orientation, where
+        the integration volume is ignored. The default is `octahedron`.
+    :ivar sideband_amplitude_threshold:
+        The sideband orders with a summed absolute amplitude, over all orientations,
+        below the threshold times the total amplitude from all sideband orders are
+        skipped before the interpolation of a one-dimensional method. The skipped
+        fraction of the sideband intensity is printed when verbose is 1 or 11. The
+        default value is 0, that is, every sideband order is interpolated.
+    :ivar precision:
+        An unsigned integer. When the value is 0, the sideband amplitudes are evaluated
+        in double precision. If the value is 1, the sideband phase is evaluated in
+        single precision. The default value is 0.
+    :ivar sideband_pair_threshold:
+        The pairs of sideband orders from the two dimensions of a two-dimensional
+        method, with a summed absolute product of the amplitudes of the pair below the
+        threshold times the total over all pairs, are skipped before the
+        interpolation. The default value is 0, that is, every pair is interpolated.
+    :ivar return_sideband_intensity:
+        If true, the skipped and the total sideband intensity, summed over the spin
+        systems, are returned with the spectrum. The default value is False.
+
+    Returns:
+        The spectrum, or when `return_sideband_intensity` is true, a tuple of the
+        spectrum and an array with the skipped and the total sideband intensity.
     """
+    result = simulate_methods(
+        [method],
+        spin_systems,
+        verbose=verbose,
+        number_of_sidebands=number_of_sidebands,
+        integration_density=integration_density,
+        decompose_spectrum=decompose_spectrum,
+        integration_volume=integration_volume,
+        interpolation=interpolation,
+        n_threads=n_threads,
+        averaging_scheme=averaging_scheme,
+        sideband_amplitude_threshold=sideband_amplitude_threshold,
+        precision=precision,
+        sideband_pair_threshold=sideband_pair_threshold,
+        return_sideband_intensity=return_sideband_intensity,
+    )
+    if return_sideband_intensity:
+        return result[0][0], result[1][0]
+    return result[0]
 
-# observed spin _______________________________________________________
-    channel = method.channels[0].symbol
-    # spin quantum number of the observed spin
-    cdef double spin_quantum_number = method.channels[0].spin
-
-    # gyromagnetic ratio
-    cdef gyromagnetic_ratio = method.channels[0].gyromagnetic_ratio
-    cdef double factor = 1.0
-    if gyromagnetic_ratio > 0.0:
-        factor = -1.0
-
-    # if verbose in [1, 11]:
-    #     print(f'Simulating {isotope} (I={spin_quantum_number})')
-    #     print(f'Larmor frequency (ω0 = - γ B0) = {larmor_frequency/1.0e6} MHz')
-    #     print((f'Recording {isotope} spectrum with {number_of_points} '
-    #             f'points over {spectral_width} Hz bandwidth'))
-    #     print((f"and a reference offset of {dimension['reference_offset']} Hz."))
-
-    # transitions of the observed spin
-    cdef int transition_increment
-    cdef ndarray[float, ndim=1] transition_pathway_c
-    cdef int number_of_transitions
-    # transition_pathway_c = np.asarray([-0.5, 0.5]).ravel()
-    # number_of_transitions = int(transition_pathway_c.size/2)
-    # else:
-    #     energy_level_count = int(2*spin_quantum_number+1)
-    #     number_of_transitions = energy_level_count-1
-    #     energy_states = np.arange(energy_level_count) - spin_quantum_number
-    #     transitions = [ [energy_states[i], energy_states[i+1]] for i in range(number_of_transitions)]
-    #     transition_pathway_c = np.asarray(transitions).ravel()
-
-    cdef bool_t allow_fourth_rank = 0
-    if spin_quantum_number > 0.5:
-        allow_fourth_rank = 1
 
-# create averaging scheme _____________________________________________________
-    cdef clib.MRS_averaging_scheme *the_averaging_scheme
-    the_averaging_scheme = clib.MRS_create_averaging_scheme(
-        integration_density=integration_density, allow_fourth_rank=allow_fourth_rank,
-        integration_volume=integration_volume
+def simulate_methods(methods,
+       spin_systems,
+       int verbose=0,
+       unsigned int number_of_sidebands=90,
+       unsigned int integration_density=72,
+       unsigned int decompose_spectrum=0,
+       unsigned int integration_volume=1,
+       bool_t interpolation=True,
+       int n_threads=1,
+       averaging_scheme="octahedron",
+       double sideband_amplitude_threshold=0.0,
+       unsigned int precision=0,
+       double sideband_pair_threshold=0.0,
+       bool_t return_sideband_intensity=False):
+    """Simulate the spectra of a list of methods in a single pass over the spin
+    systems. The spin systems are packed as C structs once and shared between the
+    methods, and the methods with the same integration settings share the averaging
+    schemes. The tensors of a spin system are rotated once over the orientations of an
+    averaging scheme, and reused between the methods, where the magnetic flux density
+    and the spin transitions of every method only weigh the rotated tensors. The
+    arguments are the same as for `one_d_spectrum`.
+
+    :ivar methods:
+        A list of Method objects.
+
+    Returns:
+        A list with the spectrum of every method, as returned from `one_d_spectrum`.
+        When `return_sideband_intensity` is true, a tuple of the list and an array of
+        shape (number of methods, 2) with the skipped and the total sideband intensity
+        of every method.
+    """
+    if not isinstance(spin_systems, PackedSpinSystems):
+        spin_systems = PackedSpinSystems(spin_systems)
+
+    if verbose in [1, 11]:
+        print(f'N spin systems = {spin_systems.number_of_spin_systems}')
+        print(f'N sites = {spin_systems.spin.size}')
+        print(f'N couplings = {spin_systems.isotropic_j.size}')
+
+    buffer = _SpinSystemsBuffer(spin_systems)
+    tasks = [
+        _SimulationTask(
+            method, spin_systems, buffer, number_of_sidebands, integration_density,
+            decompose_spectrum, integration_volume, interpolation, averaging_scheme,
+            sideband_amplitude_threshold, precision, sideband_pair_threshold
+        )
+        for method in methods
+    ]
+
+    cdef int i, n_tasks = len(tasks)
+    intensity = np.zeros((n_tasks, 2))
+    cdef clib.MRS_simulation_task *tasks_c = <clib.MRS_simulation_task *>malloc(
+        max(n_tasks, 1) * sizeof(clib.MRS_simulation_task)
     )
+    try:
+        for i in range(n_tasks):
+            tasks_c[i] = (<_SimulationTask>tasks[i]).task
+        with nogil:
+            clib.__mrsimulator_core_tasks(tasks_c, n_tasks, n_threads)
+        for i in range(n_tasks):
+            intensity[i, 0] = tasks_c[i].sideband_intensity[0]
+            intensity[i, 1] = tasks_c[i].sideband_intensity[1]
+    finally:
+        free(tasks_c)
 
-# create spectral dimensions _______________________________________________
-    cdef int n_dimension = len(method.spectral_dimensions)
-    # if n_sequence > 1:
-    #     number_of_sidebands = 1
-
-    max_n_sidebands = number_of_sidebands
-
-    total_n_points = 1
-    cdef ndarray[int] n_event
-    cdef ndarray[double] magnetic_flux_density_in_T, frac
-    cdef ndarray[double] srfiH
-    cdef ndarray[double] rair
-    cdef ndarray[int] cnt
-    cdef ndarray[double] coord_off
-    cdef ndarray[double] incre
-    freq_contrib = np.asarray([])
-
-    fr = []
-    Bo = []
-    vr = []
-    th = []
-    event_i = []
-    count = []
-    increment = []
-    coordinates_offset = []
-
-    prev_n_sidebands = 0
-    for i, dim in enumerate(method.spectral_dimensions):
-        for event in dim.events:
-            freq_contrib = np.append(freq_contrib, event.get_value_int())
-            if event.rotor_frequency < 1.0e-3:
-                sample_rotation_frequency_in_Hz = 1.0e9
-                rotor_angle_in_rad = 0.0
-                number_of_sidebands = 1
-                if prev_n_sidebands == 0: prev_n_sidebands = 1
-            else:
-                sample_rotation_frequency_in_Hz = event.rotor_frequency
-                rotor_angle_in_rad = event.rotor_angle
-                if prev_n_sidebands == 0: prev_n_sidebands = number_of_sidebands
-
-            if prev_n_sidebands != number_of_sidebands:
-                raise ValueError(
-                    (
-                        'The library does not support spectral dimensions containing '
-                        'both zero and non-zero rotor frequencies. Consider using a '
-                        'smaller value instead of zero.'
-                    )
-                )
-
-            fr.append(event.fraction) # fraction
-            Bo.append(event.magnetic_flux_density)  # in T
-            vr.append(sample_rotation_frequency_in_Hz) # in Hz
-            th.append(rotor_angle_in_rad) # in rad
-
-        total_n_points *= dim.count
-
-        count.append(dim.count)
-        offset = dim.spectral_width / 2.0
-        coordinates_offset.append(-dim.reference_offset * factor - offset)
-        increment.append(dim.spectral_width / dim.count)
-        event_i.append(len(dim.events))
-
-        dim.origin_offset = np.abs(Bo[0] * gyromagnetic_ratio * 1e6)
-
-    frac = np.asarray(fr, dtype=np.float64)
-    magnetic_flux_density_in_T = np.asarray(Bo, dtype=np.float64)
-    srfiH = np.asarray(vr, dtype=np.float64)
-    rair = np.asarray(th, dtype=np.float64)
-    cnt = np.asarray(count, dtype=np.int32)
-    incre = np.asarray(increment, dtype=np.float64)
-    coord_off = np.asarray(coordinates_offset, dtype=np.float64)
-    n_event = np.asarray(event_i, dtype=np.int32)
-
-    # create spectral_dimensions
-    dimensions = clib.MRS_create_dimensions(the_averaging_scheme, &cnt[0],
-        &coord_off[0], &incre[0], &frac[0], &magnetic_flux_density_in_T[0],
-        &srfiH[0], &rair[0], &n_event[0], n_dimension, number_of_sidebands)
-
-# normalization factor for the spectrum
-    norm = np.prod(incre)
-
-# create fftw scheme __________________________________________________________
-    cdef clib.MRS_fftw_scheme *the_fftw_scheme
-    the_fftw_scheme = clib.create_fftw_scheme(the_averaging_scheme.total_orientations, number_of_sidebands)
-
-# _____________________________________________________________________________
-
-# frequency contrib
-    cdef ndarray[bool_t] freq_contrib_c = np.asarray(freq_contrib, dtype=np.bool)
-
-# affine transformation
-    cdef ndarray[double] affine_matrix_c
-    if method.affine_matrix is None:
-        affine_matrix_c = np.asarray([1, 0, 0, 1], dtype=np.float64)
-    else:
-        increment_fraction = [incre/item for item in incre]
-        matrix = method.affine_matrix.ravel() * np.asarray(increment_fraction).ravel()
-        affine_matrix_c = np.asarray(matrix, dtype=np.float64)
-        if affine_matrix_c[2] != 0:
-            affine_matrix_c[2] /= affine_matrix_c[0]
-            affine_matrix_c[3] -=  affine_matrix_c[1]*affine_matrix_c[2]
-
-    # B0 = dimension.magnetic_flux_density
-
-    # if verbose in [1, 11]:
-    #     text = "`one_d_spectrum` method simulation parameters."
-    #     len_ = len(text)
-    #     print(text)
-    #     print(f"{'-'*(len_-1)}")
-    #     print (f'Macroscopic magnetic flux density (B0) = {B0} T')
-    #     print (f'Sample rotation angle is (θ) = {rotor_angle_in_rad} rad')
-    #     print (f'Sample rotation frequency (𝜈r) = {sample_rotation_frequency_in_Hz} Hz')
-
-# sites _______________________________________________________________________________
-    p_isotopes = None
-
-    cdef int number_of_sites, number_of_couplings, p_number_of_sites=0
-    cdef ndarray[int] spin_index_ij
-    cdef ndarray[float] spin_i
-    cdef ndarray[double] gyromagnetic_ratio_i
-
-    # CSA
-    cdef ndarray[double] iso_n
-    cdef ndarray[double] zeta_n
-    cdef ndarray[double] eta_n
-    cdef ndarray[double] ori_n
-
-    # quad
-    cdef ndarray[double] Cq_e
-    cdef ndarray[double] eta_e
-    cdef ndarray[double] ori_e
-
-    # J-coupling
-    cdef ndarray[double] iso_j
-    cdef ndarray[double] zeta_j
-    cdef ndarray[double] eta_j
-    cdef ndarray[double] ori_j
-
-    # quad
-    cdef ndarray[double] D_d
-    cdef ndarray[double] eta_d
-    cdef ndarray[double] ori_d
-
-
-
-    cdef int trans__, pathway_increment, pathway_count, transition_count_per_pathway
-    cdef ndarray[double, ndim=1] amp
-    amp1 = np.zeros(total_n_points, dtype=np.float64)
-    amp_individual = []
-
-    cdef clib.site_struct sites_c
-    cdef clib.coupling_struct couplings_c
-
-    index_ = []
-
-    # -------------------------------------------------------------------------
-    # sample __________________________________________________________________
-    for index, spin_sys in enumerate(spin_systems):
-        abundance = spin_sys.abundance
-        isotopes = [site.isotope.symbol for site in spin_sys.sites]
-        if channel not in isotopes:
-            if decompose_spectrum == 1:
-                amp_individual.append([])
-            continue
-
-        # sub_sites = [site for site in spin_sys.sites if site.isotope.symbol == isotope]
-        index_.append(index)
-        number_of_sites = len(spin_sys.sites)
-
-        # ------------------------------------------------------------------------
-        #                          Site specification
-        # ------------------------------------------------------------------------
-        # CSA
-        spin_i = np.empty(number_of_sites, dtype=np.float32)
-        gyromagnetic_ratio_i = np.empty(number_of_sites, dtype=np.float64)
-
-        iso_n = np.zeros(number_of_sites, dtype=np.float64)
-        zeta_n = np.zeros(number_of_sites, dtype=np.float64)
-        eta_n = np.zeros(number_of_sites, dtype=np.float64)
-        ori_n = np.zeros(3*number_of_sites, dtype=np.float64)
-
-        # Quad
-        Cq_e = np.zeros(number_of_sites, dtype=np.float64)
-        eta_e = np.zeros(number_of_sites, dtype=np.float64)
-        ori_e = np.zeros(3*number_of_sites, dtype=np.float64)
-
-        # Extract and assign site information from Site objects to C structure
-        # ---------------------------------------------------------------------
-        for i in range(number_of_sites):
-            site = spin_sys.sites[i]
-            spin_i[i] = site.isotope.spin
-            gyromagnetic_ratio_i[i] = site.isotope.gyromagnetic_ratio
-            i3 = 3*i
-
-            # CSA tensor
-            if site.isotropic_chemical_shift is not None:
-                iso_n[i] = site.isotropic_chemical_shift
-
-            shielding = site.shielding_symmetric
-            if shielding is not None:
-                if shielding.zeta is not None:
-                    zeta_n[i] = shielding.zeta
-                if shielding.eta is not None:
-                    eta_n[i] = shielding.eta
-                if shielding.alpha is not None:
-                    ori_n[i3] = shielding.alpha
-                if shielding.beta is not None:
-                    ori_n[i3+1] = shielding.beta
-                if shielding.gamma is not None:
-                    ori_n[i3+2] = shielding.gamma
-
-            # if verbose in [1, 11]:
-            #     text = ((
-            #         f"\n{isotope} site {i} from spin system {index} "
-            #         f"@ {abundance}% abundance"
-            #     ))
-            #     len_ = len(text)
-            #     print(text)
-            #     print(f"{'-'*(len_-1)}")
-            #     print(f'Isotropic chemical shift (δ) = {str(1e6*iso/larmor_frequency)} ppm')
-            #     print(f'Shielding anisotropy (ζ) = {str(1e6*zeta/larmor_frequency)} ppm')
-            #     print(f'Shielding asymmetry (η) = {eta}')
-            #     print(f'Shielding orientation = [alpha = {alpha}, beta = {beta}, gamma = {gamma}]')
-
-            # quad tensor
-            if spin_quantum_number > 0.5:
-                quad = site.quadrupolar
-                if quad is not None:
-                    if quad.Cq is not None:
-                        Cq_e[i] = quad.Cq
-                    if quad.eta is not None:
-                        eta_e[i] = quad.eta
-                    if quad.alpha is not None:
-                        ori_e[i3] = quad.alpha
-                    if quad.beta is not None:
-                        ori_e[i3+1] = quad.beta
-                    if quad.gamma is not None:
-                        ori_e[i3+2] = quad.gamma
-
-                # if verbose in [1, 11]:
-                #     print(f'Quadrupolar coupling constant (Cq) = {Cq_e[i]/1e6} MHz')
-                #     print(f'Quadrupolar asymmetry (η) = {eta}')
-                #     print(f'Quadrupolar orientation = [alpha = {alpha}, beta = {beta}, gamma = {gamma}]')
+    if verbose in [1, 11]:
+        for i, (skipped, total) in enumerate(intensity):
+            fraction = skipped / total if total != 0 else 0.0
+            print(f'Skipped sideband intensity (method {i}) = {fraction:.3e}')
 
-        # sites packed as c struct
-        sites_c.number_of_sites = number_of_sites
-        sites_c.spin = &spin_i[0]
-        sites_c.gyromagnetic_ratio = &gyromagnetic_ratio_i[0]
-
-        sites_c.isotropic_chemical_shift_in_ppm = &iso_n[0]
-        sites_c.shielding_symmetric_zeta_in_ppm = &zeta_n[0]
-        sites_c.shielding_symmetric_eta = &eta_n[0]
-        sites_c.shielding_orientation = &ori_n[0]
-
-        sites_c.quadrupolar_Cq_in_Hz = &Cq_e[0]
-        sites_c.quadrupolar_eta = &eta_e[0]
-        sites_c.quadrupolar_orientation = &ori_e[0]
-        # ------------------------------------------------------------------------
-        #                           Coupling specification
-        # ------------------------------------------------------------------------
-        # J-coupling
-        couplings_c.number_of_couplings = 0
-        if spin_sys.couplings is not None:
-            number_of_couplings = len(spin_sys.couplings)
-            spin_index_ij = np.zeros(2*number_of_couplings, dtype=np.int32)
-
-            iso_j = np.zeros(number_of_couplings, dtype=np.float64)
-            zeta_j = np.zeros(number_of_couplings, dtype=np.float64)
-            eta_j = np.zeros(number_of_couplings, dtype=np.float64)
-            ori_j = np.zeros(3*number_of_couplings, dtype=np.float64)
-
-            # Dipolar
-            D_d = np.zeros(number_of_couplings, dtype=np.float64)
-            eta_d = np.zeros(number_of_couplings, dtype=np.float64)
-            ori_d = np.zeros(3*number_of_couplings, dtype=np.float64)
-
-            # Extract and assign coupling information from Site objects to C structure
-            for i in range(number_of_couplings):
-                coupling = spin_sys.couplings[i]
-                spin_index_ij[2*i: 2*i+2] = coupling.site_index
-                i3 = 3*i
-
-                # J tensor
-                if coupling.isotropic_j is not None:
-                    iso_j[i] = coupling.isotropic_j
-
-                J_sym = coupling.j_symmetric
-                if J_sym is not None:
-                    if J_sym.zeta is not None:
-                        zeta_j[i] = J_sym.zeta
-                    if J_sym.eta is not None:
-                        eta_j[i] = J_sym.eta
-                    if J_sym.alpha is not None:
-                        ori_j[i3] = J_sym.alpha
-                    if J_sym.beta is not None:
-                        ori_j[i3+1] = J_sym.beta
-                    if J_sym.gamma is not None:
-                        ori_j[i3+2] = J_sym.gamma
-
-                # dipolar tensor
-                dipolar = coupling.dipolar
-                if dipolar is not None:
-                    if dipolar.D is not None:
-                        D_d[i] = dipolar.D
-                    if dipolar.eta is not None:
-                        eta_d[i] = dipolar.eta
-                    if dipolar.alpha is not None:
-                        ori_d[i3] = dipolar.alpha
-                    if dipolar.beta is not None:
-                        ori_d[i3+1] = dipolar.beta
-                    if dipolar.gamma is not None:
-                        ori_d[i3+2] = dipolar.gamma
-
-            if verbose in [1, 11]:
-                print(f'N couplings = {number_of_couplings}')
-                print(f'site index J = {spin_index_ij}')
-                print(f'Isotropic J = {iso_j} Hz')
-                print(f'J anisotropy = {zeta_j} Hz')
-                print(f'J asymmetry = {eta_j}')
-                print(f'J orientation = {ori_j}')
-
-                print(f'Dipolar coupling constant = {D_d} Hz')
-                print(f'Dipolar asymmetry = {eta_d}')
-                print(f'Dipolar orientation = {ori_d}')
-
-            # couplings packed as c struct
-            couplings_c.number_of_couplings = number_of_couplings
-            couplings_c.site_index = &spin_index_ij[0]
-
-            couplings_c.isotropic_j_in_Hz = &iso_j[0]
-            couplings_c.j_symmetric_zeta_in_Hz = &zeta_j[0]
-            couplings_c.j_symmetric_eta = &eta_j[0]
-            couplings_c.j_orientation = &ori_j[0]
-
-            couplings_c.dipolar_coupling_in_Hz = &D_d[0]
-            couplings_c.dipolar_eta = &eta_d[0]
-            couplings_c.dipolar_orientation = &ori_d[0]
-
-
-        # Spectrum amplitude vector -------------------------------------------
-        amp = np.zeros(total_n_points)
-
-        # if number_of_sites == 0:
-        #     if decompose_spectrum == 1:
-        #         amp_individual.append([])
-        #     continue
-
-        if number_of_sites != p_number_of_sites and isotopes != p_isotopes:
-            transition_pathway = spin_sys.transition_pathways
-            if transition_pathway is None:
-                transition_pathway = np.asarray(method._get_transition_pathways_np(spin_sys))
-                transition_pathway_c = np.asarray(transition_pathway, dtype=np.float32).ravel()
-            else:
-                transition_pathway = np.asarray(transition_pathway)
-                # convert transition objects to list
-                lst = [item.tolist() for item in transition_pathway.ravel()]
-                transition_pathway_c = np.asarray(lst, dtype=np.float32).ravel()
-
-            pathway_count, transition_count_per_pathway = transition_pathway.shape[:2]
-            pathway_increment = 2*number_of_sites*transition_count_per_pathway
-
-            p_number_of_sites = number_of_sites
-            p_isotopes = isotopes
-
-        # if spin_sys.transitions is not None:
-        #     transition_pathway_c = np.asarray(
-        #         spin_sys.transitions, dtype=np.float32
-        #     ).ravel()
-        # else:
-        #     transition_pathway_c = np.asarray([0.5, -0.5], dtype=np.float32)
-
-        # the number 2 is because of single site transition [mi, mf]
-        # it dose not work for coupled sites.
-        # transition_increment = 2*number_of_sites
-        # number_of_transitions = int((transition_pathway_c.size)/transition_increment)
-
-        for trans__ in range(pathway_count):
-            clib.__mrsimulator_core(
-                # spectrum information and related amplitude
-                &amp[0],
-                &sites_c,
-                &couplings_c,
-                &transition_pathway_c[pathway_increment*trans__],
-                n_dimension,          # The total number of spectroscopic dimensions.
-                dimensions,           # Pointer to MRS_dimension structure
-                the_fftw_scheme,      # Pointer to the fftw scheme.
-                the_averaging_scheme, # Pointer to the powder averaging scheme.
-                interpolation,
-                &freq_contrib_c[0],
-                &affine_matrix_c[0],
-                )
-
-        temp = amp*abundance/norm
-
-        if decompose_spectrum == 1:
-            amp_individual.append(temp.reshape(method.shape()))
-        else:
-            amp1 += temp
-        # else:
-        #     if decompose_spectrum == 1:
-        #         amp_individual.append([])
-
-    # reverse the spectrum if gyromagnetic ratio is positive.
-    if decompose_spectrum == 1 and len(amp_individual) != 0:
-        if gyromagnetic_ratio < 0:
-            amp1 = [np.fft.fftn(np.fft.ifftn(item).conj()).real for item in amp_individual]
+    spectra = [task.spectrum() for task in tasks]
+    if return_sideband_intensity:
+        return spectra, intensity
+    return spectra
+
+
+__simd_levels__ = {"scalar": 0, "avx2": 1, "avx512": 2}
+
+
+def get_simd_level():
+    """Return the SIMD level of the wigner rotation kernels, one of `scalar`, `avx2`,
+    or `avx512`. Unless set with `set_simd_level`, the highest level supported by the
+    CPU is selected at runtime."""
+    level = clib.MRS_get_simd_level()
+    return [k for k, v in __simd_levels__.items() if v == level][0]
+
+
+def set_simd_level(level="auto"):
+    """Set the SIMD level of the wigner rotation kernels.
+
+    :ivar level:
+        One of `auto`, `scalar`, `avx2`, or `avx512`. When `auto`, or when the level
+        is not supported by the CPU, the highest supported level is selected.
+
+    Returns:
+        The SIMD level in use.
+    """
+    if level != "auto" and level not in __simd_levels__:
+        raise ValueError(
+            "Expecting the SIMD level to be one of `auto`, `scalar`, `avx2`, or "
+            f"`avx512`, found {level}."
+        )
+    clib.MRS_set_simd_level(__simd_levels__.get(level, -1))
+    return get_simd_level()
+
+
+__sideband_engines__ = {"auto": 0, "fft": 1, "bessel": 2}
+
+
+def get_sideband_engine():
+    """Return the engine of the spinning sideband amplitudes, one of `auto`, `fft`, or
+    `bessel`."""
+    engine = clib.MRS_get_sideband_engine()
+    return [k for k, v in __sideband_engines__.items() if v == engine][0]
+
+
+def set_sideband_engine(engine="auto"):
+    """Set the engine of the spinning sideband amplitudes.
+
+    The `fft` engine evaluates the amplitudes from the Fourier transform of the
+    sideband phase over a rotor period. When the sideband phase is only from the
+    second-rank tensors, for example, from the shielding, J, and dipolar couplings of
+    spin-1/2 sites, the `bessel` engine evaluates the amplitudes from a series of the
+    Bessel functions of the first kind. The cost of the series grows with the
+    anisotropy relative to the rotor frequency, and is independent of the number of
+    sidebands. With `auto`, the engine of the lower estimated cost is selected per
+    spin system and event.
+
+    :ivar engine:
+        One of `auto`, `fft`, or `bessel`.
+
+    Returns:
+        The engine in use.
+    """
+    if engine not in __sideband_engines__:
+        raise ValueError(
+            "Expecting the sideband engine to be one of `auto`, `fft`, or `bessel`, "
+            f"found {engine}."
+        )
+    clib.MRS_set_sideband_engine(__sideband_engines__[engine])
+    return get_sideband_engine()
+
+
+def _get_transition_pathway_table(method, spin_systems, channel):
+    """Return the transition pathways from the packed spin systems as a table.
+
+    Returns:
+        A tuple of a float32 array of the packed transition pathways, an int32 array of
+        the offsets to the first pathway per spin system, an int32 array of the number
+        of pathways per spin system, and a boolean array, which is True if the spin
+        system contains the observed channel.
+    """
+    from mrsimulator.spin_system import SpinSystem
+
+    has_channel = spin_systems.contains_isotope(channel)
+
+    # Transition pathways only depend on the isotopes of the sites within the spin
+    # system. Evaluate the pathways once for every unique isotope signature.
+    table, offsets, counts, size = [], [], [], 0
+    for signature in spin_systems.signatures:
+        pathways = []
+        if channel in signature:
+            sys = SpinSystem(sites=[{"isotope": item} for item in signature])
+            pathways = method._get_transition_pathways_np(sys)
+        pathways_c = np.asarray(pathways, dtype=np.float32).ravel()
+        table.append(pathways_c)
+        offsets.append(size)
+        counts.append(len(pathways))
+        size += pathways_c.size
+
+    index = spin_systems.signature_index
+    pathway_offsets = np.asarray(offsets, dtype=np.int32)[index]
+    pathway_counts = np.asarray(counts, dtype=np.int32)[index] * has_channel
+
+    # user-defined transition pathways.
+    for index, pathways in spin_systems.transition_pathways.items():
+        if has_channel[index]:
+            table.append(pathways.ravel())
+            pathway_offsets[index] = size
+            pathway_counts[index] = pathways.shape[0]
+            size += pathways.size
+
+    table.append(np.zeros(1, dtype=np.float32))
+    return (
+        np.concatenate(table),
+        np.asarray(pathway_offsets, dtype=np.int32),
+        np.asarray(pathway_counts, dtype=np.int32),
+        has_channel,
+    )
+
+
+def _isotropic_spin_systems(spin_systems, spin_quantum_number):
+    """Return a boolean array, which is True for the spin systems without couplings,
+    and without shielding anisotropy and quadrupolar coupling at every site. The
+    quadrupolar coupling is ignored when the observed spin is 1/2."""
+    anisotropic = spin_systems.shielding_symmetric_zeta != 0
+    if spin_quantum_number > 0.5:
+        anisotropic |= spin_systems.quadrupolar_Cq != 0
+    anisotropic_sites = np.add.reduceat(
+        np.append(anisotropic, False), spin_systems.site_offsets[:-1]
+    )
+    anisotropic_sites[np.diff(spin_systems.site_offsets) == 0] = 0
+    return (anisotropic_sites == 0) & (np.diff(spin_systems.coupling_offsets) == 0)
+
+
+@lru_cache(maxsize=32)
+def _octahedron_triangles(nt):
+    """Return the vertex indexes of the triangles over an octahedron face, in the order
+    of the octahedron interpolation."""
+    triangles, i, j, local_index, n_pts = [], 0, 0, nt - 1, (nt + 1) * (nt + 2) // 2
+    while i < n_pts - 1:
+        triangles.append((i + 1, nt + 1 + j, i))
+        if i < local_index:
+            triangles.append((i + 1, nt + 1 + j, nt + 2 + j))
         else:
-            amp1 = amp_individual
-    else:
-        amp1.shape = method.shape()
-        if gyromagnetic_ratio < 0:
-            amp1 = np.fft.fftn(np.fft.ifftn(amp1).conj()).real
-
-    clib.MRS_free_dimension(dimensions, n_dimension)
-    clib.MRS_free_averaging_scheme(the_averaging_scheme)
-    clib.MRS_free_fftw_scheme(the_fftw_scheme)
-    return amp1
+            local_index = j + nt
+            i += 1
+        i += 1
+        j += 1
+    return np.asarray(triangles)
+
+
+@lru_cache(maxsize=32)
+def _delta_amplitude(integration_density, integration_volume, number_of_sidebands):
+    """Return the total amplitude of a delta function after the powder averaging, that
+    is, the sum of the triangle amplitudes over the octahedron faces. The sum follows
+    the order of the octahedron interpolation."""
+    nt = integration_density
+    x, y, z = [], [], []
+    for j in range(nt):
+        for i in range(nt - j + 1):
+            x.append(nt - i - j)
+            y.append(i)
+            z.append(j)
+    r2 = np.asarray(x, dtype=np.float64) ** 2 + np.asarray(y) ** 2 + np.asarray(z) ** 2
+    amplitudes = np.append(float(nt) / (r2 * np.sqrt(r2)), 1.0 / (float(nt) * nt))
+
+    n_octants = [1, 4, 8][integration_volume]
+    n_sidebands = number_of_sidebands
+    amplitudes *= 1.0 / (n_sidebands * n_sidebands * n_octants)
+    if n_sidebands != 1:
+        amplitudes *= float(n_sidebands) * n_sidebands
+
+    tri = _octahedron_triangles(nt)
+    tri_amplitudes = (amplitudes[tri[:, 0]] + amplitudes[tri[:, 1]]) + amplitudes[
+        tri[:, 2]
+    ]
+    return np.cumsum(np.tile(tri_amplitudes, n_octants))[-1]
+
+
+def _bin_isotropic_spin_systems(amp, spin_systems, pathway_counts, transition_pathways,
+                                pathway_offsets, weights, delta_amplitude, B0,
+                                fraction, contribution, count, coordinates_offset,
+                                increment, decompose):
+    """Add the delta functions from the transition pathways of the isotropic spin
+    systems to the spectrum. The delta functions are linearly interpolated between the
+    two nearest points, following the convention of the triangle interpolation.
+
+    Args:
+        amp: The spectrum as a 2D array, with a row per spin system when decompose is
+            true, otherwise, a single row.
+        pathway_counts: The number of transition pathways per spin system, where the
+            count is zero for the spin systems that are not binned.
+    """
+    system = np.repeat(np.arange(pathway_counts.size), pathway_counts)
+    starts = np.cumsum(pathway_counts) - pathway_counts
+    rank = np.arange(system.size) - np.repeat(starts, pathway_counts)
+
+    # every transition pathway is packed as the initial followed by the final quantum
+    # numbers of the sites within the spin system.
+    n_sites = np.diff(spin_systems.site_offsets)[system]
+    start = pathway_offsets[system] + 2 * rank * n_sites
+    pathway = np.repeat(np.arange(system.size), n_sites)
+    site_rank = np.arange(pathway.size) - np.repeat(np.cumsum(n_sites) - n_sites, n_sites)
+    mi = transition_pathways[start[pathway] + site_rank].astype(np.float64)
+    mf = transition_pathways[start[pathway] + n_sites[pathway] + site_rank]
+    site = spin_systems.site_offsets[system][pathway] + site_rank
+
+    # isotropic frequency of every transition pathway, in units of the increment.
+    larmor_frequency = -B0 * spin_systems.gyromagnetic_ratio[site]
+    R0 = spin_systems.isotropic_chemical_shift[site] * larmor_frequency * (mf - mi)
+    R0 = np.bincount(pathway, weights=R0, minlength=system.size) * contribution
+    inverse_increment = 1.0 / increment
+    freq = (0.5 - coordinates_offset * inverse_increment) + (
+        R0 * inverse_increment * fraction
+    )
+
+    index = np.trunc(freq).astype(int)
+    keep = (index >= 0) & (index < count)
+    system, freq, index = system[keep], freq[keep], index[keep]
+    diff = freq - index
+    amplitude = weights[system]
+    delta_amplitude = np.full(diff.size, delta_amplitude)
+    row = system * count if decompose else np.zeros_like(system)
+
+    center = np.abs(diff - 0.5) < 1.0e-6
+    left = ~center & (diff < 0.5)
+    right = ~center & (diff > 0.5)
+    position = [
+        index[center],
+        index[left],
+        index[left] - 1,
+        index[right],
+        index[right] + 1,
+    ]
+    values = [
+        amplitude[center] * delta_amplitude[center],
+        amplitude[left] * (delta_amplitude[left] * (0.5 + diff[left])),
+        amplitude[left] * (delta_amplitude[left] * (0.5 - diff[left])),
+        amplitude[right] * (delta_amplitude[right] * (1.5 - diff[right])),
+        amplitude[right] * (delta_amplitude[right] * (diff[right] - 0.5)),
+    ]
+    offsets = [row[center], row[left], row[left], row[right], row[right]]
+    position = np.concatenate(position)
+    valid = (position >= 0) & (position < count)
+    position = (np.concatenate(offsets) + position)[valid]
+    values = np.concatenate(values)[valid]
+    amp += np.bincount(position, weights=values, minlength=amp.size).reshape(amp.shape)
 
 
 @cython.profile(False)
@@ -156,6 +156,84 @@ extern void __batch_wigner_rotation(const unsigned int octant_orientations,
                                     complex128 *exp_Im_alpha, complex128 *w2,
                                     complex128 *w4);
 
+/**
+ * Same as `__batch_wigner_rotation` over a range of `octant_orientations` orientations
+ * from every octant, where the octants are `stride` orientations apart in the wigner
+ * matrices of the sphere, and in w2 and w4. The `exp_Im_alpha` array holds the range,
+ * with `octant_orientations` as the leading dimension. `__batch_wigner_rotation` is the
+ * range of the full octant, where the `stride` is `octant_orientations`.
+ */
+extern void __batch_wigner_rotation_strided(
+    const unsigned int octant_orientations, const unsigned int stride,
+    const unsigned int n_octants, double *wigner_2j_matrices, complex128 *R2,
+    double *wigner_4j_matrices, complex128 *R4, complex128 *exp_Im_alpha,
+    complex128 *w2, complex128 *w4);
+
+/**
+ * Add the m=0 components of the second and fourth rank tensors after the rotation of
+ * `__batch_wigner_rotation_strided`, scaled by `scale_2` and `scale_4`, to `freq`,
+ * where the frequencies of the octants are `stride` orientations apart. For a static
+ * sample, the m=0 components are the lab-frame frequencies, and only the row m=0 of the
+ * wigner matrices is evaluated.
+ *
+ * @param octant_orientations The number of orientations in the range of an octant.
+ * @param stride The number of orientations between the octants.
+ * @param n_octants Number of octants.
+ * @param wigner_2j_matrices A pointer to a stack of 5x5 second rank wigner matrices.
+ * @param R2 A pointer to the second rank tensor coefficients of length 5 to be rotated,
+ *      or NULL to skip the second rank tensor.
+ * @param scale_2 The scaling of the second rank frequencies.
+ * @param wigner_4j_matrices A pointer to a stack of 9x9 fourth rank wigner matrices,
+ *      or NULL to skip the fourth rank tensor.
+ * @param R4 A pointer to the fourth rank tensor coefficients of length 9 to be rotated.
+ * @param scale_4 The scaling of the fourth rank frequencies.
+ * @param exp_Im_alpha A pointer to a `4 x octant_orientations` array with the exp(-Imα)
+ *      with `octant_orientations` as the leading dimension, ordered as m=[-4,-3,-2,-1].
+ * @param freq A pointer to the frequencies of the orientations.
+ */
+extern void __batch_wigner_rotation_m0(
+    const unsigned int octant_orientations, const unsigned int stride,
+    const unsigned int n_octants, double *wigner_2j_matrices, complex128 *R2,
+    const double scale_2, double *wigner_4j_matrices, complex128 *R4,
+    const double scale_4, complex128 *exp_Im_alpha, double *freq);
+
+// SIMD levels of the wigner rotation kernels ....................................... //
+
+#define MRS_SIMD_AUTO -1  // The highest level supported by the CPU.
+#define MRS_SIMD_SCALAR 0 // The portable scalar kernel.
+#define MRS_SIMD_AVX2 1   // The AVX2 and FMA kernel.
+#define MRS_SIMD_AVX512 2 // The AVX-512F kernel.
+
+/**
+ * @brief Return the highest SIMD level of the wigner rotation kernels supported by the
+ * CPU and the build.
+ */
+extern int MRS_simd_supported_level(void);
+
+/**
+ * @brief Set the SIMD level of the wigner rotation kernels.
+ *
+ * @param level The SIMD level. A negative level, or a level that is not supported by
+ *      the CPU, selects the highest supported level.
+ * @return The SIMD level in use.
+ */
+extern int MRS_set_simd_level(int level);
+
+/**
+ * @brief Return the SIMD level of the wigner rotation kernels. When the level is not
+ * set, the highest level supported by the CPU is selected on the first call.
+ */
+extern int MRS_get_simd_level(void);
+
+/**
+ * @brief Same as `__wigner_rotation_2`, evaluated with the kernel of the SIMD level
+ * from `MRS_get_simd_level`. The SIMD kernels assume the symmetry of the wigner-d
+ * matrices, @f$d^{l}_{m_1, m_2} = (-1)^{m_1-m_2} d^{l}_{m_2, m_1}@f$.
+ */
+extern void __wigner_rotation_simd(const int l, const int n, const double *wigner,
+                                   const void *exp_Im_alpha, const void *R_in,
+                                   void *R_out);
+
 /**
  * ✅ Calculates exp(-Im alpha) where alpha is an array of size n.
  * The function accepts cos_alpha = cos(alpha).
@@ -0,0 +1,73 @@
+// -*- coding: utf-8 -*-
+//
+//  arena.h
+//
+//  @copyright Deepansh J. Srivastava, 2019-2021.
+//  Created by Deepansh J. Srivastava, Oct 18, 2026.
+//  Contact email = srivastava.89@osu.edu
+//
+
+#ifndef arena_h
+#define arena_h
+
+#include "config.h"
+
+/**
+ * @struct MRS_arena
+ * A reusable block of memory for the scratch buffers of a single call to the core, such
+ * as the tensor components and the sideband amplitudes of the powder averaging. The
+ * buffers are taken from the block with a pointer increment, and are released together
+ * with `MRS_arena_reset` at the start of the next call.
+ *
+ * When a call requests more memory than the block holds, the remaining requests are
+ * served from the heap, and the block grows to the total size of the call at the next
+ * reset. After the first call of a given size, a call makes no heap allocation.
+ */
+typedef struct MRS_arena {
+  char *block;     /**< The block of memory. */
+  size_t size;     /**< The size of the block in bytes. */
+  size_t used;     /**< The bytes taken from the block since the last reset. */
+  size_t overflow; /**< The bytes served from the heap since the last reset. */
+  void **heap;     /**< The buffers served from the heap since the last reset. */
+  unsigned int n_heap, heap_capacity;
+} MRS_arena;
+
+/**
+ * @brief Create an arena with a block of `size` bytes.
+ *
+ * @param size The initial size of the block in bytes. The block grows as required.
+ * @return A pointer to the MRS_arena.
+ */
+MRS_arena *MRS_create_arena(size_t size);
+
+/**
+ * @brief Free the memory of the arena.
+ *
+ * @param arena A pointer to the MRS_arena.
+ */
+void MRS_free_arena(MRS_arena *arena);
+
+/**
+ * @brief Release every buffer taken from the arena since the last reset, and grow the
+ * block to the total size of the buffers when the block was too small.
+ *
+ * @param arena A pointer to the MRS_arena.
+ */
+void MRS_arena_reset(MRS_arena *arena);
+
+/**
+ * @brief Take a buffer of `size` bytes from the arena, with the alignment of a buffer
+ * from malloc. The buffer is valid until the next reset of the arena.
+ *
+ * @param arena A pointer to the MRS_arena.
+ * @param size The size of the buffer in bytes.
+ * @return A pointer to the buffer.
+ */
+void *MRS_arena_malloc(MRS_arena *arena, size_t size);
+
+// Take a buffer for `m` elements of a given type from the arena.
+#define arena_double(arena, m) (double *)MRS_arena_malloc(arena, (m) * sizeof(double))
+#define arena_complex128(arena, m)                                                    \
+  (complex128 *)MRS_arena_malloc(arena, (m) * sizeof(complex128))
+
+#endif /* arena_h */
@@ -24,6 +24,28 @@
 extern void triangle_interpolation(double *f1, double *f2, double *f3, double *amp,
                                    double *spec, int *m0);
 
+/**
+ * @func triangle_strip_interpolation
+ *
+ * Create the triangles of a strip between a row of n + 1 points and the next row of n
+ * points onto a 1D grid. The k-th pair of triangles have the coordinates
+ * (top[k], top[k + 1], bottom[k]) and (top[k + 1], bottom[k], bottom[k + 1]), where
+ * the last triangle of the pair is absent for k = n - 1. The area of a triangle is the
+ * sum of the amplitudes at the three coordinates.
+ *
+ * @param freq_top A pointer to the coordinates of the row of n + 1 points.
+ * @param freq_bottom A pointer to the coordinates of the row of n points.
+ * @param amp_top A pointer to the amplitudes of the row of n + 1 points.
+ * @param amp_bottom A pointer to the amplitudes of the row of n points.
+ * @param stride The stride of the `amp_top` and `amp_bottom` arrays.
+ * @param n The number of points in the bottom row.
+ * @param spec A pointer to the starting of the array of one dimensional grid.
+ * @param m The number of points on the 1D grid.
+ */
+extern void triangle_strip_interpolation(double *freq_top, double *freq_bottom,
+                                         double *amp_top, double *amp_bottom,
+                                         int stride, int n, double *spec, int m);
+
 /**
  * @func triangle_interpolation2D
  *
@@ -44,3 +66,40 @@ extern void triangle_interpolation(double *f1, double *f2, double *f3, double *a
 extern int triangle_interpolation2D(double *f11, double *f12, double *f13, double *f21,
                                     double *f22, double *f23, double *amp, double *spec,
                                     int m0, int m1);
+
+/**
+ * @func point_set_interpolation
+ *
+ * Bin a set of delta functions at the coordinates `freq` onto a 1D grid. Every delta
+ * function is linearly interpolated between the two nearest grid points, following
+ * the convention of `triangle_interpolation` for a triangle of zero width. Used with
+ * the orientation averaging schemes from a set of points, where no triangulation of
+ * the orientations exists.
+ *
+ * @param spec A pointer to the starting of the array of one dimensional grid.
+ * @param freq A pointer to the array of coordinates of length `n`.
+ * @param n The number of delta functions.
+ * @param amp A pointer to the amplitudes of the delta functions.
+ * @param stride The stride of the `amp` array.
+ * @param m The number of points on the 1D grid.
+ */
+extern void point_set_interpolation(double *spec, double *freq, int n, double *amp,
+                                    int stride, int m);
+
+/**
+ * @func point_set_interpolation2D
+ *
+ * Bin a set of delta functions at the coordinates (freq1, freq2) onto a 2D grid with
+ * a bilinear interpolation between the four nearest grid points.
+ *
+ * @param spec A pointer to the starting of the array of two dimensional grid.
+ * @param freq1 A pointer to the array of coordinates along the rows of length `n`.
+ * @param freq2 A pointer to the array of coordinates along the columns of length `n`.
+ * @param n The number of delta functions.
+ * @param amp A pointer to the amplitudes of the delta functions.
+ * @param stride The stride of the `amp` array.
+ * @param m0 An interger with the rows in the 2D grid.
+ * @param m1 An interger with the columns in the 2D grid.
+ */
+extern void point_set_interpolation2D(double *spec, double *freq1, double *freq2, int n,
+                                      double *amp, int stride, int m0, int m1);
@@ -35,6 +35,22 @@ typedef struct MRS_dimension {
   double *freq_offset;     // buffer for local + sideband frequencies.
   double normalize_offset; // fixed value = 0.5 - coordinate_offset/increment
   double inverse_increment;
+
+  /* The sideband orders with a summed absolute amplitude below `sideband_threshold`
+   * times the total amplitude, over all sideband orders, are skipped before the
+   * interpolation. For two-dimensional methods, the threshold of the first dimension
+   * applies to the pairs of sideband orders from the two dimensions. The default value
+   * is zero, that is, no sideband order is skipped. */
+  double sideband_threshold;
+
+  /* The sum of the absolute amplitudes of the skipped sideband orders, or pairs of
+   * sideband orders in two dimensions, and the sum over all orders, or pairs, added up
+   * over the simulation. The sums are zero when no sideband order is skipped. */
+  double sideband_intensity[2];
+
+  /* If true, the sideband phase of the events is evaluated in single precision, see
+   * MRS_get_amplitudes_from_plan. The default value is false. */
+  bool single_precision;
 } MRS_dimension;
 
 /**
@@ -61,11 +77,12 @@ MRS_dimension *MRS_dimension_malloc(int n);
  * @param magnetic_flux_density_in_T Pointer to magnetic flux density array along each
  *      dimension.
  * @param sample_rotation_frequency_in_Hz Pointer to rotation frequency array along each
- *      dimension.
+ *      dimension. A zero frequency is a static event, see MRS_plan.is_static.
  * @param rotor_angle_in_rad Pointer to rotor angle array along each dimension.
  * @param	n_events Pointer to number of events list within each dimension.
  * @param n_dim Unsigned int with the number of dimensions.
- * @param number_of_sidebands An int with the number of sidebands.
+ * @param number_of_sidebands An int with the number of sidebands of the dimensions with
+ *      a spinning event. A dimension of static events only has a single sideband.
  */
 MRS_dimension *MRS_create_dimensions(
     MRS_averaging_scheme *scheme, int *count, double *coordinates_offset,
@@ -81,4 +98,27 @@ MRS_dimension *MRS_create_dimensions(
  */
 void MRS_free_dimension(MRS_dimension *dimensions, unsigned int n);
 
+/**
+ * @brief Create a thread-private workspace from the MRS dimensions.
+ *
+ * The events within the workspace share the plans with `dimensions`, while the buffers
+ * updated during the simulation are private, so that several threads can simulate the
+ * same dimensions at once.
+ *
+ * @param dimensions The pointer to an array of MRS_dimension structs.
+ * @param n_dim Unsigned int with the number of dimensions.
+ * @param scheme Pointer to the MRS_averaging_scheme.
+ */
+MRS_dimension *MRS_create_dimensions_workspace(MRS_dimension *dimensions,
+                                               unsigned int n_dim,
+                                               MRS_averaging_scheme *scheme);
+
+/**
+ * @brief Free the memory allocation for the MRS dimensions workspace.
+ *
+ * @param workspace The pointer to the workspace from MRS_create_dimensions_workspace.
+ * @param n_dim Unsigned int with the number of dimensions.
+ */
+void MRS_free_dimensions_workspace(MRS_dimension *workspace, unsigned int n_dim);
+
 #endif /* method_h */
@@ -11,6 +11,7 @@
 #define mrsimulator_h
 
 #include "angular_momentum.h"
+#include "arena.h"
 #include "config.h"
 #include "fftw3.h"
 #include "frequency_tensor.h"
@@ -49,6 +50,14 @@ struct MRS_plan {
    */
   double rotor_angle_in_rad;
 
+  /**
+   * If true, the sample is static, that is, the sample rotation frequency is zero. The
+   * frequencies of a static plan are the lab-frame frequencies of the rotated tensors,
+   * and the sideband amplitudes are one, see MRS_get_normalized_frequencies_from_plan.
+   * A static plan holds no sideband phase tables.
+   */
+  bool is_static;
+
   /** \privatesection */
   /**
    * A pointer to an array of sideband frequency ratio stored in the fft output order.
@@ -73,6 +82,9 @@ struct MRS_plan {
   complex128 *pre_phase;      // temp buffer to hold sideband phase calculation.
   complex128 *pre_phase_2;    // buffer for 2nk rank sideband phase calculation.
   complex128 *pre_phase_4;    // buffer for 4th rank sideband phase calculation.
+  // single precision pre_phase_2 and pre_phase_4, see MRS_get_amplitudes_from_plan.
+  complex64 *pre_phase_2_single;
+  complex64 *pre_phase_4_single;
   complex128 one;             // holds complex value 1.
   complex128 zero;            // holds complex value 0.
   double buffer;              // buffer for temporary storage.
@@ -85,7 +97,8 @@ typedef struct MRS_plan MRS_plan;
  *
  * @param scheme The MRS_averaging_scheme.
  * @param number_of_sidebands The number of sidebands.
- * @param sample_rotation_frequency_in_Hz The sample rotation frequency in Hz.
+ * @param sample_rotation_frequency_in_Hz The sample rotation frequency in Hz. A zero
+ *          frequency creates a static plan.
  * @param rotor_angle_in_rad The polar angle in radians with respect to the
  *          z-axis describing the axis of rotation.
  * @param increment The increment along the spectroscopic dimension in Hz.
@@ -145,9 +158,69 @@ MRS_plan *MRS_copy_plan(MRS_plan *plan);
  * @param fftw_scheme A pointer to the fftw scheme of type MRS_fftw_scheme.
  * @param refresh If true, zero the output array before proceeding, else add to
  *            the existing array.
+ * @param single_precision If true, evaluate the sideband phase in single precision.
+ *            The Fourier transform is evaluated in double precision.
  */
 void MRS_get_amplitudes_from_plan(MRS_averaging_scheme *scheme, MRS_plan *plan,
-                                  MRS_fftw_scheme *fftw_scheme, bool refresh);
+                                  MRS_fftw_scheme *fftw_scheme, bool refresh,
+                                  bool single_precision);
+
+// Sideband engines of the spinning sideband amplitudes ............................. //
+
+#define MRS_SIDEBAND_ENGINE_AUTO 0   // The engine of the lower estimated cost.
+#define MRS_SIDEBAND_ENGINE_FFT 1    // The Fourier transform of the sideband phase.
+#define MRS_SIDEBAND_ENGINE_BESSEL 2 // The Bessel function series, when applicable.
+
+/**
+ * @brief Set the engine of the spinning sideband amplitudes.
+ *
+ * @param engine One of MRS_SIDEBAND_ENGINE_AUTO, MRS_SIDEBAND_ENGINE_FFT, or
+ *      MRS_SIDEBAND_ENGINE_BESSEL. An unknown engine selects MRS_SIDEBAND_ENGINE_AUTO.
+ * @return The engine in use.
+ */
+extern int MRS_set_sideband_engine(int engine);
+
+/**
+ * @brief Return the engine of the spinning sideband amplitudes. The default is
+ * MRS_SIDEBAND_ENGINE_AUTO.
+ */
+extern int MRS_get_sideband_engine(void);
+
+/**
+ * @brief Evaluate the amplitudes at every orientation and at every sideband per
+ * orientation from the Bessel functions of the first kind, in place of the Fourier
+ * transform of MRS_get_amplitudes_from_plan. Only applies when the sideband phase is
+ * from the second-rank tensors.
+ *
+ * The sideband phase of the rotor-frame second-rank components, w2, is
+ * @f[
+ *    \Phi(\theta) = \sum_{m=1}^{2} z_m \sin(m\theta + \phi_m) + \text{const},
+ * @f]
+ * where
+ * @f$z_m e^{i\phi_m} = (w_{2,m} d^2_{m,0} + w_{2,-m}^* d^2_{-m,0}) / m\omega_r@f$.
+ * From the Jacobi-Anger expansion, the amplitude of the sideband of order @f$p@f$ is
+ * @f[
+ *    F_p = \sum_{k_1 + 2k_2 = p} J_{k_1}(z_1) J_{k_2}(z_2) e^{i(k_1\phi_1+k_2\phi_2)},
+ * @f]
+ * where @f$J_k@f$ is the Bessel function of the first kind. The orders are folded
+ * modulo the number of sidebands, which is the aliasing of the discrete Fourier
+ * transform, such that the amplitudes match MRS_get_amplitudes_from_plan. The cost
+ * grows with the square of @f$z_m@f$, that is, the anisotropy relative to the rotor
+ * frequency, and is independent of the number of sidebands.
+ *
+ * @param scheme The pointer to the powder averaging scheme of type
+ *            MRS_averaging_scheme.
+ * @param plan A pointer to the mrsimulator plan of type MRS_plan.
+ * @param fftw_scheme A pointer to the fftw scheme of type MRS_fftw_scheme. The
+ *            amplitudes are stored in the real part of the `vector`.
+ * @param arena The arena for the scratch buffers.
+ * @param force If false, the amplitudes are only evaluated when the estimated cost is
+ *            lower than the cost of MRS_get_amplitudes_from_plan.
+ * @return True if the amplitudes are evaluated.
+ */
+bool MRS_get_bessel_amplitudes_from_plan(MRS_averaging_scheme *scheme, MRS_plan *plan,
+                                         MRS_fftw_scheme *fftw_scheme, MRS_arena *arena,
+                                         bool force);
 
 // Important: `method.h` header file must be included after defining MRS_plan.
 #include "method.h"
@@ -232,6 +305,104 @@ void MRS_rotate_components_from_PAS_to_common_frame(
     bool *freq_contrib          // The pointer to freq contribs boolean.
 );
 
+/**
+ * @struct MRS_tensor_basis
+ * The spatial tensors of the interactions of a spin system in the common frame, and
+ * their rotation to the rotor frame over the orientations of an averaging scheme.
+ *
+ * The frequency components of a spin transition, see
+ * MRS_rotate_components_from_PAS_to_common_frame, are a linear combination of the
+ * spatial tensors, where the weights are the spin transition functions scaled by the
+ * Larmor frequency. Since the wigner rotation is linear, the rotated frequency
+ * components of every event and transition pathway of the spin system are the same
+ * linear combination of the rotated tensors. A tensor is rotated once per spin system,
+ * when an event first uses the tensor, see MRS_get_normalized_frequencies_from_basis.
+ * For the static events, only the lab-frame frequencies of the tensors are evaluated.
+ * The rotated tensors are independent of the magnetic flux density, the rotor angle,
+ * and the spinning frequency of the events, and are shared between the methods with
+ * the same averaging scheme.
+ *
+ * The second-rank tensors are ordered per site as the nuclear shielding, the
+ * first-order, and the second-order quadrupolar tensors, followed per coupling by the
+ * J and the dipolar tensors. The fourth-rank tensors are the second-order quadrupolar
+ * tensors of the sites, which are rotated with the second-order second-rank tensor of
+ * the site.
+ */
+typedef struct MRS_tensor_basis {
+  unsigned int total_orientations; // The number of orientations of the scheme.
+  bool allow_fourth_rank;          // If true, rotate the fourth-rank tensors.
+  unsigned int n_sites;            // The number of sites of the spin system.
+  unsigned int n_2;                // The number of second-rank tensors.
+
+  /** \privatesection */
+  unsigned int capacity_2, capacity_4; // The allocated number of tensors.
+  double *R0;                          // The zeroth-rank tensors, per second-rank.
+  complex128 *R2;                      // The second-rank tensors, n_2 x 5.
+  complex128 *R4;                      // The fourth-rank tensors, n_sites x 9.
+  bool *nonzero;                       // If false, the tensor and its pair are zero.
+  bool *rotated;                       // If true, the tensor is rotated.
+  bool *rotated_static;                // If true, the lab-frame frequencies are set.
+  complex128 **w2;                     // The second-rank tensors in the rotor frame.
+  complex128 **w4;                     // The fourth-rank tensors in the rotor frame.
+  double **freq_2;                     // The lab-frame frequencies of the second-rank
+  double **freq_4;                     // and fourth-rank tensors of a static sample.
+  double *weights_0, *weights_2, *weights_4; // The weights of the current transition.
+  unsigned int *pending, n_pending;          // The tensors to rotate.
+} MRS_tensor_basis;
+
+/**
+ * @brief Create an empty tensor basis for the orientations of the averaging scheme.
+ *
+ * @param scheme The pointer to the powder averaging scheme.
+ * @return A pointer to the MRS_tensor_basis.
+ */
+MRS_tensor_basis *MRS_create_tensor_basis(MRS_averaging_scheme *scheme);
+
+/**
+ * @brief Free the memory of the tensor basis.
+ *
+ * @param basis A pointer to the MRS_tensor_basis.
+ */
+void MRS_free_tensor_basis(MRS_tensor_basis *basis);
+
+/**
+ * @brief Set the tensor basis to the spatial tensors of a spin system. The rotated
+ * tensors of the previous spin system are discarded, while the memory is reused.
+ *
+ * @param basis A pointer to the MRS_tensor_basis.
+ * @param sites A pointer to the site_struct structure.
+ * @param couplings A pointer to the coupling_struct structure.
+ */
+void MRS_tensor_basis_update(MRS_tensor_basis *basis, site_struct *sites,
+                             coupling_struct *couplings);
+
+/**
+ * @brief Evaluate the weights of the tensors of the basis for a spin transition, and
+ * the frequency components, @p R0, @p R2, and @p R4, from the linear combination of
+ * the tensors. The arguments are the same as
+ * MRS_rotate_components_from_PAS_to_common_frame, where the components are
+ * overwritten.
+ *
+ * @return True if the linear combination of the rotated tensors reads fewer values
+ *      per orientation than the wigner rotation of @p R2 and @p R4, see
+ *      MRS_get_normalized_frequencies_from_basis.
+ */
+bool MRS_tensor_basis_components(MRS_tensor_basis *basis, site_struct *sites,
+                                 coupling_struct *couplings, float *transition,
+                                 bool allow_fourth_rank, double *R0, complex128 *R2,
+                                 complex128 *R4, double B0_in_T, bool *freq_contrib);
+
+/**
+ * @brief Same as MRS_get_normalized_frequencies_from_plan, where the rotated frequency
+ * components are the linear combination of the rotated tensors of the basis, weighted
+ * from the last call to MRS_tensor_basis_components. The tensors with a non-zero
+ * weight are rotated on their first use.
+ */
+void MRS_get_normalized_frequencies_from_basis(MRS_averaging_scheme *scheme,
+                                               MRS_plan *plan, MRS_tensor_basis *basis,
+                                               double R0, bool refresh,
+                                               MRS_dimension *dim, double fraction);
+
 extern void __get_components(unsigned int number_of_sidebands, double spin_frequency,
                              double *restrict pre_phase);
 
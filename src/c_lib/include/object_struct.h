@@ -105,4 +105,45 @@ struct __coupling_struct {
 };
 typedef struct __coupling_struct coupling_struct;
 
+/**
+ * =====================================================================================
+ *                                 Spin systems structure
+ * =====================================================================================
+ * Spin systems structure is a collection of spin systems packed as a structure of
+ * arrays. The sites and couplings from all spin systems are stored contiguously within
+ * the `sites` and `couplings` structures. The sites of the i-th spin system span the
+ * indexes `site_offsets[i]` to `site_offsets[i+1]`, and likewise, the couplings span
+ * `coupling_offsets[i]` to `coupling_offsets[i+1]`.
+ **/
+struct __spin_systems_struct {
+  unsigned int number_of_spin_systems; /**< Number of spin systems */
+
+  /* Pointer to an array of size number_of_spin_systems+1 of site offsets. */
+  int *site_offsets;
+
+  /* Pointer to an array of size number_of_spin_systems+1 of coupling offsets. */
+  int *coupling_offsets;
+
+  /* Pointer to the sites from all spin systems. */
+  site_struct *sites;
+
+  /* Pointer to the couplings from all spin systems. */
+  coupling_struct *couplings;
+
+  /* Pointer to a table of transition pathways. */
+  float *transition_pathways;
+
+  /* Pointer to an array of offsets, per spin system, to the first transition pathway of
+   * the spin system within the `transition_pathways` table. */
+  int *pathway_offsets;
+
+  /* Pointer to an array with the number of transition pathways per spin system. A spin
+   * system with zero pathways is skipped. */
+  int *pathway_counts;
+
+  /* Pointer to an array of spectrum scaling factors per spin system. */
+  double *weights;
+};
+typedef struct __spin_systems_struct spin_systems_struct;
+
 #endif /* object_struct_h */
@@ -39,8 +39,8 @@ typedef struct MRS_averaging_scheme {
   unsigned int total_orientations; /**< The total number of orientations. */
 
   /** \privatesection */
-  unsigned int
-      integration_density; //  number of triangles along the edge of the octahedron.
+  unsigned int integration_density; //  number of triangles along the edge of the
+                                    //  octahedron, zero for a set of orientations.
   unsigned int integration_volume; //  0-octant, 1-hemisphere, 2-sphere.
   unsigned int
       octant_orientations;  //  number of unique orientations on the face of an octant.
@@ -48,11 +48,24 @@ typedef struct MRS_averaging_scheme {
   complex128 *exp_Im_alpha; //  array of cos_alpha per orientation.
   complex128 *w2;           //  buffer for 2nd rank frequency calculation.
   complex128 *w4;           //  buffer for 4nd rank frequency calculation.
+  complex64 *w2_single;     //  single precision w2, allocated on first use.
+  complex64 *w4_single;     //  single precision w4, allocated on first use.
   double *wigner_2j_matrices; //  wigner-d 2j matrix per orientation.
   double *wigner_4j_matrices; //  wigner-d 4j matrix per orientation.
   bool allow_fourth_rank;     //  If true, compute wigner matrices for wigner-d 4j.
+  int n_threads; //  number of threads over the orientations of a workspace, else 1.
+  complex128 *exp_Im_alpha_threads; //  exp_Im_alpha split between the threads.
 } MRS_averaging_scheme;
 
+/* Set `start` and `count` to the range of the `n` items of the thread `thread` out of
+ * `n_threads`, where the items are split into contiguous ranges of near equal size. */
+static inline void MRS_thread_range(unsigned int n, int n_threads, int thread,
+                                    unsigned int *start, unsigned int *count) {
+  unsigned int size = n / n_threads, rest = n % n_threads, t = (unsigned int)thread;
+  *start = t * size + ((t < rest) ? t : rest);
+  *count = size + ((t < rest) ? 1 : 0);
+}
+
 // typedef struct MRS_averaging_scheme;
 
 /**
@@ -78,6 +91,12 @@ MRS_averaging_scheme *MRS_create_averaging_scheme(unsigned int integration_densi
 /**
  * Create a new orientation averaging scheme from given alpha and beta.
  *
+ * The orientations of the scheme are not triangulated, and the spectrum is evaluated by
+ * binning the frequencies at every orientation, see `point_set_interpolation`. The
+ * scheme has a zero `integration_density` and an octant `integration_volume`, where
+ * the orientations may cover any part of the sphere. The weights are copied and
+ * normalized to the total amplitude of the octahedron interpolation.
+ *
  * @param alpha A pointer to an array of size `n_angles` holding the alpha values of
  * type double.
  * @param beta A pointer to an array of size `n_angles` holding the beta values of type
@@ -100,6 +119,28 @@ MRS_averaging_scheme *MRS_create_averaging_scheme_from_alpha_beta(
  */
 void MRS_free_averaging_scheme(MRS_averaging_scheme *scheme);
 
+/**
+ * Create a thread-private workspace from the averaging scheme. The workspace shares the
+ * pre-calculated tables with the `scheme` and allocates private buffers for the
+ * frequency calculation, so that several threads can use the same scheme at once.
+ *
+ * @param scheme A pointer to the MRS_averaging_scheme.
+ * @param n_threads The number of threads over the orientations. When greater than one,
+ *      the wigner rotation of the workspace is split between the threads, where every
+ *      thread rotates a contiguous range of the orientations of an octant, see
+ *      MRS_thread_range.
+ */
+MRS_averaging_scheme *MRS_create_averaging_scheme_workspace(MRS_averaging_scheme *scheme,
+                                                            int n_threads);
+
+/**
+ * Free the memory allocated for the averaging scheme workspace.
+ *
+ * @param workspace A pointer to the workspace from
+ * MRS_create_averaging_scheme_workspace.
+ */
+void MRS_free_averaging_scheme_workspace(MRS_averaging_scheme *workspace);
+
 #endif // averaging_scheme_h
 
 #ifndef fftw_scheme_h
@@ -113,11 +154,50 @@ typedef struct MRS_fftw_scheme {
   fftw_complex *vector; // holds the amplitude of sidebands.
 
   fftw_plan the_fftw_plan; //  The plan for fftw routine.
+
+  /** The number of threads over the orientations of a workspace, else 1. */
+  int n_threads;
+
+  /** The fftw plans of the ranges of the orientations of the threads, see
+   * MRS_thread_range, and the buffer of the single precision sideband phase, allocated
+   * on first use. */
+  fftw_plan *thread_plans;
+  complex64 *phase_single;
 } MRS_fftw_scheme;
 
+/**
+ * @brief Create the fftw plan of the sideband amplitudes.
+ *
+ * @param total_orientations The number of orientations, that is, the number of
+ *      transforms in the batch.
+ * @param number_of_sidebands The number of sidebands, that is, the length of a
+ *      transform.
+ * @param planner_flag The fftw planner rigor, one of FFTW_ESTIMATE, FFTW_MEASURE, or
+ *      FFTW_PATIENT. The planner uses the imported fftw wisdom of the same or a higher
+ *      rigor in place of measuring the transform.
+ * @return A pointer to the MRS_fftw_scheme.
+ */
 MRS_fftw_scheme *create_fftw_scheme(unsigned int total_orientations,
-                                    unsigned int number_of_sidebands);
+                                    unsigned int number_of_sidebands,
+                                    unsigned int planner_flag);
 
 void MRS_free_fftw_scheme(MRS_fftw_scheme *fftw_scheme);
 
+/**
+ * Create a thread-private workspace, sharing the fftw plan, with a private `vector`.
+ *
+ * @param fftw_scheme A pointer to the MRS_fftw_scheme.
+ * @param total_orientations The number of orientations.
+ * @param number_of_sidebands The number of sidebands.
+ * @param n_threads The number of threads over the orientations. When greater than one,
+ *      the workspace holds a plan per thread, which transforms the range of the
+ *      orientations of the thread, see MRS_thread_range.
+ */
+MRS_fftw_scheme *MRS_create_fftw_scheme_workspace(MRS_fftw_scheme *fftw_scheme,
+                                                  unsigned int total_orientations,
+                                                  unsigned int number_of_sidebands,
+                                                  int n_threads);
+
+void MRS_free_fftw_scheme_workspace(MRS_fftw_scheme *workspace);
+
 #endif // fftw_scheme_h
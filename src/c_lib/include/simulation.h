@@ -7,6 +7,7 @@
 //  Contact email = srivastava.89@osu.edu
 //
 
+#include "arena.h"
 #include "method.h"
 #include "mrsimulator.h"
 #include "octahedron.h"
@@ -67,5 +68,89 @@ extern void __mrsimulator_core(
      * events.
      */
     bool *freq_contrib,
-    double *affine_matrix // Affine transformation matrix.
+    double *affine_matrix, // Affine transformation matrix.
+
+    // The tensor basis of the spin system, see MRS_tensor_basis, updated from the sites
+    // and couplings. The rotated tensors of the basis are reused between the calls for
+    // the transition pathways of the spin system, and for the tasks with the same
+    // averaging scheme. If NULL, the frequency components of every event are rotated.
+    MRS_tensor_basis *basis,
+
+    // The arena for the scratch buffers of the call, see MRS_arena. The arena is reset
+    // at the start of the call, and is reused between the calls on the same thread,
+    // such that a call makes no heap allocation once the arena has grown.
+    MRS_arena *arena);
+
+/**
+ * @brief Calculate the spectrum from a batch of spin systems.
+ *
+ * The function loops over the spin systems and their transition pathways, and adds the
+ * spectrum from every spin system, scaled by the spin system weight, to `spec`.
+ *
+ * @param spec Pointer to the spectrum array. When `decompose` is true, the array is of
+ *      size `spin_systems->number_of_spin_systems x spectrum_size`, where the spectrum
+ *      from the i-th spin system is stored at index `i x spectrum_size`. Otherwise, the
+ *      size of the array is `spectrum_size`.
+ * @param spectrum_size The total number of points in the spectrum.
+ * @param decompose If true, store the spectrum from every spin system separately.
+ * @param spin_systems Pointer to the spin_systems_struct.
+ * @param n_threads The number of threads. The spin systems are distributed between the
+ *      threads, where every thread uses a private workspace and spectrum accumulator.
+ *      When there are too few spin systems to keep the threads busy, the orientations
+ *      of every spin system are split between the threads instead, each with a private
+ *      spectrum, and the spectra are summed in thread order.
+ *      The `dimensions`, `fftw_scheme`, and `scheme` are not modified, and the function
+ *      may be called concurrently with the same schemes. Without OpenMP support, the
+ *      simulation runs on a single thread.
+ */
+extern void __mrsimulator_core_batch(
+    double *spec, unsigned int spectrum_size, bool decompose,
+    spin_systems_struct *spin_systems,
+    int n_dimension,              // The total number of spectroscopic dimensions.
+    MRS_dimension *dimensions,    // Pointer to MRS_dimension structure.
+    MRS_fftw_scheme *fftw_scheme, // Pointer to the fftw scheme.
+    MRS_averaging_scheme *scheme, // Pointer to the powder averaging scheme.
+    bool interpolation,           // If true, perform a 1D interpolation.
+    bool *freq_contrib,           // Pointer to the freq contribs boolean.
+    double *affine_matrix,        // Affine transformation matrix.
+    int n_threads                 // The number of threads.
 );
+
+/**
+ * A simulation task holds the arguments of `__mrsimulator_core_batch` for the spectrum
+ * of a method.
+ */
+typedef struct MRS_simulation_task {
+  double *spec;                      // Pointer to the spectrum array.
+  unsigned int spectrum_size;        // The total number of points in the spectrum.
+  bool decompose;                    // If true, store spectrum per spin system.
+  spin_systems_struct *spin_systems; // Pointer to the packed spin systems.
+  int n_dimension;                   // The total number of spectroscopic dimensions.
+  MRS_dimension *dimensions;         // Pointer to MRS_dimension structure.
+  MRS_fftw_scheme *fftw_scheme;      // Pointer to the fftw scheme.
+  MRS_averaging_scheme *scheme;      // Pointer to the powder averaging scheme.
+  bool interpolation;                // If true, perform a 1D interpolation.
+  bool *freq_contrib;                // Pointer to the freq contribs boolean.
+  double *affine_matrix;             // Affine transformation matrix.
+
+  /* The skipped and the total sideband intensity of the task, weighted by the spin
+   * system weights, see `sideband_intensity` of MRS_dimension. Set by
+   * `__mrsimulator_core_tasks`. */
+  double sideband_intensity[2];
+} MRS_simulation_task;
+
+/**
+ * @brief Calculate the spectra of a list of tasks from the same batch of spin systems.
+ *
+ * The spin systems are visited once, and the spectrum of every task is evaluated from
+ * a spin system before moving to the next spin system. The tasks with the same
+ * averaging scheme, or fftw scheme, share the thread-private workspace of the scheme.
+ *
+ * @param tasks Pointer to an array of simulation tasks. The `spin_systems` of the
+ *      tasks may differ in the sites, transition pathways, and weights, but must hold
+ *      the same number of spin systems.
+ * @param n_tasks The number of tasks.
+ * @param n_threads The number of threads, see `__mrsimulator_core_batch`.
+ */
+extern void __mrsimulator_core_tasks(MRS_simulation_task *tasks, int n_tasks,
+                                     int n_threads);
@@ -348,6 +348,36 @@ static inline void vm_double_complex_exp_imag_only(int count, const void *restri
   }
 }
 
+/**
+ * Exponent of the elements of vector x of type complex64, evaluated in single
+ * precision, and stored in res of type complex128.
+ *      res = exp(x(imag))
+ * The vector x may occupy the first half of the memory of res, as the elements are
+ * evaluated from the last to the first.
+ */
+static inline void vm_float_complex_exp_imag_only(int count, const void *x, void *res) {
+  const float *x_ = (const float *)x + 2 * count;
+  double *res_ = (double *)res + 2 * count;
+  float phase;
+
+  while (count-- > 0) {
+    x_ -= 2;
+    phase = x_[1];
+    *--res_ = (double)sinf(phase);
+    *--res_ = (double)cosf(phase);
+  }
+}
+
+/**
+ * Convert the elements of vector x of type double to type float.
+ *      res = (float)x
+ */
+static inline void vm_double_to_float(int count, const double *restrict x,
+                                      float *restrict res) {
+  while (count-- > 0)
+    *res++ = (float)*x++;
+}
+
 #ifndef __blas_activate
 //========================================================================== //
 //                  Wrapper for blas and blas like functions                 //
@@ -336,7 +336,7 @@ void __wigner_rotation_2(const int l, const int n, const double *wigner,
   int orientation, two_l_pm, two_l_mm;
   int n1 = 2 * l + 1, m, mp, two_l = 2 * l, two_n1 = 2 * n1;
   double a, b, c, d, *temp;
-  double *temp_initial_vector = malloc_double(two_n1);
+  double temp_initial_vector[18]; // two_n1 <= 18 for l <= 4
 
   for (orientation = 0; orientation < n; orientation++) {
     // copy the initial vector
@@ -379,7 +379,6 @@ void __wigner_rotation_2(const int l, const int n, const double *wigner,
       R_out_ += 2;
     }
   }
-  free(temp_initial_vector);
 }
 
 // ✅ .. note: (wigner_dm0_vector) monitored with pytest .....................
@@ -627,10 +626,9 @@ void single_wigner_rotation(const int l, const double *euler_angles, const void
   double *R_in_ = (double *)R_in;
   double *R_out_ = (double *)R_out;
 
-  int n1 = 2 * l + 1, n2 = n1 * n1, m, mp, k, two_l = 2 * l, two_n1 = 2 * n1;
+  int n1 = 2 * l + 1, m, mp, k, two_l = 2 * l, two_n1 = 2 * n1;
   double real, imag, copy_real = 0.0, copy_imag = 0.0, a, b, c, d;
-  double *wigner = malloc_double(n2);
-  double *temp_initial_vector = malloc_double(two_n1);
+  double wigner[81], temp_initial_vector[18]; // n1 * n1 <= 81 and two_n1 <= 18
 
   // get wigner matrix corresponding to beta angle
   wigner_d_matrices(l, 1, &euler_angles[1], wigner);
@@ -690,8 +688,6 @@ void single_wigner_rotation(const int l, const double *euler_angles, const void
       R_out_[m + 1] += wigner[k++] * temp_initial_vector[mp + 1];
     }
   }
-  free(wigner);
-  free(temp_initial_vector);
 
   real = cos(euler_angles[2]);
   imag = sin(euler_angles[2]);
@@ -755,33 +751,43 @@ void __batch_wigner_rotation(const unsigned int octant_orientations,
                              const unsigned int n_octants, double *wigner_2j_matrices,
                              complex128 *R2, double *wigner_4j_matrices, complex128 *R4,
                              complex128 *exp_Im_alpha, complex128 *w2, complex128 *w4) {
+  __batch_wigner_rotation_strided(octant_orientations, octant_orientations, n_octants,
+                                  wigner_2j_matrices, R2, wigner_4j_matrices, R4,
+                                  exp_Im_alpha, w2, w4);
+}
+
+/* The batch wigner rotation over a range of orientations from every octant, where the
+ * octants are `stride` orientations apart. */
+void __batch_wigner_rotation_strided(
+    const unsigned int octant_orientations, const unsigned int stride,
+    const unsigned int n_octants, double *wigner_2j_matrices, complex128 *R2,
+    double *wigner_4j_matrices, complex128 *R4, complex128 *exp_Im_alpha,
+    complex128 *w2, complex128 *w4) {
   unsigned int j, index_25, index_81, w2_increment, w4_increment;
 
-  w2_increment = 5 * octant_orientations;
-  index_25 = 5 * w2_increment; // equal to 25 * octant_orientations;
-  if (w4 != NULL) {
-    w4_increment = 9 * octant_orientations;
-    index_81 = 9 * w4_increment; // equal to 81 * octant_orientations;
-  }
+  w2_increment = 5 * stride;
+  index_25 = 5 * w2_increment; // equal to 25 * stride;
+  w4_increment = 9 * stride;
+  index_81 = 9 * w4_increment; // equal to 81 * stride;
 
   for (j = 0; j < n_octants; j++) {
     /* Second-rank Wigner rotation from crystal/common frame to rotor frame. */
-    __wigner_rotation_2(2, octant_orientations, wigner_2j_matrices, exp_Im_alpha, R2,
-                        w2);
+    __wigner_rotation_simd(2, octant_orientations, wigner_2j_matrices, exp_Im_alpha, R2,
+                           w2);
     w2 += w2_increment;
     if (n_octants == 8) {
-      __wigner_rotation_2(2, octant_orientations, &wigner_2j_matrices[index_25],
-                          exp_Im_alpha, R2, w2);
+      __wigner_rotation_simd(2, octant_orientations, &wigner_2j_matrices[index_25],
+                             exp_Im_alpha, R2, w2);
       w2 += w2_increment;
     }
     if (w4 != NULL) {
       /* Fourth-rank Wigner rotation from crystal/common frame to rotor frame. */
-      __wigner_rotation_2(4, octant_orientations, wigner_4j_matrices, exp_Im_alpha, R4,
-                          w4);
+      __wigner_rotation_simd(4, octant_orientations, wigner_4j_matrices, exp_Im_alpha,
+                             R4, w4);
       w4 += w4_increment;
       if (n_octants == 8) {
-        __wigner_rotation_2(4, octant_orientations, &wigner_4j_matrices[index_81],
-                            exp_Im_alpha, R4, w4);
+        __wigner_rotation_simd(4, octant_orientations, &wigner_4j_matrices[index_81],
+                               exp_Im_alpha, R4, w4);
         w4 += w4_increment;
       }
     }
@@ -823,6 +829,78 @@ void __batch_wigner_rotation(const unsigned int octant_orientations,
   }
 }
 
+/* Add `scale` times the real part of the m=0 component of the rank-l tensor, R, after
+ * the wigner rotation of __wigner_rotation_2, to `freq` at `n` orientations, where the
+ * alpha phase of the |m|=k terms is exp_Im_alpha times the complex `phase[k - 1]`. Only
+ * the row m=0 of the wigner matrices is evaluated. */
+static inline void wigner_rotation_m0(const int l, const unsigned int n,
+                                      const double *wigner, const double *exp_Im_alpha,
+                                      const double *R, const double *phase,
+                                      const double scale, double *freq) {
+  unsigned int i;
+  int k, n1 = 2 * l + 1, n2 = n1 * n1;
+  double a_re[4], a_im[4], b_re[4], b_im[4], sum;
+  const double *row, *p, *exp_k;
+
+  /* R[l - k] is scaled by exp(-I(-k)α) and R[l + k] by its conjugate, where the
+   * octant phase is folded into a_k = R[l - k] phase and b_k = R[l + k] phase*. */
+  for (k = 1; k <= l; k++) {
+    p = &phase[2 * k - 2];
+    a_re[k - 1] = R[2 * (l - k)] * p[0] - R[2 * (l - k) + 1] * p[1];
+    a_im[k - 1] = R[2 * (l - k)] * p[1] + R[2 * (l - k) + 1] * p[0];
+    b_re[k - 1] = R[2 * (l + k)] * p[0] + R[2 * (l + k) + 1] * p[1];
+    b_im[k - 1] = R[2 * (l + k) + 1] * p[0] - R[2 * (l + k)] * p[1];
+  }
+
+  for (i = 0; i < n; i++) {
+    row = &wigner[i * n2 + l * n1 + l];
+    sum = row[0] * R[2 * l];
+    for (k = 1; k <= l; k++) {
+      exp_k = &exp_Im_alpha[2 * ((4 - k) * n + i)];
+      sum += exp_k[0] * (row[-k] * a_re[k - 1] + row[k] * b_re[k - 1]);
+      sum += exp_k[1] * (row[k] * b_im[k - 1] - row[-k] * a_im[k - 1]);
+    }
+    freq[i] += scale * sum;
+  }
+}
+
+/* Add the lab-frame frequencies of a static sample over a range of orientations from
+ * every octant, where the octants are `stride` orientations apart. The alpha phase of
+ * the octants steps by π/2 as in __batch_wigner_rotation_strided, where the |m|=k terms
+ * of the q-th octant of a hemisphere are scaled by (-I)^(kq). */
+void __batch_wigner_rotation_m0(const unsigned int octant_orientations,
+                                const unsigned int stride, const unsigned int n_octants,
+                                double *wigner_2j_matrices, complex128 *R2,
+                                const double scale_2, double *wigner_4j_matrices,
+                                complex128 *R4, const double scale_4,
+                                complex128 *exp_Im_alpha, double *freq) {
+  // The powers of -I as complex numbers.
+  static const double negative_iota_power[8] = {1.0, 0.0, 0.0, -1.0,
+                                                -1.0, 0.0, 0.0, 1.0};
+  unsigned int j, q, h;
+  int k;
+  double phase[8];
+
+  for (j = 0; j < n_octants; j++) {
+    q = j % 4;
+    h = j / 4;
+    for (k = 1; k <= 4; k++) {
+      phase[2 * k - 2] = negative_iota_power[2 * ((k * q) % 4)];
+      phase[2 * k - 1] = negative_iota_power[2 * ((k * q) % 4) + 1];
+    }
+    if (R2 != NULL) {
+      wigner_rotation_m0(2, octant_orientations, &wigner_2j_matrices[25 * h * stride],
+                         (double *)exp_Im_alpha, (double *)R2, phase, scale_2,
+                         &freq[j * stride]);
+    }
+    if (wigner_4j_matrices != NULL) {
+      wigner_rotation_m0(4, octant_orientations, &wigner_4j_matrices[81 * h * stride],
+                         (double *)exp_Im_alpha, (double *)R4, phase, scale_4,
+                         &freq[j * stride]);
+    }
+  }
+}
+
 /**
  * ✅ Calculates exp(-Im alpha) where alpha is an array of size n.
  * The function accepts cos_alpha = cos(alpha)
@@ -0,0 +1,225 @@
+// -*- coding: utf-8 -*-
+//
+//  angular_momentum_simd.c
+//
+//  @copyright Deepansh J. Srivastava, 2019-2021.
+//  Created by Deepansh J. Srivastava.
+//  Contact email = srivastava.89@osu.edu
+//
+
+#include "angular_momentum.h"
+
+/**
+ * SIMD kernels of the batch wigner rotation. The kernels are compiled with function
+ * level target attributes, and the kernel is selected at runtime from the instruction
+ * sets supported by the CPU, so that the same build runs on every x86-64 CPU. On other
+ * architectures and compilers, the scalar `__wigner_rotation_2` is used.
+ *
+ * The kernels use the symmetry of the wigner-d matrices,
+ *
+ *    d^l(m, m') = (-1)^(m-m') d^l(m', m),
+ *
+ * to evaluate the rotation, R_out[m] = sum_m' d^l(m, m') R[m'], from the contiguous
+ * rows of the wigner matrices as
+ *
+ *    R_out[m] = (-1)^m sum_m' d^l(m', m) (-1)^m' R[m'],
+ *
+ * where every SIMD lane holds a different m.
+ */
+#if (defined(__x86_64__) || defined(__i386__)) &&                                      \
+    (defined(__GNUC__) || defined(__clang__)) && !defined(_MSC_VER)
+#define MRS_X86_SIMD
+#include <immintrin.h>
+#endif
+
+// The SIMD level of the wigner rotation kernels. A negative value is unresolved.
+static int simd_level = -1;
+
+int MRS_simd_supported_level(void) {
+#ifdef MRS_X86_SIMD
+  __builtin_cpu_init();
+  if (__builtin_cpu_supports("avx512f")) {
+    return MRS_SIMD_AVX512;
+  }
+  if (__builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma")) {
+    return MRS_SIMD_AVX2;
+  }
+#endif
+  return MRS_SIMD_SCALAR;
+}
+
+int MRS_set_simd_level(int level) {
+  int supported = MRS_simd_supported_level();
+  if (level < 0 || level > supported) {
+    level = supported;
+  }
+  simd_level = level;
+  return level;
+}
+
+int MRS_get_simd_level(void) {
+  if (simd_level < 0) {
+    MRS_set_simd_level(MRS_SIMD_AUTO);
+  }
+  return simd_level;
+}
+
+#ifdef MRS_X86_SIMD
+
+/* Scale the initial vector with exp(-I m alpha) of the orientation and with (-1)^m,
+ * where m is the index of the vector, and store the result as split real and imaginary
+ * parts. */
+static inline void __phase_scaled_vector(const int l, const int n,
+                                         const int orientation,
+                                         const double *exp_Im_alpha, const double *R_in,
+                                         double *t_re, double *t_im) {
+  int m, sign = (l % 2 == 0) ? 1 : -1;
+  double er, ei, a, b;
+  const double *temp;
+
+  t_re[l] = sign * R_in[2 * l];
+  t_im[l] = sign * R_in[2 * l + 1];
+  for (m = 1; m <= l; m++) {
+    sign = -sign;
+    temp = &exp_Im_alpha[2 * ((4 - m) * n + orientation)];
+    er = temp[0];
+    ei = temp[1];
+
+    // R_in[l - m] * exp(-I (-m) alpha)
+    a = R_in[2 * (l - m)];
+    b = R_in[2 * (l - m) + 1];
+    t_re[l - m] = sign * (a * er - b * ei);
+    t_im[l - m] = sign * (a * ei + b * er);
+
+    // R_in[l + m] * exp(-I m alpha)
+    a = R_in[2 * (l + m)];
+    b = R_in[2 * (l + m) + 1];
+    t_re[l + m] = sign * (a * er + b * ei);
+    t_im[l + m] = sign * (b * er - a * ei);
+  }
+}
+
+/* The remaining rows, from `start`, of a wigner rotation. */
+static inline void __wigner_rotation_rows(const int n1, const int start,
+                                          const double *wigner, const double *t_re,
+                                          const double *t_im, double *R_out) {
+  int m, mp;
+  double re, im, w;
+  for (m = start; m < n1; m++) {
+    re = 0.0;
+    im = 0.0;
+    for (mp = 0; mp < n1; mp++) {
+      w = wigner[mp * n1 + m];
+      re += w * t_re[mp];
+      im += w * t_im[mp];
+    }
+    if (m % 2 != 0) {
+      re = -re;
+      im = -im;
+    }
+    R_out[2 * m] = re;
+    R_out[2 * m + 1] = im;
+  }
+}
+
+__attribute__((target("avx2,fma"))) static void
+__wigner_rotation_avx2(const int l, const int n, const double *wigner,
+                       const double *exp_Im_alpha, const double *R_in, double *R_out) {
+  int orientation, m, mp, n1 = 2 * l + 1, n_vector = ((n1 - 1) / 4) * 4;
+  double t_re[9], t_im[9];
+  __m256d w, re, im, lo, hi;
+  const __m256d sign = _mm256_set_pd(-1.0, 1.0, -1.0, 1.0);
+
+  for (orientation = 0; orientation < n; orientation++) {
+    __phase_scaled_vector(l, n, orientation, exp_Im_alpha, R_in, t_re, t_im);
+
+    for (m = 0; m < n_vector; m += 4) {
+      re = _mm256_setzero_pd();
+      im = _mm256_setzero_pd();
+      for (mp = 0; mp < n1; mp++) {
+        w = _mm256_loadu_pd(&wigner[mp * n1 + m]);
+        re = _mm256_fmadd_pd(w, _mm256_broadcast_sd(&t_re[mp]), re);
+        im = _mm256_fmadd_pd(w, _mm256_broadcast_sd(&t_im[mp]), im);
+      }
+      re = _mm256_mul_pd(re, sign);
+      im = _mm256_mul_pd(im, sign);
+
+      // interleave the real and imaginary parts.
+      lo = _mm256_unpacklo_pd(re, im);
+      hi = _mm256_unpackhi_pd(re, im);
+      _mm256_storeu_pd(&R_out[2 * m], _mm256_permute2f128_pd(lo, hi, 0x20));
+      _mm256_storeu_pd(&R_out[2 * m + 4], _mm256_permute2f128_pd(lo, hi, 0x31));
+    }
+    __wigner_rotation_rows(n1, n_vector, wigner, t_re, t_im, R_out);
+
+    wigner += n1 * n1;
+    R_out += 2 * n1;
+  }
+}
+
+__attribute__((target("avx512f"))) static void
+__wigner_rotation_avx512(const int l, const int n, const double *wigner,
+                         const double *exp_Im_alpha, const double *R_in,
+                         double *R_out) {
+  int orientation, m, mp, rows, n1 = 2 * l + 1;
+  double t_re[9], t_im[9];
+  __mmask8 mask, mask_lo, mask_hi;
+  __m512d w, re, im;
+  const __m512d sign = _mm512_set_pd(-1.0, 1.0, -1.0, 1.0, -1.0, 1.0, -1.0, 1.0);
+  const __m512i index_lo = _mm512_set_epi64(11, 3, 10, 2, 9, 1, 8, 0);
+  const __m512i index_hi = _mm512_set_epi64(15, 7, 14, 6, 13, 5, 12, 4);
+
+  for (orientation = 0; orientation < n; orientation++) {
+    __phase_scaled_vector(l, n, orientation, exp_Im_alpha, R_in, t_re, t_im);
+
+    for (m = 0; m < n1; m += 8) {
+      rows = (n1 - m < 8) ? n1 - m : 8;
+      if (rows == 1) {
+        __wigner_rotation_rows(n1, m, wigner, t_re, t_im, R_out);
+        break;
+      }
+      mask = (__mmask8)((1u << rows) - 1);
+      mask_lo = (__mmask8)((1u << (2 * (rows < 4 ? rows : 4))) - 1);
+      mask_hi = (__mmask8)((1u << (2 * (rows > 4 ? rows - 4 : 0))) - 1);
+
+      re = _mm512_setzero_pd();
+      im = _mm512_setzero_pd();
+      for (mp = 0; mp < n1; mp++) {
+        w = _mm512_maskz_loadu_pd(mask, &wigner[mp * n1 + m]);
+        re = _mm512_fmadd_pd(w, _mm512_set1_pd(t_re[mp]), re);
+        im = _mm512_fmadd_pd(w, _mm512_set1_pd(t_im[mp]), im);
+      }
+      re = _mm512_mul_pd(re, sign);
+      im = _mm512_mul_pd(im, sign);
+
+      // interleave the real and imaginary parts.
+      _mm512_mask_storeu_pd(&R_out[2 * m], mask_lo,
+                            _mm512_permutex2var_pd(re, index_lo, im));
+      _mm512_mask_storeu_pd(&R_out[2 * m + 8], mask_hi,
+                            _mm512_permutex2var_pd(re, index_hi, im));
+    }
+
+    wigner += n1 * n1;
+    R_out += 2 * n1;
+  }
+}
+
+#endif
+
+void __wigner_rotation_simd(const int l, const int n, const double *wigner,
+                            const void *exp_Im_alpha, const void *R_in, void *R_out) {
+  switch (MRS_get_simd_level()) {
+#ifdef MRS_X86_SIMD
+  case MRS_SIMD_AVX512:
+    __wigner_rotation_avx512(l, n, wigner, (const double *)exp_Im_alpha,
+                             (const double *)R_in, (double *)R_out);
+    return;
+  case MRS_SIMD_AVX2:
+    __wigner_rotation_avx2(l, n, wigner, (const double *)exp_Im_alpha,
+                           (const double *)R_in, (double *)R_out);
+    return;
+#endif
+  default:
+    __wigner_rotation_2(l, n, wigner, exp_Im_alpha, R_in, R_out);
+  }
+}
@@ -0,0 +1,78 @@
+// -*- coding: utf-8 -*-
+//
+//  arena.c
+//
+//  @copyright Deepansh J. Srivastava, 2019-2021.
+//  Created by Deepansh J. Srivastava, Oct 18, 2026.
+//  Contact email = srivastava.89@osu.edu
+//
+
+#include "arena.h"
+
+// The buffers are spaced by a multiple of the size of complex128, such that every
+// buffer within the block has the alignment of the block from malloc.
+#define ARENA_ALIGNMENT sizeof(complex128)
+
+static inline size_t aligned_size(size_t size) {
+  return (size + ARENA_ALIGNMENT - 1) / ARENA_ALIGNMENT * ARENA_ALIGNMENT;
+}
+
+MRS_arena *MRS_create_arena(size_t size) {
+  MRS_arena *arena = malloc(sizeof(MRS_arena));
+  arena->size = aligned_size(size);
+  arena->block = (char *)malloc(arena->size);
+  arena->used = 0;
+  arena->overflow = 0;
+  arena->heap = NULL;
+  arena->n_heap = 0;
+  arena->heap_capacity = 0;
+  return arena;
+}
+
+void MRS_free_arena(MRS_arena *arena) {
+  unsigned int i;
+  for (i = 0; i < arena->n_heap; i++) {
+    free(arena->heap[i]);
+  }
+  free(arena->block);
+  free(arena->heap);
+  free(arena);
+}
+
+void MRS_arena_reset(MRS_arena *arena) {
+  unsigned int i;
+  for (i = 0; i < arena->n_heap; i++) {
+    free(arena->heap[i]);
+  }
+  arena->n_heap = 0;
+
+  // Grow the block to the total size of the buffers from the last call.
+  if (arena->overflow != 0) {
+    free(arena->block);
+    arena->size = arena->used + arena->overflow;
+    arena->block = (char *)malloc(arena->size);
+  }
+  arena->used = 0;
+  arena->overflow = 0;
+}
+
+void *MRS_arena_malloc(MRS_arena *arena, size_t size) {
+  char *buffer;
+  size = aligned_size(size);
+
+  if (arena->overflow == 0 && arena->used + size <= arena->size) {
+    buffer = &arena->block[arena->used];
+    arena->used += size;
+    return buffer;
+  }
+
+  // The block is full. Serve the buffer from the heap until the next reset.
+  if (arena->n_heap == arena->heap_capacity) {
+    arena->heap_capacity = (arena->heap_capacity == 0) ? 8 : 2 * arena->heap_capacity;
+    arena->heap = realloc(arena->heap, arena->heap_capacity * sizeof(void *));
+  }
+  buffer = (char *)malloc(size);
+  arena->heap[arena->n_heap++] = buffer;
+  arena->overflow += size;
+  return buffer;
+}
@@ -10,71 +10,79 @@
 #include "interpolation.h"
 
 double TOL = 1.0e-6;
-// triangle_interpolation is an optimized version of tent. Still plenty of
-// room for optimization.
 
-void triangle_interpolation(double *freq1, double *freq2, double *freq3, double *amp,
-                            double *spec, int *points) {
-  double df1, df2, top = 0.0, t, diff, f10 = 0.0, f21 = 0.0, temp, n_i;
-
-  int p, pmid, pmax, i, j;
-  int clip_right1 = 0, clip_left1 = 0, clip_right2 = 0, clip_left2 = 0;
+/* Sort the three vertices of a triangle in ascending order with a sorting network of
+ * three compare-exchange steps. The ternary min and max compile to branch-free
+ * instructions. */
+static inline void sort_vertices(double f1, double f2, double f3, double *f) {
+  double lo = (f1 < f2) ? f1 : f2, hi = (f1 < f2) ? f2 : f1;
+  f[2] = (hi < f3) ? f3 : hi;
+  hi = (hi < f3) ? hi : f3;
+  f[0] = (lo < hi) ? lo : hi;
+  f[1] = (lo < hi) ? hi : lo;
+}
 
-  p = (int)(freq1[0]);
-  if (fabs(freq1[0] - freq2[0]) < TOL && fabs(freq1[0] - freq3[0]) < TOL) {
-    if (p >= points[0] || p < 0) return;
+/* Linear interpolation of a triangle of zero width, within TOL, at `freq`. */
+static inline void degenerate_triangle_interpolation(double freq, double amp,
+                                                     double *spec, int points) {
+  double diff, n_i = 0.5;
+  int p = (int)freq;
+  if (p >= points || p < 0) return;
 
-    diff = freq1[0] - (double)p;
-    n_i = 0.5;
-    if (fabs(diff - n_i) < TOL) {
-      spec[p] += amp[0];
-      return;
-    }
-    if (diff < n_i) {
-      if (p != 0) spec[p - 1] += amp[0] * (n_i - diff);
-      spec[p] += amp[0] * (n_i + diff);
-      return;
-    }
-    if (diff > n_i) {
-      if (p + 1 != points[0]) spec[p + 1] += amp[0] * (diff - n_i);
-      spec[p] += amp[0] * (1 + n_i - diff);
-      return;
-    }
+  diff = freq - (double)p;
+  if (fabs(diff - n_i) < TOL) {
+    spec[p] += amp;
     return;
   }
-
-  if ((int)freq1[0] == (int)freq2[0] && (int)freq1[0] == (int)freq3[0]) {
-    if (p >= points[0] || p < 0) return;
-    spec[p] += amp[0];
+  if (diff < n_i) {
+    if (p != 0) spec[p - 1] += amp * (n_i - diff);
+    spec[p] += amp * (n_i + diff);
     return;
   }
+  if (diff > n_i) {
+    if (p + 1 != points) spec[p + 1] += amp * (diff - n_i);
+    spec[p] += amp * (1 + n_i - diff);
+  }
+}
 
-  // arrange the numbers in ascending order (sort)
-  double f[3] = {freq1[0], freq2[0], freq3[0]};
-  for (j = 1; j <= 2; j++) {
-    t = f[j];
-    i = j - 1;
-    while (i >= 0 && f[i] > t) {
-      f[i + 1] = f[i];
-      i--;
-    }
-    f[i + 1] = t;
+/* The triangle kernel. The vertices are sorted before the special cases, such that a
+ * triangle within a single bin, the most frequent case at high integration densities,
+ * costs the sort and a single comparison. */
+static inline void triangle_kernel(double freq1, double freq2, double freq3,
+                                   double amp, double *spec, int points) {
+  double df1, df2, top, diff, f10, f21, temp, f[3];
+  int p, pmid, pmax;
+  int clip_right1 = 0, clip_left1 = 0, clip_right2 = 0, clip_left2 = 0;
+
+  sort_vertices(freq1, freq2, freq3, f);
+
+  if (f[2] - f[0] <= 2.0 * TOL && fabs(freq1 - freq2) < TOL &&
+      fabs(freq1 - freq3) < TOL) {
+    degenerate_triangle_interpolation(freq1, amp, spec, points);
+    return;
   }
 
   p = (int)f[0];
-  if (p > points[0]) return;
-
   pmax = (int)f[2];
+
+  // The triangle within a single bin.
+  if (p == pmax) {
+    if (p >= points || p < 0) return;
+    spec[p] += amp;
+    return;
+  }
+
+  if (p > points) return;
   if (pmax < 0) return;
 
   pmid = (int)f[1];
-  if (pmid >= points[0]) {
-    pmid = points[0];
+  if (pmid >= points) {
+    pmid = points;
     clip_right1 = 1;
   }
 
-  if (pmax >= points[0]) {
-    pmax = points[0];
+  if (pmax >= points) {
+    pmax = points;
     clip_right2 = 1;
   }
 
@@ -88,9 +96,9 @@ void triangle_interpolation(double *freq1, double *freq2, double *freq3, double
     clip_left2 = 1;
   }
 
-  top += (amp[0] * 2.0 / (f[2] - f[0]));
-  f10 += f[1] - f[0];
-  f21 += f[2] - f[1];
+  top = amp * 2.0 / (f[2] - f[0]);
+  f10 = f[1] - f[0];
+  f21 = f[2] - f[1];
 
   if (p != pmid) {
     df1 = top / f10;
@@ -140,7 +148,73 @@ void triangle_interpolation(double *freq1, double *freq2, double *freq3, double
       spec[p] += f21 * top * 0.5;
     }
   }
-  return;
+}
+
+void triangle_interpolation(double *freq1, double *freq2, double *freq3, double *amp,
+                            double *spec, int *points) {
+  triangle_kernel(freq1[0], freq2[0], freq3[0], amp[0], spec, points[0]);
+}
+
+void triangle_strip_interpolation(double *freq_top, double *freq_bottom,
+                                  double *amp_top, double *amp_bottom, int stride,
+                                  int n, double *spec, int m) {
+  int k;
+  double amp_pair, amp1;
+
+  for (k = 0; k < n; k++) {
+    amp_pair = amp_top[(k + 1) * stride] + amp_bottom[k * stride];
+    amp1 = amp_pair + amp_top[k * stride];
+    triangle_kernel(freq_top[k], freq_top[k + 1], freq_bottom[k], amp1, spec, m);
+
+    if (k == n - 1) break;
+    amp1 = amp_pair + amp_bottom[(k + 1) * stride];
+    triangle_kernel(freq_top[k + 1], freq_bottom[k], freq_bottom[k + 1], amp1, spec, m);
+  }
+}
+
+/* Linear interpolation of a delta function at `freq` between the two nearest points on
+ * the 1D grid, where the i-th grid point is centered at i + 0.5. */
+static inline void delta_interpolation(double freq, double amp, double *spec, int m) {
+  double x = freq - 0.5, q = floor(x), t = x - q;
+  int p = (int)q;
+  if (p >= 0 && p < m) {
+    spec[p] += amp * (1.0 - t);
+  }
+  if (p + 1 >= 0 && p + 1 < m) {
+    spec[p + 1] += amp * t;
+  }
+}
+
+void point_set_interpolation(double *spec, double *freq, int n, double *amp, int stride,
+                             int m) {
+  int i;
+  for (i = 0; i < n; i++) {
+    if (freq[i] < -1.0 || freq[i] > (double)m + 1.0) {
+      continue;
+    }
+    delta_interpolation(freq[i], amp[i * stride], spec, m);
+  }
+}
+
+void point_set_interpolation2D(double *spec, double *freq1, double *freq2, int n,
+                               double *amp, int stride, int m0, int m1) {
+  int i, p;
+  double x, q, t;
+  for (i = 0; i < n; i++) {
+    if (freq1[i] < -1.0 || freq1[i] > (double)m0 + 1.0) {
+      continue;
+    }
+    x = freq1[i] - 0.5;
+    q = floor(x);
+    t = x - q;
+    p = (int)q;
+    if (p >= 0 && p < m0) {
+      delta_interpolation(freq2[i], amp[i * stride] * (1.0 - t), &spec[p * m1], m1);
+    }
+    if (p + 1 >= 0 && p + 1 < m0) {
+      delta_interpolation(freq2[i], amp[i * stride] * t, &spec[(p + 1) * m1], m1);
+    }
+  }
 }
 
 int triangle_interpolation2D(double *freq11, double *freq12, double *freq13,
@@ -542,8 +616,8 @@ void rasterization(double *grid, double *v0, double *v1, double *v2, int rows,
 //     for sec in self.clip(0, 1, 1, 0):
 //         v1 = Point(sec[0], sec[1])
 //         v0 = Point(sec[2], sec[3])
-//         if abs(v0.x - 1) < eps and abs(v1.x - 1) < eps \
-//         or abs(v0.y - 1) < eps and abs(v1.y - 1) < eps:
+//         if (abs(v0.x - 1) < eps and abs(v1.x - 1) < eps
+//                 or abs(v0.y - 1) < eps and abs(v1.y - 1) < eps):
 //             continue
 
 //         Kx += 1./4 * (v0.y - v1.y)
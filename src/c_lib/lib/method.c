@@ -27,6 +27,22 @@ static inline void MRS_set_event(MRS_event *event, double fraction,
   event->rotor_angle_in_rad = rotor_angle_in_rad;
   event->magnetic_flux_density_in_T = magnetic_flux_density_in_T;
 
+  /* A static event within a dimension of spinning events shares the sidebands of the
+   * dimension, while its frequencies are evaluated in the lab frame, where the rotor
+   * angle does not apply. */
+  if (sample_rotation_frequency_in_Hz == 0.0) {
+    if (plan->is_static) {
+      event->plan = plan;
+      return;
+    }
+    MRS_plan *new_plan = MRS_copy_plan(plan);
+    new_plan->sample_rotation_frequency_in_Hz = 0.0;
+    new_plan->is_static = true;
+    MRS_plan_update_from_rotor_angle_in_rad(new_plan, 0.0, plan->allow_fourth_rank);
+    event->plan = new_plan;
+    return;
+  }
+
   if (sample_rotation_frequency_in_Hz == plan->sample_rotation_frequency_in_Hz &&
       rotor_angle_in_rad == plan->rotor_angle_in_rad) {
     event->plan = plan;
@@ -50,7 +66,13 @@ static inline void MRS_set_event(MRS_event *event, double fraction,
     event->plan = new_plan;
     return;
   }
-  return;
+
+  /* Both the sample rotation frequency and the rotor angle differ from the plan. */
+  MRS_plan *new_plan = MRS_copy_plan(plan);
+  new_plan->rotor_angle_in_rad = rotor_angle_in_rad;
+  MRS_plan_update_from_sample_rotation_frequency_in_Hz(new_plan, increment,
+                                                       sample_rotation_frequency_in_Hz);
+  event->plan = new_plan;
 }
 
 MRS_dimension *MRS_dimension_malloc(int n) {
@@ -63,16 +85,26 @@ static inline void create_plans_for_events_in_dimension(
     double coordinates_offset, int n_events, double *fraction,
     double *sample_rotation_frequency_in_Hz, double *rotor_angle_in_rad,
     double *magnetic_flux_density_in_T, unsigned int number_of_sidebands) {
-  int i;
+  int i, spinning = -1;
   dimension->count = count;
   dimension->coordinates_offset = coordinates_offset;
   dimension->increment = increment;
   dimension->n_events = n_events;
   dimension->events = (MRS_event *)malloc(n_events * sizeof(MRS_event));
 
+  /* The sidebands of the dimension are from the first spinning event. A dimension of
+   * static events only, with zero sample rotation frequencies, has a single sideband.
+   */
+  for (i = n_events - 1; i >= 0; i--) {
+    if (sample_rotation_frequency_in_Hz[i] != 0.0) spinning = i;
+  }
   MRS_plan *the_plan =
-      MRS_create_plan(scheme, number_of_sidebands, sample_rotation_frequency_in_Hz[0],
-                      rotor_angle_in_rad[0], increment, scheme->allow_fourth_rank);
+      (spinning == -1)
+          ? MRS_create_plan(scheme, 1, 0.0, 0.0, increment, scheme->allow_fourth_rank)
+          : MRS_create_plan(scheme, number_of_sidebands,
+                            sample_rotation_frequency_in_Hz[spinning],
+                            rotor_angle_in_rad[spinning], increment,
+                            scheme->allow_fourth_rank);
 
   for (i = 0; i < n_events; i++) {
     dimension->events[i].freq_amplitude = malloc_double(the_plan->size);
@@ -85,6 +117,10 @@ static inline void create_plans_for_events_in_dimension(
   dimension->normalize_offset =
       0.5 - (coordinates_offset * dimension->inverse_increment);
   dimension->R0_offset = 0.0;
+  dimension->sideband_threshold = 0.0;
+  dimension->sideband_intensity[0] = 0.0;
+  dimension->sideband_intensity[1] = 0.0;
+  dimension->single_precision = false;
   /* buffer to hold the local frequencies and frequency offset. The buffer   *
    * is useful when the rotor angle is off magic angle (54.735 deg). */
   dimension->local_frequency = malloc_double(scheme->total_orientations);
@@ -141,3 +177,47 @@ void MRS_free_dimension(MRS_dimension *dimensions, unsigned int n) {
     free(dimension->freq_offset);
   }
 }
+
+/* Create a thread-private workspace of the dimensions. The events within the workspace
+ * share the plans with `dimensions`, while the buffers for the event amplitudes, local
+ * frequencies, and frequency offsets are private. */
+MRS_dimension *MRS_create_dimensions_workspace(MRS_dimension *dimensions,
+                                               unsigned int n_dim,
+                                               MRS_averaging_scheme *scheme) {
+  unsigned int dim, evt, size;
+  MRS_dimension *workspace = MRS_dimension_malloc(n_dim);
+  MRS_event *event;
+
+  for (dim = 0; dim < n_dim; dim++) {
+    workspace[dim] = dimensions[dim];
+    workspace[dim].events =
+        (MRS_event *)malloc(dimensions[dim].n_events * sizeof(MRS_event));
+    for (evt = 0; evt < dimensions[dim].n_events; evt++) {
+      event = &workspace[dim].events[evt];
+      *event = dimensions[dim].events[evt];
+      size = event->plan->size;
+      event->freq_amplitude = malloc_double(size);
+      cblas_dcopy(size, dimensions[dim].events[evt].freq_amplitude, 1,
+                  event->freq_amplitude, 1);
+    }
+    workspace[dim].R0_offset = 0.0;
+    workspace[dim].sideband_intensity[0] = 0.0;
+    workspace[dim].sideband_intensity[1] = 0.0;
+    workspace[dim].local_frequency = malloc_double(scheme->total_orientations);
+    workspace[dim].freq_offset = malloc_double(scheme->octant_orientations);
+  }
+  return workspace;
+}
+
+void MRS_free_dimensions_workspace(MRS_dimension *workspace, unsigned int n_dim) {
+  unsigned int dim, evt;
+  for (dim = 0; dim < n_dim; dim++) {
+    for (evt = 0; evt < workspace[dim].n_events; evt++) {
+      free(workspace[dim].events[evt].freq_amplitude);
+    }
+    free(workspace[dim].events);
+    free(workspace[dim].local_frequency);
+    free(workspace[dim].freq_offset);
+  }
+  free(workspace);
+}
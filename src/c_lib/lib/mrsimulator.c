@@ -42,6 +42,9 @@ void MRS_free_plan(MRS_plan *the_plan) {
   if (!the_plan->pre_phase_4) {
     free(the_plan->pre_phase_4);
   }
+
+  free(the_plan->pre_phase_2_single);
+  free(the_plan->pre_phase_4_single);
 }
 
 /**
@@ -131,6 +134,7 @@ void MRS_plan_update_from_sample_rotation_frequency_in_Hz(
   unsigned int size_4;
   // double increment_inverse = 1.0 / increment;
   plan->sample_rotation_frequency_in_Hz = sample_rotation_frequency_in_Hz;
+  plan->is_static = sample_rotation_frequency_in_Hz == 0.0;
 
   plan->vr_freq = __get_frequency_in_FFT_order(plan->number_of_sidebands,
                                                sample_rotation_frequency_in_Hz);
@@ -142,11 +146,15 @@ void MRS_plan_update_from_sample_rotation_frequency_in_Hz(
    *    pre_phase(m, t) =  I 2π [(exp(I m wr t) - 1)/(I m wr)].
    * for m = [-4, -3, .. 3, 4]
    * @see __get_components()
+   * The sideband phase of a static plan is undefined and not evaluated.
    */
-  size_4 = 9 * plan->number_of_sidebands;
-  plan->pre_phase = malloc_complex128(size_4);
-  __get_components(plan->number_of_sidebands, sample_rotation_frequency_in_Hz,
-                   (double *)plan->pre_phase);
+  plan->pre_phase = NULL;
+  if (!plan->is_static) {
+    size_4 = 9 * plan->number_of_sidebands;
+    plan->pre_phase = malloc_complex128(size_4);
+    __get_components(plan->number_of_sidebands, sample_rotation_frequency_in_Hz,
+                     (double *)plan->pre_phase);
+  }
 
   /**
    * Update the mrsimulator plan with the given rotor angle in radian. This method
@@ -185,6 +193,14 @@ void MRS_plan_update_from_rotor_angle_in_rad(MRS_plan *plan, double rotor_angle_
     wigner_dm0_vector(4, rotor_angle_in_rad, plan->wigner_d4m0_vector);
   }
 
+  plan->pre_phase_2 = NULL;
+  plan->pre_phase_4 = NULL;
+  plan->pre_phase_2_single = NULL;
+  plan->pre_phase_4_single = NULL;
+  if (plan->is_static) {
+    return;
+  }
+
   size_2 = 5 * plan->number_of_sidebands;
   plan->pre_phase_2 = malloc_complex128(size_2);
 
@@ -207,7 +223,10 @@ void MRS_plan_update_from_rotor_angle_in_rad(MRS_plan *plan, double rotor_angle_
     j += plan->number_of_sidebands;
   }
 
-  plan->pre_phase_4 = NULL;
+  /* Single precision copy of pre_phase_2, see MRS_get_amplitudes_from_plan. */
+  plan->pre_phase_2_single = malloc_complex64(size_2);
+  vm_double_to_float(2 * size_2, (double *)plan->pre_phase_2,
+                     (float *)plan->pre_phase_2_single);
 
   /* Setup for processing the fourth rank tensors. */
   if (allow_fourth_rank) {
@@ -232,6 +251,10 @@ void MRS_plan_update_from_rotor_angle_in_rad(MRS_plan *plan, double rotor_angle_
                    (double *)(plan->pre_phase_4[j]), 1);
       j += plan->number_of_sidebands;
     }
+
+    plan->pre_phase_4_single = malloc_complex64(size_4);
+    vm_double_to_float(2 * size_4, (double *)plan->pre_phase_4,
+                       (float *)plan->pre_phase_4_single);
   }
 }
 
@@ -246,6 +269,7 @@ MRS_plan *MRS_copy_plan(MRS_plan *plan) {
   new_plan->number_of_sidebands = plan->number_of_sidebands;
   new_plan->sample_rotation_frequency_in_Hz = plan->sample_rotation_frequency_in_Hz;
   new_plan->rotor_angle_in_rad = plan->rotor_angle_in_rad;
+  new_plan->is_static = plan->is_static;
   new_plan->vr_freq = plan->vr_freq;
   new_plan->allow_fourth_rank = plan->allow_fourth_rank;
   new_plan->size = plan->size;
@@ -256,6 +280,8 @@ MRS_plan *MRS_copy_plan(MRS_plan *plan) {
   new_plan->pre_phase = plan->pre_phase;
   new_plan->pre_phase_2 = plan->pre_phase_2;
   new_plan->pre_phase_4 = plan->pre_phase_4;
+  new_plan->pre_phase_2_single = plan->pre_phase_2_single;
+  new_plan->pre_phase_4_single = plan->pre_phase_4_single;
   new_plan->one[0] = plan->one[0];
   new_plan->one[1] = plan->one[1];
   new_plan->zero[0] = plan->zero[0];
@@ -264,6 +290,123 @@ MRS_plan *MRS_copy_plan(MRS_plan *plan) {
   return new_plan;
 }
 
+/**
+ * Evaluate the sideband phase, exp(vector), in single precision. Same as the double
+ * precision evaluation in MRS_get_amplitudes_from_plan, where the lab frame tensors,
+ * w2 and w4, and the pre-calculated sideband phase, pre_phase_2 and pre_phase_4, are
+ * single precision copies. The single precision product occupies the first half of the
+ * memory of `vector`, and its exponent is expanded to the complex128 `vector` for the
+ * Fourier transform.
+ */
+static inline void get_sideband_phase_single(MRS_averaging_scheme *scheme,
+                                             MRS_plan *plan,
+                                             MRS_fftw_scheme *fftw_scheme) {
+  complex64 one = {1.0, 0.0}, zero = {0.0, 0.0};
+  complex64 *vector = (complex64 *)fftw_scheme->vector;
+  unsigned int total = scheme->total_orientations;
+
+  if (scheme->w2_single == NULL) {
+    scheme->w2_single = malloc_complex64(5 * total);
+  }
+  vm_double_to_float(10 * total, (double *)scheme->w2, (float *)scheme->w2_single);
+  cblas_cgemm(CblasRowMajor, CblasTrans, CblasTrans, plan->number_of_sidebands, total,
+              5, (float *)one, (float *)(plan->pre_phase_2_single),
+              plan->number_of_sidebands, (float *)(scheme->w2_single), 5,
+              (float *)zero, (float *)vector, total);
+
+  if (scheme->w4 != NULL) {
+    if (scheme->w4_single == NULL) {
+      scheme->w4_single = malloc_complex64(9 * total);
+    }
+    vm_double_to_float(18 * total, (double *)scheme->w4, (float *)scheme->w4_single);
+    cblas_cgemm(CblasRowMajor, CblasTrans, CblasTrans, plan->number_of_sidebands,
+                total, 9, (float *)one, (float *)(plan->pre_phase_4_single),
+                plan->number_of_sidebands, (float *)(scheme->w4_single), 9,
+                (float *)one, (float *)vector, total);
+  }
+
+  vm_float_complex_exp_imag_only(plan->size, vector, fftw_scheme->vector);
+}
+
+/* Evaluate the sideband amplitudes, see MRS_get_amplitudes_from_plan, where the
+ * orientations are split between the threads of the fftw scheme workspace. Every
+ * thread evaluates the sideband phase, the Fourier transform, and the absolute value
+ * square over the columns of its range of the orientations within the `vector`, a
+ * number_of_sidebands x total_orientations row major matrix. In single precision, the
+ * phase of a range is evaluated in the `phase_single` buffer of the workspace, at the
+ * offset number_of_sidebands x start of the range. */
+static inline void amplitudes_threaded(MRS_averaging_scheme *scheme, MRS_plan *plan,
+                                       MRS_fftw_scheme *fftw_scheme,
+                                       bool single_precision) {
+  int thread, n_threads = fftw_scheme->n_threads;
+  unsigned int total = scheme->total_orientations, N = plan->number_of_sidebands;
+
+  if (single_precision) {
+    if (scheme->w2_single == NULL) {
+      scheme->w2_single = malloc_complex64(5 * total);
+    }
+    if (scheme->w4 != NULL && scheme->w4_single == NULL) {
+      scheme->w4_single = malloc_complex64(9 * total);
+    }
+    if (fftw_scheme->phase_single == NULL) {
+      fftw_scheme->phase_single = malloc_complex64(plan->size);
+    }
+  }
+
+#pragma omp parallel for num_threads(n_threads) schedule(static, 1)
+  for (thread = 0; thread < n_threads; thread++) {
+    unsigned int start, count, n;
+    complex64 one = {1.0, 0.0}, zero = {0.0, 0.0}, *phase;
+    fftw_complex *vector;
+
+    MRS_thread_range(total, n_threads, thread, &start, &count);
+    vector = &fftw_scheme->vector[start];
+
+    if (single_precision) {
+      phase = &fftw_scheme->phase_single[N * start];
+      vm_double_to_float(10 * count, (double *)&scheme->w2[5 * start],
+                         (float *)&scheme->w2_single[5 * start]);
+      cblas_cgemm(CblasRowMajor, CblasTrans, CblasTrans, N, count, 5, (float *)one,
+                  (float *)(plan->pre_phase_2_single), N,
+                  (float *)&scheme->w2_single[5 * start], 5, (float *)zero,
+                  (float *)phase, count);
+      if (scheme->w4 != NULL) {
+        vm_double_to_float(18 * count, (double *)&scheme->w4[9 * start],
+                           (float *)&scheme->w4_single[9 * start]);
+        cblas_cgemm(CblasRowMajor, CblasTrans, CblasTrans, N, count, 9, (float *)one,
+                    (float *)(plan->pre_phase_4_single), N,
+                    (float *)&scheme->w4_single[9 * start], 9, (float *)one,
+                    (float *)phase, count);
+      }
+      for (n = 0; n < N; n++) {
+        vm_float_complex_exp_imag_only(count, &phase[n * count], &vector[n * total]);
+      }
+    } else {
+      cblas_zgemm(CblasRowMajor, CblasTrans, CblasTrans, N, count, 5,
+                  (double *)(plan->one), (double *)(plan->pre_phase_2), N,
+                  (double *)&scheme->w2[5 * start], 5, (double *)(plan->zero),
+                  (double *)vector, total);
+      if (scheme->w4 != NULL) {
+        cblas_zgemm(CblasRowMajor, CblasTrans, CblasTrans, N, count, 9,
+                    (double *)(plan->one), (double *)(plan->pre_phase_4), N,
+                    (double *)&scheme->w4[9 * start], 9, (double *)(plan->one),
+                    (double *)vector, total);
+      }
+      for (n = 0; n < N; n++) {
+        vm_double_complex_exp_imag_only(count, &vector[n * total], &vector[n * total]);
+      }
+    }
+
+    fftw_execute_dft(fftw_scheme->thread_plans[thread], vector, vector);
+
+    for (n = 0; n < N; n++) {
+      vm_double_square_inplace(2 * count, (double *)&vector[n * total]);
+      cblas_daxpy(count, 1.0, (double *)&vector[n * total] + 1, 2,
+                  (double *)&vector[n * total], 2);
+    }
+  }
+}
+
 /**
  * @func MRS_get_amplitudes_from_plan
  *
@@ -273,69 +416,86 @@ MRS_plan *MRS_copy_plan(MRS_plan *plan) {
  *    frame using wigner 2j and 4j rotation matrices, respectively, at all orientations.
  * 2) Evalute the sideband amplitudes using equation [39] of the reference
  *    https://doi.org/10.1006/jmre.1998.1427.
+ * When `single_precision` is true, the sideband phase is evaluated in single precision,
+ * see get_sideband_phase_single.
  */
 void MRS_get_amplitudes_from_plan(MRS_averaging_scheme *scheme, MRS_plan *plan,
-                                  MRS_fftw_scheme *fftw_scheme, bool refresh) {
+                                  MRS_fftw_scheme *fftw_scheme, bool refresh,
+                                  bool single_precision) {
   /* If the number of sidebands is 1, the sideband amplitude at every sideband order is
    * one. In this case, return null,
    */
   if (plan->number_of_sidebands == 1) return;
 
+  /* For a workspace with more than one thread over the orientations, see
+   * MRS_create_fftw_scheme_workspace, the orientations are split between the threads.
+   */
+  if (fftw_scheme->n_threads > 1) {
+    amplitudes_threaded(scheme, plan, fftw_scheme, single_precision);
+    return;
+  }
+
   /* ================ Calculate the spinning sideband amplitude. ==================== */
 
   // if (refresh) {
   //   cblas_dscal(2 * plan->size, 0.0, (double *)(fftw_scheme->vector), 1);
   // }
 
-  /**
-   * Evaluate the exponent of the sideband phase w.r.t the second-rank tensor
-   * components. The exponent is given as,
-   *
-   * w2(Θ) * d^2_{m,0}(rotor_angle_in_rad) * 2πI [(exp(I m ωr t) - 1)/(I m ωr)]
-   * |-----lab frame 2nd-rank tensors----|
-   *         |------------------------- pre_phase_2 --------------------------|
-   *
-   * where `pre_phase_2` is pre-calculated and stored in the plan. The calculated
-   * product is stored in the fftw_scheme as a complex double array under the variable
-   * name `vector`, which is interpreted as a row major matrix of shape
-   * `number_of_sidebands` x `total_orientations` with `total_orientations` as the
-   * leading dimension.
-   */
-  cblas_zgemm(CblasRowMajor, CblasTrans, CblasTrans, plan->number_of_sidebands,
-              scheme->total_orientations, 5, (double *)(plan->one),
-              (double *)(plan->pre_phase_2), plan->number_of_sidebands,
-              (double *)(scheme->w2), 5, (double *)(plan->zero),
-              (double *)(fftw_scheme->vector), scheme->total_orientations);
-
-  if (scheme->w4 != NULL) {
+  if (single_precision) {
+    get_sideband_phase_single(scheme, plan, fftw_scheme);
+  } else {
     /**
-     * Similarly, evaluate the exponent of the sideband phase w.r.t the fourth-rank
-     * tensor components. The exponent is given as,
+     * Evaluate the exponent of the sideband phase w.r.t the second-rank tensor
+     * components. The exponent is given as,
      *
-     * w4(Θ) * d^4_{m, 0}(rotor_angle_in_rad) * 2πI[(exp(I m ωr t) - 1)/(I m ωr)]
-     * |-----lab frame 4th rank tensors-----|
-     *         |-------------------------- pre_phase_4--------------------------|
+     * w2(Θ) * d^2_{m,0}(rotor_angle_in_rad) * 2πI [(exp(I m ωr t) - 1)/(I m ωr)]
+     * |-----lab frame 2nd-rank tensors----|
+     *         |------------------------- pre_phase_2 --------------------------|
      *
-     * where `pre_phase_4` is pre-calculated and stored in the plan. This operation will
-     * add and update the values stored in the variable `vector`.
+     * where `pre_phase_2` is pre-calculated and stored in the plan. The calculated
+     * product is stored in the fftw_scheme as a complex double array under the variable
+     * name `vector`, which is interpreted as a row major matrix of shape
+     * `number_of_sidebands` x `total_orientations` with `total_orientations` as the
+     * leading dimension.
      */
     cblas_zgemm(CblasRowMajor, CblasTrans, CblasTrans, plan->number_of_sidebands,
-                scheme->total_orientations, 9, (double *)(plan->one),
-                (double *)(plan->pre_phase_4), plan->number_of_sidebands,
-                (double *)(scheme->w4), 9, (double *)(plan->one),
+                scheme->total_orientations, 5, (double *)(plan->one),
+                (double *)(plan->pre_phase_2), plan->number_of_sidebands,
+                (double *)(scheme->w2), 5, (double *)(plan->zero),
                 (double *)(fftw_scheme->vector), scheme->total_orientations);
-  }
 
-  /**
-   * Evaluate the sideband phase -> exp(vector). Since the real part of the complex data
-   * is zero, evaluate the exponential for only the imaginary part. The evaluated value
-   * is overwritten on the variable `vector`. */
-  vm_double_complex_exp_imag_only(plan->size, fftw_scheme->vector, fftw_scheme->vector);
+    if (scheme->w4 != NULL) {
+      /**
+       * Similarly, evaluate the exponent of the sideband phase w.r.t the fourth-rank
+       * tensor components. The exponent is given as,
+       *
+       * w4(Θ) * d^4_{m, 0}(rotor_angle_in_rad) * 2πI[(exp(I m ωr t) - 1)/(I m ωr)]
+       * |-----lab frame 4th rank tensors-----|
+       *         |-------------------------- pre_phase_4--------------------------|
+       *
+       * where `pre_phase_4` is pre-calculated and stored in the plan. This operation
+       * will add and update the values stored in the variable `vector`.
+       */
+      cblas_zgemm(CblasRowMajor, CblasTrans, CblasTrans, plan->number_of_sidebands,
+                  scheme->total_orientations, 9, (double *)(plan->one),
+                  (double *)(plan->pre_phase_4), plan->number_of_sidebands,
+                  (double *)(scheme->w4), 9, (double *)(plan->one),
+                  (double *)(fftw_scheme->vector), scheme->total_orientations);
+    }
+
+    /**
+     * Evaluate the sideband phase -> exp(vector). Since the real part of the complex
+     * data is zero, evaluate the exponential for only the imaginary part. The evaluated
+     * value is overwritten on the variable `vector`. */
+    vm_double_complex_exp_imag_only(plan->size, fftw_scheme->vector,
+                                    fftw_scheme->vector);
+  }
 
   /**
    * Evaluate the Fourier transform of the variable, `vector`, -> fft(vector). The fft
    * operation again updates the values of the array, `vector`. */
-  fftw_execute(fftw_scheme->the_fftw_plan);
+  fftw_execute_dft(fftw_scheme->the_fftw_plan, fftw_scheme->vector,
+                   fftw_scheme->vector);
 
   /**
    * Evaluate the absolute value square of the `vector` array. The absolute value square
@@ -355,6 +515,244 @@ void MRS_get_amplitudes_from_plan(MRS_averaging_scheme *scheme, MRS_plan *plan,
   // }
 }
 
+/* Sideband engines ................................................................. */
+
+static int sideband_engine = MRS_SIDEBAND_ENGINE_AUTO;
+
+int MRS_set_sideband_engine(int engine) {
+  if (engine < MRS_SIDEBAND_ENGINE_AUTO || engine > MRS_SIDEBAND_ENGINE_BESSEL) {
+    engine = MRS_SIDEBAND_ENGINE_AUTO;
+  }
+  sideband_engine = engine;
+  return engine;
+}
+
+int MRS_get_sideband_engine(void) { return sideband_engine; }
+
+/* The estimated costs of the sideband engines, in units of a complex multiply-add of
+ * the Bessel series. Per orientation, the cost of the Fourier transform is
+ * N (FFT_COST + FFT_LOG2_COST log2(N)), where N is the number of sidebands, and the
+ * cost of the Bessel series is BESSEL_COST + BESSEL_ORDER_COST (K_1 + K_2) + P + N,
+ * where K_m is the largest order of the series, and P = (K_1 + 1) (K_2 + 1) is the
+ * estimated number of products. The values are measured from the timings of the
+ * engines over the numbers of sidebands from 8 to 512 and the arguments z_m from 0.01
+ * to 64, see the benchmark_sideband_engine.py script of the spectral integration
+ * tests. */
+#define FFT_COST 2.5
+#define FFT_LOG2_COST 0.25
+#define BESSEL_COST 35.0
+#define BESSEL_ORDER_COST 1.0
+
+// The largest order of the Bessel series. A larger order selects the Fourier transform.
+#define BESSEL_MAX_ORDER 65536
+
+// The products of the Bessel functions below the tolerance are skipped.
+#define BESSEL_TOLERANCE 1e-17
+
+// The number of orientations per block of the amplitude store.
+#define BESSEL_BLOCK 16
+
+/* Return the largest order, K, where the Bessel functions |J_k(z)| > 1e-17. */
+static inline int bessel_order_limit(double z) {
+  return (int)(z + 11.5 * cbrt(z) + 5.0);
+}
+
+/* Evaluate the Bessel functions of the first kind, J_k(z) for k = 0 to K, with the
+ * Miller backward recurrence from the order M = K + 4, normalized with the sum rule
+ * J_0(z) + 2 sum_k J_2k(z) = 1. Since |J_K(z)| < 1e-17, the functions are evaluated to
+ * an absolute error of 1e-14. The buffer `J` is of length K + 6. */
+static inline void bessel_j(double z, int K, double *J) {
+  int k, i, M = K + 4;
+  double sum = 0.0, scale, two_over_z;
+
+  if (z < 1e-300) {
+    vm_double_zeros(K + 1, J);
+    J[0] = 1.0;
+    return;
+  }
+
+  two_over_z = 2.0 / z;
+  J[M + 1] = 0.0;
+  J[M] = 1e-300;
+  for (k = M; k > 0; k--) {
+    J[k - 1] = k * two_over_z * J[k] - J[k + 1];
+    if (fabs(J[k - 1]) > 1e250) {
+      for (i = k - 1; i <= M; i++) J[i] *= 1e-250;
+    }
+  }
+  for (k = 2; k <= M; k += 2) sum += J[k];
+  scale = 1.0 / (J[0] + 2.0 * sum);
+  cblas_dscal(K + 1, scale, J, 1);
+}
+
+/* Evaluate the series a_k = J_k(z) exp(I k phi) for k = -K to K from the Bessel
+ * functions J_k(z), k >= 0, where J_-k(z) = (-1)^k J_k(z), and exp(I phi) = c + I s.
+ * The series is stored as split real and imaginary parts at index K + k. */
+static inline void bessel_series(double c, double s, int K, double *J, double *re,
+                                 double *im) {
+  int k;
+  double e_re = 1.0, e_im = 0.0, temp, sign = -1.0;
+
+  re[K] = J[0];
+  im[K] = 0.0;
+  for (k = 1; k <= K; k++) {
+    temp = e_re * c - e_im * s;
+    e_im = e_re * s + e_im * c;
+    e_re = temp;
+    re[K + k] = J[k] * e_re;
+    im[K + k] = J[k] * e_im;
+    re[K - k] = sign * J[k] * e_re;
+    im[K - k] = -sign * J[k] * e_im;
+    sign = -sign;
+  }
+}
+
+/* Return the largest order, L <= K, where |J_L(z)| scale > BESSEL_TOLERANCE. Only
+ * the orders above z, where |J_k(z)| decreases with k, are skipped. */
+static inline int bessel_product_limit(double *J, int K, double z, double scale) {
+  double limit = BESSEL_TOLERANCE / scale;
+  while (K > z && fabs(J[K]) <= limit) K--;
+  return K;
+}
+
+/* Evaluate the folded sideband amplitudes of an orientation, |G_n|^2 for n = 0 to N-1,
+ * where G_n = sum_{k1 + 2 k2 = n mod N} a1[k1] a2[k2], and a_m is the Bessel series of
+ * the arguments `arg`, see MRS_get_bessel_amplitudes_from_plan. The products below the
+ * tolerance are skipped with |k1| <= L. The k1 series is added in contiguous segments
+ * between the folds. The buffers `J1` and `J2` are of length K_m + 6, the series
+ * `a1` and `a2` of length 2 K_m + 1, and `G_re`, `G_im`, and `amp` of length N. */
+static inline void bessel_sideband_orders(double *arg, int N, double *J1, double *J2,
+                                          double *a1_re, double *a1_im, double *a2_re,
+                                          double *a2_im, double *G_re, double *G_im,
+                                          double *amp) {
+  int i, k2, n, start, len, offset, L;
+  int K1 = (int)arg[3], K2 = (int)arg[7];
+  double a_re, a_im;
+
+  bessel_j(arg[0], K1, J1);
+  bessel_series(arg[1], arg[2], K1, J1, a1_re, a1_im);
+  bessel_j(arg[4], K2, J2);
+  bessel_series(arg[5], arg[6], K2, J2, a2_re, a2_im);
+
+  vm_double_zeros(N, G_re);
+  vm_double_zeros(N, G_im);
+  for (k2 = -K2; k2 <= K2; k2++) {
+    L = bessel_product_limit(J1, K1, arg[0], fabs(J2[abs(k2)]));
+    a_re = a2_re[K2 + k2];
+    a_im = a2_im[K2 + k2];
+    start = (2 * k2 - L) % N;
+    start += (start < 0) ? N : 0;
+    offset = K1 - L;
+    n = 2 * L + 1;
+    while (n > 0) {
+      len = (n < N - start) ? n : N - start;
+      for (i = 0; i < len; i++) {
+        G_re[start + i] += a_re * a1_re[offset + i] - a_im * a1_im[offset + i];
+        G_im[start + i] += a_re * a1_im[offset + i] + a_im * a1_re[offset + i];
+      }
+      offset += len;
+      n -= len;
+      start = 0;
+    }
+  }
+  for (n = 0; n < N; n++) {
+    amp[n] = G_re[n] * G_re[n] + G_im[n] * G_im[n];
+  }
+}
+
+bool MRS_get_bessel_amplitudes_from_plan(MRS_averaging_scheme *scheme, MRS_plan *plan,
+                                         MRS_fftw_scheme *fftw_scheme, MRS_arena *arena,
+                                         bool force) {
+  unsigned int orientation, n_blocks, total = scheme->total_orientations;
+  int m, K1, K2, K_max = 0, thread, n_threads, size;
+  int N = (int)plan->number_of_sidebands;
+  double *d2 = plan->wigner_d2m0_vector, *w2, *args, *arg, *scratch;
+  double *vector = (double *)fftw_scheme->vector;
+  double b_re, b_im, mwr, scale, cost = 0.0;
+
+  if (N == 1) return true;
+
+  /* The arguments of the Bessel series of m = 1 and 2 per orientation, stored as
+   * [z_1, c_1, s_1, K_1, z_2, c_2, s_2, K_2], where
+   * z_m (c_m + I s_m) = (w2_m d2_m0 + conj(w2_-m) d2_-m0) / (m ωr), and K_m is the
+   * largest order of the series. The terms follow from the sideband phase of
+   * MRS_get_amplitudes_from_plan, Im(w2 pre_phase_2).
+   */
+  args = arena_double(arena, 8 * total);
+  for (orientation = 0; orientation < total; orientation++) {
+    w2 = (double *)scheme->w2[5 * orientation];
+    arg = &args[8 * orientation];
+    for (m = 1; m <= 2; m++) {
+      mwr = m * plan->sample_rotation_frequency_in_Hz;
+      b_re = (w2[2 * (2 + m)] * d2[2 + m] + w2[2 * (2 - m)] * d2[2 - m]) / mwr;
+      b_im = (w2[2 * (2 + m) + 1] * d2[2 + m] - w2[2 * (2 - m) + 1] * d2[2 - m]) / mwr;
+      arg[0] = hypot(b_re, b_im);
+      arg[1] = (arg[0] > 0.0) ? b_re / arg[0] : 1.0;
+      arg[2] = (arg[0] > 0.0) ? b_im / arg[0] : 0.0;
+      arg[3] = (double)bessel_order_limit(arg[0]);
+      K_max = ((int)arg[3] > K_max) ? (int)arg[3] : K_max;
+      arg += 4;
+    }
+    K1 = (int)args[8 * orientation + 3];
+    K2 = (int)args[8 * orientation + 7];
+    cost += BESSEL_COST + BESSEL_ORDER_COST * (K1 + K2) + (K1 + 1) * (K2 + 1) + N;
+  }
+
+  if (K_max > BESSEL_MAX_ORDER) return false;
+  if (!force && cost >= (double)total * N * (FFT_COST + FFT_LOG2_COST * log2(N))) {
+    return false;
+  }
+
+  // The scratch buffers of the threads over the orientations, see
+  // MRS_create_fftw_scheme_workspace.
+  n_threads = fftw_scheme->n_threads;
+  size = 2 * (K_max + 6) + 4 * (2 * K_max + 1) + 2 * N + BESSEL_BLOCK * N;
+  scratch = arena_double(arena, n_threads * size);
+
+  // The discrete Fourier transform of N samples scales the amplitudes by N.
+  scale = (double)N * (double)N;
+
+  /* The amplitudes are stored in the real part of the `vector` in the layout of the
+   * Fourier transform, number_of_sidebands x total_orientations. The amplitudes of a
+   * block of orientations are evaluated before the store, such that every sideband
+   * order is stored as a contiguous row segment. The blocks are split between the
+   * threads. */
+  n_blocks = (total + BESSEL_BLOCK - 1) / BESSEL_BLOCK;
+#pragma omp parallel for num_threads(n_threads) schedule(static, 1)
+  for (thread = 0; thread < n_threads; thread++) {
+    unsigned int first, n_thread_blocks, block, count, j;
+    int n;
+    double *J1, *J2, *a1_re, *a1_im, *a2_re, *a2_im, *G_re, *G_im, *amp, *row;
+
+    J1 = &scratch[thread * size];
+    J2 = J1 + K_max + 6;
+    a1_re = J2 + K_max + 6;
+    a1_im = a1_re + 2 * K_max + 1;
+    a2_re = a1_im + 2 * K_max + 1;
+    a2_im = a2_re + 2 * K_max + 1;
+    G_re = a2_im + 2 * K_max + 1;
+    G_im = G_re + N;
+    amp = G_im + N;
+
+    MRS_thread_range(n_blocks, n_threads, thread, &first, &n_thread_blocks);
+    for (block = first * BESSEL_BLOCK; block < (first + n_thread_blocks) * BESSEL_BLOCK;
+         block += BESSEL_BLOCK) {
+      count = (total - block < BESSEL_BLOCK) ? total - block : BESSEL_BLOCK;
+      for (j = 0; j < count; j++) {
+        bessel_sideband_orders(&args[8 * (block + j)], N, J1, J2, a1_re, a1_im, a2_re,
+                               a2_im, G_re, G_im, &amp[j * N]);
+      }
+      for (n = 0; n < N; n++) {
+        row = &vector[2 * ((size_t)n * total + block)];
+        for (j = 0; j < count; j++) {
+          row[2 * j] = scale * amp[j * N + n];
+        }
+      }
+    }
+  }
+  return true;
+}
+
 /**
  * @func MRS_get_frequencies_from_plan
  *
@@ -364,6 +762,8 @@ void MRS_get_amplitudes_from_plan(MRS_averaging_scheme *scheme, MRS_plan *plan,
 void MRS_get_frequencies_from_plan(MRS_averaging_scheme *scheme, MRS_plan *plan,
                                    double R0, complex128 *R2, complex128 *R4,
                                    bool refresh, MRS_dimension *dim) {
+  double scale;
+
   /**
    * Rotate the R2 and R4 components from the common frame to the rotor frame over all
    * the orientations. The componets are stored in w2 and w4 of the averaging scheme,
@@ -375,7 +775,7 @@ void MRS_get_frequencies_from_plan(MRS_averaging_scheme *scheme, MRS_plan *plan,
 
   /* If refresh is true, zero the local_frequencies before update. */
   if (refresh) {
-    cblas_dscal(scheme->total_orientations, 0.0, dim->local_frequency, 1);
+    vm_double_zeros(scheme->total_orientations, dim->local_frequency);
     dim->R0_offset = 0.0;
   }
 
@@ -390,42 +790,220 @@ void MRS_get_frequencies_from_plan(MRS_averaging_scheme *scheme, MRS_plan *plan,
    * and 4j rotations to transform the frequencies in the lab-frame.
    */
   /* Wigner 2j rotation for the second-rank tensor frequency contributions. */
-  plan->buffer = plan->wigner_d2m0_vector[2];
-  cblas_daxpy(scheme->total_orientations, plan->buffer, (double *)&scheme->w2[2], 10,
+  scale = plan->wigner_d2m0_vector[2];
+  cblas_daxpy(scheme->total_orientations, scale, (double *)&scheme->w2[2], 10,
               dim->local_frequency, 1);
   if (plan->allow_fourth_rank) {
     /* Wigner 4j rotation for the fourth-rank tensor frequency contributions. */
-    plan->buffer = plan->wigner_d4m0_vector[4];
-    cblas_daxpy(scheme->total_orientations, plan->buffer, (double *)&scheme->w4[4], 18,
+    scale = plan->wigner_d4m0_vector[4];
+    cblas_daxpy(scheme->total_orientations, scale, (double *)&scheme->w4[4], 18,
                 dim->local_frequency, 1);
   }
 }
 
-/**
- * @func MRS_get_normalized_frequencies_from_plan
- *
- * Get the lab-frame normalized frequency contributions from the zeroth, second,
- * fourth-rank tensors. Here, normalization refers to dividing the calculated
- * frequencies by the increment of the respective spectral dimension. Normalization
- * makes binning of frequencies on the spectrum faster as bins can then be of 1 unit
- * increments.
+/* Return true if the second-rank tensor at index `k` of the basis is the second-order
+ * quadrupolar tensor of a site, which is paired with the fourth-rank tensor of the
+ * site at index `k / 3`. */
+static inline bool basis_second_order_tensor(MRS_tensor_basis *basis, unsigned int k) {
+  return k < 3 * basis->n_sites && k % 3 == 2;
+}
+
+/* Rotate the pending tensors of the basis, see
+ * MRS_get_normalized_frequencies_from_basis, over the range of `count` orientations
+ * from `start` of every octant. The second-order quadrupolar tensors of a site are
+ * rotated together. For a static plan, the lab-frame frequencies of the tensors, that
+ * is, the m=0 components after the rotation, are evaluated instead. */
+static inline void basis_rotation_range(MRS_averaging_scheme *scheme, MRS_plan *plan,
+                                        MRS_tensor_basis *basis,
+                                        complex128 *exp_Im_alpha, unsigned int start,
+                                        unsigned int count) {
+  unsigned int i, j, k, site, stride = scheme->octant_orientations;
+  double *wigner_2j = &scheme->wigner_2j_matrices[25 * start];
+  double *wigner_4j = NULL;
+  bool fourth_rank;
+
+  if (basis->allow_fourth_rank) {
+    wigner_4j = &scheme->wigner_4j_matrices[81 * start];
+  }
+
+  for (i = 0; i < basis->n_pending; i++) {
+    k = basis->pending[i];
+    site = k / 3;
+    fourth_rank = basis->allow_fourth_rank && basis_second_order_tensor(basis, k);
+    if (!plan->is_static) {
+      __batch_wigner_rotation_strided(
+          count, stride, plan->n_octants, wigner_2j, &basis->R2[5 * k],
+          (fourth_rank) ? wigner_4j : NULL, (fourth_rank) ? &basis->R4[9 * site] : NULL,
+          exp_Im_alpha, &basis->w2[k][5 * start],
+          (fourth_rank) ? &basis->w4[site][9 * start] : NULL);
+      continue;
+    }
+    for (j = 0; j < plan->n_octants; j++) {
+      vm_double_zeros(count, &basis->freq_2[k][j * stride + start]);
+    }
+    __batch_wigner_rotation_m0(count, stride, plan->n_octants, wigner_2j,
+                               &basis->R2[5 * k], 1.0, NULL, NULL, 0.0, exp_Im_alpha,
+                               &basis->freq_2[k][start]);
+    if (!fourth_rank) continue;
+    for (j = 0; j < plan->n_octants; j++) {
+      vm_double_zeros(count, &basis->freq_4[site][j * stride + start]);
+    }
+    __batch_wigner_rotation_m0(count, stride, plan->n_octants, wigner_2j, NULL, 0.0,
+                               wigner_4j, &basis->R4[9 * site], 1.0, exp_Im_alpha,
+                               &basis->freq_4[site][start]);
+  }
+}
+
+/* Evaluate the rotated frequency components, w2 and w4 of the scheme, as the linear
+ * combination of the rotated tensors of the basis over the range of `count`
+ * orientations from `start` of every octant. For a static plan, the lab-frame
+ * frequencies of the tensors, scaled by `scale_2` and `scale_4`, are added to the
+ * frequencies instead. */
+static inline void basis_combination_range(MRS_averaging_scheme *scheme,
+                                           MRS_plan *plan, MRS_tensor_basis *basis,
+                                           MRS_dimension *dim, double scale_2,
+                                           double scale_4, unsigned int start,
+                                           unsigned int count) {
+  unsigned int j, k, address, stride = scheme->octant_orientations;
+  double *weights_2 = basis->weights_2, *weights_4 = basis->weights_4;
+
+  for (j = 0; j < plan->n_octants; j++) {
+    address = j * stride + start;
+    if (plan->is_static) {
+      for (k = 0; k < basis->n_2; k++) {
+        if (weights_2[k] == 0.0) continue;
+        cblas_daxpy(count, scale_2 * weights_2[k], &basis->freq_2[k][address], 1,
+                    &dim->local_frequency[address], 1);
+      }
+      for (k = 0; plan->allow_fourth_rank && k < basis->n_sites; k++) {
+        if (weights_4[k] == 0.0) continue;
+        cblas_daxpy(count, scale_4 * weights_4[k], &basis->freq_4[k][address], 1,
+                    &dim->local_frequency[address], 1);
+      }
+      continue;
+    }
+
+    vm_double_zeros(10 * count, (double *)&scheme->w2[5 * address]);
+    for (k = 0; k < basis->n_2; k++) {
+      if (weights_2[k] == 0.0) continue;
+      cblas_daxpy(10 * count, weights_2[k], (double *)&basis->w2[k][5 * address], 1,
+                  (double *)&scheme->w2[5 * address], 1);
+    }
+    if (scheme->w4 == NULL) continue;
+    vm_double_zeros(18 * count, (double *)&scheme->w4[9 * address]);
+    for (k = 0; k < basis->n_sites; k++) {
+      if (weights_4[k] == 0.0) continue;
+      cblas_daxpy(18 * count, weights_4[k], (double *)&basis->w4[k][9 * address], 1,
+                  (double *)&scheme->w4[9 * address], 1);
+    }
+  }
+}
+
+/* Add the normalized local anisotropic frequencies of the range of `count`
+ * orientations from `start` of every octant, see
+ * MRS_get_normalized_frequencies_from_plan, where `exp_Im_alpha` holds the range with
+ * `count` as the leading dimension, and `scale_2` and `scale_4` are the scaling of the
+ * second and fourth-rank frequencies. When the `basis` is not NULL, the rotated
+ * frequency components are the linear combination of the rotated tensors of the
+ * basis, see MRS_get_normalized_frequencies_from_basis, and `R2` and `R4` are unused.
  */
-void MRS_get_normalized_frequencies_from_plan(MRS_averaging_scheme *scheme,
-                                              MRS_plan *plan, double R0, complex128 *R2,
-                                              complex128 *R4, bool refresh,
-                                              MRS_dimension *dim, double fraction) {
+static inline void
+normalized_frequencies_range(MRS_averaging_scheme *scheme, MRS_plan *plan,
+                             complex128 *R2, complex128 *R4, MRS_tensor_basis *basis,
+                             bool refresh, MRS_dimension *dim, double scale_2,
+                             double scale_4, complex128 *exp_Im_alpha,
+                             unsigned int start, unsigned int count) {
+  unsigned int j, address, stride = scheme->octant_orientations;
+
+  if (basis != NULL) {
+    basis_rotation_range(scheme, plan, basis, exp_Im_alpha, start, count);
+  }
+
+  /* The frequencies of a static plan are the m=0 components of the tensors after the
+   * rotation to the lab frame, where only the row m=0 of the wigner matrices applies.
+   */
+  if (plan->is_static) {
+    for (j = 0; refresh && j < plan->n_octants; j++) {
+      vm_double_zeros(count, &dim->local_frequency[j * stride + start]);
+    }
+    if (basis != NULL) {
+      basis_combination_range(scheme, plan, basis, dim, scale_2, scale_4, start,
+                              count);
+      return;
+    }
+    __batch_wigner_rotation_m0(
+        count, stride, plan->n_octants, &scheme->wigner_2j_matrices[25 * start], R2,
+        scale_2,
+        (plan->allow_fourth_rank) ? &scheme->wigner_4j_matrices[81 * start] : NULL, R4,
+        scale_4, exp_Im_alpha, &dim->local_frequency[start]);
+    return;
+  }
+
   /**
-   * Rotate the R2 and R4 components from the common frame to the rotor frame over all
-   * the orientations. The componets are stored in w2 and w4 of the averaging scheme,
+   * Rotate the R2 and R4 components from the common frame to the rotor frame over the
+   * orientations. The componets are stored in w2 and w4 of the averaging scheme,
    * respectively.
    */
-  __batch_wigner_rotation(scheme->octant_orientations, plan->n_octants,
-                          scheme->wigner_2j_matrices, R2, scheme->wigner_4j_matrices,
-                          R4, scheme->exp_Im_alpha, scheme->w2, scheme->w4);
+  if (basis != NULL) {
+    basis_combination_range(scheme, plan, basis, dim, scale_2, scale_4, start, count);
+  } else {
+    __batch_wigner_rotation_strided(
+        count, stride, plan->n_octants, &scheme->wigner_2j_matrices[25 * start], R2,
+        (scheme->w4 != NULL) ? &scheme->wigner_4j_matrices[81 * start] : NULL, R4,
+        exp_Im_alpha, &scheme->w2[5 * start],
+        (scheme->w4 != NULL) ? &scheme->w4[9 * start] : NULL);
+  }
+
+  for (j = 0; j < plan->n_octants; j++) {
+    address = j * stride + start;
+    /* If refresh is true, zero the local_frequencies before update. */
+    if (refresh) {
+      vm_double_zeros(count, &dim->local_frequency[address]);
+    }
+    cblas_daxpy(count, scale_2, (double *)&scheme->w2[5 * address + 2], 10,
+                &dim->local_frequency[address], 1);
+    if (plan->allow_fourth_rank) {
+      cblas_daxpy(count, scale_4, (double *)&scheme->w4[9 * address + 4], 18,
+                  &dim->local_frequency[address], 1);
+    }
+  }
+}
+
+/* Same as normalized_frequencies_range, where the orientations of an octant are split
+ * between the threads of the averaging scheme workspace. */
+static inline void normalized_frequencies_threaded(
+    MRS_averaging_scheme *scheme, MRS_plan *plan, complex128 *R2, complex128 *R4,
+    MRS_tensor_basis *basis, bool refresh, MRS_dimension *dim, double scale_2,
+    double scale_4) {
+  int thread, n_threads = scheme->n_threads;
+  unsigned int n = scheme->octant_orientations;
+
+#pragma omp parallel for num_threads(n_threads) schedule(static, 1)
+  for (thread = 0; thread < n_threads; thread++) {
+    unsigned int start, count, m;
+    complex128 *exp_Im_alpha;
+
+    MRS_thread_range(n, n_threads, thread, &start, &count);
+    exp_Im_alpha = &scheme->exp_Im_alpha_threads[4 * start];
+    for (m = 0; m < 4; m++) {
+      cblas_zcopy(count, (double *)&scheme->exp_Im_alpha[m * n + start], 1,
+                  (double *)&exp_Im_alpha[m * count], 1);
+    }
+    normalized_frequencies_range(scheme, plan, R2, R4, basis, refresh, dim, scale_2,
+                                 scale_4, exp_Im_alpha, start, count);
+  }
+}
+
+/* Evaluate the normalized frequencies, see MRS_get_normalized_frequencies_from_plan,
+ * where the rotated frequency components are from the `basis` when not NULL. */
+static inline void normalized_frequencies(MRS_averaging_scheme *scheme,
+                                          MRS_plan *plan, double R0, complex128 *R2,
+                                          complex128 *R4, MRS_tensor_basis *basis,
+                                          bool refresh, MRS_dimension *dim,
+                                          double fraction) {
+  double scale_2, scale_4 = 0.0;
 
-  /* If refresh is true, zero the local_frequencies before update. */
   if (refresh) {
-    cblas_dscal(scheme->total_orientations, 0.0, dim->local_frequency, 1);
     dim->R0_offset = 0.0;
   }
 
@@ -442,18 +1020,92 @@ void MRS_get_normalized_frequencies_from_plan(MRS_averaging_scheme *scheme,
    */
 
   /* Normalized local anisotropic frequency contributions from the 2nd-rank tensor. */
-  plan->buffer = dim->inverse_increment * plan->wigner_d2m0_vector[2] * fraction;
-  cblas_daxpy(scheme->total_orientations, plan->buffer, (double *)&scheme->w2[2], 10,
-              dim->local_frequency, 1);
+  scale_2 = dim->inverse_increment * plan->wigner_d2m0_vector[2] * fraction;
   if (plan->allow_fourth_rank) {
     /**
      * Similarly, calculate the normalized local anisotropic frequency contributions
      * from the fourth-rank tensor. `wigner_d2m0_vector[4] = d^4(0,0)(rotor_angle)`.
      */
-    plan->buffer = dim->inverse_increment * plan->wigner_d4m0_vector[4] * fraction;
-    cblas_daxpy(scheme->total_orientations, plan->buffer, (double *)&scheme->w4[4], 18,
-                dim->local_frequency, 1);
+    scale_4 = dim->inverse_increment * plan->wigner_d4m0_vector[4] * fraction;
   }
+
+  if (scheme->n_threads > 1) {
+    normalized_frequencies_threaded(scheme, plan, R2, R4, basis, refresh, dim, scale_2,
+                                    scale_4);
+    return;
+  }
+  normalized_frequencies_range(scheme, plan, R2, R4, basis, refresh, dim, scale_2,
+                               scale_4, scheme->exp_Im_alpha, 0,
+                               scheme->octant_orientations);
+}
+
+/**
+ * @func MRS_get_normalized_frequencies_from_plan
+ *
+ * Get the lab-frame normalized frequency contributions from the zeroth, second,
+ * fourth-rank tensors. Here, normalization refers to dividing the calculated
+ * frequencies by the increment of the respective spectral dimension. Normalization
+ * makes binning of frequencies on the spectrum faster as bins can then be of 1 unit
+ * increments. For a workspace with more than one thread over the orientations, see
+ * MRS_create_averaging_scheme_workspace, the orientations are split between the
+ * threads. For a static plan, the frequencies are evaluated directly in the lab frame,
+ * see __batch_wigner_rotation_m0.
+ */
+void MRS_get_normalized_frequencies_from_plan(MRS_averaging_scheme *scheme,
+                                              MRS_plan *plan, double R0, complex128 *R2,
+                                              complex128 *R4, bool refresh,
+                                              MRS_dimension *dim, double fraction) {
+  normalized_frequencies(scheme, plan, R0, R2, R4, NULL, refresh, dim, fraction);
+}
+
+/* Return true if the tensor at index `k` of the basis has a non-zero weight, where the
+ * second-order quadrupolar tensors of a site are counted together. */
+static inline bool basis_tensor_in_use(MRS_tensor_basis *basis, unsigned int k) {
+  if (basis->weights_2[k] != 0.0) return true;
+  return basis_second_order_tensor(basis, k) && basis->weights_4[k / 3] != 0.0;
+}
+
+/**
+ * @func MRS_get_normalized_frequencies_from_basis
+ *
+ * Same as MRS_get_normalized_frequencies_from_plan, where the tensors of the basis in
+ * use by the transition, and not yet rotated, are rotated over all orientations before
+ * the linear combination. The tensors are rotated to the rotor frame for a spinning
+ * plan, and to the lab-frame frequencies for a static plan.
+ */
+void MRS_get_normalized_frequencies_from_basis(MRS_averaging_scheme *scheme,
+                                               MRS_plan *plan, MRS_tensor_basis *basis,
+                                               double R0, bool refresh,
+                                               MRS_dimension *dim, double fraction) {
+  unsigned int k, site, n = basis->total_orientations;
+  bool *rotated = (plan->is_static) ? basis->rotated_static : basis->rotated;
+  bool fourth_rank;
+
+  basis->n_pending = 0;
+  for (k = 0; k < basis->n_2; k++) {
+    if (rotated[k] || !basis_tensor_in_use(basis, k)) continue;
+    site = k / 3;
+    fourth_rank = basis->allow_fourth_rank && basis_second_order_tensor(basis, k);
+    if (plan->is_static) {
+      if (basis->freq_2[k] == NULL) basis->freq_2[k] = malloc_double(n);
+      if (fourth_rank && basis->freq_4[site] == NULL) {
+        basis->freq_4[site] = malloc_double(n);
+      }
+    } else {
+      if (basis->w2[k] == NULL) basis->w2[k] = malloc_complex128(5 * n);
+      if (fourth_rank && basis->w4[site] == NULL) {
+        basis->w4[site] = malloc_complex128(9 * n);
+      }
+    }
+    basis->pending[basis->n_pending++] = k;
+  }
+
+  normalized_frequencies(scheme, plan, R0, NULL, NULL, basis, refresh, dim, fraction);
+
+  for (k = 0; k < basis->n_pending; k++) {
+    rotated[basis->pending[k]] = true;
+  }
+  basis->n_pending = 0;
 }
 
 static inline void MRS_rotate_single_site_interaction_components(
@@ -613,6 +1265,240 @@ void MRS_rotate_components_from_PAS_to_common_frame(
                                                  R0_temp, R2_temp, freq_contrib);
 }
 
+/**
+ * @func MRS_create_tensor_basis
+ *
+ * Create an empty tensor basis. The memory of the tensors is allocated on update.
+ */
+MRS_tensor_basis *MRS_create_tensor_basis(MRS_averaging_scheme *scheme) {
+  MRS_tensor_basis *basis = calloc(1, sizeof(MRS_tensor_basis));
+  basis->total_orientations = scheme->total_orientations;
+  basis->allow_fourth_rank = (scheme->w4 != NULL);
+  return basis;
+}
+
+/**
+ * @func MRS_free_tensor_basis
+ *
+ * Free the tensors and the rotated tensors of the basis.
+ */
+void MRS_free_tensor_basis(MRS_tensor_basis *basis) {
+  unsigned int k;
+  for (k = 0; k < basis->capacity_2; k++) {
+    free(basis->w2[k]);
+    free(basis->freq_2[k]);
+  }
+  for (k = 0; k < basis->capacity_4; k++) {
+    free(basis->w4[k]);
+    free(basis->freq_4[k]);
+  }
+  free(basis->R0);
+  free(basis->R2);
+  free(basis->R4);
+  free(basis->nonzero);
+  free(basis->rotated);
+  free(basis->rotated_static);
+  free(basis->w2);
+  free(basis->w4);
+  free(basis->freq_2);
+  free(basis->freq_4);
+  free(basis->weights_0);
+  free(basis->weights_2);
+  free(basis->weights_4);
+  free(basis->pending);
+  free(basis);
+}
+
+/* Grow the basis to hold `n_2` second-rank and `n_4` fourth-rank tensors. The rotated
+ * tensors are kept, and the new entries are allocated on their first rotation. */
+static inline void basis_reserve(MRS_tensor_basis *basis, unsigned int n_2,
+                                 unsigned int n_4) {
+  unsigned int k;
+  if (n_2 > basis->capacity_2) {
+    basis->R0 = realloc(basis->R0, n_2 * sizeof(double));
+    basis->R2 = realloc(basis->R2, 5 * n_2 * sizeof(complex128));
+    basis->nonzero = realloc(basis->nonzero, n_2 * sizeof(bool));
+    basis->rotated = realloc(basis->rotated, n_2 * sizeof(bool));
+    basis->rotated_static = realloc(basis->rotated_static, n_2 * sizeof(bool));
+    basis->w2 = realloc(basis->w2, n_2 * sizeof(complex128 *));
+    basis->freq_2 = realloc(basis->freq_2, n_2 * sizeof(double *));
+    basis->weights_0 = realloc(basis->weights_0, n_2 * sizeof(double));
+    basis->weights_2 = realloc(basis->weights_2, n_2 * sizeof(double));
+    basis->pending = realloc(basis->pending, n_2 * sizeof(unsigned int));
+    for (k = basis->capacity_2; k < n_2; k++) {
+      basis->w2[k] = NULL;
+      basis->freq_2[k] = NULL;
+    }
+    basis->capacity_2 = n_2;
+  }
+  if (n_4 > basis->capacity_4) {
+    basis->R4 = realloc(basis->R4, 9 * n_4 * sizeof(complex128));
+    basis->w4 = realloc(basis->w4, n_4 * sizeof(complex128 *));
+    basis->freq_4 = realloc(basis->freq_4, n_4 * sizeof(double *));
+    basis->weights_4 = realloc(basis->weights_4, n_4 * sizeof(double));
+    for (k = basis->capacity_4; k < n_4; k++) {
+      basis->w4[k] = NULL;
+      basis->freq_4[k] = NULL;
+    }
+    basis->capacity_4 = n_4;
+  }
+}
+
+/* Return true if any of the `n` values is non-zero. */
+static inline bool any_nonzero(unsigned int n, double *values) {
+  unsigned int i;
+  for (i = 0; i < n; i++) {
+    if (values[i] != 0.0) return true;
+  }
+  return false;
+}
+
+/**
+ * @func MRS_tensor_basis_update
+ *
+ * Evaluate the spatial tensors of the sites and couplings in the common frame. The
+ * nuclear shielding tensors are evaluated at a unit Larmor frequency, in MHz, and the
+ * second-order quadrupolar tensors at a unit Larmor frequency, in Hz, see
+ * MRS_tensor_basis_components for the scaling.
+ */
+void MRS_tensor_basis_update(MRS_tensor_basis *basis, site_struct *sites,
+                             coupling_struct *couplings) {
+  unsigned int i, k, n_sites = sites->number_of_sites;
+  unsigned int n_2 = 3 * n_sites + 2 * couplings->number_of_couplings;
+
+  basis_reserve(basis, n_2, n_sites);
+  basis->n_sites = n_sites;
+  basis->n_2 = n_2;
+  basis->n_pending = 0;
+  vm_double_zeros(n_2, basis->R0);
+  vm_double_zeros(10 * n_2, (double *)basis->R2);
+  vm_double_zeros(18 * n_sites, (double *)basis->R4);
+
+  for (i = 0; i < n_sites; i++) {
+    k = 3 * i;
+    sSOT_1st_order_nuclear_shielding_tensor_components(
+        &basis->R0[k], &basis->R2[5 * k], sites->isotropic_chemical_shift_in_ppm[i],
+        sites->shielding_symmetric_zeta_in_ppm[i], sites->shielding_symmetric_eta[i],
+        &sites->shielding_orientation[3 * i]);
+    if (sites->spin[i] > 0.5) {
+      sSOT_1st_order_electric_quadrupole_tensor_components(
+          &basis->R2[5 * (k + 1)], sites->spin[i], sites->quadrupolar_Cq_in_Hz[i],
+          sites->quadrupolar_eta[i], &sites->quadrupolar_orientation[3 * i]);
+      sSOT_2nd_order_electric_quadrupole_tensor_components(
+          &basis->R0[k + 2], &basis->R2[5 * (k + 2)], &basis->R4[9 * i],
+          sites->spin[i], 1.0, sites->quadrupolar_Cq_in_Hz[i],
+          sites->quadrupolar_eta[i], &sites->quadrupolar_orientation[3 * i]);
+    }
+  }
+
+  for (i = 0; i < couplings->number_of_couplings; i++) {
+    k = 3 * n_sites + 2 * i;
+    sSOT_1st_order_weakly_coupled_J_tensor_components(
+        &basis->R0[k], &basis->R2[5 * k], couplings->isotropic_j_in_Hz[i],
+        couplings->j_symmetric_zeta_in_Hz[i], couplings->j_symmetric_eta[i],
+        &couplings->j_orientation[3 * i]);
+    sSOT_1st_order_weakly_coupled_dipolar_tensor_components(
+        &basis->R2[5 * (k + 1)], couplings->dipolar_coupling_in_Hz[i],
+        &couplings->dipolar_orientation[3 * i]);
+  }
+
+  for (k = 0; k < n_2; k++) {
+    basis->nonzero[k] = any_nonzero(10, (double *)&basis->R2[5 * k]);
+    if (basis_second_order_tensor(basis, k)) {
+      basis->nonzero[k] |= any_nonzero(18, (double *)&basis->R4[9 * (k / 3)]);
+    }
+    basis->rotated[k] = false;
+    basis->rotated_static[k] = false;
+  }
+}
+
+/**
+ * @func MRS_tensor_basis_components
+ *
+ * Evaluate the weights of the tensors of the basis from the spin transition functions,
+ * following the order of the frequency contributions of
+ * MRS_rotate_components_from_PAS_to_common_frame, and the frequency components from
+ * the linear combination of the tensors.
+ */
+bool MRS_tensor_basis_components(MRS_tensor_basis *basis, site_struct *sites,
+                                 coupling_struct *couplings, float *transition,
+                                 bool allow_fourth_rank, double *R0, complex128 *R2,
+                                 complex128 *R4, double B0_in_T, bool *freq_contrib) {
+  unsigned int i, k, n_sites = sites->number_of_sites, n_used_2 = 0, n_used_4 = 0;
+  int site_index_A, site_index_X;
+  double larmor_freq_in_MHz, transition_fn, cl_value[3];
+  float *mf = &transition[n_sites], *mi = transition;
+  double *weights_0 = basis->weights_0, *weights_2 = basis->weights_2;
+  double *weights_4 = basis->weights_4;
+
+  vm_double_zeros(basis->n_2, weights_0);
+  vm_double_zeros(basis->n_2, weights_2);
+  vm_double_zeros(n_sites, weights_4);
+
+  /* Weights of the site tensors */
+  for (i = 0; i < n_sites; i++, mi++, mf++) {
+    if (*mi == *mf) continue;
+    k = 3 * i;
+    larmor_freq_in_MHz = -B0_in_T * sites->gyromagnetic_ratio[i];
+
+    // Nuclear shielding, scaled by the Larmor frequency in MHz.
+    transition_fn = STF_p(*mf, *mi) * larmor_freq_in_MHz;
+    if (*freq_contrib++) weights_0[k] = transition_fn;
+    if (*freq_contrib++) weights_2[k] = transition_fn;
+
+    if (sites->spin[i] <= 0.5) continue;
+    // Electric quadrupolar, where the second order scales inversely with the Larmor
+    // frequency in Hz.
+    if (*freq_contrib++) weights_2[k + 1] = STF_d(*mf, *mi);
+    if (allow_fourth_rank) {
+      STF_cL(cl_value, *mf, *mi, sites->spin[i]);
+      if (*freq_contrib++) weights_0[k + 2] = cl_value[0] / (larmor_freq_in_MHz * 1e6);
+      if (*freq_contrib++) weights_2[k + 2] = cl_value[1] / (larmor_freq_in_MHz * 1e6);
+      if (*freq_contrib++) weights_4[i] = cl_value[2] / (larmor_freq_in_MHz * 1e6);
+    }
+  }
+
+  /* Weights of the J and dipolar coupling tensors */
+  for (i = 0; i < couplings->number_of_couplings; i++) {
+    k = 3 * n_sites + 2 * i;
+    site_index_A = couplings->site_index[2 * i];
+    site_index_X = couplings->site_index[2 * i + 1];
+    transition_fn =
+        STF_dIS(transition[site_index_A + n_sites], transition[site_index_A],
+                transition[site_index_X + n_sites], transition[site_index_X]);
+    weights_0[k] = transition_fn;
+    weights_2[k] = transition_fn;
+    weights_2[k + 1] = transition_fn;
+  }
+
+  /* Frequency components from the linear combination of the tensors. The weights of
+   * the zero tensors are dropped, such that the tensors are never rotated. */
+  *R0 = 0.0;
+  vm_double_zeros(10, (double *)R2);
+  vm_double_zeros(18, (double *)R4);
+  for (k = 0; k < basis->n_2; k++) {
+    *R0 += weights_0[k] * basis->R0[k];
+    if (!basis->nonzero[k]) {
+      weights_2[k] = 0.0;
+      if (basis_second_order_tensor(basis, k)) weights_4[k / 3] = 0.0;
+      continue;
+    }
+    if (weights_2[k] == 0.0) continue;
+    cblas_daxpy(10, weights_2[k], (double *)&basis->R2[5 * k], 1, (double *)R2, 1);
+    n_used_2++;
+  }
+  for (i = 0; i < n_sites; i++) {
+    if (weights_4[i] == 0.0) continue;
+    cblas_daxpy(18, weights_4[i], (double *)&basis->R4[9 * i], 1, (double *)R4, 1);
+    n_used_4++;
+  }
+
+  /* The wigner rotation reads the 25 and 81 elements of the second and fourth-rank
+   * wigner matrices per orientation, while the linear combination reads the 5 and 9
+   * components of every rotated tensor in use. */
+  return 5 * n_used_2 + 9 * n_used_4 < 25 + ((allow_fourth_rank) ? 81 : 0);
+}
+
 /**
  * @func __get_components_2
  *
@@ -155,37 +155,20 @@ void octahedronGetComplexExpOfPolarAngleOverOctant(int nt, void *exp_I_alpha,
 
 void octahedronInterpolation(double *spec, double *freq, int nt, double *amp,
                              int stride, int m) {
-  int i = 0, j = 0, local_index, n_pts = (nt + 1) * (nt + 2) / 2;
-  unsigned int int_i_stride, int_j_stride;
-  double amp1 = 0.0, temp;
-  double *amp_address, *freq_address;
-
-  /* Interpolate between 1d points by setting up triangles of unit area */
-
-  local_index = nt - 1;
-  amp_address = &amp[(nt + 1) * stride];
-  freq_address = &freq[nt + 1];
-
-  while (i < n_pts - 1) {
-    int_i_stride = i * stride;
-    int_j_stride = j * stride;
-    temp = amp[int_i_stride + stride] + amp_address[int_j_stride];
-    amp1 = temp;
-    amp1 += amp[int_i_stride];
-
-    triangle_interpolation(&freq[i], &freq[i + 1], &freq_address[j], &amp1, spec, &m);
-
-    if (i < local_index) {
-      amp1 = temp;
-      amp1 += amp_address[int_j_stride + stride];
-      triangle_interpolation(&freq[i + 1], &freq_address[j], &freq_address[j + 1],
-                             &amp1, spec, &m);
-    } else {
-      local_index = j + nt;
-      i++;
-    }
-    i++;
-    j++;
+  int row, n;
+  double *freq_bottom, *amp_bottom;
+
+  /* Interpolate between 1d points by setting up triangles of unit area. The face of
+   * the octahedron is a stack of strips, where the strip between a row of n + 1
+   * points and the next row of n points holds 2n - 1 triangles. */
+  for (row = 0; row < nt; row++) {
+    n = nt - row;
+    freq_bottom = &freq[n + 1];
+    amp_bottom = &amp[(n + 1) * stride];
+    triangle_strip_interpolation(freq, freq_bottom, amp, amp_bottom, stride, n, spec,
+                                 m);
+    freq = freq_bottom;
+    amp = amp_bottom;
   }
 }
 
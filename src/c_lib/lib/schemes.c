@@ -105,6 +105,15 @@ static inline void averaging_scheme_setup(MRS_averaging_scheme *scheme,
      * tensors. */
     scheme->w4 = malloc_complex128(9 * scheme->total_orientations);
   }
+
+  /* The single precision buffers are allocated on first use, see
+   * MRS_get_amplitudes_from_plan. */
+  scheme->w2_single = NULL;
+  scheme->w4_single = NULL;
+
+  // The orientations are split between threads only in a workspace.
+  scheme->n_threads = 1;
+  scheme->exp_Im_alpha_threads = NULL;
 }
 
 /* Free the memory from the mrsimulator plan associated with the spherical averaging
@@ -114,8 +123,52 @@ void MRS_free_averaging_scheme(MRS_averaging_scheme *scheme) {
   free(scheme->exp_Im_alpha);
   free(scheme->w2);
   free(scheme->w4);
+  free(scheme->w2_single);
+  free(scheme->w4_single);
   free(scheme->wigner_2j_matrices);
   free(scheme->wigner_4j_matrices);
+  free(scheme);
+}
+
+/* Create a thread-private workspace of the averaging scheme. The tabulated wigner
+ * matrices and amplitudes are shared with the scheme, while the buffers w2, w4, and
+ * exp_Im_alpha, which are updated during the frequency calculation, and their single
+ * precision copies are private. With more than one thread over the orientations, the
+ * exp_Im_alpha of the range of every thread is copied to `exp_Im_alpha_threads` before
+ * the wigner rotation, at the offset 4 x start of the range. */
+MRS_averaging_scheme *MRS_create_averaging_scheme_workspace(MRS_averaging_scheme *scheme,
+                                                            int n_threads) {
+  MRS_averaging_scheme *workspace = malloc(sizeof(MRS_averaging_scheme));
+  *workspace = *scheme;
+
+  workspace->n_threads = (n_threads > 1) ? n_threads : 1;
+  workspace->exp_Im_alpha_threads = NULL;
+  if (workspace->n_threads > 1) {
+    workspace->exp_Im_alpha_threads = malloc_complex128(4 * scheme->octant_orientations);
+  }
+
+  workspace->exp_Im_alpha = malloc_complex128(4 * scheme->octant_orientations);
+  cblas_zcopy(4 * scheme->octant_orientations, (double *)scheme->exp_Im_alpha, 1,
+              (double *)workspace->exp_Im_alpha, 1);
+  workspace->w2 = malloc_complex128(5 * scheme->total_orientations);
+  workspace->w4 = NULL;
+  if (scheme->w4 != NULL) {
+    workspace->w4 = malloc_complex128(9 * scheme->total_orientations);
+  }
+  workspace->w2_single = NULL;
+  workspace->w4_single = NULL;
+  return workspace;
+}
+
+/* Free the private buffers of the averaging scheme workspace. */
+void MRS_free_averaging_scheme_workspace(MRS_averaging_scheme *workspace) {
+  free(workspace->exp_Im_alpha);
+  free(workspace->exp_Im_alpha_threads);
+  free(workspace->w2);
+  free(workspace->w4);
+  free(workspace->w2_single);
+  free(workspace->w4_single);
+  free(workspace);
 }
 
 /* Create a new orientation averaging scheme. */
@@ -146,23 +199,35 @@ MRS_averaging_scheme *MRS_create_averaging_scheme(unsigned int integration_densi
   return scheme;
 }
 
-/* Create a new orientation averaging scheme. */
+/* Create a new orientation averaging scheme from a set of orientations. */
 MRS_averaging_scheme *MRS_create_averaging_scheme_from_alpha_beta(
     double *alpha, double *beta, double *weight, unsigned int n_angles,
     bool allow_fourth_rank) {
   MRS_averaging_scheme *scheme = malloc(sizeof(MRS_averaging_scheme));
+  unsigned int i;
+  double total = 0.0;
 
+  // A set of orientations has no triangulation, see `integration_density`.
+  scheme->integration_density = 0;
   scheme->octant_orientations = n_angles;
   scheme->integration_volume = 0;
   scheme->total_orientations = n_angles;
+  scheme->allow_fourth_rank = allow_fourth_rank;
 
   scheme->exp_Im_alpha = malloc_complex128(4 * scheme->total_orientations);
   complex128 *exp_I_beta = malloc_complex128(scheme->total_orientations);
-  scheme->amplitudes = weight;
+
+  /* Normalize the weights to the total amplitude of the octahedron interpolation over
+   * the sphere, 3π. ................................................................ */
+  scheme->amplitudes = malloc_double(n_angles);
+  for (i = 0; i < n_angles; i++) {
+    total += weight[i];
+  }
+  cblas_dcopy(n_angles, weight, 1, scheme->amplitudes, 1);
+  cblas_dscal(n_angles, 3.0 * M_PI / total, scheme->amplitudes, 1);
 
   /* Calculate cos(α) + isin(α) from α. ............................................. */
-  vm_cosine_I_sine(n_angles, alpha,
-                   scheme->exp_Im_alpha[3 * scheme->octant_orientations]);
+  vm_cosine_I_sine(n_angles, alpha, &scheme->exp_Im_alpha[3 * n_angles]);
 
   /* Calculate cos(β) + isin(β) from β. ............................................. */
   vm_cosine_I_sine(n_angles, beta, exp_I_beta);
@@ -175,7 +240,8 @@ MRS_averaging_scheme *MRS_create_averaging_scheme_from_alpha_beta(
 /* fftw routine setup ............................................................... */
 /* .................................................................................. */
 MRS_fftw_scheme *create_fftw_scheme(unsigned int total_orientations,
-                                    unsigned int number_of_sidebands) {
+                                    unsigned int number_of_sidebands,
+                                    unsigned int planner_flag) {
   unsigned int size = total_orientations * number_of_sidebands;
   int nssb = (int)number_of_sidebands;
   MRS_fftw_scheme *fftw_scheme = malloc(sizeof(MRS_fftw_scheme));
@@ -190,18 +256,75 @@ MRS_fftw_scheme *create_fftw_scheme(unsigned int total_orientations,
   // }
   // fftw_plan_with_nthreads(2);
 
+  // The FFTW_MEASURE and FFTW_PATIENT planners overwrite `vector` while planning.
+  // The fftw planner is not thread-safe, see MRS_create_fftw_scheme_workspace.
+#pragma omp critical(mrs_fftw_planner)
   fftw_scheme->the_fftw_plan = fftw_plan_many_dft(
       1, &nssb, total_orientations, fftw_scheme->vector, NULL, total_orientations, 1,
-      fftw_scheme->vector, NULL, total_orientations, 1, FFTW_FORWARD, FFTW_ESTIMATE);
-
-  // char *filename = "128_sidebands.wisdom";
-  // int status = fftw_export_wisdom_to_filename(filename);
-  // printf("file save status %i \n", status);
+      fftw_scheme->vector, NULL, total_orientations, 1, FFTW_FORWARD, planner_flag);
   /* ----------------------------------------------------------------------- */
+  fftw_scheme->n_threads = 1;
+  fftw_scheme->thread_plans = NULL;
+  fftw_scheme->phase_single = NULL;
   return fftw_scheme;
 }
 
 void MRS_free_fftw_scheme(MRS_fftw_scheme *fftw_scheme) {
+#pragma omp critical(mrs_fftw_planner)
   fftw_destroy_plan(fftw_scheme->the_fftw_plan);
   fftw_free(fftw_scheme->vector);
+  free(fftw_scheme);
+}
+
+/* Create a thread-private workspace of the fftw scheme. The workspace shares the fftw
+ * plan with the fftw scheme and holds a private `vector` of the given size. With more
+ * than one thread over the orientations, the workspace also holds a plan per thread,
+ * which transforms the range of the orientations of the thread within the `vector`.
+ * The plans of the ranges are executed at an offset of the planned `vector`, and are
+ * planned without the alignment of the `vector`. The fftw planner is not thread-safe,
+ * and the planning is a critical section with the planning of create_fftw_scheme. */
+MRS_fftw_scheme *MRS_create_fftw_scheme_workspace(MRS_fftw_scheme *fftw_scheme,
+                                                  unsigned int total_orientations,
+                                                  unsigned int number_of_sidebands,
+                                                  int n_threads) {
+  MRS_fftw_scheme *workspace = malloc(sizeof(MRS_fftw_scheme));
+  unsigned int start, count;
+  int thread, nssb = (int)number_of_sidebands;
+
+  workspace->vector = (fftw_complex *)fftw_malloc(sizeof(fftw_complex) *
+                                                  total_orientations * nssb);
+  workspace->the_fftw_plan = fftw_scheme->the_fftw_plan;
+  workspace->n_threads = (n_threads > 1) ? n_threads : 1;
+  workspace->thread_plans = NULL;
+  workspace->phase_single = NULL;
+  if (workspace->n_threads == 1) {
+    return workspace;
+  }
+
+  workspace->thread_plans = malloc(n_threads * sizeof(fftw_plan));
+#pragma omp critical(mrs_fftw_planner)
+  for (thread = 0; thread < n_threads; thread++) {
+    MRS_thread_range(total_orientations, n_threads, thread, &start, &count);
+    workspace->thread_plans[thread] = fftw_plan_many_dft(
+        1, &nssb, count, &workspace->vector[start], NULL, total_orientations, 1,
+        &workspace->vector[start], NULL, total_orientations, 1, FFTW_FORWARD,
+        FFTW_ESTIMATE | FFTW_UNALIGNED);
+  }
+  return workspace;
+}
+
+/* Free the private buffer of the fftw scheme workspace. The shared plan is not
+ * destroyed. */
+void MRS_free_fftw_scheme_workspace(MRS_fftw_scheme *workspace) {
+  int thread;
+  if (workspace->thread_plans != NULL) {
+#pragma omp critical(mrs_fftw_planner)
+    for (thread = 0; thread < workspace->n_threads; thread++) {
+      fftw_destroy_plan(workspace->thread_plans[thread]);
+    }
+    free(workspace->thread_plans);
+  }
+  free(workspace->phase_single);
+  fftw_free(workspace->vector);
+  free(workspace);
 }
@@ -9,6 +9,8 @@
 
 #include "simulation.h"
 
+#include <assert.h>
+
 /**
  * Each event consists of the following freq contrib ordered as
  * 1. Shielding 1st order 0th rank
@@ -25,22 +27,241 @@
  */
 int FREQ_CONTRIB_INCREMENT = 6;
 
+/* The least number of sideband amplitudes, number_of_sidebands x total_orientations,
+ * per thread, when the orientations of a spin system are split between the threads,
+ * see orientation_threads. Below, the cost of the parallel regions of the threads
+ * outweighs the work of a thread. */
+#define ORIENTATION_THREAD_WORK 8192
+
 static inline void __zero_components(double *R0, complex128 *R2, complex128 *R4) {
   R0[0] = 0.0;
   vm_double_zeros(10, (double *)R2);
   vm_double_zeros(18, (double *)R4);
 }
 
+/* Interpolate the frequencies from an octant of orientations onto the 1D spectrum,
+ * either over the triangles of the octahedron, or by binning every orientation when
+ * the averaging scheme is a set of orientations without triangulation. */
+static inline void orientations_interpolation(MRS_averaging_scheme *scheme,
+                                              double *spec, double *freq, double *amp,
+                                              int stride, int m) {
+  if (scheme->integration_density == 0) {
+    point_set_interpolation(spec, freq, scheme->octant_orientations, amp, stride, m);
+    return;
+  }
+  octahedronInterpolation(spec, freq, scheme->integration_density, amp, stride, m);
+}
+
+/* Same as `orientations_interpolation` onto the 2D spectrum. */
+static inline void orientations_interpolation2D(MRS_averaging_scheme *scheme,
+                                                double *spec, double *freq1,
+                                                double *freq2, double *amp, int stride,
+                                                int m0, int m1) {
+  if (scheme->integration_density == 0) {
+    point_set_interpolation2D(spec, freq1, freq2, scheme->octant_orientations, amp,
+                              stride, m0, m1);
+    return;
+  }
+  octahedronInterpolation2D(spec, freq1, freq2, scheme->integration_density, amp,
+                            stride, m0, m1);
+}
+
+/* Return the sum of the absolute amplitudes of every sideband order, over `size`
+ * orientations at `amp[i * size * stride]`, and set `cutoff` to `threshold` times the
+ * total over all orders. The total is added to `intensity[1]`. Return NULL when the
+ * sideband orders are not pruned. */
+static inline double *sideband_order_sums(unsigned int number_of_sidebands,
+                                          unsigned int size, double *amp, int stride,
+                                          double threshold, double *cutoff,
+                                          double *intensity, MRS_arena *arena) {
+  unsigned int i;
+  double total = 0.0;
+  double *sums;
+
+  if (threshold <= 0.0 || number_of_sidebands == 1) {
+    return NULL;
+  }
+  sums = arena_double(arena, number_of_sidebands);
+  for (i = 0; i < number_of_sidebands; i++) {
+    sums[i] = cblas_dasum(size, &amp[i * size * stride], stride);
+    total += sums[i];
+  }
+  *cutoff = threshold * total;
+  intensity[1] += total;
+  return sums;
+}
+
+/* Return the sum of the absolute products of the amplitudes of every pair of sideband
+ * orders (i, k) from the two dimensions, of `nA` and `nB` sideband orders, over `size`
+ * orientations, at the index i * nB + k, and set `cutoff` to `threshold` times the
+ * total over all pairs. The sums are the product of the matrices of the absolute
+ * amplitudes, `ampA` and `ampB`, with a row per sideband order. The total is added to
+ * `intensity[1]`. Return NULL when the pairs of sideband orders are not pruned. */
+static inline double *sideband_pair_sums(unsigned int nA, unsigned int nB,
+                                         unsigned int size, double *ampA, double *ampB,
+                                         double threshold, double *cutoff,
+                                         double *intensity, MRS_arena *arena) {
+  unsigned int i, n_pairs = nA * nB;
+  size_t sizeA = (size_t)nA * size, sizeB = (size_t)nB * size;
+  double total = 0.0;
+  double *absA, *absB, *sums;
+
+  if (threshold <= 0.0 || n_pairs == 1) {
+    return NULL;
+  }
+  absA = arena_double(arena, sizeA);
+  absB = arena_double(arena, sizeB);
+  for (i = 0; i < sizeA; i++) {
+    absA[i] = fabs(ampA[i]);
+  }
+  for (i = 0; i < sizeB; i++) {
+    absB[i] = fabs(ampB[i]);
+  }
+  sums = arena_double(arena, n_pairs);
+  cblas_dgemm(CblasRowMajor, CblasNoTrans, CblasTrans, nA, nB, size, 1.0, absA, size,
+              absB, size, 0.0, sums, nB);
+
+  for (i = 0; i < n_pairs; i++) {
+    total += sums[i];
+  }
+  *cutoff = threshold * total;
+  intensity[1] += total;
+  return sums;
+}
+
+/* Return true when the sideband order, or pair of orders, at `index` is skipped, that
+ * is, the sum at `index` is below the cutoff. The sum of a skipped order is added to
+ * `intensity[0]`. */
+static inline bool skip_sideband_order(double *sums, double cutoff, unsigned int index,
+                                       double *intensity) {
+  if (sums == NULL || sums[index] >= cutoff) {
+    return false;
+  }
+  intensity[0] += sums[index];
+  return true;
+}
+
+/* Evaluate the minimum and maximum of the `n` frequencies, as `bounds[0]` and
+ * `bounds[1]`. */
+static inline void frequency_bounds(unsigned int n, double *freq, double *bounds) {
+  unsigned int i;
+  bounds[0] = freq[0];
+  bounds[1] = freq[0];
+  for (i = 1; i < n; i++) {
+    bounds[0] = (freq[i] < bounds[0]) ? freq[i] : bounds[0];
+    bounds[1] = (freq[i] > bounds[1]) ? freq[i] : bounds[1];
+  }
+}
+
+/* Return true when the frequencies within `bounds`, shifted by `offset`, lie outside
+ * the `count` points of the dimension, where no triangle is binned. */
+static inline bool outside_dimension(double *bounds, double offset, int count) {
+  return bounds[1] + offset < -1.0 || bounds[0] + offset > (double)count + 1.0;
+}
+
+/* Return the private spectra of the threads over the orientations, of `size` points
+ * per thread, except the first thread, which adds to the spectrum of the call. The
+ * spectra are zeroed. Return NULL for a single thread. */
+static inline double *thread_spectra(int n_threads, size_t size, MRS_arena *arena) {
+  double *spectra;
+  if (n_threads == 1) {
+    return NULL;
+  }
+  spectra = arena_double(arena, (n_threads - 1) * size);
+  vm_double_zeros((n_threads - 1) * size, spectra);
+  return spectra;
+}
+
+/* Add the private spectra of the threads, see thread_spectra, to `spec` in the order
+ * of the threads, so that the spectrum is reproducible for a given n_threads. */
+static inline void reduce_thread_spectra(int n_threads, size_t size, double *spectra,
+                                         double *spec) {
+  int thread;
+  for (thread = 1; thread < n_threads; thread++) {
+    cblas_daxpy(size, 1.0, &spectra[(thread - 1) * size], 1, spec, 1);
+  }
+}
+
+/* Interpolate the sideband orders onto the 1D spectrum, where the amplitudes of the
+ * i-th order over the orientations are at `amp[stride * i * total_orientations]`, and
+ * the order is shifted by `offset0` plus the sideband frequency. The orders outside the
+ * spectrum, or skipped, see skip_sideband_order, are not interpolated. The octants of
+ * the orders are split between `n_threads` threads, see thread_spectra. */
+static inline void sideband_orders_interpolation(MRS_averaging_scheme *scheme,
+                                                 MRS_plan *plan, MRS_dimension *dim,
+                                                 double *spec, double *amp, int stride,
+                                                 double offset0, double *sums,
+                                                 double cutoff, int n_threads,
+                                                 MRS_arena *arena) {
+  unsigned int i, n_orders = 0, n_items, octant = scheme->octant_orientations;
+  unsigned int *orders;
+  double *offsets, *freq_offsets = NULL, *spectra, offset;
+  int thread;
+
+  orders = MRS_arena_malloc(arena, plan->number_of_sidebands * sizeof(unsigned int));
+  offsets = arena_double(arena, plan->number_of_sidebands);
+  for (i = 0; i < plan->number_of_sidebands; i++) {
+    offset = plan->vr_freq[i] * dim->inverse_increment + offset0;
+    if ((int)offset >= 0 && (int)offset <= dim->count) {
+      if (skip_sideband_order(sums, cutoff, i, dim->sideband_intensity)) {
+        continue;
+      }
+      orders[n_orders] = i;
+      offsets[n_orders++] = offset;
+    }
+  }
+
+  n_items = n_orders * plan->n_octants;
+  if (n_threads > (int)n_items) {
+    n_threads = (n_items > 0) ? n_items : 1;
+  }
+  // The first thread uses the frequency buffer of the dimension.
+  if (n_threads > 1) {
+    freq_offsets = arena_double(arena, (size_t)(n_threads - 1) * octant);
+  }
+  spectra = thread_spectra(n_threads, dim->count, arena);
+
+#pragma omp parallel for num_threads(n_threads) schedule(static, 1) if (n_threads > 1)
+  for (thread = 0; thread < n_threads; thread++) {
+    unsigned int start, count, item, k, address;
+    double *freq = dim->freq_offset, *spec_t = spec;
+
+    if (thread > 0) {
+      freq = &freq_offsets[(thread - 1) * octant];
+      spec_t = &spectra[(size_t)(thread - 1) * dim->count];
+    }
+
+    MRS_thread_range(n_items, n_threads, thread, &start, &count);
+    for (item = start; item < start + count; item++) {
+      k = item / plan->n_octants;
+      address = (item % plan->n_octants) * octant;
+
+      // Add offset(isotropic + sideband_order) to the local frequency
+      // from [n to n+octant_orientation]
+      vm_double_add_offset(octant, &dim->local_frequency[address], offsets[k], freq);
+      // Perform tenting on every sideband order over all orientations.
+      orientations_interpolation(
+          scheme, spec_t, freq,
+          &amp[(size_t)stride * (orders[k] * scheme->total_orientations + address)],
+          stride, dim->count);
+    }
+  }
+  reduce_thread_spectra(n_threads, dim->count, spectra, spec);
+}
+
 static inline void one_dimensional_averaging(MRS_dimension *dimensions,
                                              MRS_averaging_scheme *scheme,
                                              MRS_fftw_scheme *fftw_scheme, double *spec,
-                                             unsigned int number_of_sidebands) {
-  unsigned int i, j, evt, step_vector = 0, address;
-  MRS_plan *plan;
+                                             unsigned int number_of_sidebands,
+                                             MRS_arena *arena) {
+  unsigned int j, evt;
+  MRS_plan *plan = NULL;
   MRS_event *event;
   int size = scheme->total_orientations * number_of_sidebands;
-  double *freq_amp = malloc_double(size);
-  double offset, offset1;
+  int n_threads = fftw_scheme->n_threads;
+  double *freq_amp = arena_double(arena, size);
+  double offset, cutoff = 0.0;
+  double *sums;
 
   vm_double_ones(size, freq_amp);
 
@@ -53,53 +274,52 @@ static inline void one_dimensional_averaging(MRS_dimension *dimensions,
     // offset += plan->R0_offset;
     vm_double_multiply_inplace(size, event->freq_amplitude, 1, freq_amp, 1);
   }
+  // a dimension has at least one event.
+  assert(plan != NULL);
 
+#pragma omp parallel for num_threads(n_threads) if (n_threads > 1)
   for (j = 0; j < scheme->octant_orientations; j++) {
     cblas_dscal(plan->n_octants * number_of_sidebands, plan->norm_amplitudes[j],
                 &freq_amp[j], scheme->octant_orientations);
   }
+  sums = sideband_order_sums(number_of_sidebands, scheme->total_orientations, freq_amp,
+                             1, dimensions[0].sideband_threshold, &cutoff,
+                             dimensions[0].sideband_intensity, arena);
 
-  for (i = 0; i < number_of_sidebands; i++) {
-    offset1 = offset + plan->vr_freq[i] * dimensions[0].inverse_increment;
-    if ((int)offset1 >= 0 && (int)offset1 <= dimensions[0].count) {
-      step_vector = i * scheme->total_orientations;
-      for (j = 0; j < plan->n_octants; j++) {
-        address = j * scheme->octant_orientations;
-        // Add offset(isotropic + sideband_order) to the local frequency
-        // from [n to n+octant_orientation]
-        vm_double_add_offset(scheme->octant_orientations,
-                             &dimensions[0].local_frequency[address], offset1,
-                             dimensions[0].freq_offset);
-        // Perform tenting on every sideband order over all orientations
-        octahedronInterpolation(spec, dimensions[0].freq_offset,
-                                scheme->integration_density, &freq_amp[step_vector], 1,
-                                dimensions[0].count);
-        step_vector += scheme->octant_orientations;
-      }
-    }
-  }
-  free(freq_amp);
+  sideband_orders_interpolation(scheme, plan, &dimensions[0], spec, freq_amp, 1, offset,
+                                sums, cutoff, n_threads, arena);
 }
 
+/* The two dimensions have the sidebands of their events, nA and nB, where a dimension
+ * of static events has a single sideband. The pairs of sideband orders are normalized
+ * by nA x nB, which is the square of the number of sidebands when both dimensions
+ * spin. */
 static inline void two_dimensional_averaging(MRS_dimension *dimensions,
                                              MRS_averaging_scheme *scheme,
                                              MRS_fftw_scheme *fftw_scheme, double *spec,
-                                             unsigned int number_of_sidebands,
-                                             double *affine_matrix) {
-  unsigned int i, k, j, evt;
-  unsigned int step_vector_i = 0, step_vector_k = 0, address;
-  MRS_plan *planA, *planB;
+                                             double *affine_matrix, MRS_arena *arena) {
+  unsigned int i, k, j, evt, n_pairs, n_items, *pairs, nA, nB;
+  unsigned int octant = scheme->octant_orientations;
+  MRS_plan *planA = NULL, *planB = NULL;
   MRS_event *event;
-  int size = scheme->total_orientations * number_of_sidebands;
-  double *freq_ampA = malloc_double(size);
-  double *freq_ampB = malloc_double(size);
-  double *freq_amp = malloc_double(scheme->total_orientations);
+  int sizeA, sizeB;
+  int thread, n_threads = fftw_scheme->n_threads;
+  size_t spectrum_size;
+  double *freq_ampA, *freq_ampB;
+  double *freq_amp = arena_double(arena, scheme->octant_orientations);
   double offset0, offset1, offsetA, offsetB;
-  double *dim0, *dim1;
-  double norm0, norm1;
+  double *dim0, *dim1, *norms, *buffers = NULL, *spectra;
+  double norm0, norm1, bounds0[2], bounds1[2], cutoff = 0.0, ratio;
+  double *sums;
 
-  vm_double_ones(size, freq_ampA);
-  vm_double_ones(size, freq_ampB);
+  nA = dimensions[0].events[0].plan->number_of_sidebands;
+  nB = dimensions[1].events[0].plan->number_of_sidebands;
+  sizeA = scheme->total_orientations * nA;
+  sizeB = scheme->total_orientations * nB;
+  freq_ampA = arena_double(arena, sizeA);
+  freq_ampB = arena_double(arena, sizeB);
+  vm_double_ones(sizeA, freq_ampA);
+  vm_double_ones(sizeB, freq_ampB);
 
   dim0 = dimensions[0].local_frequency;
   dim1 = dimensions[1].local_frequency;
@@ -134,7 +354,7 @@ static inline void two_dimensional_averaging(MRS_dimension *dimensions,
     event = &dimensions[0].events[evt];
     planA = event->plan;
     // offset0 += plan->R0_offset;
-    vm_double_multiply_inplace(size, event->freq_amplitude, 1, freq_ampA, 1);
+    vm_double_multiply_inplace(sizeA, event->freq_amplitude, 1, freq_ampA, 1);
   }
 
   offset1 = dimensions[1].R0_offset;
@@ -142,17 +362,33 @@ static inline void two_dimensional_averaging(MRS_dimension *dimensions,
     event = &dimensions[1].events[evt];
     planB = event->plan;
     // offset1 += plan->R0_offset;
-    vm_double_multiply_inplace(size, event->freq_amplitude, 1, freq_ampB, 1);
+    vm_double_multiply_inplace(sizeB, event->freq_amplitude, 1, freq_ampB, 1);
   }
+  // every dimension has at least one event.
+  assert(planA != NULL && planB != NULL);
 
+  // The norm_amplitudes of planA are normalized by nA x nA.
+  ratio = (double)nA / (double)nB;
+#pragma omp parallel for num_threads(n_threads) if (n_threads > 1)
   for (j = 0; j < scheme->octant_orientations; j++) {
-    cblas_dscal(planA->n_octants * number_of_sidebands, planA->norm_amplitudes[j],
-                &freq_ampB[j], scheme->octant_orientations);
+    cblas_dscal(planA->n_octants * nB, planA->norm_amplitudes[j] * ratio, &freq_ampB[j],
+                scheme->octant_orientations);
   }
+  sums = sideband_pair_sums(nA, nB, scheme->total_orientations, freq_ampA, freq_ampB,
+                            dimensions[0].sideband_threshold, &cutoff,
+                            dimensions[0].sideband_intensity, arena);
 
-  for (i = 0; i < number_of_sidebands; i++) {
+  // The bounds of the sheared local frequencies. The frequencies of a pair of sideband
+  // orders are the local frequencies shifted by the offsets of the orders.
+  frequency_bounds(scheme->total_orientations, dim0, bounds0);
+  frequency_bounds(scheme->total_orientations, dim1, bounds1);
+
+  n_pairs = 0;
+  pairs = MRS_arena_malloc(arena, (size_t)nA * nB * 2 * sizeof(unsigned int));
+  norms = arena_double(arena, (size_t)nA * nB * 2);
+  for (i = 0; i < nA; i++) {
     offsetA = offset0 + planA->vr_freq[i] * dimensions[0].inverse_increment;
-    for (k = 0; k < number_of_sidebands; k++) {
+    for (k = 0; k < nB; k++) {
       offsetB = offset1 + planB->vr_freq[k] * dimensions[1].inverse_increment;
 
       norm0 = offsetA;
@@ -168,42 +404,100 @@ static inline void two_dimensional_averaging(MRS_dimension *dimensions,
       norm0 += dimensions[0].normalize_offset;
       norm1 += dimensions[1].normalize_offset;
 
+      if (outside_dimension(bounds0, norm0, dimensions[0].count) ||
+          outside_dimension(bounds1, norm1, dimensions[1].count)) {
+        continue;
+      }
+
       if ((int)norm0 >= 0 && (int)norm0 <= dimensions[0].count) {
-        step_vector_i = i * scheme->total_orientations;
         // for (k = 0; k < number_of_sidebands; k++) {
         //   offsetB =
         //       offset1 + plan->vr_freq[k] * dimensions[1].inverse_increment;
         //   norm1 = offsetB + dimensions[1].normalize_offset;
         if ((int)norm1 >= 0 && (int)norm1 <= dimensions[1].count) {
-          step_vector_k = k * scheme->total_orientations;
-
-          // step_vector = 0;
-          for (j = 0; j < planA->n_octants; j++) {
-            address = j * scheme->octant_orientations;
-            // Add offset(isotropic + sideband_order) to the local frequency
-            // from [n to n+octant_orientation]
-            vm_double_add_offset(scheme->octant_orientations, &dim0[address], norm0,
-                                 dimensions[0].freq_offset);
-            vm_double_add_offset(scheme->octant_orientations, &dim1[address], norm1,
-                                 dimensions[1].freq_offset);
-
-            vm_double_multiply(scheme->total_orientations,
-                               &freq_ampA[step_vector_i + address],
-                               &freq_ampB[step_vector_k + address], freq_amp);
-            // Perform tenting on every sideband order over all orientations
-            octahedronInterpolation2D(spec, dimensions[0].freq_offset,
-                                      dimensions[1].freq_offset,
-                                      scheme->integration_density, freq_amp, 1,
-                                      dimensions[0].count, dimensions[1].count);
-            // step_vector += scheme->octant_orientations;
+          if (skip_sideband_order(sums, cutoff, i * nB + k,
+                                  dimensions[0].sideband_intensity)) {
+            continue;
           }
+          pairs[2 * n_pairs] = i;
+          pairs[2 * n_pairs + 1] = k;
+          norms[2 * n_pairs] = norm0;
+          norms[2 * n_pairs + 1] = norm1;
+          n_pairs++;
         }
       }
     }
   }
-  free(freq_amp);
-  free(freq_ampA);
-  free(freq_ampB);
+
+  /* Interpolate the pairs of sideband orders. The octants of the pairs are split
+   * between the threads over the orientations, see thread_spectra, where the first
+   * thread uses the buffers of the dimensions. */
+  n_items = n_pairs * planA->n_octants;
+  if (n_threads > (int)n_items) {
+    n_threads = (n_items > 0) ? n_items : 1;
+  }
+  if (n_threads > 1) {
+    buffers = arena_double(arena, (size_t)(n_threads - 1) * 3 * octant);
+  }
+  spectrum_size = (size_t)dimensions[0].count * dimensions[1].count;
+  spectra = thread_spectra(n_threads, spectrum_size, arena);
+
+#pragma omp parallel for num_threads(n_threads) schedule(static, 1) if (n_threads > 1)
+  for (thread = 0; thread < n_threads; thread++) {
+    unsigned int start, count, item, pair, address;
+    double *freq0 = dimensions[0].freq_offset, *freq1 = dimensions[1].freq_offset;
+    double *amp = freq_amp, *spec_t = spec;
+
+    if (thread > 0) {
+      freq0 = &buffers[(size_t)(thread - 1) * 3 * octant];
+      freq1 = freq0 + octant;
+      amp = freq1 + octant;
+      spec_t = &spectra[(thread - 1) * spectrum_size];
+    }
+
+    MRS_thread_range(n_items, n_threads, thread, &start, &count);
+    for (item = start; item < start + count; item++) {
+      pair = item / planA->n_octants;
+      address = (item % planA->n_octants) * octant;
+
+      // Add offset(isotropic + sideband_order) to the local frequency
+      // from [n to n+octant_orientation]
+      vm_double_add_offset(octant, &dim0[address], norms[2 * pair], freq0);
+      vm_double_add_offset(octant, &dim1[address], norms[2 * pair + 1], freq1);
+
+      vm_double_multiply(
+          octant, &freq_ampA[pairs[2 * pair] * scheme->total_orientations + address],
+          &freq_ampB[pairs[2 * pair + 1] * scheme->total_orientations + address], amp);
+      // Perform tenting on every sideband order over all orientations
+      orientations_interpolation2D(scheme, spec_t, freq0, freq1, amp, 1,
+                                   dimensions[0].count, dimensions[1].count);
+    }
+  }
+  reduce_thread_spectra(n_threads, spectrum_size, spectra, spec);
+}
+
+/* Evaluate the sideband amplitudes from the Bessel functions, when the sideband phase
+ * is from the second-rank tensors only, that is, without the fourth-rank components,
+ * R4, and the engine, see MRS_set_sideband_engine, selects the Bessel functions. In
+ * the auto engine, the Bessel functions are selected when the estimated cost is lower
+ * than the cost of the Fourier transform. Returns true if the amplitudes are evaluated.
+ */
+static inline bool bessel_sideband_amplitudes(MRS_averaging_scheme *scheme,
+                                              MRS_plan *plan,
+                                              MRS_fftw_scheme *fftw_scheme,
+                                              complex128 *R4, MRS_arena *arena) {
+  int engine = MRS_get_sideband_engine(), i;
+
+  if (engine == MRS_SIDEBAND_ENGINE_FFT || plan->number_of_sidebands == 1) {
+    return false;
+  }
+  if (plan->allow_fourth_rank) {
+    for (i = 0; i < 18; i++) {
+      if (((double *)R4)[i] != 0.0) return false;
+    }
+  }
+  return MRS_get_bessel_amplitudes_from_plan(scheme, plan, fftw_scheme, arena,
+                                             engine == MRS_SIDEBAND_ENGINE_BESSEL);
 }
 
 // Calculate spectrum from the spin systems for a single transition.
@@ -239,37 +533,40 @@ void __mrsimulator_core(
      * events.
      */
     bool *freq_contrib,
-    double *affine_matrix // Affine transformation matrix.
+    double *affine_matrix,   // Affine transformation matrix.
+    MRS_tensor_basis *basis, // The tensor basis of the spin system, or NULL.
+    MRS_arena *arena         // The arena for the scratch buffers.
 ) {
   /*
   The sideband computation is based on the method described by Eden and Levitt
   et. al. `Computation of Orientational Averages in Solid-State NMR by Gaussian
   Spherical Quadrature` JMR, 132, 1998. https://doi.org/10.1006/jmre.1998.1427
   */
-  bool refresh;
+  bool refresh, use_basis = false;
   unsigned int evt;
   int dim;
   double B0_in_T, fraction;
 
-  // Allocate memory for zeroth, second, and fourth-rank tensor components.
+  // Release the scratch buffers from the previous call.
+  MRS_arena_reset(arena);
+
+  // Memory for zeroth, second, and fourth-rank tensor components.
   double R0 = 0.0;
-  complex128 *R2 = malloc_complex128(5);
-  complex128 *R4 = malloc_complex128(9);
+  complex128 *R2 = arena_complex128(arena, 5);
+  complex128 *R4 = arena_complex128(arena, 9);
 
-  // Allocate memory for zeroth, second, and fourth-rank temporary tensor components.
+  // Memory for zeroth, second, and fourth-rank temporary tensor components.
   double R0_temp = 0.0;
-  complex128 *R2_temp = malloc_complex128(5);
-  complex128 *R4_temp = malloc_complex128(9);
+  complex128 *R2_temp = arena_complex128(arena, 5);
+  complex128 *R4_temp = arena_complex128(arena, 9);
 
   double *spec_site_ptr;
   // `transition_increment` is the step size to the next transition within the pathway.
   int transition_increment = 2 * sites->number_of_sites;
 
-  MRS_plan *plan;
+  MRS_plan *plan = NULL;
   MRS_event *event;
 
-  openblas_set_num_threads(1);
-
   // spec_site = site * dimensions[0].count;
   spec_site_ptr = &spec[0];
 
@@ -283,49 +580,67 @@ void __mrsimulator_core(
       B0_in_T = event->magnetic_flux_density_in_T;
       fraction = event->fraction;
 
-      /* Initialize with zeroing all spatial components */
-      __zero_components(&R0, R2, R4);
-
-      /* Rotate all frequency components from PAS to a common frame */
-      MRS_rotate_components_from_PAS_to_common_frame(
-          sites,              // Pointer to a list of sites within a spin system.
-          couplings,          // Pointer to a list of couplings within a spin system.
-          transition_pathway, // Pointer to a list of transition.
-          plan->allow_fourth_rank, // If 1, prepare for 4th rank computation.
-          &R0,                     // The R0 components.
-          R2,                      // The R2 components.
-          R4,                      // The R4 components.
-          &R0_temp,                // The temporary R0 components.
-          R2_temp,                 // The temporary R2 components.
-          R4_temp,                 // The temporary R4 components.
-          B0_in_T,                 // Magnetic flux density in T.
-          freq_contrib             // The pointer to freq contribs boolean.
-      );
+      if (basis != NULL) {
+        /* The frequency components from the weights of the tensor basis. The rotated
+         * components are the same linear combination of the rotated tensors, when
+         * cheaper than the wigner rotation of the components. */
+        use_basis = MRS_tensor_basis_components(
+            basis, sites, couplings, transition_pathway, plan->allow_fourth_rank, &R0,
+            R2, R4, B0_in_T, freq_contrib);
+      } else {
+        /* Initialize with zeroing all spatial components */
+        __zero_components(&R0, R2, R4);
+
+        /* Rotate all frequency components from PAS to a common frame */
+        MRS_rotate_components_from_PAS_to_common_frame(
+            sites,              // Pointer to a list of sites within a spin system.
+            couplings,          // Pointer to a list of couplings within a spin system.
+            transition_pathway, // Pointer to a list of transition.
+            plan->allow_fourth_rank, // If 1, prepare for 4th rank computation.
+            &R0,                     // The R0 components.
+            R2,                      // The R2 components.
+            R4,                      // The R4 components.
+            &R0_temp,                // The temporary R0 components.
+            R2_temp,                 // The temporary R2 components.
+            R4_temp,                 // The temporary R4 components.
+            B0_in_T,                 // Magnetic flux density in T.
+            freq_contrib             // The pointer to freq contribs boolean.
+        );
+      }
 
       // The number 6 comes from the six types of pre-listed freq contributions.
       freq_contrib += FREQ_CONTRIB_INCREMENT;
 
       /* Get frequencies and amplitudes per octant .................................. */
       /* IMPORTANT: Always evalute the frequencies before the amplitudes. */
-      MRS_get_normalized_frequencies_from_plan(scheme, plan, R0, R2, R4, refresh,
-                                               &dimensions[dim], fraction);
-      MRS_get_amplitudes_from_plan(scheme, plan, fftw_scheme, 1);
-
-      /* Copy the amplitudes from the `fftw_scheme->vector` to the
-       * `event->freq_amplitude` for each event within the dimension.*/
-      if (plan->number_of_sidebands != 1) {
-        cblas_dcopy(plan->size, (double *)fftw_scheme->vector, 2, event->freq_amplitude,
-                    1);
+      if (use_basis) {
+        MRS_get_normalized_frequencies_from_basis(scheme, plan, basis, R0, refresh,
+                                                  &dimensions[dim], fraction);
+      } else {
+        MRS_get_normalized_frequencies_from_plan(scheme, plan, R0, R2, R4, refresh,
+                                                 &dimensions[dim], fraction);
+      }
+
+      /* The sideband amplitudes of a static event are one, and the `freq_amplitude` of
+       * the event keeps the ones from MRS_create_dimensions. */
+      if (!plan->is_static) {
+        if (!bessel_sideband_amplitudes(scheme, plan, fftw_scheme, R4, arena)) {
+          MRS_get_amplitudes_from_plan(scheme, plan, fftw_scheme, 1,
+                                       dimensions[dim].single_precision);
+        }
+
+        /* Copy the amplitudes from the `fftw_scheme->vector` to the
+         * `event->freq_amplitude` for each event within the dimension.*/
+        if (plan->number_of_sidebands != 1) {
+          cblas_dcopy(plan->size, (double *)fftw_scheme->vector, 2,
+                      event->freq_amplitude, 1);
+        }
       }
       transition_pathway += transition_increment;
       refresh = 0;
     } // end events
   }   // end dimensions
 
-  free(R2);
-  free(R4);
-  free(R2_temp);
-  free(R4_temp);
 
   /* ---------------------------------------------------------------------
    *              Calculating the tent for every sideband
@@ -346,9 +661,12 @@ void __mrsimulator_core(
    *   }
    * }
    */
-  unsigned int i, j, step_vector, address;
-  double offset, offset0;
+  unsigned int j;
+  int n_threads = fftw_scheme->n_threads;
+  double offset0, cutoff = 0.0;
+  double *sums;
   if (n_dimension == 1 && dimensions[0].n_events == 1) {
+    assert(plan != NULL);
     /**
      * If the number of sidebands is 1, the sideband amplitude at every
      * sideband order is one. In this case, update the `fftw_scheme->vector` is
@@ -365,6 +683,7 @@ void __mrsimulator_core(
        * Scale the absolute value square with the powder scheme weights. Only
        * the real part is scaled and the imaginary part is left as is.
        */
+#pragma omp parallel for num_threads(n_threads) if (n_threads > 1)
       for (j = 0; j < scheme->octant_orientations; j++) {
         cblas_dscal(plan->n_octants * plan->number_of_sidebands,
                     plan->norm_amplitudes[j], (double *)&fftw_scheme->vector[j],
@@ -373,45 +692,410 @@ void __mrsimulator_core(
     }
 
     offset0 = dimensions[0].normalize_offset + dimensions[0].R0_offset;
+    sums = sideband_order_sums(plan->number_of_sidebands, scheme->total_orientations,
+                               (double *)fftw_scheme->vector, 2,
+                               dimensions[0].sideband_threshold, &cutoff,
+                               dimensions[0].sideband_intensity, arena);
 
-    for (i = 0; i < plan->number_of_sidebands; i++) {
-      offset = plan->vr_freq[i] * dimensions[0].inverse_increment + offset0;
-      if ((int)offset >= 0 && (int)offset <= dimensions[0].count) {
-        step_vector = i * scheme->total_orientations;
-        for (j = 0; j < plan->n_octants; j++) {
-          address = j * scheme->octant_orientations;
-
-          // Add offset(isotropic + sideband_order) to the local frequency
-          // from [n to n+octant_orientation]
-          vm_double_add_offset(scheme->octant_orientations,
-                               &dimensions[0].local_frequency[address], offset,
-                               dimensions[0].freq_offset);
-          // Perform tenting on every sideband order over all orientations.
-          octahedronInterpolation(
-              spec_site_ptr, dimensions[0].freq_offset, scheme->integration_density,
-              (double *)&fftw_scheme->vector[step_vector], 2, dimensions[0].count);
-          step_vector += scheme->octant_orientations;
-        }
-      }
-    }
+    sideband_orders_interpolation(scheme, plan, &dimensions[0], spec_site_ptr,
+                                  (double *)fftw_scheme->vector, 2, offset0, sums,
+                                  cutoff, n_threads, arena);
     return;
   }
 
   if (interpolation) {
     if (n_dimension == 1) {
       one_dimensional_averaging(dimensions, scheme, fftw_scheme, spec,
-                                plan->number_of_sidebands);
+                                plan->number_of_sidebands, arena);
       return;
     }
 
     if (n_dimension == 2) {
-      two_dimensional_averaging(dimensions, scheme, fftw_scheme, spec,
-                                plan->number_of_sidebands, affine_matrix);
+      two_dimensional_averaging(dimensions, scheme, fftw_scheme, spec, affine_matrix,
+                                arena);
       return;
     }
   }
 }
 
+/* Set the site and coupling structures to the sites and couplings from the spin system
+ * at `index` within the packed spin systems. */
+static inline void get_spin_system_at(spin_systems_struct *spin_systems,
+                                      unsigned int index, site_struct *sites,
+                                      coupling_struct *couplings) {
+  int s0 = spin_systems->site_offsets[index];
+  int c0 = spin_systems->coupling_offsets[index];
+  site_struct *all_sites = spin_systems->sites;
+  coupling_struct *all_couplings = spin_systems->couplings;
+
+  sites->number_of_sites = spin_systems->site_offsets[index + 1] - s0;
+  sites->spin = &all_sites->spin[s0];
+  sites->gyromagnetic_ratio = &all_sites->gyromagnetic_ratio[s0];
+  sites->isotropic_chemical_shift_in_ppm =
+      &all_sites->isotropic_chemical_shift_in_ppm[s0];
+  sites->shielding_symmetric_zeta_in_ppm =
+      &all_sites->shielding_symmetric_zeta_in_ppm[s0];
+  sites->shielding_symmetric_eta = &all_sites->shielding_symmetric_eta[s0];
+  sites->shielding_orientation = &all_sites->shielding_orientation[3 * s0];
+  sites->quadrupolar_Cq_in_Hz = &all_sites->quadrupolar_Cq_in_Hz[s0];
+  sites->quadrupolar_eta = &all_sites->quadrupolar_eta[s0];
+  sites->quadrupolar_orientation = &all_sites->quadrupolar_orientation[3 * s0];
+
+  couplings->number_of_couplings = spin_systems->coupling_offsets[index + 1] - c0;
+  couplings->site_index = &all_couplings->site_index[2 * c0];
+  couplings->isotropic_j_in_Hz = &all_couplings->isotropic_j_in_Hz[c0];
+  couplings->j_symmetric_zeta_in_Hz = &all_couplings->j_symmetric_zeta_in_Hz[c0];
+  couplings->j_symmetric_eta = &all_couplings->j_symmetric_eta[c0];
+  couplings->j_orientation = &all_couplings->j_orientation[3 * c0];
+  couplings->dipolar_coupling_in_Hz = &all_couplings->dipolar_coupling_in_Hz[c0];
+  couplings->dipolar_eta = &all_couplings->dipolar_eta[c0];
+  couplings->dipolar_orientation = &all_couplings->dipolar_orientation[3 * c0];
+}
+
+/* Return the largest number of sidebands over the dimensions of the task, that is,
+ * the length of the transforms of the fftw scheme of the task. A dimension of static
+ * events has a single sideband, see MRS_create_dimensions. */
+static inline unsigned int task_number_of_sidebands(MRS_simulation_task *task) {
+  unsigned int n, number_of_sidebands = 1;
+  int dim;
+  for (dim = 0; dim < task->n_dimension; dim++) {
+    n = task->dimensions[dim].events[0].plan->number_of_sidebands;
+    number_of_sidebands = (n > number_of_sidebands) ? n : number_of_sidebands;
+  }
+  return number_of_sidebands;
+}
+
+// Calculate the spectra of the tasks from the spin systems at `index` within the packed
+// spin systems, where the spin systems are distributed between the threads as
+// index = thread, thread + n_threads, thread + 2 n_threads, ... The spectrum of the
+// i-th task is added to `spec[i]`, and the weighted sideband intensity to
+// `intensity[2 * i]` and `intensity[2 * i + 1]`. The orientations of every spin system
+// are split between `orientation_threads` threads, see orientation_threads.
+static inline void __mrsimulator_core_thread(MRS_simulation_task *tasks, int n_tasks,
+                                             double **spec, double *intensity,
+                                             int thread, int n_threads,
+                                             int orientation_threads) {
+  unsigned int index, n_sidebands, n_spin_systems;
+  int i, k, dim, pathway, n_events, pathway_increment;
+  site_struct sites;
+  coupling_struct couplings;
+  float *transition_pathway;
+  double *amp_i;
+  MRS_simulation_task *task;
+  spin_systems_struct *spin_systems;
+
+  /* Thread-private copies of the buffers that are updated during the simulation. The
+   * tasks with the same averaging scheme, or fftw scheme, share the workspace. */
+  MRS_averaging_scheme **scheme_t = malloc(n_tasks * sizeof(MRS_averaging_scheme *));
+  MRS_fftw_scheme **fftw_scheme_t = malloc(n_tasks * sizeof(MRS_fftw_scheme *));
+  MRS_dimension **dimensions_t = malloc(n_tasks * sizeof(MRS_dimension *));
+  MRS_tensor_basis **basis_t = malloc(n_tasks * sizeof(MRS_tensor_basis *));
+  MRS_tensor_basis *basis;
+  int *scheme_owner = malloc(4 * n_tasks * sizeof(int));
+  int *fftw_scheme_owner = &scheme_owner[n_tasks];
+  int *basis_owner = &scheme_owner[2 * n_tasks];
+  int *basis_uses = &scheme_owner[3 * n_tasks];
+  int *n_events_t = malloc(n_tasks * sizeof(int));
+
+  // buffer for the spectrum of a single spin system.
+  double **amp = malloc(n_tasks * sizeof(double *));
+
+  // The scratch buffers of `__mrsimulator_core`, shared between the tasks.
+  MRS_arena *arena = MRS_create_arena(0);
+
+  for (i = 0; i < n_tasks; i++) {
+    task = &tasks[i];
+    scheme_owner[i] = i;
+    fftw_scheme_owner[i] = i;
+    basis_owner[i] = i;
+    for (k = 0; k < i; k++) {
+      if (scheme_owner[i] == i && tasks[k].scheme == task->scheme) {
+        scheme_owner[i] = k;
+      }
+      if (fftw_scheme_owner[i] == i && tasks[k].fftw_scheme == task->fftw_scheme) {
+        fftw_scheme_owner[i] = k;
+      }
+      if (basis_owner[i] == i && tasks[k].scheme == task->scheme &&
+          tasks[k].spin_systems->sites == task->spin_systems->sites &&
+          tasks[k].spin_systems->couplings == task->spin_systems->couplings) {
+        basis_owner[i] = k;
+      }
+    }
+
+    n_sidebands = task_number_of_sidebands(task);
+    scheme_t[i] =
+        (scheme_owner[i] == i)
+            ? MRS_create_averaging_scheme_workspace(task->scheme, orientation_threads)
+            : scheme_t[scheme_owner[i]];
+    fftw_scheme_t[i] = (fftw_scheme_owner[i] == i)
+                           ? MRS_create_fftw_scheme_workspace(
+                                 task->fftw_scheme, task->scheme->total_orientations,
+                                 n_sidebands, orientation_threads)
+                           : fftw_scheme_t[fftw_scheme_owner[i]];
+    dimensions_t[i] = MRS_create_dimensions_workspace(task->dimensions,
+                                                      task->n_dimension, task->scheme);
+    /* The tensor basis holds the rotated tensors over the orientations of the scheme.
+     * The tasks with the same scheme and the same sites and couplings share the basis,
+     * where the Larmor frequency of every event enters through the weights of the
+     * tensors, see MRS_tensor_basis_components. */
+    basis_t[i] = (basis_owner[i] == i) ? MRS_create_tensor_basis(task->scheme)
+                                       : basis_t[basis_owner[i]];
+
+    n_events_t[i] = 0;
+    for (dim = 0; dim < task->n_dimension; dim++) {
+      n_events_t[i] += task->dimensions[dim].n_events;
+    }
+    amp[i] = (task->decompose) ? NULL : malloc_double(task->spectrum_size);
+  }
+
+  n_spin_systems = tasks[0].spin_systems->number_of_spin_systems;
+  for (index = thread; index < n_spin_systems; index += n_threads) {
+    /* The tensors of the spin system are rotated once per basis, and reused between
+     * the events, the transition pathways, and the tasks sharing the basis, see
+     * MRS_tensor_basis. The basis is skipped when the spin system has a single event
+     * and transition pathway over the tasks, where nothing is reused. */
+    for (i = 0; i < n_tasks; i++) {
+      basis_uses[i] = 0;
+    }
+    for (i = 0; i < n_tasks; i++) {
+      basis_uses[basis_owner[i]] +=
+          tasks[i].spin_systems->pathway_counts[index] * n_events_t[i];
+    }
+    for (i = 0; i < n_tasks; i++) {
+      if (basis_owner[i] == i && basis_uses[i] > 1) {
+        get_spin_system_at(tasks[i].spin_systems, index, &sites, &couplings);
+        MRS_tensor_basis_update(basis_t[i], &sites, &couplings);
+      }
+    }
+
+    for (i = 0; i < n_tasks; i++) {
+      task = &tasks[i];
+      spin_systems = task->spin_systems;
+      if (spin_systems->pathway_counts[index] == 0) {
+        continue;
+      }
+
+      get_spin_system_at(spin_systems, index, &sites, &couplings);
+
+      if (task->decompose) {
+        amp_i = &spec[i][(size_t)index * task->spectrum_size];
+      } else {
+        amp_i = amp[i];
+        vm_double_zeros(task->spectrum_size, amp_i);
+      }
+
+      // The step size to the next transition pathway.
+      n_events = n_events_t[i];
+      pathway_increment = 2 * sites.number_of_sites * n_events;
+      transition_pathway =
+          &spin_systems->transition_pathways[spin_systems->pathway_offsets[index]];
+
+      basis = (basis_uses[basis_owner[i]] > 1) ? basis_t[i] : NULL;
+
+      for (pathway = 0; pathway < spin_systems->pathway_counts[index]; pathway++) {
+        __mrsimulator_core(amp_i, &sites, &couplings, transition_pathway,
+                           task->n_dimension, dimensions_t[i], fftw_scheme_t[i],
+                           scheme_t[i], task->interpolation, task->freq_contrib,
+                           task->affine_matrix, basis, arena);
+        transition_pathway += pathway_increment;
+      }
+
+      for (k = 0; k < 2; k++) {
+        intensity[2 * i + k] += spin_systems->weights[index] *
+                                dimensions_t[i][0].sideband_intensity[k];
+        dimensions_t[i][0].sideband_intensity[k] = 0.0;
+      }
+
+      if (task->decompose) {
+        cblas_dscal(task->spectrum_size, spin_systems->weights[index], amp_i, 1);
+      } else {
+        cblas_daxpy(task->spectrum_size, spin_systems->weights[index], amp_i, 1,
+                    spec[i], 1);
+      }
+    }
+  }
+
+  for (i = 0; i < n_tasks; i++) {
+    if (amp[i] != NULL) {
+      free(amp[i]);
+    }
+    MRS_free_dimensions_workspace(dimensions_t[i], tasks[i].n_dimension);
+    if (fftw_scheme_owner[i] == i) {
+      MRS_free_fftw_scheme_workspace(fftw_scheme_t[i]);
+    }
+    if (basis_owner[i] == i) {
+      MRS_free_tensor_basis(basis_t[i]);
+    }
+    if (scheme_owner[i] == i) {
+      MRS_free_averaging_scheme_workspace(scheme_t[i]);
+    }
+  }
+  MRS_free_arena(arena);
+  free(amp);
+  free(n_events_t);
+  free(scheme_owner);
+  free(basis_t);
+  free(dimensions_t);
+  free(fftw_scheme_t);
+  free(scheme_t);
+}
+
+/* Return the number of threads over the orientations of a spin system. The threads are
+ * either distributed between the spin systems, or, when the spin systems are too few
+ * to keep the threads busy, over the orientations of every spin system in turn. The
+ * orientations are split when the fraction of the idle threads between the spin
+ * systems is above a half, and every thread holds at least ORIENTATION_THREAD_WORK
+ * sideband amplitudes, number_of_sidebands x total_orientations, of the largest task.
+ * Returns 1 for the threads over the spin systems. */
+static inline int orientation_threads(MRS_simulation_task *tasks, int n_tasks,
+                                      int n_threads) {
+  int i, n_spin_systems = tasks[0].spin_systems->number_of_spin_systems, rounds;
+  unsigned int octant, work, largest = 0, largest_octant = 0;
+
+  if (n_threads <= 1 || n_spin_systems < 1) {
+    return 1;
+  }
+  // The fraction of the thread time spent on the spin systems.
+  rounds = (n_spin_systems + n_threads - 1) / n_threads;
+  if (2 * n_spin_systems > rounds * n_threads) {
+    return 1;
+  }
+  for (i = 0; i < n_tasks; i++) {
+    octant = tasks[i].scheme->octant_orientations;
+    work = tasks[i].scheme->total_orientations * task_number_of_sidebands(&tasks[i]);
+    largest = (work > largest) ? work : largest;
+    largest_octant = (octant > largest_octant) ? octant : largest_octant;
+  }
+  if (largest / n_threads < ORIENTATION_THREAD_WORK) {
+    return 1;
+  }
+  // Every thread rotates at least one orientation of an octant.
+  return (n_threads < (int)largest_octant) ? n_threads : (int)largest_octant;
+}
+
+// Calculate the spectra of a list of tasks from the same batch of spin systems.
+void __mrsimulator_core_tasks(MRS_simulation_task *tasks, int n_tasks, int n_threads) {
+  int i, thread, n_orientation_threads;
+  size_t size = 0, offset;
+  double *accumulator = NULL, **spec, *intensity;
+
+  if (n_tasks < 1) {
+    return;
+  }
+
+#ifndef _OPENMP
+  n_threads = 1;
+#endif
+
+  // The threads run the BLAS routines on small arrays. Disable the BLAS threading.
+  openblas_set_num_threads(1);
+
+  // Select the wigner rotation kernel before the threads start.
+  MRS_get_simd_level();
+
+  n_orientation_threads = orientation_threads(tasks, n_tasks, n_threads);
+  if (n_orientation_threads > 1) {
+    intensity = malloc_double(2 * n_tasks);
+    vm_double_zeros(2 * n_tasks, intensity);
+    spec = malloc(n_tasks * sizeof(double *));
+    for (i = 0; i < n_tasks; i++) {
+      spec[i] = tasks[i].spec;
+    }
+    __mrsimulator_core_thread(tasks, n_tasks, spec, intensity, 0, 1,
+                              n_orientation_threads);
+    for (i = 0; i < n_tasks; i++) {
+      tasks[i].sideband_intensity[0] = intensity[2 * i];
+      tasks[i].sideband_intensity[1] = intensity[2 * i + 1];
+    }
+    free(intensity);
+    free(spec);
+    return;
+  }
+
+  if (n_threads > (int)tasks[0].spin_systems->number_of_spin_systems) {
+    n_threads = tasks[0].spin_systems->number_of_spin_systems;
+  }
+  if (n_threads < 1) {
+    n_threads = 1;
+  }
+
+  /* Per-thread spectrum accumulators. The first thread adds to the task `spec`
+   * directly, while the remaining threads add to the accumulators, which are reduced
+   * at the end in the order of the threads, so that the result is reproducible for a
+   * given n_threads. In decompose mode, every spin system updates a separate section
+   * of the task `spec`. */
+  for (i = 0; i < n_tasks; i++) {
+    if (!tasks[i].decompose) {
+      size += tasks[i].spectrum_size;
+    }
+  }
+  if (size != 0 && n_threads > 1) {
+    accumulator = malloc_double((size_t)(n_threads - 1) * size);
+    vm_double_zeros((n_threads - 1) * size, accumulator);
+  }
+
+  // The spectrum of the i-th task from the thread is spec[thread * n_tasks + i].
+  spec = malloc((size_t)n_threads * n_tasks * sizeof(double *));
+  for (thread = 0; thread < n_threads; thread++) {
+    offset = (size_t)(thread - 1) * size;
+    for (i = 0; i < n_tasks; i++) {
+      if (thread == 0 || tasks[i].decompose) {
+        spec[thread * n_tasks + i] = tasks[i].spec;
+      } else {
+        spec[thread * n_tasks + i] = &accumulator[offset];
+        offset += tasks[i].spectrum_size;
+      }
+    }
+  }
+
+  // The sideband intensity of the i-th task from the thread is at
+  // intensity[2 * (thread * n_tasks + i)].
+  intensity = malloc_double((size_t)2 * n_threads * n_tasks);
+  vm_double_zeros(2 * n_threads * n_tasks, intensity);
+
+#pragma omp parallel for num_threads(n_threads) schedule(static, 1)
+  for (thread = 0; thread < n_threads; thread++) {
+    __mrsimulator_core_thread(tasks, n_tasks, &spec[thread * n_tasks],
+                              &intensity[2 * thread * n_tasks], thread, n_threads, 1);
+  }
+
+  for (i = 0; i < n_tasks; i++) {
+    tasks[i].sideband_intensity[0] = 0.0;
+    tasks[i].sideband_intensity[1] = 0.0;
+    for (thread = 0; thread < n_threads; thread++) {
+      tasks[i].sideband_intensity[0] += intensity[2 * (thread * n_tasks + i)];
+      tasks[i].sideband_intensity[1] += intensity[2 * (thread * n_tasks + i) + 1];
+    }
+  }
+  free(intensity);
+
+  if (accumulator != NULL) {
+    for (thread = 1; thread < n_threads; thread++) {
+      for (i = 0; i < n_tasks; i++) {
+        if (!tasks[i].decompose) {
+          cblas_daxpy(tasks[i].spectrum_size, 1.0, spec[thread * n_tasks + i], 1,
+                      tasks[i].spec, 1);
+        }
+      }
+    }
+    free(accumulator);
+  }
+  free(spec);
+}
+
+// Calculate spectrum from a batch of spin systems.
+void __mrsimulator_core_batch(double *spec, unsigned int spectrum_size, bool decompose,
+                              spin_systems_struct *spin_systems, int n_dimension,
+                              MRS_dimension *dimensions, MRS_fftw_scheme *fftw_scheme,
+                              MRS_averaging_scheme *scheme, bool interpolation,
+                              bool *freq_contrib, double *affine_matrix,
+                              int n_threads) {
+  MRS_simulation_task task = {spec,          spectrum_size, decompose,    spin_systems,
+                              n_dimension,   dimensions,    fftw_scheme,  scheme,
+                              interpolation, freq_contrib,  affine_matrix};
+  __mrsimulator_core_tasks(&task, 1, n_threads);
+}
+
 void mrsimulator_core(
     // spectrum information and related amplitude
     double *spec,               // The amplitude of the spectrum.
@@ -449,10 +1133,8 @@ void mrsimulator_core(
     allow_fourth_rank = true;
   }
 
-  // check for spinning speed
+  // A static sample has a single sideband, see MRS_create_dimensions.
   if (sample_rotation_frequency_in_Hz < 1.0e-3) {
-    sample_rotation_frequency_in_Hz = 1.0e9;
-    rotor_angle_in_rad = 0.0;
     number_of_sidebands = 1;
   }
 
@@ -460,7 +1142,9 @@ void mrsimulator_core(
       integration_density, allow_fourth_rank, integration_volume);
 
   MRS_fftw_scheme *fftw_scheme =
-      create_fftw_scheme(scheme->total_orientations, number_of_sidebands);
+      create_fftw_scheme(scheme->total_orientations, number_of_sidebands,
+                         FFTW_ESTIMATE);
+  MRS_arena *arena = MRS_create_arena(0);
 
   // gettimeofday(&all_site_time, NULL);
   __mrsimulator_core(
@@ -472,7 +1156,7 @@ void mrsimulator_core(
       transition_pathway, // Pointer to a list of transition.
 
       n_dimension, dimensions, fftw_scheme, scheme, interpolation, freq_contrib,
-      affine_matrix);
+      affine_matrix, NULL, arena);
 
   // gettimeofday(&end, NULL);
   // clock_time = (double)(end.tv_usec - begin.tv_usec) / 1000000. +
@@ -481,6 +1165,7 @@ void mrsimulator_core(
   // cpu_time_[0] += clock_time;
 
   /* clean up */
+  MRS_free_arena(arena);
   MRS_free_fftw_scheme(fftw_scheme);
   MRS_free_averaging_scheme(scheme);
   // MRS_free_plan(plan);
@@ -39,6 +39,10 @@ cdef extern from "angular_momentum.h":
                              void *exp_Im_alpha,
                              void *w2, void *w4)
 
+    int MRS_simd_supported_level()
+    int MRS_set_simd_level(int level)
+    int MRS_get_simd_level()
+
 
 cdef extern from "powder_setup.h":
     void averaging_setup(
@@ -277,6 +277,14 @@ def __batch_wigner_rotation(unsigned int octant_orientations,
     return w2, w4
 
 
+def set_simd_level(int level):
+    return clib.MRS_set_simd_level(level)
+
+
+def simd_supported_level():
+    return clib.MRS_simd_supported_level()
+
+
 # @cython.boundscheck(False)
 # @cython.wraparound(False)
 # def _one_d_simulator(
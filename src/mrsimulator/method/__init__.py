@@ -14,6 +14,7 @@ from mrsimulator.spin_system.isotope import Isotope
 from mrsimulator.transition import Transition
 from mrsimulator.transition import TransitionPathway
 from mrsimulator.utils.parseable import Parseable
+from pydantic import PrivateAttr
 from pydantic import validator
 
 from .named_method_updates import named_methods
@@ -130,6 +131,9 @@ class Method(Parseable):
         "rotor_frequency": "Hz",
     }
 
+    # cache of the transition pathways, see `_get_transition_pathways_np()`.
+    _transition_pathways: dict = PrivateAttr(default_factory=dict)
+
     class Config:
         validate_assignment = True
         arbitrary_types_allowed = True
@@ -375,12 +379,34 @@ class Method(Parseable):
         return segments
 
     def _get_transition_pathways_np(self, spin_system):
-        segments = self._get_transition_pathways(spin_system)
-        segments_index = [np.arange(item.shape[0]) for item in segments]
-        cartesian_index = cartesian_product(*segments_index)
-        return [
-            [segments[i][j] for i, j in enumerate(item)] for item in cartesian_index
+        """Return the transition pathways from the spin system as a list of lists of
+        transitions. The pathways only depend on the isotopes of the sites within the
+        spin system and on the channels and transition queries of the method. The
+        pathways are cached per isotope signature and re-used across simulations."""
+        key = self._transition_pathway_key(spin_system)
+        if key not in self._transition_pathways:
+            segments = self._get_transition_pathways(spin_system)
+            segments_index = [np.arange(item.shape[0]) for item in segments]
+            cartesian_index = cartesian_product(*segments_index)
+            self._transition_pathways[key] = [
+                [segments[i][j] for i, j in enumerate(item)] for item in cartesian_index
+            ]
+        return self._transition_pathways[key]
+
+    def _transition_pathway_key(self, spin_system):
+        """Return a tuple of the isotope symbols and spins of the sites within the spin
+        system, and the channels and transition queries of the method."""
+        isotopes = [site.isotope for site in spin_system.sites]
+        queries = [
+            ent.transition_query.dict()
+            for dim in self.spectral_dimensions
+            for ent in dim.events
         ]
+        return (
+            tuple(item.symbol for item in isotopes),
+            tuple(item.spin for item in isotopes),
+            repr(([item.symbol for item in self.channels], queries)),
+        )
 
     def get_transition_pathways(self, spin_system) -> list:
         """
@@ -29,7 +29,9 @@ class Event(Parseable):
             during the event in units of T. The default value is ``9.4``.
         rotor_frequency: An `optional` float containing the sample spinning frequency
             :math:`\nu_r`, during the event in units of Hz.
-            The default value is ``0``.
+            The default value is ``0``, that is, a static sample, where the
+            frequencies are evaluated in the lab frame without sidebands. The static
+            and spinning events may be combined within a method.
         rotor_angle: An `optional` float containing the angle between the
             sample rotation axis and the applied external magnetic field,
             :math:`\theta`, during the event in units of rad.
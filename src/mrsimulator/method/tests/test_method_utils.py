@@ -8,3 +8,24 @@ def test_warnings():
     s = SpinSystem(sites=[Site(isotope="23Na")])
     m = Method1D(channels=["1H"])
     assert m.get_transition_pathways(s) == []
+
+
+def test_transition_pathway_cache():
+    m = Method1D(channels=["1H"])
+    sys_1 = SpinSystem(sites=[Site(isotope="1H"), Site(isotope="13C")])
+    sys_2 = SpinSystem(sites=[Site(isotope="1H", isotropic_chemical_shift=2)] * 2)
+    sys_3 = SpinSystem(sites=[Site(isotope="13C"), Site(isotope="1H")])
+
+    pathways = [m.get_transition_pathways(item) for item in [sys_1, sys_2, sys_3]]
+    assert len(m._transition_pathways) == 3
+    assert len(pathways[0]) == 2 and len(pathways[1]) == 4
+
+    # spin systems with the same isotopes re-use the cached pathways.
+    sys_4 = SpinSystem(sites=[Site(isotope="1H", isotropic_chemical_shift=-5)] * 2)
+    assert m.get_transition_pathways(sys_4) == pathways[1]
+    assert len(m._transition_pathways) == 3
+
+    # a change in the transition query is a cache miss.
+    m.spectral_dimensions[0].events[0].transition_query.P = {"channel-1": [[1]]}
+    assert m.get_transition_pathways(sys_1) != pathways[0]
+    assert len(m._transition_pathways) == 4
@@ -8,21 +8,30 @@ import csdmpy as cp
 import numpy as np
 import pandas as pd
 import psutil
-from joblib import delayed
-from joblib import Parallel
 from mrsimulator import __version__
 from mrsimulator import Site
 from mrsimulator import SpinSystem
-from mrsimulator.base_model import one_d_spectrum
+from mrsimulator.base_model import simulate_methods
 from mrsimulator.method import Method
 from mrsimulator.spin_system.isotope import Isotope
+from mrsimulator.spin_system.packing import PackedSpinSystems
+from mrsimulator.spin_system.packing import spin_systems_fingerprint
 from mrsimulator.utils import flatten_dict
 from mrsimulator.utils.abstract_list import AbstractList
 from mrsimulator.utils.extra import _reduce_dict
 from mrsimulator.utils.importer import import_json
+from mrsimulator.utils.parseable import Parseable
 from pydantic import BaseModel
+from pydantic import PrivateAttr
 
+from .config import __integration_volume_enum__
+from .config import _auto_integration_density
+from .config import _auto_number_of_sidebands
 from .config import ConfigSimulator
+from .pool import WorkerPool
+from .powder import max_integration_density
+from .spectrum_cache import __default_max_memory__
+from .spectrum_cache import SpectrumCache
 
 # from IPython.display import JSON
 
@@ -31,6 +40,9 @@ __email__ = "srivastava.89@osu.edu"
 
 __CPU_count__ = psutil.cpu_count()
 
+# event parameters for the Simulator sweep method.
+__sweep_parameters__ = ["magnetic_flux_density", "rotor_frequency", "rotor_angle"]
+
 
 class Simulator(BaseModel):
     """
@@ -143,6 +155,18 @@ class Simulator(BaseModel):
     config: ConfigSimulator = ConfigSimulator()
     indexes = []
 
+    # cached packed spin systems, see `_get_packed_spin_systems()`.
+    _packed_spin_systems: tuple = PrivateAttr(default=None)
+
+    # persistent worker pool for the 'processes' backend, see `run()`.
+    _pool: WorkerPool = PrivateAttr(default=None)
+
+    # cache of the spectra per spin system, see `enable_spectrum_cache()`.
+    _spectrum_cache: SpectrumCache = PrivateAttr(default=None)
+
+    # cached unique spin systems, see `_get_unique_spin_systems()`.
+    _unique_spin_systems: tuple = PrivateAttr(default=None)
+
     class Config:
         validate_assignment = True
 
@@ -302,10 +326,15 @@ class Simulator(BaseModel):
         -------
 
         >>> pprint(sim.json())
-        {'config': {'decompose_spectrum': 'none',
+        {'config': {'averaging_scheme': 'octahedron',
+                    'decompose_spectrum': 'none',
                     'integration_density': 70,
+                    'integration_density_tolerance': 0.002,
                     'integration_volume': 'octant',
-                    'number_of_sidebands': 64},
+                    'number_of_sidebands': 64,
+                    'precision': 'double',
+                    'sideband_amplitude_threshold': 0.0,
+                    'sideband_pair_threshold': 0.0},
          'spin_systems': [{'abundance': '100.0 %',
                            'sites': [{'isotope': '13C',
                                       'isotropic_chemical_shift': '20.0 ppm',
@@ -414,15 +443,29 @@ class Simulator(BaseModel):
         n_jobs: int = 1,
         verbose: int = 0,
         pack_as_csdm: bool = True,
+        backend: str = "threads",
         **kwargs,
     ):
-        """Run the simulation and compute spectrum.
+        """Run the simulation and compute spectrum. The methods are simulated in a
+        single pass over the spin systems, where the spin systems are prepared once and
+        shared between the methods.
 
         Args:
             method_index: An integer or a list of integers. If provided, only the
                 simulations corresponding to the methods at the given index/indexes
                 will be computed. The default is None, `i.e.`, the simulation for
                 all method will be computed.
+            int n_jobs: The number of threads used in the simulation. The spin systems
+                are distributed between the threads within the same process. When
+                there are fewer spin systems than threads, the orientations of every
+                spin system are split between the threads instead. A negative
+                value counts back from the number of CPUs, `i.e.`, -1 uses all CPUs. The
+                default is 1.
+            int verbose: If 1, print the number of spin systems, sites, and couplings,
+                and the fraction of the sideband intensity skipped with the
+                ``sideband_amplitude_threshold``, or for two-dimensional methods, the
+                ``sideband_pair_threshold`` of the config, per simulated group of
+                spin systems. The default is 0.
             bool pack_as_csdm: If true, the simulation results are stored as a
                 `CSDM <https://csdmpy.readthedocs.io/en/stable/api/CSDM.html>`_ object,
                 otherwise, as a `ndarray
@@ -431,59 +474,510 @@ class Simulator(BaseModel):
                 The simulations are stored as the value of the
                 :attr:`~mrsimulator.Method.simulation` attribute of the corresponding
                 method.
+            str backend: The parallel backend, either 'threads' or 'processes'. With
+                'processes', the simulation runs on a persistent pool of `n_jobs`
+                worker processes attached to the Simulator object. The spin systems and
+                the methods are sent to the pool once and updated by delta on the
+                subsequent runs, which makes repeated runs, such as in a least-squares
+                fit, cheap. Use :meth:`~mrsimulator.Simulator.close_pool` to stop the
+                workers. The default is 'threads'.
 
         Example
         -------
 
         >>> sim.run() # doctest:+SKIP
         """
+        if backend not in ["threads", "processes"]:
+            raise ValueError(
+                f"Expecting backend to be 'threads' or 'processes', found {backend}."
+            )
 
         if method_index is None:
             method_index = np.arange(len(self.methods))
         if isinstance(method_index, int):
             method_index = [method_index]
-        for index in method_index:
-            method = self.methods[index]
-            spin_sys = get_chunks(self.spin_systems, n_jobs)
-            kwargs_dict = self.config.get_int_dict()
-            jobs = (
-                delayed(one_d_spectrum)(
-                    method=method, spin_systems=sys, **kwargs_dict, **kwargs
+        n_threads = n_jobs + __CPU_count__ + 1 if n_jobs < 0 else n_jobs
+        methods = [self.methods[index] for index in method_index]
+        for method in methods:
+            _set_origin_offset(method)
+
+        kwargs_dict = {**self.config.get_int_dict(), **kwargs}
+        if verbose != 0:
+            kwargs_dict["verbose"] = verbose
+        packed = self._get_packed_spin_systems()
+        if self._spectrum_cache is None or len(packed) == 0:
+            amps = self._simulate_unique(methods, n_threads, backend, kwargs_dict)
+        else:
+            amps = [
+                self._spectrum_cache.simulate(
+                    method,
+                    packed,
+                    kwargs_dict,
+                    lambda index: self._simulate_unit_abundance(
+                        method, index, n_threads, backend, kwargs_dict
+                    ),
                 )
-                for sys in spin_sys
-            )
-            amp = Parallel(
-                n_jobs=n_jobs,
-                verbose=verbose,
-                # **{
-                #     "backend": {
-                #         "threads": "threading",
-                #         "processes": "multiprocessing",
-                #         None: None,
-                #     }["threads"]
-                # },
-            )(jobs)
-
-            # self.indexes.append(indexes)
-
-            gyromagnetic_ratio = method.channels[0].gyromagnetic_ratio
-            B0 = method.spectral_dimensions[0].events[0].magnetic_flux_density
-            origin_offset = np.abs(B0 * gyromagnetic_ratio * 1e6)
-            for seq in method.spectral_dimensions:
-                seq.origin_offset = origin_offset
-
-            if isinstance(amp[0], list):
-                simulated_data = []
-                for item in amp:
-                    simulated_data += item
-            if isinstance(amp[0], np.ndarray):
-                simulated_data = [np.asarray(amp).sum(axis=0)]
+                for method in methods
+            ]
+
+        for method, amp in zip(methods, amps):
+            simulated_data = amp if isinstance(amp, list) else [amp]
 
             if pack_as_csdm:
                 method.simulation = self._as_csdm_object(simulated_data, method)
             else:
                 method.simulation = np.asarray(simulated_data)
 
+    def run_iter(
+        self,
+        method_index: int = 0,
+        batch_size: int = 1000,
+        n_jobs: int = 1,
+        backend: str = "threads",
+        **kwargs,
+    ):
+        """Run the simulation of a method and yield the spectra of the spin systems in
+        batches, as they are computed. Unlike the :meth:`~mrsimulator.Simulator.run`
+        method with a decomposed spectrum, at most one batch of spectra is held in
+        memory, which allows to stream the spectra of a large number of spin systems,
+        for example, to a file, or reduce the spectra on the fly.
+
+        Args:
+            int method_index: The index of the method. The default is 0.
+            int batch_size: The maximum number of spin systems per batch. The default
+                is 1000.
+            int n_jobs: The number of threads, see :meth:`~mrsimulator.Simulator.run`.
+            str backend: The parallel backend, see :meth:`~mrsimulator.Simulator.run`.
+
+        Yields:
+            A tuple of a ndarray with the indexes of the spin systems in the batch,
+            and a ndarray of shape `(len(indexes),) + method.shape()` with the spectra
+            of the spin systems in the batch, scaled by the spin system abundance. The
+            spectrum of a spin system without the channel isotope of the method is
+            zero. The spectra are not stored in the method.
+
+        Example
+        -------
+
+        >>> total = 0
+        >>> for indexes, spectra in sim.run_iter(batch_size=100):  # doctest:+SKIP
+        ...     total = total + spectra.sum(axis=0)
+        """
+        if backend not in ["threads", "processes"]:
+            raise ValueError(
+                f"Expecting backend to be 'threads' or 'processes', found {backend}."
+            )
+        if batch_size < 1:
+            raise ValueError(f"Expecting a positive batch_size, found {batch_size}.")
+
+        n_threads = n_jobs + __CPU_count__ + 1 if n_jobs < 0 else n_jobs
+        method = self.methods[method_index]
+        _set_origin_offset(method)
+
+        kwargs_dict = {**self.config.get_int_dict(), **kwargs, "decompose_spectrum": 1}
+        packed = self._get_packed_spin_systems()
+        shape = method.shape()
+        for start in range(0, len(packed), batch_size):
+            batch = packed[start : start + batch_size]
+            amp = self._simulate([method], batch, n_threads, backend, kwargs_dict)[0]
+
+            spectra = np.zeros((len(batch),) + tuple(shape))
+            for spectrum, item in zip(spectra, amp):
+                if len(item) != 0:
+                    spectrum[...] = item
+            yield np.arange(start, start + len(batch)), spectra
+
+    def sweep(
+        self,
+        parameter: str,
+        values: list,
+        method_index: int = 0,
+        n_jobs: int = 1,
+        backend: str = "threads",
+        **kwargs,
+    ) -> np.ndarray:
+        """Simulate the spectrum of a method over a series of values of an event
+        parameter, such as a magnetic field, spinning speed, or rotor angle series.
+
+        The parameter is set on every event of a copy of the method for each value, and
+        the copies are simulated in a single pass over the spin systems, sharing the
+        packed spin systems, the orientation averaging scheme, and the tensors of every
+        spin system rotated over the orientations of the scheme. The spectrum is the
+        total spectrum of the spin systems, irrespective of the `decompose_spectrum`
+        config. The method itself is not modified.
+
+        Args:
+            str parameter: The event parameter, one of 'magnetic_flux_density' in T,
+                'rotor_frequency' in Hz, or 'rotor_angle' in rad.
+            values: A list of the parameter values.
+            int method_index: The index of the method. The default is 0.
+            int n_jobs: The number of threads, see :meth:`~mrsimulator.Simulator.run`.
+            str backend: The parallel backend, see :meth:`~mrsimulator.Simulator.run`.
+
+        Returns:
+            A ndarray of shape `(len(values),) + method.shape()`, with the spectrum at
+            every parameter value.
+
+        Example
+        -------
+
+        >>> B0 = [9.4, 14.1, 18.8, 28.2]
+        >>> spectra = sim.sweep("magnetic_flux_density", B0)  # doctest:+SKIP
+        """
+        if parameter not in __sweep_parameters__:
+            raise ValueError(
+                f"Expecting parameter to be one of {__sweep_parameters__}, found "
+                f"{parameter}."
+            )
+        if backend not in ["threads", "processes"]:
+            raise ValueError(
+                f"Expecting backend to be 'threads' or 'processes', found {backend}."
+            )
+
+        n_threads = n_jobs + __CPU_count__ + 1 if n_jobs < 0 else n_jobs
+        method = self.methods[method_index]
+        method = method.copy(update={"simulation": None, "experiment": None})
+
+        methods = []
+        for value in values:
+            item = method.copy(deep=True)
+            for dim in item.spectral_dimensions:
+                for event in dim.events:
+                    setattr(event, parameter, value)
+            _set_origin_offset(item)
+            methods.append(item)
+
+        shape = (len(methods),) + tuple(method.shape())
+        if methods == []:
+            return np.zeros(shape)
+
+        kwargs_dict = {**self.config.get_int_dict(), **kwargs, "decompose_spectrum": 0}
+        amps = self._simulate_unique(methods, n_threads, backend, kwargs_dict)
+        return np.asarray(amps).reshape(shape)
+
+    def get_integration_volumes(self) -> list:
+        """Return a list with the integration volume of every spin system, as used in
+        the simulation. When the integration volume from the config is ``auto``, the
+        spin systems where every tensor is aligned with the common frame, that is, the
+        tensor is zero, has zero Euler angles, or is axially symmetric with a zero beta
+        Euler angle, are integrated over the ``octant``. The remaining spin systems are
+        integrated over the ``hemisphere``.
+
+        Example
+        -------
+
+        >>> sim_auto = Simulator(spin_systems=[
+        ...     SpinSystem(sites=[Site(shielding_symmetric={'zeta': 5, 'eta': 0.5})]),
+        ...     SpinSystem(sites=[Site(shielding_symmetric={'zeta': 5, 'beta': 0.5})]),
+        ... ])
+        >>> sim_auto.config.integration_volume = 'auto'
+        >>> sim_auto.get_integration_volumes()
+        ['octant', 'hemisphere']
+        """
+        volume = self.config.integration_volume
+        if volume != "auto":
+            return [volume] * len(self.spin_systems)
+        aligned = self._get_packed_spin_systems().aligned_tensors()
+        return ["octant" if item else "hemisphere" for item in aligned]
+
+    def get_integration_densities(self, method_index: list = None) -> list:
+        """Return a list with the integration density of every spin system, as used in
+        the simulation of the methods at the given indexes. When the integration
+        density from the config is ``auto``, the integration density of a spin system
+        is chosen from the ratio of the span of the anisotropic interactions, see
+        :meth:`~mrsimulator.spin_system.packing.PackedSpinSystems.anisotropy_span`, to
+        the smallest spectral increment of the methods, such that the relative error of
+        the spectrum is within the ``integration_density_tolerance`` from the config.
+
+        Args:
+            method_index: An integer or a list of integers. The default is None, `i.e.`,
+                all methods.
+
+        Example
+        -------
+
+        >>> from mrsimulator.methods import BlochDecaySpectrum
+        >>> csa = {'zeta': 100, 'eta': 0.5}
+        >>> sim_auto = Simulator(
+        ...     spin_systems=[
+        ...         SpinSystem(sites=[Site(isotope='13C')]),
+        ...         SpinSystem(sites=[Site(isotope='13C', shielding_symmetric=csa)]),
+        ...     ],
+        ...     methods=[BlochDecaySpectrum(channels=['13C'], spectral_width=50000)],
+        ... )
+        >>> sim_auto.config.integration_density = 'auto'
+        >>> sim_auto.get_integration_densities()
+        [23, 67]
+        """
+        density = self.config.integration_density
+        if density != "auto":
+            return [density] * len(self.spin_systems)
+
+        if method_index is None:
+            method_index = np.arange(len(self.methods))
+        if isinstance(method_index, int):
+            method_index = [method_index]
+        methods = [self.methods[index] for index in method_index]
+        packed = self._get_packed_spin_systems()
+        tolerance = self.config.integration_density_tolerance
+        scheme = self.config.averaging_scheme
+        return _integration_densities(packed, methods, tolerance, scheme).tolist()
+
+    def get_numbers_of_sidebands(self, method_index: list = None) -> list:
+        """Return a list with the number of sidebands of every spin system, as used in
+        the simulation of the methods at the given indexes. When the number of
+        sidebands from the config is ``auto``, the number of sidebands of a spin system
+        is chosen from the ratio of the span of the anisotropic interactions, see
+        :meth:`~mrsimulator.spin_system.packing.PackedSpinSystems.sideband_span`, to
+        the rotor frequency of the methods. The span accounts for the transitions
+        selected by the methods, such that the satellite transitions of a quadrupolar
+        site need more sidebands than the central transition.
+
+        Args:
+            method_index: An integer or a list of integers. The default is None, `i.e.`,
+                all methods.
+
+        Example
+        -------
+
+        >>> from mrsimulator.methods import BlochDecaySpectrum
+        >>> site = Site(isotope='13C', shielding_symmetric={'zeta': 100, 'eta': 0.5})
+        >>> sim_auto = Simulator(
+        ...     spin_systems=[SpinSystem(sites=[site])],
+        ...     methods=[
+        ...         BlochDecaySpectrum(channels=['13C'], rotor_frequency=1000),
+        ...         BlochDecaySpectrum(channels=['13C'], rotor_frequency=60000),
+        ...     ],
+        ... )
+        >>> sim_auto.config.number_of_sidebands = 'auto'
+        >>> sim_auto.get_numbers_of_sidebands(method_index=0)
+        [48]
+        >>> sim_auto.get_numbers_of_sidebands(method_index=1)
+        [12]
+        """
+        n_sidebands = self.config.number_of_sidebands
+        if n_sidebands != "auto":
+            return [n_sidebands] * len(self.spin_systems)
+
+        if method_index is None:
+            method_index = np.arange(len(self.methods))
+        if isinstance(method_index, int):
+            method_index = [method_index]
+        methods = [self.methods[index] for index in method_index]
+        packed = self._get_packed_spin_systems()
+        return _numbers_of_sidebands(packed, methods).tolist()
+
+    def _simulate(self, methods, spin_systems, n_threads, backend, kwargs):
+        """Return a list with the spectrum of every method from the packed spin systems.
+        When the integration volume, density, or number of sidebands is `auto`, the spin
+        systems are simulated in groups of the same integration volume, density, and
+        number of sidebands, see
+        :meth:`~mrsimulator.Simulator.get_integration_volumes`,
+        :meth:`~mrsimulator.Simulator.get_integration_densities`, and
+        :meth:`~mrsimulator.Simulator.get_numbers_of_sidebands`. The integration volume
+        is ignored for the averaging schemes from a set of orientations."""
+        kwargs = kwargs.copy()
+        tolerance = kwargs.pop("integration_density_tolerance", None)
+        if kwargs.get("averaging_scheme", "octahedron") != "octahedron":
+            kwargs["integration_volume"] = 0
+        volume, density = kwargs["integration_volume"], kwargs["integration_density"]
+        n_sidebands = kwargs["number_of_sidebands"]
+        auto_volume = volume == __integration_volume_enum__["auto"]
+        if not auto_volume and density != -1 and n_sidebands != -1:
+            return self._simulate_group(
+                methods, spin_systems, n_threads, backend, kwargs
+            )
+
+        volumes = np.full(len(spin_systems), volume)
+        if auto_volume:
+            volumes = np.where(spin_systems.aligned_tensors(), 0, 1)
+        densities = np.full(len(spin_systems), density)
+        if density == -1:
+            scheme = kwargs.get("averaging_scheme", "octahedron")
+            densities = _integration_densities(spin_systems, methods, tolerance, scheme)
+        sidebands = np.full(len(spin_systems), n_sidebands)
+        if n_sidebands == -1:
+            sidebands = _numbers_of_sidebands(spin_systems, methods)
+
+        keys, inverse = np.unique(
+            np.column_stack([volumes, densities, sidebands]),
+            axis=0,
+            return_inverse=True,
+        )
+        names = ["integration_volume", "integration_density", "number_of_sidebands"]
+        if len(keys) < 2:
+            kwargs.update(zip(names, keys[0] if len(keys) else (0, 1, 1)))
+            return self._simulate_group(
+                methods, spin_systems, n_threads, backend, kwargs
+            )
+
+        groups = [np.where(inverse.ravel() == i)[0] for i in range(len(keys))]
+        results = [
+            self._simulate_group(
+                methods,
+                spin_systems[index],
+                n_threads,
+                backend,
+                {**kwargs, **dict(zip(names, key))},
+            )
+            for key, index in zip(keys, groups)
+        ]
+        if kwargs["decompose_spectrum"] != 1:
+            return [sum(amps) for amps in zip(*results)]
+
+        spectra = []
+        for amps in zip(*results):
+            amp = [None] * len(spin_systems)
+            for index, group_amp in zip(groups, amps):
+                for i, item in zip(index, group_amp):
+                    amp[i] = item
+            spectra.append(amp)
+        return spectra
+
+    def _simulate_group(self, methods, spin_systems, n_threads, backend, kwargs):
+        """Return a list with the spectrum of every method from the packed spin systems.
+        With the 'threads' backend, the methods are simulated in a single pass over the
+        spin systems."""
+        if backend == "processes":
+            pool = self._get_pool(n_threads)
+            return [pool.simulate(method, spin_systems, **kwargs) for method in methods]
+        return simulate_methods(
+            methods=methods, spin_systems=spin_systems, n_threads=n_threads, **kwargs
+        )
+
+    def _simulate_unique(self, methods, n_threads, backend, kwargs):
+        """Return a list with the spectrum of every method, where the identical spin
+        systems are simulated once. The spectrum of a group of identical spin systems is
+        scaled by the total abundance of the group, or when decomposed, by the abundance
+        of each spin system within the group."""
+        packed = self._get_packed_spin_systems()
+        unique, inverse = self._get_unique_spin_systems()
+        if unique is packed:
+            return self._simulate(methods, packed, n_threads, backend, kwargs)
+
+        if kwargs["decompose_spectrum"] != 1:
+            unique.abundance = np.bincount(
+                inverse, weights=packed.abundance, minlength=len(unique)
+            )
+            return self._simulate(methods, unique, n_threads, backend, kwargs)
+
+        unique.abundance = np.ones(len(unique))
+        amps = self._simulate(methods, unique, n_threads, backend, kwargs)
+        return [
+            [
+                amp[i] * abundance if len(amp[i]) != 0 else []
+                for i, abundance in zip(inverse, packed.abundance)
+            ]
+            for amp in amps
+        ]
+
+    def _simulate_unit_abundance(self, method, index, n_threads, backend, kwargs):
+        """Return a list of spectra from the spin systems at index, at unit
+        abundance."""
+        spin_systems = PackedSpinSystems([self.spin_systems[i] for i in index])
+        spin_systems.abundance = np.ones(len(index))
+        kwargs = {**kwargs, "decompose_spectrum": 1}
+        return self._simulate([method], spin_systems, n_threads, backend, kwargs)[0]
+
+    def enable_spectrum_cache(self, max_memory: int = __default_max_memory__):
+        """Cache the spectrum of every spin system between the subsequent runs of the
+        :meth:`~mrsimulator.Simulator.run` method. A run only simulates the spin systems
+        that were modified since the previous run, which is useful when only a few spin
+        systems change between the runs, such as in a least-squares fit.
+
+        Args:
+            int max_memory: The upper bound of the memory used by the cache, in bytes.
+                The least recently used spectra are evicted beyond this bound. The
+                default is 256 MB.
+
+        Example
+        -------
+
+        >>> sim.enable_spectrum_cache(max_memory=64 * 1024**2)
+        """
+        if self._spectrum_cache is None:
+            self._spectrum_cache = SpectrumCache(max_memory)
+        self._spectrum_cache.max_memory = max_memory
+
+    def disable_spectrum_cache(self):
+        """Disable and clear the cache of the spectra per spin system.
+
+        Example
+        -------
+
+        >>> sim.disable_spectrum_cache()
+        """
+        self._spectrum_cache = None
+
+    def _get_packed_spin_systems(self) -> PackedSpinSystems:
+        """Return the spin systems packed as a PackedSpinSystems object.
+
+        The packed spin systems are cached and re-used until a spin system, site, or
+        coupling is added, removed, replaced, or modified.
+        """
+        count = Parseable.modification_count
+        fingerprint, objects = spin_systems_fingerprint(self.spin_systems)
+        if self._packed_spin_systems is not None:
+            cached_count, cached_fingerprint, _, packed = self._packed_spin_systems
+            if cached_count == count and cached_fingerprint == fingerprint:
+                return packed
+
+        packed = PackedSpinSystems(self.spin_systems)
+        self._packed_spin_systems = (count, fingerprint, objects, packed)
+        return packed
+
+    def _get_unique_spin_systems(self) -> tuple:
+        """Return the packed unique spin systems, and an array with the index of the
+        unique spin system for every spin system. The spin systems that only differ in
+        the abundance, name, label, or description are identical. If all spin systems
+        are unique, the packed spin systems are returned as is. The unique spin systems
+        are cached with the modification count and the fingerprint of the packed spin
+        systems, and re-used until a spin system, site, or coupling is modified."""
+        packed = self._get_packed_spin_systems()
+        key = self._packed_spin_systems[:2]
+        if self._unique_spin_systems is not None:
+            cached_key, unique, inverse = self._unique_spin_systems
+            if cached_key == key:
+                return unique, inverse
+
+        groups = {}
+        inverse = np.asarray(
+            [groups.setdefault(item, len(groups)) for item in packed.digests()],
+            dtype=int,
+        )
+        unique = packed
+        if len(groups) != len(packed):
+            index = np.unique(inverse, return_index=True)[1]
+            unique = PackedSpinSystems([self.spin_systems[i] for i in index])
+        self._unique_spin_systems = (key, unique, inverse)
+        return unique, inverse
+
+    def _get_pool(self, n_workers: int) -> WorkerPool:
+        """Return the worker pool with `n_workers` processes, starting a new pool if
+        required."""
+        if self._pool is not None and not self._pool.closed:
+            if self._pool.n_workers == n_workers:
+                return self._pool
+            self._pool.close()
+        self._pool = WorkerPool(n_workers)
+        return self._pool
+
+    def close_pool(self):
+        """Stop the worker processes started by the
+        :meth:`~mrsimulator.Simulator.run` method with the 'processes' backend. The
+        worker processes are also stopped when the Simulator object is garbage
+        collected.
+
+        Example
+        -------
+
+        >>> sim.run(n_jobs=4, backend='processes') # doctest:+SKIP
+        >>> sim.close_pool() # doctest:+SKIP
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
     def save(self, filename: str, with_units: bool = True):
         """Serialize the simulator object to a JSON file.
 
@@ -617,6 +1111,89 @@ class Simulator(BaseModel):
         }
 
 
+def _integration_densities(spin_systems, methods, tolerance, averaging_scheme):
+    """Return an array with the automatic integration density of every spin system
+    for the simulation of the methods, capped at the largest integration density of
+    the averaging scheme."""
+    span_ratio = np.zeros(len(spin_systems))
+    for method in methods:
+        dimensions = method.spectral_dimensions
+        increment = min(abs(dim.spectral_width / dim.count) for dim in dimensions)
+        B0 = {event.magnetic_flux_density for dim in dimensions for event in dim.events}
+        isotope = method.channels[0].symbol
+        for item in B0:
+            span = spin_systems.anisotropy_span(isotope, item)
+            span_ratio = np.maximum(span_ratio, span / increment)
+    densities = _auto_integration_density(span_ratio, tolerance)
+    largest = max_integration_density(averaging_scheme)
+    return densities if largest is None else np.minimum(densities, largest)
+
+
+def _numbers_of_sidebands(spin_systems, methods):
+    """Return an array with the automatic number of sidebands of every spin system
+    for the simulation of the methods."""
+    span_ratio = np.zeros(len(spin_systems))
+    for method in methods:
+        p, d = _transition_extents(spin_systems, method)
+        for dim in method.spectral_dimensions:
+            for event in dim.events:
+                if event.rotor_frequency < 1.0e-3:
+                    continue
+                span = spin_systems.sideband_span(event.magnetic_flux_density, p, d)
+                span_ratio = np.maximum(span_ratio, span / event.rotor_frequency)
+    return _auto_number_of_sidebands(span_ratio)
+
+
+def _transition_extents(spin_systems, method):
+    """Return a tuple of two arrays with the largest |m_f - m_i| and |m_f^2 - m_i^2| of
+    every site, over the transition pathways of the method from the packed spin
+    systems. The pathways are evaluated once for every unique isotope signature."""
+    channel = method.channels[0].symbol
+    extents = []
+    for signature in spin_systems.signatures:
+        pathways = []
+        if channel in signature:
+            sys = SpinSystem(sites=[{"isotope": item} for item in signature])
+            pathways = method._get_transition_pathways_np(sys)
+        extents.append(_pathway_extents(pathways, len(signature)))
+
+    index = spin_systems.signature_index
+    p = [extents[i][0] for i in index]
+    d = [extents[i][1] for i in index]
+
+    # user-defined transition pathways.
+    for i, pathways in spin_systems.transition_pathways.items():
+        n_sites = spin_systems.site_offsets[i + 1] - spin_systems.site_offsets[i]
+        p[i], d[i] = _pathway_extents(pathways, n_sites)
+
+    if len(p) == 0:
+        return np.zeros(0), np.zeros(0)
+    return np.concatenate(p), np.concatenate(d)
+
+
+def _pathway_extents(pathways, n_sites):
+    """Return the largest |m_f - m_i| and |m_f^2 - m_i^2| of every site over a list of
+    transition pathways, where a transition holds the initial and final quantum
+    numbers of the sites."""
+    if len(pathways) == 0:
+        return np.zeros(n_sites), np.zeros(n_sites)
+    states = np.asarray(pathways, dtype=np.float64).reshape(-1, 2, n_sites)
+    initial, final = states[:, 0], states[:, 1]
+    p = np.abs(final - initial).max(axis=0)
+    d = np.abs(final**2 - initial**2).max(axis=0)
+    return p, d
+
+
+def _set_origin_offset(method):
+    """Set the origin offset of the spectral dimensions of the method to the Larmor
+    frequency of the channel isotope, in Hz."""
+    gyromagnetic_ratio = method.channels[0].gyromagnetic_ratio
+    B0 = method.spectral_dimensions[0].events[0].magnetic_flux_density
+    origin_offset = np.abs(B0 * gyromagnetic_ratio * 1e6)
+    for seq in method.spectral_dimensions:
+        seq.origin_offset = origin_offset
+
+
 class Sites(AbstractList):
     def __init__(self, data=[]):
         super().__init__(data)
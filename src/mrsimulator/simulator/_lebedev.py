@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Orbit parameters of the Lebedev quadratures over the unit sphere.
+
+Every rule is a list of orbits of the octahedral group, given as the orbit type, the
+weight of every point in the orbit, and the orbit parameters, see
+`mrsimulator.simulator.powder._lebedev_orbit`. The weights sum to one over the sphere.
+The rules of n points are exact for the spherical harmonics up to the degree
+L, as listed in `__lebedev_degree__`.
+"""
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+__lebedev_degree__ = {110: 17, 194: 23, 302: 29, 434: 35}
+
+__lebedev_orbits__ = {
+    110: [
+        ("a1", 0.003828270494937167),
+        ("a3", 0.009793737512487515),
+        ("b", 0.008211737283191111, 0.18511563534473618),
+        ("b", 0.009942814891178101, 0.6904210483822922),
+        ("b", 0.009595471336070962, 0.3956894730559419),
+        ("c", 0.009694996361663025, 0.4783690288121501),
+    ],
+    194: [
+        ("a1", 0.0017823404472445904),
+        ("a2", 0.005716905949977101),
+        ("a3", 0.005573383178848739),
+        ("b", 0.005158237711805384, 0.28924656275754385),
+        ("b", 0.004106777028169396, 0.12993354476500663),
+        ("b", 0.005608704082587995, 0.6712973442695226),
+        ("b", 0.0055187714672736135, 0.4446933178717437),
+        ("c", 0.005051846064614809, 0.3457702197611283),
+        ("d", 0.0055302489162330935, 0.15904171053835292, 0.525118572443642),
+    ],
+    302: [
+        ("a1", 0.0008545911725128196),
+        ("a3", 0.0035991192850255735),
+        ("b", 0.0031089531224136736, 0.2219645236294179),
+        ("b", 0.002352101413689162, 0.09618308522614807),
+        ("b", 0.003449788424305884, 0.3515640345570105),
+        ("b", 0.003576729661743366, 0.4729054132581004),
+        ("b", 0.0036048226014198815, 0.6566329410219611),
+        ("b", 0.0036500458076772547, 0.7011766416089545),
+        ("c", 0.002982344963171806, 0.2644152887060663),
+        ("c", 0.003600820932216461, 0.5718955891878961),
+        ("d", 0.003571540554273387, 0.2510034751770465, 0.5448677372580774),
+        ("d", 0.00339231220500617, 0.12335485325833274, 0.4127724083168531),
+    ],
+    434: [
+        ("a1", 0.0005265897968225046),
+        ("a2", 0.0025482199720026064),
+        ("a3", 0.002512317418927307),
+        ("b", 0.002530403801186355, 0.690934630750911),
+        ("b", 0.0014624956215946094, 0.07568084367178106),
+        ("b", 0.002513267174597565, 0.6456664707424257),
+        ("b", 0.0024453734373129786, 0.39272597633680023),
+        ("b", 0.002501725168402937, 0.4914342637784747),
+        ("b", 0.0020142790209185216, 0.1774836054609161),
+        ("b", 0.0023026947822274144, 0.286128901030764),
+        ("c", 0.0019109512821795323, 0.21027252285730683),
+        ("c", 0.00241744237563898, 0.47159869115131586),
+        ("d", 0.002512236854563495, 0.10680182607580484, 0.590515704892527),
+        ("d", 0.0024169300443247763, 0.2054823696403043, 0.4502330382582625),
+        ("d", 0.0024966440545530857, 0.3104284035166542, 0.5550152361076807),
+        ("d", 0.002236607760437849, 0.09921769636429234, 0.3344363145343454),
+    ],
+}
@@ -1,10 +1,19 @@
 # -*- coding: utf-8 -*-
 """Base ConfigSimulator class."""
 # from mrsimulator.sandbox import AveragingScheme
+from typing import Union
+
+import numpy as np
 from pydantic import BaseModel
+from pydantic import conint
 from pydantic import Field
+from pydantic import root_validator
 from typing_extensions import Literal
 
+from .powder import get_orientations_count as _point_set_count
+from .powder import max_integration_density as _max_integration_density
+from .powder import PowderScheme
+
 __author__ = "Deepansh Srivastava"
 __email__ = "srivastava.89@osu.edu"
 
@@ -12,9 +21,53 @@ __email__ = "srivastava.89@osu.edu"
 __decompose_spectrum_enum__ = {"none": 0, "spin_system": 1}
 
 # integration volume
-__integration_volume_enum__ = {"octant": 0, "hemisphere": 1}
+__integration_volume_enum__ = {"octant": 0, "hemisphere": 1, "auto": -1}
 __integration_volume_octants__ = [1, 4]
 
+# precision of the sideband phase
+__precision_enum__ = {"double": 0, "single": 1}
+
+# bounds of the automatic integration density
+__auto_integration_density_bounds__ = (8, 256)
+
+# bounds of the automatic number of sidebands
+__auto_number_of_sidebands_bounds__ = (8, 1024)
+
+
+def _auto_integration_density(span_ratio, tolerance: float) -> np.ndarray:
+    r"""Return the automatic integration density from the ratio of the anisotropic
+    frequency span to the spectral increment.
+
+    The relative error of the spectrum, integrated over the spectrum, decreases as
+    :math:`C/n^2` with the integration density :math:`n`, where the constant grows
+    slowly with the span ratio, :math:`s`. The constant is estimated as
+    :math:`1 + 1.2 \ln(1 + s)`, an upper bound of the errors of the shielding and
+    second-order quadrupolar lineshapes, static and spinning, against a converged
+    simulation.
+    """
+    constant = 1 + 1.2 * np.log1p(np.asarray(span_ratio, dtype=np.float64))
+    density = np.ceil(np.sqrt(constant / tolerance))
+    return np.clip(density, *__auto_integration_density_bounds__).astype(int)
+
+
+def _auto_number_of_sidebands(span_ratio) -> np.ndarray:
+    r"""Return the automatic number of sidebands from the ratio of the anisotropic
+    frequency span to the rotor frequency.
+
+    The sideband amplitudes are evaluated from the Fourier transform of :math:`n`
+    samples over a rotor period, and the truncation error of the sideband manifold
+    decays faster than exponentially once :math:`n` exceeds the number of sideband
+    orders within the span, :math:`s`. The number of sidebands is the smallest
+    :math:`2^k` or :math:`3 \times 2^k`, not less than :math:`1.6 s + 8`, which keeps
+    the relative error of the spinning sideband spectra below :math:`10^{-6}`.
+    """
+    low, high = __auto_number_of_sidebands_bounds__
+    sizes = np.sort(np.outer([1, 3], 2 ** np.arange(11)).ravel())
+    sizes = sizes[(sizes >= low) & (sizes <= high)]
+    target = 1.6 * np.asarray(span_ratio, dtype=np.float64) + 8
+    index = np.searchsorted(sizes, np.minimum(target, high))
+    return sizes[index]
+
 
 class ConfigSimulator(BaseModel):
     r"""
@@ -26,14 +79,38 @@ class ConfigSimulator(BaseModel):
     number_of_sidebands: int (optional).
         The value is the requested number of sidebands that will be computed in the
         simulation. The value cannot be zero or negative. The default value
-        is 64.
+        is 64. When the value is ``auto``, the number of sidebands is chosen per spin
+        system from the span of the anisotropic interactions relative to the rotor
+        frequency of the methods, see
+        :meth:`~mrsimulator.Simulator.get_numbers_of_sidebands`. Spin systems at a fast
+        spinning speed use fewer sidebands, and spin systems at a slow spinning speed
+        use more sidebands.
+
+    sideband_amplitude_threshold: float (optional).
+        The sideband orders with a summed absolute amplitude, over all orientations,
+        below the threshold times the total amplitude of a spin system are skipped
+        before the interpolation of a one-dimensional method. A zero threshold
+        interpolates every sideband order. The default value is 0, that is, the pruning
+        is enabled by setting a threshold, such as 1e-8.
+
+    sideband_pair_threshold: float (optional).
+        The pairs of sideband orders from the two dimensions of a two-dimensional
+        method, with a summed absolute product of amplitudes below the threshold times
+        the total over all pairs, are skipped before the interpolation. A zero threshold
+        interpolates every pair of sideband orders. The default value is 0.
 
     integration_volume: enum (optional).
         The value is the volume over which the solid-state spectral frequency
         integration is performed. The valid literals of this enumeration are
 
-        - ``octant`` (default), and
-        - ``hemisphere``
+        - ``octant`` (default),
+        - ``hemisphere``, and
+        - ``auto``: The volume is chosen per spin system. The spin systems with all
+          tensors aligned with the common frame, see
+          :meth:`~mrsimulator.Simulator.get_integration_volumes`, are integrated over
+          the ``octant``, which gives the same spectrum as the ``hemisphere`` at a
+          quarter of the orientations. The remaining spin systems are integrated over
+          the ``hemisphere``.
 
     integration_density: int (optional).
         The value represents the integration density or equivalently the number of
@@ -45,7 +122,40 @@ class ConfigSimulator(BaseModel):
             n_\text{octants} \frac{(n+1)(n+2)}{2},
 
         where :math:`n_\text{octants}` is the number of octants in the given volume.
-        The default value is 70.
+        The default value is 70. When the value is ``auto``, the integration density is
+        chosen per spin system from the span of the anisotropic interactions relative
+        to the spectral increment of the methods, see
+        :meth:`~mrsimulator.Simulator.get_integration_densities`. Spin systems with
+        broad lineshapes use a higher density, and spin systems with narrow lineshapes
+        use a lower density.
+
+    integration_density_tolerance: float (optional).
+        The target relative error of the spectrum, integrated over the spectrum, when
+        the integration density is ``auto``. A lower tolerance gives a higher
+        integration density. The default value is 0.002.
+
+    averaging_scheme: enum or PowderScheme (optional).
+        The powder averaging scheme. The valid literals of this enumeration are
+
+        - ``octahedron`` (default): The orientations over the face of an octahedron,
+          where the frequencies are interpolated over the triangles between the
+          orientations.
+        - ``zcw``: The Zaremba-Conroy-Wolfsberg orientations.
+        - ``lebedev``: The Lebedev orientations.
+        - ``repulsion``: The REPULSION orientations.
+
+        The value may also be a user-defined
+        :class:`~mrsimulator.simulator.powder.PowderScheme` of orientations. The
+        orientations of the ``zcw``, ``lebedev``, and ``repulsion`` schemes cover the
+        hemisphere, where the number of orientations is at least the number of
+        orientations of the ``octahedron`` scheme over an octant at the same
+        integration density. A set of orientations has no triangulation, and the
+        spectrum is evaluated by binning the frequency at every orientation, where the
+        integration volume is ignored. The ``lebedev`` scheme uses the largest Lebedev
+        rule, with a warning, above an integration density of 19, and the
+        ``repulsion`` scheme supports an integration density of at most 89. When the
+        integration density is ``auto``, the density of a spin system is capped at the
+        largest density of the scheme.
 
     decompose_spectrum: enum (optional).
         The value specifies how a simulation result is decomposed into an array of
@@ -57,6 +167,18 @@ class ConfigSimulator(BaseModel):
           is an array of spectra, where each spectrum arises from a spin system within
           the Simulator object.
 
+    precision: enum (optional).
+        The floating-point precision of the spinning sideband amplitudes. The valid
+        literals of this enumeration are
+
+        - ``double`` (default): The amplitudes are evaluated in double precision.
+        - ``single``: The sideband phase, the most expensive step in evaluating the
+          amplitudes, is evaluated in single precision, while the Fourier transform and
+          the frequencies remain in double precision. The relative error of the
+          spectrum is below :math:`10^{-6}`, which is sufficient for least-squares
+          fitting, at a lower computation time at large integration densities and
+          numbers of sidebands. The precision has no effect on static samples.
+
     Example
     -------
 
@@ -67,14 +189,34 @@ class ConfigSimulator(BaseModel):
     >>> a.config.decompose_spectrum = 'spin_system'
     """
 
-    number_of_sidebands: int = Field(default=64, gt=0)
-    integration_volume: Literal["octant", "hemisphere"] = "octant"
-    integration_density: int = Field(default=70, gt=0)
+    number_of_sidebands: Union[conint(gt=0), Literal["auto"]] = 64
+    sideband_amplitude_threshold: float = Field(default=0.0, ge=0)
+    sideband_pair_threshold: float = Field(default=0.0, ge=0)
+    integration_volume: Literal["octant", "hemisphere", "auto"] = "octant"
+    integration_density: Union[conint(gt=0), Literal["auto"]] = 70
+    integration_density_tolerance: float = Field(default=0.002, gt=0)
+    averaging_scheme: Union[
+        Literal["octahedron", "zcw", "lebedev", "repulsion"], PowderScheme
+    ] = "octahedron"
     decompose_spectrum: Literal["none", "spin_system"] = "none"
+    precision: Literal["double", "single"] = "double"
 
     class Config:
         validate_assignment = True
 
+    @root_validator(skip_on_failure=True)
+    def validate_integration_density(cls, values):
+        scheme, density = values["averaging_scheme"], values["integration_density"]
+        if scheme != "repulsion" or density == "auto":
+            return values
+        largest = _max_integration_density(scheme)
+        if density > largest:
+            raise ValueError(
+                f"The {scheme} averaging scheme supports an integration density of at "
+                f"most {largest}, found {density}."
+            )
+        return values
+
     def get_int_dict(self):
         py_dict = self.dict()
         py_dict["integration_volume"] = __integration_volume_enum__[
@@ -83,6 +225,11 @@ class ConfigSimulator(BaseModel):
         py_dict["decompose_spectrum"] = __decompose_spectrum_enum__[
             self.decompose_spectrum
         ]
+        py_dict["precision"] = __precision_enum__[self.precision]
+        if self.integration_density == "auto":
+            py_dict["integration_density"] = -1
+        if self.number_of_sidebands == "auto":
+            py_dict["number_of_sidebands"] = -1
         return py_dict
 
     # averaging scheme. This contains the c pointer used in frequency evaluation
@@ -98,7 +245,10 @@ class ConfigSimulator(BaseModel):
     #     raise ValueError("Expecting an instance of either the AveragingScheme class.")
 
     def get_orientations_count(self):
-        """Return the total number of orientations.
+        """Return the total number of orientations. When the integration volume or
+        density is ``auto``, the number of orientations at the largest volume or
+        density is returned. For the averaging schemes from a set of orientations, the
+        number of orientations in the set is returned.
 
         Example
         -------
@@ -110,7 +260,13 @@ class ConfigSimulator(BaseModel):
         924
         """
         n = self.integration_density
-        vol = __integration_volume_octants__[
-            __integration_volume_enum__[self.integration_volume]
-        ]
+        if n == "auto":
+            n = __auto_integration_density_bounds__[1]
+            largest = _max_integration_density(self.averaging_scheme)
+            n = n if largest is None else min(n, largest)
+        if self.averaging_scheme != "octahedron":
+            return _point_set_count(self.averaging_scheme, n)
+        volume = self.integration_volume
+        volume = "hemisphere" if volume == "auto" else volume
+        vol = __integration_volume_octants__[__integration_volume_enum__[volume]]
         return int(vol * (n + 1) * (n + 2) / 2)
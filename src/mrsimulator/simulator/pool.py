@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""A persistent pool of worker processes for the Simulator."""
+import multiprocessing as mp
+import pickle
+import traceback
+import weakref
+
+import numpy as np
+from mrsimulator.base_model import one_d_spectrum
+
+try:
+    from multiprocessing import resource_tracker
+    from multiprocessing import shared_memory
+except ImportError:  # python < 3.8
+    shared_memory = None
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+# attributes of the PackedSpinSystems that describe the layout of the spin systems.
+# When any of these change, the full spin systems are sent to the worker.
+__layout_attributes__ = [
+    "number_of_spin_systems",
+    "site_offsets",
+    "coupling_offsets",
+    "signature_index",
+    "signatures",
+    "transition_pathways",
+]
+
+
+class WorkerPool:
+    """A pool of long-lived worker processes for simulating spectra.
+
+    Every worker holds a contiguous chunk of the packed spin systems and the method.
+    Both are sent to the workers once and updated by delta on subsequent runs, that is,
+    only the spin system attributes that have changed since the last run are sent.
+    The workers write the spectra into a shared memory buffer, which is re-used
+    between runs. Every worker writes the spectrum of its chunk into a separate slice
+    of the buffer, and the slices are summed in the parent process, in the order of the
+    workers. Unlike a single accumulator shared between the workers, the slices need no
+    lock, and the sum is reproducible between runs.
+
+    Args:
+        int n_workers: The number of worker processes.
+    """
+
+    def __init__(self, n_workers: int):
+        if shared_memory is None:
+            raise RuntimeError("The worker pool requires python 3.8 or higher.")
+
+        # start the resource tracker before the workers, so that the workers share the
+        # tracker of the shared memory with this process.
+        resource_tracker.ensure_running()
+        context = mp.get_context("spawn")
+        self.n_workers = n_workers
+        self._connections = []
+        self._processes = []
+        for _ in range(n_workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child,), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+        self._chunks = [None] * n_workers
+        self._method = None
+        self._memory = []
+        self._finalizer = weakref.finalize(
+            self, _shutdown, self._connections, self._processes, self._memory
+        )
+
+    def __reduce__(self):
+        # the pool is bound to its processes. Copies do not share the pool.
+        return (_closed_pool, ())
+
+    @property
+    def closed(self):
+        return not self._finalizer.alive
+
+    def close(self):
+        """Stop the worker processes and release the shared memory."""
+        self._finalizer()
+
+    def simulate(self, method, spin_systems, decompose_spectrum=0, **kwargs):
+        """Simulate the spectrum of the method from the packed spin systems.
+
+        Args:
+            method: The Method object.
+            spin_systems: The PackedSpinSystems object.
+            decompose_spectrum: If 1, return the spectrum from every spin system.
+            kwargs: The remaining keyword arguments of `one_d_spectrum`.
+
+        Returns:
+            A ndarray with the spectrum, or a list of spectra per spin system when
+            decompose_spectrum is 1.
+        """
+        if self.closed:
+            raise RuntimeError("The worker pool is closed.")
+
+        n_sys = len(spin_systems)
+        shape = method.shape()
+        size = int(np.prod(shape))
+        decompose = decompose_spectrum == 1 and n_sys != 0
+        view = self._buffer(size * (n_sys if decompose else self.n_workers))
+
+        method_ = method.copy(update={"simulation": None, "experiment": None})
+        method_ = pickle.dumps(method_)
+        method_, self._method = (None if method_ == self._method else method_), method_
+
+        kwargs.update(decompose_spectrum=1 if decompose else 0)
+        bounds = [(i * n_sys) // self.n_workers for i in range(self.n_workers + 1)]
+        try:
+            for i, conn in enumerate(self._connections):
+                chunk = spin_systems[bounds[i] : bounds[i + 1]]
+                self._send_spin_systems(i, chunk)
+                offset = size * (bounds[i] if decompose else i)
+                conn.send(("run", method_, kwargs, self._memory[0].name, offset))
+            errors = [conn.recv() for conn in self._connections]
+        except (EOFError, OSError):
+            # a broken pipe or a reset connection, when a worker process has died.
+            self.close()
+            raise RuntimeError("A worker process exited unexpectedly.")
+
+        errors = [item for item in errors if item is not None]
+        if errors != []:
+            # the state of the workers is unknown, re-send everything on the next run.
+            self._chunks, self._method = [None] * self.n_workers, None
+            raise RuntimeError(f"Simulation failed on a worker process.\n{errors[0]}")
+
+        if decompose:
+            channel = method.channels[0].symbol
+            has_channel = spin_systems.contains_isotope(channel)
+            rows = view[: n_sys * size].reshape(n_sys, -1)
+            return [
+                row.reshape(shape).copy() if check else []
+                for row, check in zip(rows, has_channel)
+            ]
+        spectra = view[: self.n_workers * size].reshape(self.n_workers, -1)
+        return spectra.sum(axis=0).reshape(shape)
+
+    def _buffer(self, size):
+        """Return the shared memory buffer of at least `size` doubles as a ndarray."""
+        nbytes = max(8 * size, 8)
+        if self._memory == [] or self._memory[0].size < nbytes:
+            _release(self._memory)
+            self._memory.append(shared_memory.SharedMemory(create=True, size=nbytes))
+        return np.ndarray(size, dtype=np.float64, buffer=self._memory[0].buf)
+
+    def _send_spin_systems(self, index, chunk):
+        """Send the chunk of spin systems to the worker at index, or only the attributes
+        that differ from the previously sent chunk."""
+        previous, self._chunks[index] = self._chunks[index], chunk
+        if previous is None or any(
+            not _equal(getattr(previous, name), getattr(chunk, name))
+            for name in __layout_attributes__
+        ):
+            self._connections[index].send(("set_spin_systems", chunk))
+            return
+
+        old, new = vars(previous), vars(chunk)
+        delta = {
+            key: value
+            for key, value in new.items()
+            if key not in __layout_attributes__ and not _equal(old[key], value)
+        }
+        if delta != {}:
+            self._connections[index].send(("update", delta))
+
+
+def _equal(a, b):
+    if isinstance(a, np.ndarray):
+        return a.shape == b.shape and np.array_equal(a, b)
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_equal(a[k], b[k]) for k in a)
+    return a == b
+
+
+def _closed_pool():
+    return None
+
+
+def _release(memory):
+    while memory != []:
+        item = memory.pop()
+        item.close()
+        item.unlink()
+
+
+def _shutdown(connections, processes, memory):
+    for conn in connections:
+        try:
+            conn.send(("close",))
+        except (OSError, ValueError):
+            pass
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+    for conn in connections:
+        conn.close()
+    _release(memory)
+
+
+def _attach(name):
+    """Attach to the shared memory without tracking, as the parent owns the memory."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # python < 3.13, the tracker is shared with the parent.
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker(connection):
+    """The worker process loop. The worker holds a chunk of the packed spin systems and
+    the method, and writes the simulated spectra into the shared memory buffer."""
+    state = _WorkerState()
+    while True:
+        try:
+            command, *args = connection.recv()
+        except EOFError:
+            break
+        if command == "close":
+            break
+        reply = state.execute(command, *args)
+        if command == "run":
+            connection.send(reply)
+    state.close()
+    connection.close()
+
+
+class _WorkerState:
+    """The state of a worker process."""
+
+    def __init__(self):
+        self.spin_systems = None
+        self.method = None
+        self.memory = None
+        self.error = None
+
+    def execute(self, command, *args):
+        """Execute the command. Returns None on success, otherwise, the traceback. An
+        error from a command without a reply is reported on the next run."""
+        try:
+            if self.error is not None and command == "run":
+                raise RuntimeError(self.error)
+            getattr(self, command)(*args)
+        except Exception:
+            self.error = None if command == "run" else traceback.format_exc()
+            return traceback.format_exc()
+
+    def set_spin_systems(self, spin_systems):
+        self.spin_systems = spin_systems
+
+    def update(self, delta):
+        for key, value in delta.items():
+            setattr(self.spin_systems, key, value)
+
+    def run(self, method, kwargs, name, offset):
+        self.method = pickle.loads(method) if method is not None else self.method
+        if self.memory is None or self.memory.name != name:
+            self.close()
+            self.memory = _attach(name)
+        _run(self.method, self.spin_systems, kwargs, self.memory, offset)
+
+    def close(self):
+        if self.memory is not None:
+            self.memory.close()
+            self.memory = None
+
+
+def _run(method, spin_systems, kwargs, memory, offset):
+    size = int(np.prod(method.shape()))
+    n_sys = len(spin_systems)
+    decompose = kwargs["decompose_spectrum"] == 1
+    count = size * (n_sys if decompose else 1)
+    out = np.ndarray(count, dtype=np.float64, buffer=memory.buf, offset=8 * offset)
+
+    if n_sys == 0:
+        out[:] = 0.0
+        return
+
+    amp = one_d_spectrum(method=method, spin_systems=spin_systems, **kwargs)
+    if not decompose:
+        out[:] = amp.ravel()
+        return
+
+    rows = out.reshape(n_sys, -1)
+    for row, item in zip(rows, amp):
+        row[:] = np.ravel(item) if len(item) != 0 else 0.0
@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""Powder orientation averaging schemes from a set of orientations."""
+import warnings
+from functools import lru_cache
+from typing import List
+from typing import Union
+
+import numpy as np
+from pydantic import BaseModel
+from pydantic import validator
+
+from ._lebedev import __lebedev_orbits__
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+# averaging schemes from a set of orientations
+__point_set_schemes__ = ["zcw", "lebedev", "repulsion"]
+
+# the largest number of REPULSION orientations
+__repulsion_max_count__ = 4096
+
+
+class PowderScheme(BaseModel):
+    r"""A user-defined powder averaging scheme from a set of orientations.
+
+    The orientations are given as the azimuthal, :math:`\alpha`, and polar,
+    :math:`\beta`, angles in radians, along with the weight of every orientation. The
+    orientations may cover the sphere, or the upper hemisphere. The spectrum is
+    evaluated by binning the frequencies at every orientation.
+
+    Attributes
+    ----------
+
+    alpha: list of float (required).
+        The azimuthal angles of the orientations in radians.
+
+    beta: list of float (required).
+        The polar angles of the orientations in radians.
+
+    weight: list of float (optional).
+        The weights of the orientations. The weights are normalized in the simulation.
+        The default is None, `i.e.`, equal weights.
+
+    Example
+    -------
+
+    >>> from mrsimulator.simulator.powder import zcw
+    >>> alpha, beta, weight = zcw(144)
+    >>> scheme = PowderScheme(alpha=alpha, beta=beta, weight=weight)
+    >>> len(scheme.alpha)
+    144
+    """
+
+    alpha: List[float]
+    beta: List[float]
+    weight: List[float] = None
+
+    class Config:
+        validate_assignment = True
+
+    @validator("alpha", "beta", "weight", pre=True)
+    def validate_array(cls, v):
+        return v.tolist() if isinstance(v, np.ndarray) else v
+
+    @validator("beta")
+    def validate_beta(cls, v, values):
+        if "alpha" in values and len(v) != len(values["alpha"]):
+            raise ValueError("The length of alpha and beta must be equal.")
+        if len(v) == 0:
+            raise ValueError("Expecting at least one orientation.")
+        return v
+
+    @validator("weight")
+    def validate_weight(cls, v, values):
+        if v is None:
+            return v
+        if "beta" in values and len(v) != len(values["beta"]):
+            raise ValueError("The length of weight and beta must be equal.")
+        if np.any(np.asarray(v) < 0) or np.sum(v) <= 0:
+            raise ValueError("Expecting non-negative weights with a positive sum.")
+        return v
+
+    def orientations(self) -> tuple:
+        """Return a tuple of the alpha, beta, and weight arrays."""
+        alpha = np.asarray(self.alpha, dtype=np.float64)
+        beta = np.asarray(self.beta, dtype=np.float64)
+        weight = np.ones(alpha.size) if self.weight is None else self.weight
+        return alpha, beta, np.asarray(weight, dtype=np.float64)
+
+
+def _from_vectors(xyz):
+    """Return the alpha and beta angles of unit vectors over the upper hemisphere."""
+    alpha = np.arctan2(xyz[:, 1], xyz[:, 0])
+    beta = np.arccos(np.clip(xyz[:, 2], -1.0, 1.0))
+    return alpha, beta
+
+
+def _fibonacci(count):
+    """Return the smallest Fibonacci number, not less than count, along with the
+    Fibonacci number two steps before."""
+    f = [1, 1]
+    while f[-1] < count or len(f) < 4:
+        f.append(f[-1] + f[-2])
+    return f[-1], f[-3]
+
+
+def zcw(count: int) -> tuple:
+    """Return the Zaremba-Conroy-Wolfsberg (ZCW) orientations over the upper
+    hemisphere. The number of orientations is the smallest Fibonacci number, not less
+    than count.
+
+    Args:
+        int count: The minimum number of orientations.
+
+    Returns:
+        A tuple of the alpha, beta, and weight arrays.
+
+    Example
+    -------
+
+    >>> alpha, beta, weight = zcw(100)
+    >>> alpha.size
+    144
+    """
+    n, g = _fibonacci(count)
+    j = np.arange(n)
+    alpha = 2 * np.pi * np.mod(j * g / n, 1.0)
+    beta = np.arccos(1.0 - (j + 0.5) / n)
+    return alpha, beta, np.full(n, 1.0 / n)
+
+
+def _lebedev_orbit(kind, *parameters):
+    """Return the unit vectors of an orbit of the octahedral group, as in the
+    Lebedev-Laikov generators. The orbits are a1 (1,0,0), a2 (0,l,l), a3 (l,l,l),
+    b (l,l,m), c (p,q,0), and d (r,s,t)."""
+    if kind == "a1":
+        points = [(1.0, 0.0, 0.0)]
+    elif kind == "a2":
+        points = [(0.0, np.sqrt(0.5), np.sqrt(0.5))]
+    elif kind == "a3":
+        points = [(np.sqrt(1 / 3), np.sqrt(1 / 3), np.sqrt(1 / 3))]
+    elif kind == "b":
+        (l,) = parameters
+        points = [(l, l, np.sqrt(1 - 2 * l * l))]
+    elif kind == "c":
+        (p,) = parameters
+        points = [(p, np.sqrt(1 - p * p), 0.0)]
+    else:
+        r, s = parameters
+        points = [(r, s, np.sqrt(1 - r * r - s * s))]
+
+    x = np.asarray(points[0])
+    perms = [(0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0)]
+    signs = np.array(np.meshgrid([1, -1], [1, -1], [1, -1])).reshape(3, -1).T
+    orbit = np.asarray([x[list(p)] * s for p in perms for s in signs])
+    return np.unique(orbit.round(15) + 0.0, axis=0)
+
+
+def lebedev(count: int) -> tuple:
+    """Return the Lebedev orientations over the upper hemisphere. The Lebedev
+    quadrature is exact for the spherical harmonics up to a given degree. The
+    orientations from the lower hemisphere are folded onto the upper hemisphere, with
+    the weight of the inverted orientation. The rule with the smallest number of
+    orientations, not less than count, over the hemisphere is returned. When count
+    exceeds the largest rule, the largest rule is returned with a warning.
+
+    Args:
+        int count: The minimum number of orientations.
+
+    Returns:
+        A tuple of the alpha, beta, and weight arrays.
+
+    Example
+    -------
+
+    >>> alpha, beta, weight = lebedev(100)
+    >>> alpha.size
+    151
+    """
+    for n in sorted(__lebedev_orbits__):
+        rule = _lebedev_hemisphere(n)
+        if rule[0].size >= count:
+            break
+    else:
+        warnings.warn(
+            f"The Lebedev scheme supports at most {rule[0].size} orientations, "
+            f"requested {count}. Using the largest Lebedev rule. Use an integration "
+            f"density of at most {max_integration_density('lebedev')} to silence the "
+            "warning.",
+            UserWarning,
+        )
+    return tuple(item.copy() for item in rule)
+
+
+@lru_cache(maxsize=None)
+def _lebedev_hemisphere(n):
+    """Return the alpha, beta, and weight arrays of the Lebedev rule of n points,
+    folded onto the upper hemisphere."""
+    xyz, weight = [], []
+    for kind, w, *parameters in __lebedev_orbits__[n]:
+        orbit = _lebedev_orbit(kind, *parameters)
+        xyz.append(orbit)
+        weight.append(np.full(orbit.shape[0], w))
+    xyz, weight = np.concatenate(xyz), np.concatenate(weight)
+
+    # keep the upper hemisphere, and half of the equator, at twice the weight.
+    upper = (xyz[:, 2] > 0) | (
+        (xyz[:, 2] == 0) & ((xyz[:, 1] > 0) | ((xyz[:, 1] == 0) & (xyz[:, 0] > 0)))
+    )
+    alpha, beta = _from_vectors(xyz[upper])
+    return alpha, beta, 2 * weight[upper]
+
+
+def _inverse_cube_root_square(d2):
+    """Return 1/d^3 from the squared distances, d^2, in place."""
+    d2 *= np.sqrt(d2)
+    return np.reciprocal(d2, out=d2)
+
+
+def repulsion(count: int, iterations: int = 20) -> tuple:
+    """Return the REPULSION orientations over the upper hemisphere. Starting from a
+    spiral, the orientations are evolved to minimize the electrostatic energy of the
+    orientations and their inversion images on the sphere, following Bak and Nielsen,
+    J. Magn. Reson. 125, 132 (1997). The orientations have equal weights.
+
+    Args:
+        int count: The number of orientations, at most 4096.
+        int iterations: The number of steepest descent iterations.
+
+    Returns:
+        A tuple of the alpha, beta, and weight arrays.
+
+    Example
+    -------
+
+    >>> alpha, beta, weight = repulsion(100)
+    >>> alpha.size
+    100
+    """
+    if count > __repulsion_max_count__:
+        raise ValueError(
+            f"The REPULSION scheme supports at most {__repulsion_max_count__} "
+            f"orientations, requested {count}. Use a lower integration density."
+        )
+    j = np.arange(count) + 0.5
+    z = 1.0 - j / count
+    phi = np.pi * (3.0 - np.sqrt(5.0)) * j
+    r = np.sqrt(1.0 - z * z)
+    xyz = np.column_stack([r * np.cos(phi), r * np.sin(phi), z])
+
+    # step size relative to the mean separation of the orientations.
+    step = np.sqrt(2 * np.pi / count)
+    for _ in range(iterations):
+        # the squared distances to the orientations and their inversion images are
+        # 2 - 2 cos(θ) and 2 + 2 cos(θ), where θ is the angle between orientations.
+        cosine = np.clip(xyz @ xyz.T, -1.0, 1.0)
+        np.fill_diagonal(cosine, 0.0)
+        direct = _inverse_cube_root_square(2.0 - 2.0 * cosine)
+        image = _inverse_cube_root_square(2.0 + 2.0 * cosine)
+        np.fill_diagonal(direct, 0.0)
+        total = direct.sum(axis=1) + image.sum(axis=1)
+        direct -= image
+        force = xyz * total[:, None] - direct @ xyz
+
+        # project the force on the tangent plane and take a normalized step.
+        force -= np.sum(force * xyz, axis=1)[:, None] * xyz
+        norm = np.linalg.norm(force, axis=1).max()
+        if norm == 0:
+            break
+        xyz += (0.1 * step / norm) * force
+        xyz /= np.linalg.norm(xyz, axis=1)[:, None]
+
+    xyz[xyz[:, 2] < 0] *= -1
+    alpha, beta = _from_vectors(xyz)
+    return alpha, beta, np.full(count, 1.0 / count)
+
+
+def max_integration_density(averaging_scheme) -> int:
+    """Return the largest integration density of the named scheme from a set of
+    orientations, for which the number of orientations, (density + 1)(density + 2)/2, is
+    within the largest rule of the scheme, or None when the scheme has no limit.
+
+    Example
+    -------
+
+    >>> max_integration_density('lebedev')
+    19
+    >>> max_integration_density('repulsion')
+    89
+    """
+    if averaging_scheme == "lebedev":
+        count = _lebedev_hemisphere(max(__lebedev_orbits__))[0].size
+    elif averaging_scheme == "repulsion":
+        count = __repulsion_max_count__
+    else:
+        return None
+    return int((np.sqrt(8 * count + 1) - 3) // 2)
+
+
+def get_orientations(averaging_scheme: Union[str, dict, PowderScheme], density: int):
+    """Return the alpha, beta, and weight arrays of the averaging scheme from a set of
+    orientations.
+
+    Args:
+        averaging_scheme: One of `zcw`, `lebedev`, or `repulsion`, a PowderScheme
+            object, or the equivalent dict object.
+        int density: The integration density. The named schemes have at least as many
+            orientations as the octahedron scheme over an octant, that is,
+            (density + 1)(density + 2)/2.
+
+    Returns:
+        A tuple of the alpha, beta, and weight arrays.
+    """
+    if isinstance(averaging_scheme, dict):
+        averaging_scheme = PowderScheme(**averaging_scheme)
+    if isinstance(averaging_scheme, PowderScheme):
+        return averaging_scheme.orientations()
+
+    if averaging_scheme not in __point_set_schemes__:
+        raise ValueError(
+            "Expecting the averaging scheme to be one of `octahedron`, `zcw`, "
+            f"`lebedev`, `repulsion`, or a PowderScheme, found {averaging_scheme}."
+        )
+    count = (int(density) + 1) * (int(density) + 2) // 2
+    return _named_orientations(averaging_scheme, count)
+
+
+def get_orientations_count(averaging_scheme, density: int) -> int:
+    """Return the number of orientations of the averaging scheme from a set of
+    orientations, see `get_orientations`, without generating the orientations."""
+    if isinstance(averaging_scheme, dict):
+        return len(averaging_scheme["alpha"])
+    if isinstance(averaging_scheme, PowderScheme):
+        return len(averaging_scheme.alpha)
+
+    count = (int(density) + 1) * (int(density) + 2) // 2
+    if averaging_scheme == "zcw":
+        return _fibonacci(count)[0]
+    if averaging_scheme == "lebedev":
+        return lebedev(count)[0].size
+    return count
+
+
+@lru_cache(maxsize=16)
+def _named_orientations(name, count):
+    """Cached orientations of the named schemes. The arrays are shared between calls,
+    and must not be modified."""
+    return {"zcw": zcw, "lebedev": lebedev, "repulsion": repulsion}[name](count)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""A memory-bounded cache of the spectra from individual spin systems."""
+import hashlib
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+# default upper bound of the cache memory, in bytes.
+__default_max_memory__ = 256 * 1024 * 1024
+
+# number of incremental updates of a total spectrum before the total is summed afresh,
+# which bounds the accumulation of the round-off errors.
+__max_incremental_updates__ = 64
+
+
+class SpectrumCache:
+    """A least recently used cache of the spectra from individual spin systems.
+
+    The spectra are cached per method and spin system at unit abundance, keyed by a
+    content hash of the method, the simulation configuration, and the spin system. The
+    total spectrum of the last run is kept per method. A subsequent run only simulates
+    the spin systems with a new hash, and updates the total spectrum by subtracting the
+    old and adding the new contributions of the modified spin systems.
+
+    Args:
+        int max_memory: The upper bound of the memory used by the cached spectra, in
+            bytes. The least recently used spectra are evicted beyond this bound.
+    """
+
+    def __init__(self, max_memory: int = __default_max_memory__):
+        self.max_memory = max_memory
+        self.memory = 0
+        self._items = OrderedDict()
+        self._digests = (None, None)
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        """Remove all cached spectra."""
+        self._items.clear()
+        self._digests = (None, None)
+        self.memory = 0
+
+    def simulate(self, method, spin_systems, kwargs, simulate):
+        """Return the spectrum of the method, simulating only the spin systems that are
+        not cached.
+
+        Args:
+            method: The Method object.
+            spin_systems: The PackedSpinSystems object.
+            dict kwargs: The keyword arguments of `one_d_spectrum`, including the
+                integer representation of the simulation configuration.
+            simulate: A callable, `simulate(indexes)`, returning a list of spectra at
+                unit abundance from the spin systems at the given indexes.
+
+        Returns:
+            A ndarray with the spectrum, or a list of spectra per spin system when the
+            value of the `decompose_spectrum` keyword is 1.
+        """
+        decompose = kwargs["decompose_spectrum"] == 1
+        method_key = _method_digest(method, kwargs)
+        keys = self._get_digests(spin_systems)
+        abundance = spin_systems.abundance
+
+        changed, old_units = None, None
+        state = self._get((method_key, None))
+        updates = 0
+        if not decompose and state is not None and len(state[0]) == len(keys):
+            old_keys, old_abundance, total, updates = state
+            changed = [
+                i
+                for i, key in enumerate(keys)
+                if key != old_keys[i] or abundance[i] != old_abundance[i]
+            ]
+            old_units = [self._get((method_key, old_keys[i])) for i in changed]
+            if updates >= __max_incremental_updates__ or any(
+                item is None for item in old_units
+            ):
+                changed, updates = None, 0
+
+        index = range(len(keys)) if changed is None else changed
+        units = self._get_units(method_key, keys, index, simulate)
+
+        if decompose:
+            return [_scale(units[i], abundance[i]) for i in index]
+
+        if changed is None:
+            total = np.zeros(method.shape())
+            for i in index:
+                _add(total, units[i], abundance[i])
+        else:
+            total, updates = total.copy(), updates + 1
+            for i, old in zip(changed, old_units):
+                _add(total, old, -old_abundance[i])
+                _add(total, units[i], abundance[i])
+
+        self._set((method_key, None), (keys, abundance.copy(), total, updates))
+        return total.copy()
+
+    def _get_digests(self, spin_systems):
+        """Return the content hashes of the spin systems. The hashes are re-used while
+        the same PackedSpinSystems object is passed. The Simulator passes the same
+        object until a spin system, site, or coupling is modified, so that a run
+        without modifications hashes none of the spin systems."""
+        packed, digests = self._digests
+        if packed is not spin_systems:
+            digests = spin_systems.digests()
+            self._digests = (spin_systems, digests)
+        return digests
+
+    def _get_units(self, method_key, keys, index, simulate):
+        """Return a dict of the unit abundance spectra of the spin systems at index,
+        simulating the spin systems that are not cached. Identical spin systems are
+        simulated once."""
+        units, missing = {}, {}
+        for i in index:
+            item = self._get((method_key, keys[i]))
+            if item is None:
+                missing.setdefault(keys[i], []).append(i)
+            else:
+                units[i] = item
+
+        if missing != {}:
+            spectra = simulate([item[0] for item in missing.values()])
+            for (key, lst), spectrum in zip(missing.items(), spectra):
+                spectrum = np.asarray(spectrum, dtype=np.float64)
+                self._set((method_key, key), spectrum)
+                units.update({i: spectrum for i in lst})
+        return units
+
+    def _get(self, key):
+        item = self._items.get(key, None)
+        if item is not None:
+            self._items.move_to_end(key)
+        return item
+
+    def _set(self, key, value):
+        if key in self._items:
+            self.memory -= _nbytes(self._items.pop(key))
+        size = _nbytes(value)
+        if size > self.max_memory:
+            return
+        self._items[key] = value
+        self.memory += size
+        while self.memory > self.max_memory:
+            _, item = self._items.popitem(last=False)
+            self.memory -= _nbytes(item)
+
+
+def _method_digest(method, kwargs):
+    """Return a content hash of the method and the keyword arguments, excluding the
+    simulation results and the `decompose_spectrum` and `verbose` keywords."""
+    method = method.copy(update={"simulation": None, "experiment": None}).dict()
+    kwargs = sorted(
+        (key, value)
+        for key, value in kwargs.items()
+        if key not in ["decompose_spectrum", "verbose"]
+    )
+    return hashlib.blake2b(pickle.dumps((method, kwargs)), digest_size=16).digest()
+
+
+def _nbytes(item):
+    if isinstance(item, np.ndarray):
+        return item.nbytes
+    if isinstance(item, tuple):
+        return sum(_nbytes(value) for value in item)
+    return 0
+
+
+def _add(total, spectrum, abundance):
+    if spectrum.size != 0:
+        total += spectrum * abundance
+
+
+def _scale(spectrum, abundance):
+    """Return the spectrum scaled by the abundance, or an empty list if the spin system
+    does not contribute to the spectrum."""
+    return spectrum * abundance if spectrum.size != 0 else []
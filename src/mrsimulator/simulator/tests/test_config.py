@@ -33,6 +33,27 @@ def test_config():
     with pytest.raises(ValueError, match=f".*{error}.*"):
         a.config.number_of_sidebands = 0
 
+    a.config.number_of_sidebands = "auto"
+    assert a.config.get_int_dict()["number_of_sidebands"] == -1
+    a.config.number_of_sidebands = 10
+
+    # sideband amplitude threshold
+    assert a.config.sideband_amplitude_threshold == 0
+    a.config.sideband_amplitude_threshold = 1e-8
+    assert a.config.sideband_amplitude_threshold == 1e-8
+
+    error = "ensure this value is greater than or equal to 0"
+    with pytest.raises(ValueError, match=f".*{error}.*"):
+        a.config.sideband_amplitude_threshold = -1
+
+    # sideband pair threshold
+    assert a.config.sideband_pair_threshold == 0
+    a.config.sideband_pair_threshold = 1e-6
+    assert a.config.sideband_pair_threshold == 1e-6
+
+    with pytest.raises(ValueError, match=f".*{error}.*"):
+        a.config.sideband_pair_threshold = -1
+
     # integration density
     assert a.config.integration_density == 70
     a.config.integration_density = 20
@@ -46,10 +67,28 @@ def test_config():
     with pytest.raises(ValueError, match=f".*{error}.*"):
         a.config.integration_density = {}
 
+    a.config.integration_density = "auto"
+    assert a.config.integration_density == "auto"
+    assert a.config.get_int_dict()["integration_density"] == -1
+    assert a.config.get_orientations_count() == 257 * 258 / 2
+    a.config.integration_density = 20
+
+    assert a.config.integration_density_tolerance == 0.002
+    a.config.integration_density_tolerance = 0.01
+    assert a.config.integration_density_tolerance == 0.01
+
+    error = "ensure this value is greater than 0"
+    with pytest.raises(ValueError, match=f".*{error}.*"):
+        a.config.integration_density_tolerance = 0
+
     # integration volume
     assert a.config.integration_volume == "octant"
     a.config.integration_volume = "hemisphere"
     assert a.config.integration_volume == "hemisphere"
+    a.config.integration_volume = "auto"
+    assert a.config.integration_volume == "auto"
+    assert a.config.get_int_dict()["integration_volume"] == -1
+    a.config.integration_volume = "hemisphere"
 
     error = "unexpected value; permitted: 'octant', 'hemisphere'"
     with pytest.raises(ValueError, match=f".*{error}.*"):
@@ -64,19 +103,38 @@ def test_config():
     with pytest.raises(ValueError, match=f".*{error}.*"):
         a.config.decompose_spectrum = "haha"
 
+    # precision
+    assert a.config.precision == "double"
+    a.config.precision = "single"
+    assert a.config.precision == "single"
+
+    error = "unexpected value; permitted: 'double', 'single'"
+    with pytest.raises(ValueError, match=f".*{error}.*"):
+        a.config.precision = "half"
+
     # overall
     assert a.config.dict() == {
         "decompose_spectrum": "spin_system",
+        "averaging_scheme": "octahedron",
         "number_of_sidebands": 10,
+        "sideband_amplitude_threshold": 1e-8,
+        "sideband_pair_threshold": 1e-6,
         "integration_volume": "hemisphere",
         "integration_density": 20,
+        "integration_density_tolerance": 0.01,
+        "precision": "single",
     }
 
     assert a.config.get_int_dict() == {
         "decompose_spectrum": 1,
+        "averaging_scheme": "octahedron",
         "number_of_sidebands": 10,
+        "sideband_amplitude_threshold": 1e-8,
+        "sideband_pair_threshold": 1e-6,
         "integration_volume": 1,
         "integration_density": 20,
+        "integration_density_tolerance": 0.01,
+        "precision": 1,
     }
 
     assert b != a
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Test for the automatic integration density per spin system."""
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.methods import BlochDecayCTSpectrum
+from mrsimulator.methods import BlochDecaySpectrum
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def setup_simulator(method):
+    csa = [{"zeta": zeta, "eta": 0.3} for zeta in [1, 20, 200]]
+    quad = [{"Cq": Cq, "eta": 0.2} for Cq in [1e6, 4e6]]
+    spin_systems = [
+        SpinSystem(sites=[Site(isotope="13C", shielding_symmetric=item)], abundance=i)
+        for i, item in enumerate(csa, start=1)
+    ]
+    spin_systems += [
+        SpinSystem(sites=[Site(isotope="27Al", quadrupolar=item)], abundance=i)
+        for i, item in enumerate(quad, start=1)
+    ]
+    return Simulator(spin_systems=spin_systems, methods=[method])
+
+
+def run(sim, density, decompose="none", volume="octant"):
+    sim.config.integration_density = density
+    sim.config.integration_volume = volume
+    sim.config.decompose_spectrum = decompose
+    sim.run(pack_as_csdm=False)
+    return sim.methods[0].simulation
+
+
+methods = [
+    BlochDecaySpectrum(
+        channels=["13C"],
+        spectral_dimensions=[{"count": 1024, "spectral_width": 60000}],
+    ),
+    BlochDecayCTSpectrum(
+        channels=["27Al"],
+        rotor_frequency=5000,
+        spectral_dimensions=[{"count": 1024, "spectral_width": 100000}],
+    ),
+]
+
+
+def test_integration_densities():
+    sim = setup_simulator(methods[0])
+    assert sim.get_integration_densities() == [70] * 5
+
+    sim.config.integration_density = "auto"
+    densities = sim.get_integration_densities()
+    assert densities[0] < densities[1] < densities[2]
+    # the 27Al sites are not observed.
+    assert densities[3] == densities[4] == 23
+
+    sim.config.integration_density_tolerance = 0.0005
+    assert all(np.asarray(sim.get_integration_densities()) > densities)
+
+    sim.methods.append(methods[1])
+    assert sim.get_integration_densities(method_index=0)[3:] == [45, 45]
+    densities = sim.get_integration_densities()
+    assert densities[3] < densities[4]
+
+
+@pytest.mark.parametrize("volume", ["octant", "auto"])
+@pytest.mark.parametrize("decompose", ["none", "spin_system"])
+@pytest.mark.parametrize("method", methods)
+def test_auto_integration_density(method, decompose, volume):
+    sim = setup_simulator(method)
+    sim.config.integration_density = "auto"
+    densities = sim.get_integration_densities()
+
+    auto = run(sim, "auto", decompose, volume)
+    spin_systems = sim.spin_systems
+    expected = []
+    for sys, density in zip(spin_systems, densities):
+        sim.spin_systems = [sys]
+        expected.append(run(sim, density, "spin_system", volume)[0])
+    sim.spin_systems = spin_systems
+
+    if decompose == "none":
+        total = sum(item for item in expected if len(item) != 0)
+        np.testing.assert_allclose(auto[0], total, rtol=1e-10, atol=1e-12)
+        return
+
+    for item1, item2 in zip(auto, expected):
+        assert len(item1) == len(item2)
+        if len(item1) != 0:
+            np.testing.assert_allclose(item1, item2, rtol=1e-10, atol=1e-12)
+
+
+@pytest.mark.parametrize("method", methods)
+def test_auto_integration_density_error(method):
+    sim = setup_simulator(method)
+    reference = run(sim, 200)
+    for tolerance in [0.01, 0.002]:
+        sim.config.integration_density_tolerance = tolerance
+        auto = run(sim, "auto")
+        error = np.abs(auto - reference).sum() / np.abs(reference).sum()
+        assert error < tolerance
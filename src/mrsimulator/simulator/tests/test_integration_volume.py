@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Test for the automatic integration volume per spin system."""
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.methods import BlochDecayCTSpectrum
+from mrsimulator.methods import ThreeQ_VAS
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def site(beta=0, gamma=0, eta=0.3):
+    return Site(
+        isotope="27Al",
+        isotropic_chemical_shift=10,
+        shielding_symmetric={"zeta": 80, "eta": eta, "beta": beta},
+        quadrupolar={"Cq": 3e6, "eta": 0.2, "gamma": gamma},
+    )
+
+
+def setup_simulator(method):
+    spin_systems = [
+        SpinSystem(sites=[site()], abundance=10),
+        SpinSystem(sites=[site(beta=0.5)], abundance=20),
+        SpinSystem(sites=[site(gamma=0.7)], abundance=30),
+        SpinSystem(sites=[site(eta=0)], abundance=40),
+        SpinSystem(sites=[Site(isotope="1H")], abundance=5),
+    ]
+    sim = Simulator(spin_systems=spin_systems, methods=[method])
+    sim.config.integration_density = 30
+    return sim
+
+
+def run(sim, volume, decompose):
+    sim.config.integration_volume = volume
+    sim.config.decompose_spectrum = decompose
+    sim.run(pack_as_csdm=False)
+    return sim.methods[0].simulation
+
+
+methods = [
+    BlochDecayCTSpectrum(
+        channels=["27Al"],
+        rotor_frequency=0,
+        spectral_dimensions=[{"count": 512, "spectral_width": 80000}],
+    ),
+    BlochDecayCTSpectrum(
+        channels=["27Al"],
+        rotor_frequency=3000,
+        spectral_dimensions=[{"count": 512, "spectral_width": 80000}],
+    ),
+    ThreeQ_VAS(
+        channels=["27Al"],
+        spectral_dimensions=[
+            {"count": 32, "spectral_width": 20000},
+            {"count": 32, "spectral_width": 40000},
+        ],
+    ),
+]
+
+
+@pytest.mark.parametrize("decompose", ["none", "spin_system"])
+@pytest.mark.parametrize("method", methods)
+def test_auto_integration_volume(method, decompose):
+    sim = setup_simulator(method)
+    assert sim.get_integration_volumes() == ["octant"] * 5
+    sim.config.integration_volume = "auto"
+    assert sim.get_integration_volumes() == [
+        "octant",
+        "hemisphere",
+        "hemisphere",
+        "octant",
+        "octant",
+    ]
+
+    auto = run(sim, "auto", decompose)
+    hemisphere = run(sim, "hemisphere", decompose)
+    assert len(auto) == len(hemisphere)
+    for item1, item2 in zip(auto, hemisphere):
+        np.testing.assert_allclose(item1, item2, rtol=1e-10, atol=1e-12)
+
+    # a single group of spin systems.
+    sim.spin_systems = [sim.spin_systems[i] for i in [0, 3]]
+    np.testing.assert_allclose(
+        run(sim, "auto", decompose), run(sim, "octant", decompose), atol=1e-12
+    )
+
+
+def test_auto_integration_volume_run_iter():
+    sim = setup_simulator(methods[1])
+    sim.config.integration_volume = "hemisphere"
+    expected = np.concatenate([item for _, item in sim.run_iter(batch_size=2)])
+
+    sim.config.integration_volume = "auto"
+    spectra = np.concatenate([item for _, item in sim.run_iter(batch_size=2)])
+    np.testing.assert_allclose(spectra, expected, rtol=1e-10, atol=1e-12)
+
+    sim.spin_systems = []
+    assert run(sim, "auto", "none").sum() == 0
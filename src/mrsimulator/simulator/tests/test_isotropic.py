@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Test for the direct binning of spin systems with only isotropic interactions."""
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.base_model import _isotropic_spin_systems
+from mrsimulator.methods import BlochDecayCTSpectrum
+from mrsimulator.methods import BlochDecaySpectrum
+from mrsimulator.spin_system.packing import PackedSpinSystems
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def spin_systems(isotope, zeta, n=20):
+    """Spin systems with isotropic shifts over and beyond the spectral window. A tiny
+    zeta routes the spin systems through the powder averaging."""
+    shifts = np.linspace(-120, 120, n)
+    shifts[:3] = [0, 0.125, -200]
+    systems = [
+        SpinSystem(
+            sites=[
+                Site(
+                    isotope=isotope,
+                    isotropic_chemical_shift=shift,
+                    shielding_symmetric={"zeta": zeta, "eta": 0},
+                )
+            ],
+            abundance=i + 1,
+        )
+        for i, shift in enumerate(shifts)
+    ]
+    # uncoupled multi-site spin system
+    systems.append(
+        SpinSystem(
+            sites=[
+                Site(isotope=isotope, isotropic_chemical_shift=10.3),
+                Site(isotope=isotope, isotropic_chemical_shift=-20.7),
+                Site(isotope="1H", isotropic_chemical_shift=5),
+            ],
+        )
+    )
+    return systems
+
+
+def simulate(isotope, zeta, method, decompose, volume="octant"):
+    sim = Simulator(spin_systems=spin_systems(isotope, zeta), methods=[method])
+    sim.config.integration_density = 25
+    sim.config.integration_volume = volume
+    sim.config.decompose_spectrum = decompose
+    sim.run(pack_as_csdm=False)
+    return sim.methods[0].simulation
+
+
+@pytest.mark.parametrize("decompose", ["none", "spin_system"])
+@pytest.mark.parametrize(
+    "isotope, rotor_frequency, volume",
+    [
+        ("13C", 0, "octant"),
+        ("13C", 1000, "hemisphere"),
+        ("29Si", 2000, "octant"),
+        ("27Al", 0, "octant"),
+        ("17O", 5000, "hemisphere"),
+    ],
+)
+def test_isotropic_binning(isotope, rotor_frequency, volume, decompose):
+    method = BlochDecaySpectrum(
+        channels=[isotope],
+        rotor_frequency=rotor_frequency,
+        spectral_dimensions=[
+            {"count": 256, "spectral_width": 20000, "reference_offset": 500}
+        ],
+    )
+    binned = simulate(isotope, 0, method, decompose, volume)
+    averaged = simulate(isotope, 1e-14, method, decompose, volume)
+    for item1, item2 in zip(binned, averaged):
+        np.testing.assert_allclose(item1, item2, rtol=1e-10, atol=1e-12)
+
+
+def test_isotropic_binning_central_transition():
+    method = BlochDecayCTSpectrum(
+        channels=["27Al"],
+        spectral_dimensions=[{"count": 512, "spectral_width": 50000}],
+    )
+    binned = simulate("27Al", 0, method, "none")
+    averaged = simulate("27Al", 1e-14, method, "none")
+    np.testing.assert_allclose(binned, averaged, rtol=1e-10, atol=1e-12)
+
+
+def test_isotropic_spin_systems():
+    systems = [
+        SpinSystem(sites=[Site(isotope="13C")]),
+        SpinSystem(sites=[Site(isotope="13C", shielding_symmetric={"zeta": 5})]),
+        SpinSystem(sites=[Site(isotope="27Al", quadrupolar={"Cq": 1e6})]),
+        SpinSystem(sites=[]),
+        SpinSystem(
+            sites=[Site(isotope="13C"), Site(isotope="1H")],
+            couplings=[{"site_index": [0, 1], "isotropic_j": 10}],
+        ),
+    ]
+    packed = PackedSpinSystems(systems)
+    np.testing.assert_equal(
+        _isotropic_spin_systems(packed, 0.5), [True, False, True, True, False]
+    )
+    np.testing.assert_equal(
+        _isotropic_spin_systems(packed, 2.5), [True, False, False, True, False]
+    )
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""Test for the automatic number of sidebands and the sideband amplitude pruning."""
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.base_model import one_d_spectrum
+from mrsimulator.base_model import simulate_methods
+from mrsimulator.methods import BlochDecayCTSpectrum
+from mrsimulator.methods import BlochDecaySpectrum
+from mrsimulator.methods import Method2D
+from mrsimulator.simulator.config import _auto_number_of_sidebands
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def csa_system():
+    site = Site(isotope="13C", shielding_symmetric={"zeta": 80, "eta": 0.4})
+    return SpinSystem(sites=[site])
+
+
+def quad_system():
+    site = Site(isotope="27Al", quadrupolar={"Cq": 2e6, "eta": 0.3})
+    return SpinSystem(sites=[site])
+
+
+methods = [
+    BlochDecaySpectrum(
+        channels=["13C"],
+        rotor_frequency=1000,
+        spectral_dimensions=[{"count": 1024, "spectral_width": 40000}],
+    ),
+    BlochDecaySpectrum(
+        channels=["27Al"],
+        rotor_frequency=20000,
+        spectral_dimensions=[{"count": 2048, "spectral_width": 1e6}],
+    ),
+]
+
+
+def mqmas_method():
+    def events(p):
+        return [{"rotor_frequency": 5000, "transition_query": {"P": [p], "D": [0]}}]
+
+    return Method2D(
+        channels=["87Rb"],
+        magnetic_flux_density=9.4,
+        spectral_dimensions=[
+            {"count": 64, "spectral_width": 80000, "events": events(-3)},
+            {"count": 128, "spectral_width": 80000, "events": events(-1)},
+        ],
+    )
+
+
+def run(sim, sidebands, threshold=0.0, verbose=0, pair_threshold=0.0):
+    sim.config.number_of_sidebands = sidebands
+    sim.config.sideband_amplitude_threshold = threshold
+    sim.config.sideband_pair_threshold = pair_threshold
+    sim.run(pack_as_csdm=False, verbose=verbose)
+    return sim.methods[0].simulation.real
+
+
+def test_auto_number_of_sidebands_sizes():
+    sizes = _auto_number_of_sidebands([0, 10, 30, 100, 1e4])
+    np.testing.assert_equal(sizes, [8, 24, 64, 192, 1024])
+
+
+def test_numbers_of_sidebands():
+    sim = Simulator(spin_systems=[csa_system(), quad_system()], methods=[methods[0]])
+    assert sim.get_numbers_of_sidebands() == [64, 64]
+
+    sim.config.number_of_sidebands = "auto"
+    numbers = sim.get_numbers_of_sidebands()
+    assert numbers[0] > 8
+    # the 27Al site is not observed.
+    assert numbers[1] == 8
+
+    # the satellite transitions span a larger number of sideband orders than the
+    # central transition.
+    sim.methods = [
+        methods[1],
+        BlochDecayCTSpectrum(
+            channels=["27Al"],
+            rotor_frequency=20000,
+            spectral_dimensions=[{"count": 2048, "spectral_width": 1e5}],
+        ),
+    ]
+    ST = sim.get_numbers_of_sidebands(method_index=0)[1]
+    CT = sim.get_numbers_of_sidebands(method_index=1)[1]
+    assert ST > CT
+    assert sim.get_numbers_of_sidebands()[1] == ST
+
+
+@pytest.mark.parametrize(
+    "method, spin_system", [(methods[0], csa_system()), (methods[1], quad_system())]
+)
+def test_auto_number_of_sidebands(method, spin_system):
+    sim = Simulator(spin_systems=[spin_system], methods=[method])
+    reference = run(sim, 1024)
+    auto = run(sim, "auto")
+    assert sim.get_numbers_of_sidebands()[0] < 1024
+    error = np.abs(auto - reference).sum() / np.abs(reference).sum()
+    assert error < 1e-5
+
+
+@pytest.mark.parametrize(
+    "method, spin_system", [(methods[0], csa_system()), (methods[1], quad_system())]
+)
+def test_sideband_amplitude_threshold(method, spin_system):
+    sim = Simulator(spin_systems=[spin_system], methods=[method])
+    reference = run(sim, 256, threshold=0.0)
+    pruned = run(sim, 256, threshold=1e-8)
+    np.testing.assert_allclose(pruned, reference, atol=1e-6 * reference.max())
+
+    # a large threshold removes the weak sidebands.
+    pruned = run(sim, 256, threshold=1e-2)
+    assert np.count_nonzero(pruned) < np.count_nonzero(reference)
+    assert np.abs(pruned - reference).sum() / np.abs(reference).sum() < 0.05
+
+
+def test_sideband_pair_threshold():
+    site = Site(isotope="87Rb", quadrupolar={"Cq": 3.5e6, "eta": 0.36})
+    sim = Simulator(spin_systems=[SpinSystem(sites=[site])], methods=[mqmas_method()])
+    reference = run(sim, 32)
+    pruned = run(sim, 32, pair_threshold=1e-8)
+    np.testing.assert_allclose(pruned, reference, atol=1e-6 * reference.max())
+
+    # a large threshold removes the weak pairs of sideband orders.
+    pruned = run(sim, 32, pair_threshold=1e-3)
+    assert np.count_nonzero(pruned) < np.count_nonzero(reference)
+    assert np.abs(pruned - reference).sum() / np.abs(reference).sum() < 0.05
+
+    # the sideband amplitude threshold does not apply to the pairs.
+    np.testing.assert_equal(run(sim, 32, threshold=1e-3), reference)
+
+
+def skipped_intensity(output):
+    line = [item for item in output.splitlines() if "Skipped sideband" in item][0]
+    return float(line.split("=")[-1])
+
+
+rb_system = SpinSystem(sites=[Site(isotope="87Rb", quadrupolar={"Cq": 3.5e6})])
+
+
+@pytest.mark.parametrize(
+    "method, spin_system, name",
+    [
+        (methods[0], csa_system(), "threshold"),
+        (mqmas_method(), rb_system, "pair_threshold"),
+    ],
+)
+def test_skipped_sideband_intensity(method, spin_system, name, capsys):
+    sim = Simulator(spin_systems=[spin_system], methods=[method])
+    reference = run(sim, 32, verbose=1)
+    assert skipped_intensity(capsys.readouterr().out) == 0
+
+    # the skipped intensity is the intensity missing from the pruned spectrum.
+    pruned = run(sim, 32, verbose=1, **{name: 1e-2})
+    skipped = skipped_intensity(capsys.readouterr().out)
+    missing = (reference - pruned).sum() / reference.sum()
+    assert skipped > 0
+    assert skipped == pytest.approx(missing, rel=0.1)
+
+
+def test_return_sideband_intensity():
+    kwargs = dict(number_of_sidebands=32, integration_volume=0)
+    spectra, intensity = simulate_methods(
+        [methods[0], mqmas_method()],
+        [csa_system(), rb_system],
+        return_sideband_intensity=True,
+        **kwargs,
+    )
+    # the intensity is not summed without pruning.
+    np.testing.assert_equal(intensity, np.zeros((2, 2)))
+
+    pruned, intensity = simulate_methods(
+        [methods[0], mqmas_method()],
+        [csa_system(), rb_system],
+        sideband_amplitude_threshold=1e-2,
+        sideband_pair_threshold=1e-2,
+        return_sideband_intensity=True,
+        **kwargs,
+    )
+    for reference, amp, (skipped, total) in zip(spectra, pruned, intensity):
+        missing = (reference - amp).real.sum() / reference.real.sum()
+        assert skipped > 0
+        assert skipped / total == pytest.approx(missing, rel=0.1)
+
+    # the single method returns the spectrum with its sideband intensity.
+    amp, single = one_d_spectrum(
+        methods[0],
+        [csa_system()],
+        sideband_amplitude_threshold=1e-2,
+        return_sideband_intensity=True,
+        **kwargs,
+    )
+    np.testing.assert_equal(amp, pruned[0])
+    np.testing.assert_equal(single, intensity[0])
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Test for the persistent worker pool."""
+from copy import deepcopy
+
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.methods import BlochDecaySpectrum
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def setup_simulator():
+    spin_systems = [
+        SpinSystem(
+            sites=[
+                Site(
+                    isotope="13C",
+                    isotropic_chemical_shift=i * 10,
+                    shielding_symmetric={"zeta": 20, "eta": 0.1 * i},
+                )
+            ],
+            abundance=i + 1,
+        )
+        for i in range(5)
+    ]
+    spin_systems.append(SpinSystem(sites=[Site(isotope="1H")]))
+    method = BlochDecaySpectrum(
+        channels=["13C"],
+        rotor_frequency=1000,
+        spectral_dimensions=[{"count": 256, "spectral_width": 20000}],
+    )
+    sim = Simulator(spin_systems=spin_systems, methods=[method])
+    sim.config.integration_density = 20
+    return sim
+
+
+def check_against_threads(sim):
+    sim.run(n_jobs=2, backend="processes", pack_as_csdm=False)
+    processes = sim.methods[0].simulation
+    sim.run(pack_as_csdm=False)
+    threads = sim.methods[0].simulation
+    assert len(processes) == len(threads)
+    for item1, item2 in zip(processes, threads):
+        np.testing.assert_allclose(item1, item2, atol=1e-12)
+
+
+def test_pool():
+    sim = setup_simulator()
+    try:
+        check_against_threads(sim)
+        pool = sim._pool
+
+        # update by delta, the pool is re-used.
+        sim.spin_systems[0].sites[0].isotropic_chemical_shift = -20
+        sim.spin_systems[3].abundance = 40
+        check_against_threads(sim)
+        assert sim._pool is pool
+
+        # change in the layout of spin systems and the method.
+        sim.spin_systems.append(SpinSystem(sites=[Site(isotope="13C")]))
+        sim.methods[0].spectral_dimensions[0].count = 128
+        check_against_threads(sim)
+
+        sim.config.decompose_spectrum = "spin_system"
+        check_against_threads(sim)
+        assert sim.methods[0].simulation[5] == []
+
+        # a different number of workers starts a new pool.
+        sim.run(n_jobs=1, backend="processes")
+        assert sim._pool is not pool and pool.closed
+
+        # copies of the simulator do not share the pool.
+        assert deepcopy(sim)._pool is None
+    finally:
+        sim.close_pool()
+    assert sim._pool is None
+
+
+def test_pool_worker_exit():
+    sim = setup_simulator()
+    try:
+        sim.run(n_jobs=2, backend="processes", pack_as_csdm=False)
+        pool = sim._pool
+        pool._processes[0].kill()
+        pool._processes[0].join()
+
+        error = "A worker process exited unexpectedly"
+        with pytest.raises(RuntimeError, match=f".*{error}.*"):
+            sim.run(n_jobs=2, backend="processes")
+        assert pool.closed
+
+        # a closed pool is replaced on the next run.
+        check_against_threads(sim)
+        assert sim._pool is not pool
+    finally:
+        sim.close_pool()
+
+
+def test_pool_errors():
+    sim = setup_simulator()
+    error = "Expecting backend to be 'threads' or 'processes'"
+    with pytest.raises(ValueError, match=f".*{error}.*"):
+        sim.run(backend="dask")
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""Test for the powder averaging schemes from a set of orientations."""
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.base_model import SchemeCache
+from mrsimulator.methods import BlochDecaySpectrum
+from mrsimulator.methods import ThreeQ_VAS
+from mrsimulator.simulator.config import ConfigSimulator
+from mrsimulator.simulator.powder import get_orientations
+from mrsimulator.simulator.powder import lebedev
+from mrsimulator.simulator.powder import max_integration_density
+from mrsimulator.simulator.powder import PowderScheme
+from mrsimulator.simulator.powder import repulsion
+from mrsimulator.simulator.powder import zcw
+from pydantic import ValidationError
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def simulate(method, spin_systems, averaging_scheme, density):
+    sim = Simulator(spin_systems=spin_systems, methods=[method])
+    sim.config.integration_density = density
+    sim.config.integration_volume = "hemisphere"
+    sim.config.averaging_scheme = averaging_scheme
+    sim.run(pack_as_csdm=False)
+    return sim.methods[0].simulation.real
+
+
+def mas_method():
+    return BlochDecaySpectrum(
+        channels=["13C"],
+        rotor_frequency=2000,
+        spectral_dimensions=[{"count": 1024, "spectral_width": 40000}],
+    )
+
+
+def csa_system(shift=0):
+    site = Site(
+        isotope="13C",
+        isotropic_chemical_shift=shift,
+        shielding_symmetric={"zeta": 80, "eta": 0.4},
+    )
+    return [SpinSystem(sites=[site])]
+
+
+@pytest.mark.parametrize(
+    "scheme, density, tolerance",
+    [("zcw", 20, 2e-3), ("lebedev", 10, 1e-3), ("repulsion", 20, 2e-3)],
+)
+def test_sideband_spectrum(scheme, density, tolerance):
+    method = mas_method()
+    reference = simulate(method, csa_system(), "octahedron", 120)
+    spectrum = simulate(method, csa_system(), scheme, density)
+
+    # the weights are normalized, and the total amplitude is independent of the scheme.
+    np.testing.assert_allclose(spectrum.sum(), reference.sum(), rtol=1e-4)
+    error = np.abs(spectrum - reference).sum() / np.abs(reference).sum()
+    assert error < tolerance
+
+
+def test_user_defined_scheme():
+    method = mas_method()
+    alpha, beta, weight = zcw(300)
+    named = simulate(method, csa_system(), "zcw", 23)
+    user = simulate(
+        method, csa_system(), PowderScheme(alpha=alpha, beta=beta, weight=weight), 23
+    )
+    np.testing.assert_allclose(user, named, atol=1e-12)
+
+    # dict object of the scheme
+    user = simulate(method, csa_system(), {"alpha": alpha, "beta": beta}, 23)
+    np.testing.assert_allclose(user, named, atol=1e-12)
+
+
+def test_isotropic_system():
+    method = mas_method()
+    binned, averaged = csa_system(shift=10.5), csa_system(shift=10.5)
+    binned[0].sites[0].shielding_symmetric.zeta = 0
+    averaged[0].sites[0].shielding_symmetric.zeta = 1e-14
+    octahedron = simulate(method, binned, "octahedron", 20)
+    for scheme in ["zcw", "lebedev", "repulsion"]:
+        spectrum = simulate(method, binned, scheme, 10)
+        np.testing.assert_allclose(
+            spectrum, simulate(method, averaged, scheme, 10), atol=1e-10
+        )
+        # the octahedron amplitude at a finite density is slightly below the limit.
+        np.testing.assert_allclose(spectrum, octahedron, rtol=3e-3, atol=1e-10)
+
+
+def test_2D_method():
+    site = Site(isotope="87Rb", quadrupolar={"Cq": 2e6, "eta": 0.5})
+    method = ThreeQ_VAS(
+        channels=["87Rb"],
+        spectral_dimensions=[
+            {"count": 128, "spectral_width": 2e4},
+            {"count": 128, "spectral_width": 2e4},
+        ],
+    )
+    reference = simulate(method, [SpinSystem(sites=[site])], "octahedron", 70)
+    spectrum = simulate(method, [SpinSystem(sites=[site])], "zcw", 70)
+    np.testing.assert_allclose(spectrum.sum(), reference.sum(), rtol=1e-3)
+
+    # compare the projection along the isotropic dimension.
+    projection, ref_projection = spectrum.sum(axis=1), reference.sum(axis=1)
+    error = np.abs(projection - ref_projection).sum() / np.abs(ref_projection).sum()
+    assert error < 0.05
+
+
+def test_orientations():
+    for fn in [zcw, lebedev, repulsion]:
+        alpha, beta, weight = fn(200)
+        assert alpha.size >= 200
+        assert np.all(beta <= np.pi / 2 + 1e-12)
+        np.testing.assert_allclose(weight.sum(), 1)
+
+    # the Lebedev orientations integrate the even spherical harmonics exactly.
+    alpha, beta, weight = lebedev(150)
+    p2 = (3 * np.cos(beta) ** 2 - 1) / 2
+    assert abs(np.sum(weight * p2)) < 1e-12
+
+    # the largest rule is used above the largest number of orientations.
+    with pytest.warns(UserWarning, match="Lebedev scheme supports at most 217"):
+        alpha, beta, weight = lebedev(10000)
+    assert alpha.size == 217
+    np.testing.assert_allclose(weight.sum(), 1)
+    with pytest.raises(ValueError, match="REPULSION scheme supports at most"):
+        repulsion(5000)
+    with pytest.raises(ValueError, match="Expecting the averaging scheme"):
+        get_orientations("gauss", 20)
+
+
+def test_powder_scheme_validation():
+    with pytest.raises(ValidationError, match="length of alpha and beta must be equal"):
+        PowderScheme(alpha=[0, 1], beta=[0])
+    with pytest.raises(ValidationError, match="at least one orientation"):
+        PowderScheme(alpha=[], beta=[])
+    with pytest.raises(ValidationError, match="length of weight and beta must be"):
+        PowderScheme(alpha=[0], beta=[0], weight=[1, 2])
+    with pytest.raises(ValidationError, match="non-negative weights"):
+        PowderScheme(alpha=[0, 1], beta=[0, 1], weight=[1, -2])
+
+    scheme = PowderScheme(alpha=np.zeros(3), beta=np.ones(3))
+    _, _, weight = scheme.orientations()
+    np.testing.assert_equal(weight, [1, 1, 1])
+
+
+def test_config():
+    config = ConfigSimulator(integration_density=20)
+    assert config.averaging_scheme == "octahedron"
+    assert config.get_orientations_count() == 21 * 22 / 2
+
+    config.averaging_scheme = "zcw"
+    assert config.get_orientations_count() == 233
+    config.averaging_scheme = "lebedev"
+    config.integration_density = 15
+    assert config.get_orientations_count() == 151
+    config.integration_density = 20
+    config.averaging_scheme = "repulsion"
+    assert config.get_orientations_count() == 231
+    config.averaging_scheme = {"alpha": [0, 1], "beta": [0, 1]}
+    assert isinstance(config.averaging_scheme, PowderScheme)
+    assert config.get_orientations_count() == 2
+
+    with pytest.raises(ValidationError):
+        config.averaging_scheme = "gauss"
+
+
+def test_config_integration_density_limits():
+    assert max_integration_density("lebedev") == 19
+    assert max_integration_density("repulsion") == 89
+    assert max_integration_density("zcw") is None
+
+    # the REPULSION scheme generates at most 4096 orientations.
+    config = ConfigSimulator(averaging_scheme="repulsion", integration_density=89)
+    error = "repulsion averaging scheme supports an integration density of at most 89"
+    with pytest.raises(ValidationError, match=error):
+        config.integration_density = 90
+    assert config.integration_density == 89
+    config.averaging_scheme = "zcw"
+    config.integration_density = 90
+    with pytest.raises(ValidationError, match=error):
+        config.averaging_scheme = "repulsion"
+    assert config.averaging_scheme == "zcw"
+    with pytest.raises(ValidationError, match=error):
+        ConfigSimulator(averaging_scheme="repulsion", integration_density=100)
+
+    # the auto integration density is capped at the largest density of the scheme.
+    config.integration_density = "auto"
+    for scheme, count in [("lebedev", 217), ("repulsion", 4095)]:
+        config.averaging_scheme = scheme
+        assert config.get_orientations_count() == count
+
+
+def test_lebedev_default_density():
+    site = Site(isotope="13C", shielding_symmetric={"zeta": 50, "eta": 0.5})
+    method = BlochDecaySpectrum(channels=["13C"], rotor_frequency=2000)
+    sim = Simulator(spin_systems=[SpinSystem(sites=[site])], methods=[method])
+    sim.config.averaging_scheme = "lebedev"
+    with pytest.warns(UserWarning, match="Using the largest Lebedev rule"):
+        sim.run(pack_as_csdm=False)
+    expected = sim.methods[0].simulation
+
+    sim.config.integration_density = "auto"
+    assert sim.get_integration_densities() == [19]
+    sim.run(pack_as_csdm=False)
+    np.testing.assert_allclose(sim.methods[0].simulation, expected, atol=1e-12)
+
+
+def test_scheme_cache():
+    cache = SchemeCache()
+    first = cache.averaging_scheme(20, 1, False, "zcw")
+    assert first.point_set and first.total_orientations == 233
+    assert cache.averaging_scheme(20, 0, False, "zcw") is first
+    assert cache.averaging_scheme(20, 1, False, "repulsion") is not first
+    assert not cache.averaging_scheme(20, 1, False).point_set
+
+    # the user-defined schemes are keyed on the orientations.
+    alpha, beta, weight = zcw(200)
+    scheme = PowderScheme(alpha=alpha, beta=beta, weight=weight)
+    assert cache.averaging_scheme(20, 1, False, scheme) is first
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""Error budget of the single precision sideband amplitudes against double precision."""
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.methods import BlochDecayCTSpectrum
+from mrsimulator.methods import BlochDecaySpectrum
+from mrsimulator.methods import SSB2D
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+# upper bound of the relative error of the single precision spectrum.
+TOLERANCE = 1e-6
+
+
+def csa_system(zeta=80):
+    site = Site(isotope="13C", shielding_symmetric={"zeta": zeta, "eta": 0.3})
+    return SpinSystem(sites=[site])
+
+
+def quad_system(Cq=3e6):
+    site = Site(isotope="27Al", quadrupolar={"Cq": Cq, "eta": 0.4})
+    return SpinSystem(sites=[site])
+
+
+def run(sim, precision, decompose="none"):
+    sim.config.precision = precision
+    sim.config.decompose_spectrum = decompose
+    sim.run(pack_as_csdm=False)
+    return np.asarray(sim.methods[0].simulation).real
+
+
+def relative_errors(single, double):
+    l1 = np.abs(single - double).sum() / np.abs(double).sum()
+    max_ = np.abs(single - double).max() / np.abs(double).max()
+    return l1, max_
+
+
+cases = {
+    "13C slow MAS": (
+        [csa_system(200)],
+        BlochDecaySpectrum(
+            channels=["13C"],
+            rotor_frequency=200,
+            spectral_dimensions=[{"count": 4096, "spectral_width": 80000}],
+        ),
+        512,
+    ),
+    "13C fast MAS": (
+        [csa_system()],
+        BlochDecaySpectrum(
+            channels=["13C"],
+            rotor_frequency=10000,
+            spectral_dimensions=[{"count": 1024, "spectral_width": 40000}],
+        ),
+        64,
+    ),
+    "27Al satellite transitions": (
+        [quad_system(5e6)],
+        BlochDecaySpectrum(
+            channels=["27Al"],
+            rotor_frequency=10000,
+            spectral_dimensions=[{"count": 4096, "spectral_width": 2e6}],
+        ),
+        256,
+    ),
+    "27Al central transition": (
+        [quad_system()],
+        BlochDecayCTSpectrum(
+            channels=["27Al"],
+            rotor_frequency=2000,
+            spectral_dimensions=[{"count": 1024, "spectral_width": 50000}],
+        ),
+        128,
+    ),
+    "13C SSB2D": (
+        [csa_system(100)],
+        SSB2D(
+            channels=["13C"],
+            rotor_frequency=1500,
+            spectral_dimensions=[
+                {"count": 32, "spectral_width": 48000},
+                {"count": 256, "spectral_width": 30000},
+            ],
+        ),
+        32,
+    ),
+}
+
+
+@pytest.mark.parametrize("name", cases.keys())
+def test_error_budget(name):
+    spin_systems, method, n_sidebands = cases[name]
+    sim = Simulator(spin_systems=spin_systems, methods=[method])
+    sim.config.number_of_sidebands = n_sidebands
+    sim.config.integration_density = 50
+    double = run(sim, "double")
+    single = run(sim, "single")
+
+    l1, max_ = relative_errors(single, double)
+    assert 0 < l1 < TOLERANCE
+    assert max_ < TOLERANCE
+
+    # the total amplitude is preserved
+    np.testing.assert_allclose(single.sum(), double.sum(), rtol=TOLERANCE)
+
+
+def test_error_budget_spin_systems():
+    method = cases["13C fast MAS"][1]
+    spin_systems = [csa_system(zeta) for zeta in [10, 50, 100]]
+    spin_systems += [quad_system(1e6)]
+    sim = Simulator(spin_systems=spin_systems, methods=[method])
+    sim.config.integration_volume = "hemisphere"
+    double = run(sim, "double", "spin_system")
+    single = run(sim, "single", "spin_system")
+    for item1, item2 in zip(single, double):
+        assert len(item1) == len(item2)
+        if len(item1) != 0:
+            assert relative_errors(item1, item2)[0] < TOLERANCE
+
+
+def test_static_sample():
+    method = BlochDecaySpectrum(
+        channels=["13C"],
+        rotor_frequency=0,
+        spectral_dimensions=[{"count": 1024, "spectral_width": 40000}],
+    )
+    sim = Simulator(spin_systems=[csa_system()], methods=[method])
+    np.testing.assert_equal(run(sim, "single"), run(sim, "double"))
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Test for the streaming of the spectra per spin system."""
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.methods import BlochDecaySpectrum
+from mrsimulator.methods import ThreeQ_VAS
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def setup_simulator():
+    spin_systems = [
+        SpinSystem(
+            sites=[
+                Site(
+                    isotope="27Al",
+                    isotropic_chemical_shift=i * 3,
+                    quadrupolar={"Cq": 1e6 + i * 1e5, "eta": 0.05 * i},
+                )
+            ],
+            abundance=i + 1,
+        )
+        for i in range(7)
+    ]
+    spin_systems.insert(3, SpinSystem(sites=[Site(isotope="1H")]))
+    methods = [
+        BlochDecaySpectrum(
+            channels=["27Al"],
+            rotor_frequency=5000,
+            spectral_dimensions=[{"count": 256, "spectral_width": 50000}],
+        ),
+        ThreeQ_VAS(
+            channels=["27Al"],
+            spectral_dimensions=[
+                {"count": 16, "spectral_width": 20000},
+                {"count": 32, "spectral_width": 20000},
+            ],
+        ),
+    ]
+    sim = Simulator(spin_systems=spin_systems, methods=methods)
+    sim.config.integration_density = 20
+    return sim
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 8, 100])
+@pytest.mark.parametrize("method_index", [0, 1])
+def test_run_iter(method_index, batch_size):
+    sim = setup_simulator()
+    sim.config.decompose_spectrum = "spin_system"
+    sim.run(method_index=method_index, pack_as_csdm=False)
+    expected = sim.methods[method_index].simulation
+    sim.methods[method_index].simulation = None
+
+    blocks = list(sim.run_iter(method_index=method_index, batch_size=batch_size))
+    assert sim.methods[method_index].simulation is None
+    assert len(blocks) == -(-len(sim.spin_systems) // batch_size)
+    assert all(len(indexes) <= batch_size for indexes, _ in blocks)
+
+    indexes = np.concatenate([item[0] for item in blocks])
+    spectra = np.concatenate([item[1] for item in blocks])
+    np.testing.assert_equal(indexes, np.arange(len(sim.spin_systems)))
+    assert spectra.shape == (8,) + tuple(sim.methods[method_index].shape())
+    for spectrum, item in zip(spectra, expected):
+        if len(item) == 0:
+            assert np.all(spectrum == 0)
+        else:
+            np.testing.assert_allclose(spectrum, item, rtol=1e-12, atol=1e-12)
+
+    # the sum over the streamed spectra is the total spectrum.
+    sim.config.decompose_spectrum = "none"
+    sim.run(method_index=method_index, pack_as_csdm=False)
+    np.testing.assert_allclose(
+        spectra.sum(axis=0), sim.methods[method_index].simulation[0], atol=1e-12
+    )
+
+
+def test_run_iter_errors():
+    sim = setup_simulator()
+    with pytest.raises(ValueError, match="Expecting a positive batch_size"):
+        next(sim.run_iter(batch_size=0))
+    with pytest.raises(ValueError, match="Expecting backend"):
+        next(sim.run_iter(backend="mpi"))
+
+    sim.spin_systems = []
+    assert list(sim.run_iter()) == []
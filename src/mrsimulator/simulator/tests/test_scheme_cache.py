@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Test for the process-wide averaging scheme and fftw plan cache."""
+import os
+
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.base_model import get_fftw_planner
+from mrsimulator.base_model import get_fftw_wisdom_filename
+from mrsimulator.base_model import scheme_cache
+from mrsimulator.base_model import SchemeCache
+from mrsimulator.base_model import set_fftw_planner
+from mrsimulator.methods import BlochDecaySpectrum
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def setup_simulator():
+    site = Site(
+        isotope="13C",
+        isotropic_chemical_shift=10,
+        shielding_symmetric={"zeta": 50, "eta": 0.3},
+    )
+    sim = Simulator()
+    sim.spin_systems = [SpinSystem(sites=[site])]
+    sim.methods = [
+        BlochDecaySpectrum(
+            channels=["13C"], spectral_dimensions=[{"count": 512}], rotor_frequency=1000
+        )
+    ]
+    return sim
+
+
+def test_cache_reuse():
+    cache = SchemeCache()
+    first = cache.averaging_scheme(20, 0, False)
+    assert cache.info()["misses"] == 1
+    assert cache.averaging_scheme(20, 0, False) is first
+    assert cache.info()["hits"] == 1
+
+    fftw = cache.fftw_scheme(20, 0, False, 32)
+    assert fftw.nbytes == 16 * first.total_orientations * 32
+    assert cache.fftw_scheme(20, 0, False, 32) is fftw
+    assert len(cache) == 2
+
+    # a different key is a miss
+    assert cache.averaging_scheme(20, 1, False) is not first
+    assert cache.averaging_scheme(20, 0, True) is not first
+
+    cache.clear()
+    assert cache.info() == {
+        "hits": 0,
+        "misses": 0,
+        "size": 0,
+        "memory": 0,
+        "max_memory": 256 * 1024**2,
+    }
+
+
+def test_cache_eviction():
+    cache = SchemeCache()
+    small = cache.averaging_scheme(10, 0, False)
+    large = cache.averaging_scheme(40, 0, False)
+    assert cache.memory == small.nbytes + large.nbytes
+
+    # lowering the budget evicts the least recently used scheme.
+    cache.max_memory = large.nbytes
+    assert len(cache) == 1
+    assert cache.averaging_scheme(40, 0, False) is large
+    assert cache.memory == large.nbytes
+
+    # objects larger than the budget are not cached.
+    cache.max_memory = small.nbytes
+    assert len(cache) == 0
+    cache.averaging_scheme(40, 0, False)
+    assert len(cache) == 0 and cache.memory == 0
+
+    with pytest.raises(ValueError, match="Expecting a non-negative integer"):
+        cache.max_memory = -1
+
+
+def test_simulator_uses_cache():
+    sim = setup_simulator()
+    scheme_cache.clear()
+    sim.run()
+    spectrum = sim.methods[0].simulation.y[0].components[0].copy()
+    info = scheme_cache.info()
+    assert info["misses"] == 2 and info["hits"] == 1
+
+    sim.run()
+    info = scheme_cache.info()
+    assert info["misses"] == 2 and info["hits"] == 4
+    np.testing.assert_allclose(sim.methods[0].simulation.y[0].components[0], spectrum)
+
+    sim.config.integration_volume = "hemisphere"
+    sim.run()
+    assert scheme_cache.info()["misses"] == 4
+
+
+def test_fftw_planner(monkeypatch, tmp_path):
+    monkeypatch.setenv("MRSIMULATOR_CACHE_DIR", str(tmp_path))
+    filename = get_fftw_wisdom_filename()
+    assert filename.startswith(str(tmp_path)) and filename.endswith(".wisdom")
+
+    sim = setup_simulator()
+    sim.run()
+    spectrum = sim.methods[0].simulation.y[0].components[0].copy()
+    assert not os.path.isfile(filename)
+
+    try:
+        assert set_fftw_planner("measure") == "measure"
+        assert get_fftw_planner() == "measure"
+
+        # the measured plans are cached separately and saved to the wisdom file.
+        cache = SchemeCache()
+        measured = cache.fftw_scheme(20, 0, False, 32)
+        assert os.path.isfile(filename)
+        set_fftw_planner()
+        assert cache.fftw_scheme(20, 0, False, 32) is not measured
+
+        set_fftw_planner("measure")
+        sim.run()
+        np.testing.assert_allclose(
+            sim.methods[0].simulation.y[0].components[0], spectrum, atol=1e-12
+        )
+    finally:
+        set_fftw_planner()
+
+    with pytest.raises(ValueError, match="Expecting the fftw planner"):
+        set_fftw_planner("exhaustive")
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Test for the simulation of multiple methods in a single pass over the spin
+systems."""
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.base_model import one_d_spectrum
+from mrsimulator.base_model import simulate_methods
+from mrsimulator.methods import BlochDecayCTSpectrum
+from mrsimulator.methods import BlochDecaySpectrum
+from mrsimulator.methods import ThreeQ_VAS
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def assert_close(actual, expected):
+    # The methods with the same averaging scheme share the rotated tensors of a spin
+    # system, which differ from the rotation per method by the rounding only.
+    np.testing.assert_allclose(actual, expected, atol=1e-12 * np.abs(expected).max())
+
+
+def setup_simulator():
+    spin_systems = [
+        SpinSystem(
+            sites=[
+                Site(
+                    isotope="27Al",
+                    isotropic_chemical_shift=i * 5,
+                    shielding_symmetric={"zeta": 20, "eta": 0.3},
+                    quadrupolar={"Cq": 1e6 + i * 1e5, "eta": 0.1 * i},
+                )
+            ],
+            abundance=i + 1,
+        )
+        for i in range(5)
+    ]
+    spin_systems += [
+        SpinSystem(
+            sites=[
+                Site(
+                    isotope="29Si",
+                    isotropic_chemical_shift=-90,
+                    shielding_symmetric={"zeta": 30, "eta": 0.5},
+                ),
+                Site(isotope="1H", isotropic_chemical_shift=2),
+            ],
+            couplings=[{"site_index": [0, 1], "isotropic_j": 20, "dipolar": {"D": 50}}],
+        ),
+        SpinSystem(sites=[Site(isotope="29Si", isotropic_chemical_shift=-100)]),
+        SpinSystem(
+            sites=[Site(isotope="27Al", quadrupolar={"Cq": 2e6})], abundance=0.5
+        ),
+    ]
+    methods = [
+        BlochDecaySpectrum(
+            channels=["27Al"],
+            rotor_frequency=5000,
+            spectral_dimensions=[{"count": 256, "spectral_width": 50000}],
+        ),
+        BlochDecayCTSpectrum(
+            channels=["27Al"],
+            magnetic_flux_density=14.1,
+            spectral_dimensions=[{"count": 256, "spectral_width": 20000}],
+        ),
+        BlochDecaySpectrum(
+            channels=["29Si"],
+            rotor_frequency=1000,
+            spectral_dimensions=[{"count": 512, "spectral_width": 25000}],
+        ),
+        ThreeQ_VAS(
+            channels=["27Al"],
+            spectral_dimensions=[
+                {"count": 32, "spectral_width": 20000},
+                {"count": 32, "spectral_width": 20000},
+            ],
+        ),
+        BlochDecaySpectrum(channels=["17O"]),
+    ]
+    sim = Simulator(spin_systems=spin_systems, methods=methods)
+    sim.config.integration_density = 20
+    return sim
+
+
+@pytest.mark.parametrize("n_threads", [1, 3])
+@pytest.mark.parametrize("decompose", [0, 1])
+def test_simulate_methods(n_threads, decompose):
+    sim = setup_simulator()
+    kwargs = {
+        **sim.config.get_int_dict(),
+        "decompose_spectrum": decompose,
+        "n_threads": n_threads,
+    }
+    kwargs.pop("integration_density_tolerance")
+    spectra = simulate_methods(sim.methods, sim.spin_systems, **kwargs)
+    assert len(spectra) == len(sim.methods)
+    for method, spectrum in zip(sim.methods, spectra):
+        expected = one_d_spectrum(method, sim.spin_systems, **kwargs)
+        if decompose == 0:
+            assert_close(spectrum, expected)
+            continue
+        assert len(spectrum) == len(expected) == len(sim.spin_systems)
+        for item1, item2 in zip(spectrum, expected):
+            if len(item2) != 0:
+                assert_close(item1, item2)
+                continue
+            assert len(item1) == 0
+
+    assert simulate_methods([], sim.spin_systems) == []
+
+
+@pytest.mark.parametrize("n_threads", [1, 3])
+def test_simulate_methods_shared_tensors(n_threads):
+    # The methods share the rotated tensors of every spin system, while the magnetic
+    # flux density, the rotor angle, and the spinning frequency differ per method.
+    spin_systems = setup_simulator().spin_systems[:5]
+    methods = [
+        BlochDecayCTSpectrum(
+            channels=["27Al"],
+            magnetic_flux_density=B0,
+            rotor_frequency=rotor_frequency,
+            rotor_angle=rotor_angle,
+            spectral_dimensions=[{"count": 256, "spectral_width": 50000}],
+        )
+        for B0, rotor_frequency, rotor_angle in [
+            (9.4, 10000, 0.9553166),
+            (14.1, 10000, 0.9553166),
+            (14.1, 10000, 1.5707963),
+            (9.4, 0, 0.9553166),
+            (21.1, 0, 0.9553166),
+        ]
+    ]
+    kwargs = {"integration_density": 20, "n_threads": n_threads}
+    spectra = simulate_methods(methods, spin_systems, **kwargs)
+    for method, spectrum in zip(methods, spectra):
+        assert_close(spectrum, one_d_spectrum(method, spin_systems, **kwargs))
+
+
+def test_simulator_run_methods():
+    sim = setup_simulator()
+    sim.run(pack_as_csdm=False)
+    batch = [method.simulation for method in sim.methods]
+
+    for i in range(len(sim.methods)):
+        sim.run(method_index=i, pack_as_csdm=False)
+        assert_close(sim.methods[i].simulation, batch[i])
+
+    sim.run(method_index=[3, 0], pack_as_csdm=False)
+    assert_close(sim.methods[3].simulation, batch[3])
+    assert_close(sim.methods[0].simulation, batch[0])
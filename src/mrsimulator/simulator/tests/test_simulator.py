@@ -50,10 +50,15 @@ def test_equality():
         "label": "test",
         "spin_systems": [{"abundance": "100.0 %", "sites": []}],
         "config": {
+            "averaging_scheme": "octahedron",
             "decompose_spectrum": "none",
             "integration_density": 70,
+            "integration_density_tolerance": 0.002,
             "integration_volume": "octant",
             "number_of_sidebands": 64,
+            "precision": "double",
+            "sideband_amplitude_threshold": 0.0,
+            "sideband_pair_threshold": 0.0,
         },
     }
     assert c.json(include_methods=True) == result
@@ -64,9 +69,14 @@ def test_equality():
         "methods": [],
         "config": {
             "number_of_sidebands": 64,
+            "sideband_amplitude_threshold": 0.0,
+            "sideband_pair_threshold": 0.0,
             "integration_volume": "octant",
             "integration_density": 70,
+            "integration_density_tolerance": 0.002,
+            "averaging_scheme": "octahedron",
             "decompose_spectrum": "none",
+            "precision": "double",
         },
     }
 
@@ -150,10 +160,15 @@ def test_simulator_1():
             }
         ],
         "config": {
+            "averaging_scheme": "octahedron",
             "decompose_spectrum": "none",
             "integration_density": 70,
+            "integration_density_tolerance": 0.002,
             "integration_volume": "octant",
             "number_of_sidebands": 64,
+            "precision": "double",
+            "sideband_amplitude_threshold": 0.0,
+            "sideband_pair_threshold": 0.0,
         },
     }
 
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Test for the cache of the spectra per spin system."""
+from copy import deepcopy
+
+import numpy as np
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.methods import BlochDecaySpectrum
+from mrsimulator.methods import ThreeQ_VAS
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def setup_simulator():
+    spin_systems = [
+        SpinSystem(
+            sites=[
+                Site(
+                    isotope="27Al",
+                    isotropic_chemical_shift=i * 5,
+                    quadrupolar={"Cq": 1e6 + i * 1e5, "eta": 0.1 * i},
+                )
+            ],
+            abundance=i + 1,
+        )
+        for i in range(6)
+    ]
+    spin_systems.append(SpinSystem(sites=[Site(isotope="1H")]))
+    methods = [
+        BlochDecaySpectrum(
+            channels=["27Al"],
+            rotor_frequency=5000,
+            spectral_dimensions=[{"count": 256, "spectral_width": 50000}],
+        ),
+        ThreeQ_VAS(
+            channels=["27Al"],
+            spectral_dimensions=[
+                {"count": 32, "spectral_width": 20000},
+                {"count": 32, "spectral_width": 20000},
+            ],
+        ),
+    ]
+    sim = Simulator(spin_systems=spin_systems, methods=methods)
+    sim.config.integration_density = 20
+    return sim
+
+
+def check_against_no_cache(sim):
+    sim.run(pack_as_csdm=False)
+    cached = [method.simulation for method in sim.methods]
+
+    reference = deepcopy(sim)
+    reference.disable_spectrum_cache()
+    reference.run(pack_as_csdm=False)
+    for item1, method in zip(cached, reference.methods):
+        assert len(item1) == len(method.simulation)
+        for spectrum1, spectrum2 in zip(item1, method.simulation):
+            np.testing.assert_allclose(spectrum1, spectrum2, rtol=1e-12, atol=1e-12)
+
+
+def test_spectrum_cache():
+    sim = setup_simulator()
+    sim.enable_spectrum_cache()
+    cache = sim._spectrum_cache
+    check_against_no_cache(sim)
+    # 7 spectra and a total per method.
+    assert len(cache) == 16
+
+    # only the modified spin system is simulated.
+    sim.spin_systems[2].sites[0].isotropic_chemical_shift = 40
+    sim.spin_systems[4].abundance = 50
+    check_against_no_cache(sim)
+    assert len(cache) == 18
+
+    # a reverted spin system is served from the cache.
+    sim.spin_systems[2].sites[0].isotropic_chemical_shift = 10
+    check_against_no_cache(sim)
+    assert len(cache) == 18
+
+    # change in the number of spin systems, method, and config.
+    sim.spin_systems.append(SpinSystem(sites=[Site(isotope="27Al")], abundance=5))
+    check_against_no_cache(sim)
+    sim.methods[0].spectral_dimensions[0].events[0].rotor_frequency = 8000
+    sim.config.number_of_sidebands = 32
+    check_against_no_cache(sim)
+
+    sim.config.decompose_spectrum = "spin_system"
+    check_against_no_cache(sim)
+    assert sim.methods[0].simulation[6] == []
+
+
+def test_spectrum_cache_digests(monkeypatch):
+    sim = setup_simulator()
+    sim.enable_spectrum_cache()
+    sim.run(pack_as_csdm=False)
+    spectra = [method.simulation for method in sim.methods]
+
+    # a run without modifications re-uses the hashes of the spin systems.
+    packed = sim._get_packed_spin_systems()
+    calls = []
+    monkeypatch.setattr(packed, "digests", lambda: calls.append(1))
+    sim.run(pack_as_csdm=False)
+    assert calls == []
+    assert sim._get_packed_spin_systems() is packed
+    for item, method in zip(spectra, sim.methods):
+        np.testing.assert_array_equal(item, method.simulation)
+
+    # a modified spin system is hashed afresh.
+    sim.spin_systems[2].sites[0].isotropic_chemical_shift = 40
+    check_against_no_cache(sim)
+    assert calls == []
+
+
+def test_spectrum_cache_eviction():
+    sim = setup_simulator()
+    sim.enable_spectrum_cache(max_memory=6 * 256 * 8)
+    cache = sim._spectrum_cache
+    sim.run(method_index=0, pack_as_csdm=False)
+    assert cache.memory <= cache.max_memory
+
+    sim.spin_systems[0].sites[0].isotropic_chemical_shift = 50
+    sim.run(method_index=0, pack_as_csdm=False)
+    assert cache.memory <= cache.max_memory
+
+    reference = setup_simulator()
+    reference.spin_systems[0].sites[0].isotropic_chemical_shift = 50
+    reference.run(method_index=0, pack_as_csdm=False)
+    np.testing.assert_allclose(
+        sim.methods[0].simulation, reference.methods[0].simulation, atol=1e-12
+    )
+
+    sim.disable_spectrum_cache()
+    assert sim._spectrum_cache is None
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Test for the simulation over a series of event parameters."""
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.methods import BlochDecayCTSpectrum
+from mrsimulator.methods import BlochDecaySpectrum
+from mrsimulator.methods import ThreeQ_VAS
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def setup_simulator(method):
+    spin_systems = [
+        SpinSystem(
+            sites=[
+                Site(
+                    isotope="27Al",
+                    isotropic_chemical_shift=i * 5,
+                    shielding_symmetric={"zeta": 10, "eta": 0.5},
+                    quadrupolar={"Cq": 2e6 + i * 1e5, "eta": 0.2 * i},
+                )
+            ],
+            abundance=i + 1,
+        )
+        for i in range(4)
+    ]
+    spin_systems.append(spin_systems[1].copy(update={"abundance": 3}))
+    sim = Simulator(spin_systems=spin_systems, methods=[method])
+    sim.config.integration_density = 20
+    return sim
+
+
+def reference(sim, parameter, value):
+    method = sim.methods[0].copy(deep=True)
+    for dim in method.spectral_dimensions:
+        for event in dim.events:
+            setattr(event, parameter, value)
+    ref = Simulator(spin_systems=sim.spin_systems, methods=[method], config=sim.config)
+    ref.run(pack_as_csdm=False)
+    return ref.methods[0].simulation[0]
+
+
+@pytest.mark.parametrize(
+    "parameter, values",
+    [
+        ("magnetic_flux_density", [9.4, 14.1, 28.2]),
+        ("rotor_frequency", [0, 5000, 12000]),
+        ("rotor_angle", [0.2, 0.955316618, 1.5707963268]),
+    ],
+)
+def test_sweep_1d(parameter, values):
+    method = BlochDecayCTSpectrum(
+        channels=["27Al"],
+        rotor_frequency=10000,
+        spectral_dimensions=[{"count": 512, "spectral_width": 50000}],
+    )
+    sim = setup_simulator(method)
+    sim.config.decompose_spectrum = "spin_system"
+    spectra = sim.sweep(parameter, values)
+    assert spectra.shape == (len(values), 512)
+    assert sim.methods[0].simulation is None
+    assert getattr(sim.methods[0].spectral_dimensions[0].events[0], parameter) == (
+        getattr(method.spectral_dimensions[0].events[0], parameter)
+    )
+
+    sim.config.decompose_spectrum = "none"
+    for value, spectrum in zip(values, spectra):
+        np.testing.assert_allclose(
+            spectrum, reference(sim, parameter, value), rtol=1e-12, atol=1e-12
+        )
+
+
+def test_sweep_shared_tensors():
+    # The sweep points share the rotated tensors of the spin systems, where the
+    # satellite transitions add transition pathways with first-order quadrupolar terms.
+    method = BlochDecaySpectrum(
+        channels=["27Al"],
+        rotor_frequency=5000,
+        spectral_dimensions=[{"count": 512, "spectral_width": 2e5}],
+    )
+    sim = setup_simulator(method)
+    values = [7.05, 9.4, 14.1, 21.1]
+    spectra = sim.sweep("magnetic_flux_density", values)
+    for value, spectrum in zip(values, spectra):
+        expected = reference(sim, "magnetic_flux_density", value)
+        np.testing.assert_allclose(spectrum, expected, atol=1e-12 * expected.max())
+
+
+def test_sweep_2d():
+    method = ThreeQ_VAS(
+        channels=["27Al"],
+        spectral_dimensions=[
+            {"count": 32, "spectral_width": 20000},
+            {"count": 32, "spectral_width": 20000},
+        ],
+    )
+    sim = setup_simulator(method)
+    values = [9.4, 18.8]
+    spectra = sim.sweep("magnetic_flux_density", values)
+    assert spectra.shape == (2, 32, 32)
+    for value, spectrum in zip(values, spectra):
+        np.testing.assert_allclose(
+            spectrum, reference(sim, "magnetic_flux_density", value), atol=1e-12
+        )
+
+
+def test_sweep_errors():
+    sim = setup_simulator(BlochDecayCTSpectrum(channels=["27Al"]))
+    with pytest.raises(ValueError, match="Expecting parameter to be one of"):
+        sim.sweep("spectral_width", [1, 2])
+    with pytest.raises(ValueError, match="Expecting backend"):
+        sim.sweep("rotor_frequency", [1, 2], backend="mpi")
+    assert sim.sweep("rotor_frequency", []).shape == (0, 1024)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Test for the multi-threaded simulation."""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.base_model import set_sideband_engine
+from mrsimulator.methods import BlochDecaySpectrum
+from mrsimulator.methods import SSB2D
+from mrsimulator.methods import ThreeQ_VAS
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def setup_simulator(method):
+    spin_systems = [
+        SpinSystem(
+            sites=[
+                Site(
+                    isotope="27Al",
+                    isotropic_chemical_shift=i * 5,
+                    shielding_symmetric={"zeta": 20, "eta": 0.1 * (i % 10)},
+                    quadrupolar={"Cq": 1e6 + i * 1e5, "eta": 0.5, "beta": 0.3},
+                )
+            ],
+            abundance=i + 1,
+        )
+        for i in range(11)
+    ]
+    return Simulator(spin_systems=spin_systems, methods=[method])
+
+
+def run(sim, n_jobs, decompose="none"):
+    sim.config.decompose_spectrum = decompose
+    sim.run(n_jobs=n_jobs, pack_as_csdm=False)
+    return sim.methods[0].simulation
+
+
+def test_threads_1D():
+    method = BlochDecaySpectrum(
+        channels=["27Al"],
+        rotor_frequency=5000,
+        spectral_dimensions=[{"count": 512, "spectral_width": 50000}],
+    )
+    sim = setup_simulator(method)
+    sim.config.integration_density = 20
+
+    serial = run(sim, 1)
+    for n_jobs in [2, 3, 4, -1]:
+        np.testing.assert_allclose(run(sim, n_jobs), serial, rtol=1e-12, atol=1e-14)
+
+    # decomposed spectra do not depend on the number of threads.
+    serial = run(sim, 1, "spin_system")
+    np.testing.assert_equal(run(sim, 4, "spin_system"), serial)
+
+    # more threads than spin systems.
+    np.testing.assert_equal(run(sim, 20, "spin_system"), serial)
+
+
+def test_threads_2D():
+    method = ThreeQ_VAS(
+        channels=["27Al"],
+        spectral_dimensions=[
+            {"count": 64, "spectral_width": 20000},
+            {"count": 64, "spectral_width": 20000},
+        ],
+    )
+    sim = setup_simulator(method)
+    sim.config.integration_density = 20
+    np.testing.assert_allclose(run(sim, 3), run(sim, 1), rtol=1e-12, atol=1e-14)
+
+
+def test_concurrent_python_threads():
+    """The schemes from the cache are shared between simulations on different threads.
+    Check that concurrent simulations do not interfere."""
+    methods = [
+        BlochDecaySpectrum(
+            channels=["27Al"],
+            rotor_frequency=vr,
+            spectral_dimensions=[{"count": 256, "spectral_width": 50000}],
+        )
+        for vr in [4000, 4000, 6000, 6000]
+    ]
+    simulators = [setup_simulator(method) for method in methods]
+    expected = [run(sim, 1) for sim in simulators]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda sim: run(sim, 2), simulators))
+
+    for result, spectrum in zip(results, expected):
+        np.testing.assert_allclose(result, spectrum, rtol=1e-12, atol=1e-14)
+
+
+def single_spin_system_simulator(method):
+    site = Site(
+        isotope="13C",
+        isotropic_chemical_shift=10,
+        shielding_symmetric={"zeta": 60, "eta": 0.4, "beta": 0.6, "gamma": 0.2},
+    )
+    sim = Simulator(spin_systems=[SpinSystem(sites=[site])], methods=[method])
+    sim.config.integration_volume = "hemisphere"
+    return sim
+
+
+def test_orientation_threads_1D():
+    """A single spin system splits the orientations between the threads."""
+    method = BlochDecaySpectrum(
+        channels=["13C"],
+        rotor_frequency=2000,
+        spectral_dimensions=[{"count": 1024, "spectral_width": 40000}],
+    )
+    sim = single_spin_system_simulator(method)
+    # the single precision phase is rounded differently over a range of orientations.
+    for precision, atol in [("double", 1e-14), ("single", 1e-9)]:
+        sim.config.precision = precision
+        serial = run(sim, 1)
+        for n_jobs in [2, 3, 8]:
+            np.testing.assert_allclose(
+                run(sim, n_jobs), serial, rtol=1e-12, atol=atol * serial.max()
+            )
+
+    try:
+        set_sideband_engine("bessel")
+        serial = run(sim, 1)
+        np.testing.assert_allclose(
+            run(sim, 4), serial, rtol=1e-12, atol=1e-14 * serial.max()
+        )
+    finally:
+        set_sideband_engine()
+
+
+def test_orientation_threads_2D():
+    method = SSB2D(
+        channels=["13C"],
+        rotor_frequency=1500,
+        spectral_dimensions=[
+            {"count": 32, "spectral_width": 48000},
+            {"count": 256, "spectral_width": 30000},
+        ],
+    )
+    sim = single_spin_system_simulator(method)
+    sim.config.number_of_sidebands = 32
+    serial = run(sim, 1)
+    np.testing.assert_allclose(
+        run(sim, 3), serial, rtol=1e-12, atol=1e-14 * np.abs(serial).max()
+    )
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Test for the simulation of identical spin systems."""
+import numpy as np
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.methods import BlochDecaySpectrum
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def site(shift):
+    return Site(
+        isotope="29Si",
+        isotropic_chemical_shift=shift,
+        shielding_symmetric={"zeta": 30, "eta": 0.2},
+    )
+
+
+def setup_simulator(spin_systems):
+    method = BlochDecaySpectrum(
+        channels=["29Si"],
+        rotor_frequency=2000,
+        spectral_dimensions=[{"count": 512, "spectral_width": 25000}],
+    )
+    sim = Simulator(spin_systems=spin_systems, methods=[method])
+    sim.config.integration_density = 20
+    return sim
+
+
+def run(sim, decompose="none"):
+    sim.config.decompose_spectrum = decompose
+    sim.run(pack_as_csdm=False)
+    return sim.methods[0].simulation
+
+
+def test_unique_spin_systems():
+    spin_systems = [
+        SpinSystem(sites=[site(-90)], abundance=10),
+        SpinSystem(sites=[site(-100)], abundance=20),
+        SpinSystem(sites=[site(-90)], abundance=30, name="A"),
+        SpinSystem(sites=[Site(isotope="1H")], abundance=5),
+        SpinSystem(sites=[site(-90)], abundance=15, label="B"),
+    ]
+    sim = setup_simulator(spin_systems)
+    unique, inverse = sim._get_unique_spin_systems()
+    assert len(unique) == 3
+    np.testing.assert_equal(inverse, [0, 1, 0, 2, 0])
+
+    reference = setup_simulator(
+        [
+            SpinSystem(sites=[site(-90)], abundance=55),
+            SpinSystem(sites=[site(-100)], abundance=20),
+        ]
+    )
+    np.testing.assert_allclose(run(sim), run(reference), rtol=1e-12, atol=1e-12)
+
+    # the decomposed spectra are scaled by the abundance of each spin system.
+    decomposed = run(sim, "spin_system")
+    assert len(decomposed) == 5 and decomposed[3] == []
+    for sys, spectrum in zip(spin_systems, decomposed):
+        if len(spectrum) != 0:
+            expected = run(setup_simulator([sys]), "spin_system")[0]
+            np.testing.assert_allclose(spectrum, expected, rtol=1e-12, atol=1e-12)
+
+    # modified spin systems are no longer identical.
+    sim.spin_systems[2].sites[0].isotropic_chemical_shift = -80
+    assert len(sim._get_unique_spin_systems()[0]) == 4
+    sim.spin_systems[2].sites[0].isotropic_chemical_shift = -90
+
+    # spin systems with distinct transition pathways are not identical.
+    sim.spin_systems[4].transition_pathways = [[{"initial": [0.5], "final": [-0.5]}]]
+    assert len(sim._get_unique_spin_systems()[0]) == 4
+
+
+def test_unique_spin_systems_cache(monkeypatch):
+    spin_systems = [
+        SpinSystem(sites=[site(-90)], abundance=10),
+        SpinSystem(sites=[site(-100)], abundance=20),
+        SpinSystem(sites=[site(-90)], abundance=30),
+    ]
+    sim = setup_simulator(spin_systems)
+    spectrum = run(sim)
+    unique, inverse = sim._get_unique_spin_systems()
+
+    # a run without modifications re-uses the unique spin systems, without hashing.
+    packed = sim._get_packed_spin_systems()
+    calls = []
+    monkeypatch.setattr(packed, "digests", lambda: calls.append(1))
+    np.testing.assert_array_equal(run(sim), spectrum)
+    assert calls == []
+    assert sim._get_unique_spin_systems()[0] is unique
+
+    sim.spin_systems[2].abundance = 40
+    assert sim._get_unique_spin_systems()[0] is not unique
+    assert len(sim._get_unique_spin_systems()[0]) == 2
+
+
+def test_all_unique_spin_systems():
+    sim = setup_simulator([SpinSystem(sites=[site(i)]) for i in range(3)])
+    packed = sim._get_packed_spin_systems()
+    unique, inverse = sim._get_unique_spin_systems()
+    assert unique is packed
+    np.testing.assert_equal(inverse, [0, 1, 2])
@@ -160,6 +160,7 @@ class SpinSystem(Parseable):
     property_unit_types: ClassVar = {"abundance": "dimensionless"}
     property_default_units: ClassVar = {"abundance": "pct"}
     property_units: Dict = {"abundance": "pct"}
+    counts_modifications: ClassVar[bool] = True
 
     class Config:
         validate_assignment = True
@@ -159,6 +159,7 @@ class Coupling(Parseable):
     property_unit_types: ClassVar = {"isotropic_j": "frequency"}
     property_default_units: ClassVar = {"isotropic_j": "Hz"}
     property_units: Dict = {"isotropic_j": "Hz"}
+    counts_modifications: ClassVar[bool] = True
 
     @validator("dipolar")
     def dipolar_must_not_contain_Cq_and_zeta(cls, v, values):
@@ -0,0 +1,484 @@
+# -*- coding: utf-8 -*-
+"""Columnar packing of a list of SpinSystem objects."""
+import hashlib
+
+import numpy as np
+
+from .isotope import ISOTOPE_DATA
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+__tensor_attributes__ = ["eta", "alpha", "beta", "gamma"]
+
+
+def _float(value):
+    """Return the value as a float, where None is NaN. Size-1 arrays, such as the
+    Euler angles assigned from ``np.random.rand(1)``, are converted to their item."""
+    if value is None:
+        return np.nan
+    return float(value.item() if isinstance(value, np.ndarray) else value)
+
+
+def _tensor_row(tensor, magnitude):
+    """Return the magnitude, eta, and euler angles of the tensor as a tuple."""
+    if tensor is None:
+        return (np.nan,) * 5
+    return (
+        _float(getattr(tensor, magnitude)),
+        *[_float(getattr(tensor, item)) for item in __tensor_attributes__],
+    )
+
+
+def _as_float_array(rows, n_columns):
+    """Convert a list of row tuples of floats to a 2D float array, replacing NaN with
+    zero."""
+    array = np.asarray(rows, dtype=np.float64).reshape(-1, n_columns)
+    array[np.isnan(array)] = 0.0
+    return array
+
+
+def _column(array, index, stride=1):
+    return np.ascontiguousarray(array[:, index : index + stride]).ravel()
+
+
+def _aligned(magnitude, eta, orientation):
+    """Return a boolean array, where the i-th entry is True if the i-th tensor is
+    aligned with the common frame, that is, the tensor is zero, the Euler angles are
+    zero, or the tensor is axially symmetric with a zero beta Euler angle."""
+    angles = orientation.reshape(-1, 3)
+    axial = (eta == 0) & (angles[:, 1] == 0)
+    return (magnitude == 0) | np.all(angles == 0, axis=1) | axial
+
+
+def _ranges(start, stop):
+    """Return the concatenated ranges from start[i] to stop[i] as an integer array."""
+    lengths = stop - start
+    offsets = np.repeat(start - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(lengths.sum(), dtype=int)
+
+
+class PackedSpinSystems:
+    """A list of SpinSystem objects packed as a structure of arrays.
+
+    The sites and couplings from all spin systems are stored as contiguous arrays,
+    where the sites of the i-th spin system span ``site_offsets[i]`` to
+    ``site_offsets[i+1]``, and similarly, the couplings span ``coupling_offsets[i]``
+    to ``coupling_offsets[i+1]``. The Euler angles are packed as alpha, beta, and gamma
+    per site or coupling. The coupling ``site_index`` is relative to the spin system.
+
+    Args:
+        list spin_systems: A list of SpinSystem objects.
+
+    Example
+    -------
+
+    >>> packed = PackedSpinSystems([
+    ...     SpinSystem(sites=[Site(isotope='13C'), Site(isotope='1H')], abundance=20),
+    ...     SpinSystem(sites=[Site(isotope='29Si', isotropic_chemical_shift=-90)]),
+    ... ])
+    >>> packed.site_offsets
+    array([0, 2, 3], dtype=int32)
+    >>> packed.isotropic_chemical_shift
+    array([  0.,   0., -90.])
+    >>> packed.signatures
+    [('13C', '1H'), ('29Si',)]
+    """
+
+    def __init__(self, spin_systems: list = []):
+        site_rows, coupling_rows, n_sites, n_couplings = [], [], [], []
+        abundance, symbols, sys_signature = [], [], []
+        self.transition_pathways = {}
+
+        for index, sys in enumerate(spin_systems):
+            sites = sys.sites
+            couplings = sys.couplings if sys.couplings is not None else []
+            n_sites.append(len(sites))
+            n_couplings.append(len(couplings))
+            abundance.append(sys.abundance)
+
+            signature = tuple(site.isotope.symbol for site in sites)
+            symbols += signature
+            sys_signature.append(signature)
+
+            site_rows += [
+                (
+                    _float(site.isotropic_chemical_shift),
+                    *_tensor_row(site.shielding_symmetric, "zeta"),
+                    *_tensor_row(site.quadrupolar, "Cq"),
+                )
+                for site in sites
+            ]
+            coupling_rows += [
+                (
+                    *map(_float, coupling.site_index),
+                    _float(coupling.isotropic_j),
+                    *_tensor_row(coupling.j_symmetric, "zeta"),
+                    *_tensor_row(coupling.dipolar, "D"),
+                )
+                for coupling in couplings
+            ]
+
+            if sys.transition_pathways is not None:
+                pathways = np.asarray(sys.transition_pathways)
+                lst = [item.tolist() for item in pathways.ravel()]
+                self.transition_pathways[index] = np.asarray(
+                    lst, dtype=np.float32
+                ).reshape(pathways.shape[0], -1)
+
+        self.number_of_spin_systems = len(n_sites)
+        self.abundance = np.asarray(abundance, dtype=np.float64)
+        self.site_offsets = np.cumsum([0] + n_sites, dtype=np.int32)
+        self.coupling_offsets = np.cumsum([0] + n_couplings, dtype=np.int32)
+
+        # unique isotope signatures, `signature_index` maps systems to signatures.
+        unique = {}
+        self.signature_index = np.asarray(
+            [unique.setdefault(item, len(unique)) for item in sys_signature],
+            dtype=np.int32,
+        )
+        self.signatures = list(unique.keys())
+
+        # spin and gyromagnetic ratio of every site from the unique isotopes.
+        unique_symbols, inverse = np.unique(symbols, return_inverse=True)
+        data = [ISOTOPE_DATA[item] for item in unique_symbols]
+        spin = np.asarray([item["spin"] / 2.0 for item in data], dtype=np.float32)
+        gamma = np.asarray([item["gyromagnetic_ratio"] for item in data])
+        self.spin = spin[inverse] if len(symbols) else np.empty(0, dtype=np.float32)
+        self.gyromagnetic_ratio = gamma[inverse] if len(symbols) else np.empty(0)
+
+        sites = _as_float_array(site_rows, 11)
+        self.isotropic_chemical_shift = _column(sites, 0)
+        self.shielding_symmetric_zeta = _column(sites, 1)
+        self.shielding_symmetric_eta = _column(sites, 2)
+        self.shielding_orientation = _column(sites, 3, 3)
+        self.quadrupolar_Cq = _column(sites, 6)
+        self.quadrupolar_eta = _column(sites, 7)
+        self.quadrupolar_orientation = _column(sites, 8, 3)
+
+        couplings = _as_float_array(coupling_rows, 13)
+        self.site_index = _column(couplings, 0, 2).astype(np.int32)
+        self.isotropic_j = _column(couplings, 2)
+        self.j_symmetric_zeta = _column(couplings, 3)
+        self.j_symmetric_eta = _column(couplings, 4)
+        self.j_orientation = _column(couplings, 5, 3)
+        self.dipolar_D = _column(couplings, 8)
+        self.dipolar_eta = _column(couplings, 9)
+        self.dipolar_orientation = _column(couplings, 10, 3)
+
+    def __len__(self):
+        return self.number_of_spin_systems
+
+    def __getitem__(self, index):
+        """Return the packed spin systems from a contiguous slice of spin systems, or
+        from an array of spin system indexes."""
+        if not isinstance(index, slice):
+            return self._take(np.asarray(index, dtype=int))
+        start, stop, step = index.indices(self.number_of_spin_systems)
+        if step != 1:
+            raise ValueError("PackedSpinSystems only supports contiguous slices.")
+        stop = max(start, stop)
+
+        new = PackedSpinSystems.__new__(PackedSpinSystems)
+        new.number_of_spin_systems = stop - start
+        new.abundance = self.abundance[start:stop]
+
+        s0, s1 = self.site_offsets[start], self.site_offsets[stop]
+        c0, c1 = self.coupling_offsets[start], self.coupling_offsets[stop]
+        new.site_offsets = self.site_offsets[start : stop + 1] - s0
+        new.coupling_offsets = self.coupling_offsets[start : stop + 1] - c0
+
+        new.signature_index = self.signature_index[start:stop]
+        new.signatures = self.signatures
+        new.transition_pathways = {
+            key - start: value
+            for key, value in self.transition_pathways.items()
+            if start <= key < stop
+        }
+
+        for name in [
+            "spin",
+            "gyromagnetic_ratio",
+            "isotropic_chemical_shift",
+            "shielding_symmetric_zeta",
+            "shielding_symmetric_eta",
+            "quadrupolar_Cq",
+            "quadrupolar_eta",
+        ]:
+            setattr(new, name, getattr(self, name)[s0:s1])
+        for name in ["shielding_orientation", "quadrupolar_orientation"]:
+            setattr(new, name, getattr(self, name)[3 * s0 : 3 * s1])
+
+        for name in [
+            "isotropic_j",
+            "j_symmetric_zeta",
+            "j_symmetric_eta",
+            "dipolar_D",
+            "dipolar_eta",
+        ]:
+            setattr(new, name, getattr(self, name)[c0:c1])
+        for name in ["j_orientation", "dipolar_orientation"]:
+            setattr(new, name, getattr(self, name)[3 * c0 : 3 * c1])
+        new.site_index = self.site_index[2 * c0 : 2 * c1]
+        return new
+
+    def _take(self, index):
+        """Return the packed spin systems at the given array of indexes."""
+        if index.ndim != 1:
+            raise TypeError(
+                "PackedSpinSystems only supports slicing, or 1D index arrays."
+            )
+        index = np.arange(self.number_of_spin_systems)[index]
+
+        new = PackedSpinSystems.__new__(PackedSpinSystems)
+        new.number_of_spin_systems = index.size
+        new.abundance = self.abundance[index]
+
+        s0, s1 = self.site_offsets[index], self.site_offsets[index + 1]
+        c0, c1 = self.coupling_offsets[index], self.coupling_offsets[index + 1]
+        new.site_offsets = np.cumsum(np.append(0, s1 - s0), dtype=np.int32)
+        new.coupling_offsets = np.cumsum(np.append(0, c1 - c0), dtype=np.int32)
+        sites, couplings = _ranges(s0, s1), _ranges(c0, c1)
+
+        new.signature_index = self.signature_index[index]
+        new.signatures = self.signatures
+        new.transition_pathways = {
+            i: self.transition_pathways[key]
+            for i, key in enumerate(index)
+            if key in self.transition_pathways
+        }
+
+        for name in [
+            "spin",
+            "gyromagnetic_ratio",
+            "isotropic_chemical_shift",
+            "shielding_symmetric_zeta",
+            "shielding_symmetric_eta",
+            "quadrupolar_Cq",
+            "quadrupolar_eta",
+        ]:
+            setattr(new, name, getattr(self, name)[sites])
+        for name in ["shielding_orientation", "quadrupolar_orientation"]:
+            value = getattr(self, name).reshape(-1, 3)[sites]
+            setattr(new, name, np.ascontiguousarray(value).ravel())
+
+        for name in [
+            "isotropic_j",
+            "j_symmetric_zeta",
+            "j_symmetric_eta",
+            "dipolar_D",
+            "dipolar_eta",
+        ]:
+            setattr(new, name, getattr(self, name)[couplings])
+        for name in ["j_orientation", "dipolar_orientation", "site_index"]:
+            value = getattr(self, name).reshape(-1, 3 if name != "site_index" else 2)
+            setattr(new, name, np.ascontiguousarray(value[couplings]).ravel())
+        return new
+
+    def aligned_tensors(self) -> np.ndarray:
+        """Return a boolean array, where the i-th entry is True if every tensor of the
+        i-th spin system is aligned with the common frame. A tensor is aligned when the
+        tensor is zero, the Euler angles are zero, or the tensor is axially symmetric
+        with a zero beta Euler angle. The spectrum of a spin system with aligned
+        tensors is symmetric over the octants of the sphere.
+
+        Example
+        -------
+
+        >>> packed = PackedSpinSystems([
+        ...     SpinSystem(sites=[Site(shielding_symmetric={'zeta': 5, 'eta': 0.5})]),
+        ...     SpinSystem(sites=[Site(shielding_symmetric={'zeta': 5, 'beta': 0.5})]),
+        ... ])
+        >>> packed.aligned_tensors()
+        array([ True, False])
+        """
+        sites = _aligned(
+            self.shielding_symmetric_zeta,
+            self.shielding_symmetric_eta,
+            self.shielding_orientation,
+        ) & _aligned(
+            self.quadrupolar_Cq, self.quadrupolar_eta, self.quadrupolar_orientation
+        )
+        couplings = _aligned(
+            self.j_symmetric_zeta, self.j_symmetric_eta, self.j_orientation
+        ) & _aligned(self.dipolar_D, self.dipolar_eta, self.dipolar_orientation)
+
+        aligned = np.ones(self.number_of_spin_systems, dtype=bool)
+        for check, offsets in [
+            (sites, self.site_offsets),
+            (couplings, self.coupling_offsets),
+        ]:
+            misaligned = np.append(0, np.cumsum(~check))[offsets]
+            aligned &= np.diff(misaligned) == 0
+        return aligned
+
+    def anisotropy_span(self, isotope: str, magnetic_flux_density: float) -> np.ndarray:
+        r"""Return an estimate of the frequency span, in Hz, of the anisotropic
+        interactions of every spin system, when observing the given isotope at the
+        given magnetic flux density, in T.
+
+        The span of a rank two tensor, with anisotropy :math:`\zeta` and asymmetry
+        :math:`\eta`, is :math:`|\zeta|(3+\eta)/2`. The span of the quadrupolar
+        interaction is estimated from the second-order central transition broadening,
+        :math:`\nu_q^2 (I(I+1) - 3/4) / \nu_0`, where
+        :math:`\nu_q = 3 C_q / (2I(2I-1))` and :math:`\nu_0` is the Larmor frequency.
+        The span of a spin system is the largest span from the sites of the isotope plus
+        the span from the couplings.
+
+        Example
+        -------
+
+        >>> csa = {'zeta': 10}
+        >>> packed = PackedSpinSystems([
+        ...     SpinSystem(sites=[Site(isotope='13C', shielding_symmetric=csa)]),
+        ...     SpinSystem(sites=[Site(isotope='1H', shielding_symmetric=csa)]),
+        ... ])
+        >>> packed.anisotropy_span('13C', 9.4).round(1)
+        array([1509.9,    0. ])
+        """
+        masks = [
+            np.asarray([item == isotope for item in sig]) for sig in self.signatures
+        ]
+        observed = np.zeros(self.spin.size, dtype=bool)
+        if observed.size:
+            observed[:] = np.concatenate([masks[i] for i in self.signature_index])
+
+        larmor = np.abs(self.gyromagnetic_ratio) * magnetic_flux_density * 1e6
+        span = np.abs(self.shielding_symmetric_zeta) * 1e-6 * larmor
+        span *= (3 + self.shielding_symmetric_eta) / 2
+
+        spin = self.spin.astype(np.float64)
+        quad = spin > 0.5
+        nu_q = 3 * self.quadrupolar_Cq[quad] / (2 * spin[quad] * (2 * spin[quad] - 1))
+        span[quad] += nu_q**2 * (spin[quad] * (spin[quad] + 1) - 0.75) / larmor[quad]
+
+        spans = np.zeros(self.number_of_spin_systems)
+        index = np.repeat(np.arange(spans.size), np.diff(self.site_offsets))
+        np.maximum.at(spans, index[observed], span[observed])
+
+        couplings = np.abs(self.j_symmetric_zeta) * (3 + self.j_symmetric_eta) / 2
+        couplings += np.abs(self.dipolar_D) * (3 + self.dipolar_eta) / 2
+        index = np.repeat(np.arange(spans.size), np.diff(self.coupling_offsets))
+        np.add.at(spans, index, couplings)
+        return spans
+
+    def sideband_span(
+        self, magnetic_flux_density: float, p: np.ndarray, d: np.ndarray
+    ) -> np.ndarray:
+        r"""Return an estimate of the frequency span, in Hz, of the anisotropic
+        interactions of every spin system, which sets the extent of the spinning
+        sideband manifold, at the given magnetic flux density, in T.
+
+        Unlike the `anisotropy_span` method, the span of a site is scaled by the
+        transitions of the site. The shielding span,
+        :math:`|\zeta|(3+\eta)/2`, is scaled by :math:`p`, the largest
+        :math:`|m_f - m_i|`, and the first-order quadrupolar span,
+        :math:`\nu_q(3+\eta)/4`, by :math:`d`, the largest :math:`|m_f^2 - m_i^2|`,
+        over the transitions of the site. The second-order quadrupolar span is added
+        for the sites with a transition. The span of a spin system is the largest span
+        from the sites plus the span from the couplings.
+
+        Args:
+            float magnetic_flux_density: The magnetic flux density in T.
+            ndarray p: The largest :math:`|m_f - m_i|` of every site.
+            ndarray d: The largest :math:`|m_f^2 - m_i^2|` of every site.
+
+        Example
+        -------
+
+        >>> packed = PackedSpinSystems([
+        ...     SpinSystem(sites=[Site(isotope='27Al', quadrupolar={'Cq': 3e6})]),
+        ... ])
+        >>> packed.sideband_span(9.4, np.ones(1), np.zeros(1)).round(1)
+        array([15521.8])
+        >>> packed.sideband_span(9.4, np.ones(1), 2 * np.ones(1)).round(1)
+        array([690521.8])
+        """
+        larmor = np.abs(self.gyromagnetic_ratio) * magnetic_flux_density * 1e6
+        span = np.abs(self.shielding_symmetric_zeta) * 1e-6 * larmor * p
+        span *= (3 + self.shielding_symmetric_eta) / 2
+
+        spin = self.spin.astype(np.float64)
+        quad = (spin > 0.5) & (p > 0)
+        nu_q = 3 * np.abs(self.quadrupolar_Cq[quad])
+        nu_q /= 2 * spin[quad] * (2 * spin[quad] - 1)
+        span[quad] += nu_q * d[quad] * (3 + self.quadrupolar_eta[quad]) / 4
+        span[quad] += nu_q**2 * (spin[quad] * (spin[quad] + 1) - 0.75) / larmor[quad]
+
+        spans = np.zeros(self.number_of_spin_systems)
+        index = np.repeat(np.arange(spans.size), np.diff(self.site_offsets))
+        np.maximum.at(spans, index, span)
+
+        couplings = np.abs(self.j_symmetric_zeta) * (3 + self.j_symmetric_eta) / 2
+        couplings += np.abs(self.dipolar_D) * (3 + self.dipolar_eta) / 2
+        index = np.repeat(np.arange(spans.size), np.diff(self.coupling_offsets))
+        np.add.at(spans, index, couplings)
+        return spans
+
+    def contains_isotope(self, isotope: str) -> np.ndarray:
+        """Return a boolean array, where the i-th entry is True if the i-th spin system
+        contains a site with the given isotope symbol."""
+        check = np.asarray([isotope in item for item in self.signatures], dtype=bool)
+        return check[self.signature_index] if check.size else check
+
+    def digests(self) -> list:
+        """Return a list of content hashes, one for every spin system. The hash is
+        computed from the sites, couplings, and transition pathways of the spin system,
+        excluding the abundance."""
+        sites = np.column_stack(
+            [
+                self.spin,
+                self.gyromagnetic_ratio,
+                self.isotropic_chemical_shift,
+                self.shielding_symmetric_zeta,
+                self.shielding_symmetric_eta,
+                self.shielding_orientation.reshape(-1, 3),
+                self.quadrupolar_Cq,
+                self.quadrupolar_eta,
+                self.quadrupolar_orientation.reshape(-1, 3),
+            ]
+        )
+        couplings = np.column_stack(
+            [
+                self.site_index.reshape(-1, 2),
+                self.isotropic_j,
+                self.j_symmetric_zeta,
+                self.j_symmetric_eta,
+                self.j_orientation.reshape(-1, 3),
+                self.dipolar_D,
+                self.dipolar_eta,
+                self.dipolar_orientation.reshape(-1, 3),
+            ]
+        )
+
+        digests = []
+        for i in range(self.number_of_spin_systems):
+            item = hashlib.blake2b(digest_size=16)
+            item.update(repr(self.signatures[self.signature_index[i]]).encode())
+            item.update(sites[self.site_offsets[i] : self.site_offsets[i + 1]].data)
+            c0, c1 = self.coupling_offsets[i], self.coupling_offsets[i + 1]
+            item.update(couplings[c0:c1].data)
+            if i in self.transition_pathways:
+                item.update(self.transition_pathways[i].data)
+            digests.append(item.digest())
+        return digests
+
+
+def spin_systems_fingerprint(spin_systems: list):
+    """Return a tuple identifying the spin systems, and the sites and couplings within,
+    by object identity. Together with the modification count of the Parseable objects,
+    the fingerprint detects when a packed representation is no longer valid.
+
+    Returns:
+        A tuple of the fingerprint and the list of referenced objects. Hold on to the
+        objects for as long as the fingerprint is in use so that the ids are not reused.
+    """
+    objects = []
+    for sys in spin_systems:
+        objects.append(sys)
+        objects += sys.sites
+        objects.append(None)
+        if sys.couplings is not None:
+            objects += sys.couplings
+        objects.append(None)
+    return tuple(map(id, objects)), objects
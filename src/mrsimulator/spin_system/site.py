@@ -163,6 +163,7 @@ class Site(Parseable):
     property_unit_types: ClassVar = {"isotropic_chemical_shift": "dimensionless"}
     property_default_units: ClassVar = {"isotropic_chemical_shift": "ppm"}
     property_units: Dict = {"isotropic_chemical_shift": "ppm"}
+    counts_modifications: ClassVar[bool] = True
 
     @validator("quadrupolar")
     def spin_must_be_at_least_one(cls, v, values):
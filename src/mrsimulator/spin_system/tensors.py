@@ -115,6 +115,7 @@ class SymmetricTensor(Parseable):
         "beta": "rad",
         "gamma": "rad",
     }
+    counts_modifications: ClassVar[bool] = True
 
     # Deprecated
     # def to_freq_dict(self, larmor_frequency: float) -> dict:
@@ -161,6 +162,7 @@ class AntisymmetricTensor(Parseable):
     }
     property_default_units: ClassVar = {"zeta": "ppm", "alpha": "rad", "beta": "rad"}
     property_units: Dict = {"zeta": "ppm", "alpha": "rad", "beta": "rad"}
+    counts_modifications: ClassVar[bool] = True
 
     # Deprecated
     # def to_freq_dict(self, larmor_frequency: float) -> dict:
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""Test for the PackedSpinSystems class."""
+import warnings
+
+import numpy as np
+import pytest
+from mrsimulator import Coupling
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.methods import BlochDecaySpectrum
+from mrsimulator.spin_system.packing import PackedSpinSystems
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def setup_spin_systems():
+    site_A = Site(
+        isotope="1H",
+        isotropic_chemical_shift=2,
+        shielding_symmetric={"zeta": 10, "eta": 0.2, "beta": 0.5},
+    )
+    site_B = Site(isotope="13C", isotropic_chemical_shift=-10)
+    site_C = Site(
+        isotope="17O",
+        isotropic_chemical_shift=30,
+        quadrupolar={"Cq": 1e6, "eta": 0.1, "alpha": 0.1},
+    )
+    coupling = Coupling(
+        site_index=[0, 1],
+        isotropic_j=15,
+        j_symmetric={"zeta": 5, "eta": 0.1},
+        dipolar={"D": 100, "gamma": 0.2},
+    )
+    return [
+        SpinSystem(sites=[site_A, site_B], couplings=[coupling], abundance=20),
+        SpinSystem(sites=[site_C], abundance=30),
+        SpinSystem(sites=[site_B, site_A], abundance=50),
+        SpinSystem(sites=[], abundance=10),
+    ]
+
+
+def test_packing():
+    packed = PackedSpinSystems(setup_spin_systems())
+    assert len(packed) == 4
+    np.testing.assert_equal(packed.site_offsets, [0, 2, 3, 5, 5])
+    np.testing.assert_equal(packed.coupling_offsets, [0, 1, 1, 1, 1])
+    np.testing.assert_equal(packed.abundance, [20, 30, 50, 10])
+    np.testing.assert_equal(packed.spin, [0.5, 0.5, 2.5, 0.5, 0.5])
+    np.testing.assert_equal(packed.isotropic_chemical_shift, [2, -10, 30, -10, 2])
+    np.testing.assert_equal(packed.shielding_symmetric_zeta, [10, 0, 0, 0, 10])
+    np.testing.assert_equal(packed.shielding_orientation[:3], [0, 0.5, 0])
+    np.testing.assert_equal(packed.quadrupolar_Cq, [0, 0, 1e6, 0, 0])
+    np.testing.assert_equal(packed.quadrupolar_orientation[6:9], [0.1, 0, 0])
+    np.testing.assert_equal(packed.site_index, [0, 1])
+    np.testing.assert_equal(packed.isotropic_j, [15])
+    np.testing.assert_equal(packed.dipolar_D, [100])
+    np.testing.assert_equal(packed.dipolar_orientation, [0, 0, 0.2])
+
+    assert packed.signatures == [("1H", "13C"), ("17O",), ("13C", "1H"), ()]
+    np.testing.assert_equal(packed.contains_isotope("13C"), [1, 0, 1, 0])
+
+
+def test_packing_slice():
+    packed = PackedSpinSystems(setup_spin_systems())
+    sliced = packed[1:3]
+    assert len(sliced) == 2
+    np.testing.assert_equal(sliced.site_offsets, [0, 1, 3])
+    np.testing.assert_equal(sliced.coupling_offsets, [0, 0, 0])
+    np.testing.assert_equal(sliced.isotropic_chemical_shift, [30, -10, 2])
+    np.testing.assert_equal(sliced.quadrupolar_orientation[:3], [0.1, 0, 0])
+    assert sliced.site_index.size == 0
+    assert len(packed[3:1]) == 0
+
+    error = "PackedSpinSystems only supports slicing"
+    with pytest.raises(TypeError, match=f".*{error}.*"):
+        packed[0]
+
+    error = "PackedSpinSystems only supports contiguous slices"
+    with pytest.raises(ValueError, match=f".*{error}.*"):
+        packed[::2]
+
+
+def test_packing_index_array():
+    spin_systems = setup_spin_systems()
+    spin_systems[1].transition_pathways = [[{"initial": [0.5], "final": [-0.5]}]]
+    packed = PackedSpinSystems(spin_systems)
+    for index in [[2, 0, 1], [3, 1], [0, 0], []]:
+        taken = packed[np.asarray(index, dtype=int)]
+        expected = PackedSpinSystems([spin_systems[i] for i in index])
+        assert taken.digests() == expected.digests()
+        np.testing.assert_equal(taken.site_offsets, expected.site_offsets)
+        np.testing.assert_equal(taken.coupling_offsets, expected.coupling_offsets)
+        np.testing.assert_equal(taken.abundance, expected.abundance)
+        assert taken.transition_pathways.keys() == expected.transition_pathways.keys()
+
+    error = "PackedSpinSystems only supports slicing, or 1D index arrays"
+    with pytest.raises(TypeError, match=f".*{error}.*"):
+        packed[[[0, 1]]]
+
+
+def test_packing_size_one_arrays():
+    # The Euler angles and magnitudes may be assigned from size-1 numpy arrays.
+    spin_systems = setup_spin_systems()
+    spin_systems[0].sites[0].shielding_symmetric.beta = np.asarray([0.7])
+    spin_systems[0].couplings[0].dipolar.gamma = np.random.rand(1)
+    spin_systems[1].sites[0].quadrupolar.Cq = np.asarray([2e6])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        packed = PackedSpinSystems(spin_systems)
+    np.testing.assert_equal(packed.shielding_orientation[:3], [0, 0.7, 0])
+    np.testing.assert_equal(packed.quadrupolar_Cq, [0, 0, 2e6, 0, 0])
+    assert packed.dipolar_orientation[2] == spin_systems[0].couplings[0].dipolar.gamma
+
+
+def test_aligned_tensors():
+    spin_systems = setup_spin_systems()
+    np.testing.assert_equal(
+        PackedSpinSystems(spin_systems).aligned_tensors(), [0, 0, 0, 1]
+    )
+
+    aligned = [
+        Site(isotope="13C", shielding_symmetric={"zeta": 10, "eta": 0.3}),
+        Site(isotope="13C", shielding_symmetric={"zeta": 10, "alpha": 1, "gamma": 2}),
+        Site(isotope="17O", quadrupolar={"Cq": 1e6, "eta": 0, "gamma": 0.5}),
+        Site(isotope="17O", quadrupolar={"Cq": 0, "eta": 0.5, "beta": 0.5}),
+    ]
+    coupling = Coupling(site_index=[0, 1], dipolar={"D": 100, "alpha": 0.2})
+    spin_systems = [
+        SpinSystem(sites=aligned),
+        SpinSystem(sites=aligned[:2], couplings=[coupling]),
+        SpinSystem(sites=aligned[1:3]),
+    ]
+    packed = PackedSpinSystems(spin_systems)
+    np.testing.assert_equal(packed.aligned_tensors(), [1, 1, 1])
+
+    spin_systems[0].sites[0].shielding_symmetric.alpha = 0.1
+    spin_systems[1].couplings[0].dipolar.beta = 0.1
+    packed = PackedSpinSystems(spin_systems)
+    np.testing.assert_equal(packed.aligned_tensors(), [0, 0, 1])
+
+
+def test_packed_simulation_matches_individual():
+    spin_systems = setup_spin_systems()
+    spin_systems[2].transition_pathways = [
+        [{"initial": [0.5, 0.5], "final": [-0.5, 0.5]}]
+    ]
+    method = BlochDecaySpectrum(
+        channels=["13C"], spectral_dimensions=[{"count": 256, "spectral_width": 5e3}]
+    )
+
+    sim = Simulator(spin_systems=spin_systems, methods=[method])
+    sim.config.decompose_spectrum = "spin_system"
+    sim.run(pack_as_csdm=False)
+    decomposed = sim.methods[0].simulation
+    assert [len(item) for item in decomposed] == [256, 0, 256, 0]
+
+    for sys, spectrum in zip(spin_systems, decomposed):
+        sim_ = Simulator(spin_systems=[sys], methods=[method])
+        sim_.config.decompose_spectrum = "spin_system"
+        sim_.run(pack_as_csdm=False)
+        np.testing.assert_allclose(sim_.methods[0].simulation[0], spectrum)
+
+    sim.config.decompose_spectrum = "none"
+    sim.run(pack_as_csdm=False)
+    total = np.sum([item for item in decomposed if len(item) != 0], axis=0)
+    np.testing.assert_allclose(sim.methods[0].simulation[0], total, atol=1e-12)
+
+
+def test_packed_cache_invalidation():
+    sim = Simulator(spin_systems=setup_spin_systems())
+    packed = sim._get_packed_spin_systems()
+    assert sim._get_packed_spin_systems() is packed
+
+    # modify a site attribute
+    sim.spin_systems[0].sites[0].isotropic_chemical_shift = 5
+    packed_1 = sim._get_packed_spin_systems()
+    assert packed_1 is not packed
+    assert packed_1.isotropic_chemical_shift[0] == 5
+
+    # modify a tensor attribute
+    sim.spin_systems[1].sites[0].quadrupolar.Cq = 2e6
+    packed_2 = sim._get_packed_spin_systems()
+    assert packed_2.quadrupolar_Cq[2] == 2e6
+
+    # replace a site, and append a site or spin system in-place
+    sim.spin_systems[1].sites[0] = Site(isotope="27Al")
+    assert sim._get_packed_spin_systems().signatures[1] == ("27Al",)
+
+    sim.spin_systems[3].sites.append(Site(isotope="29Si"))
+    np.testing.assert_equal(
+        sim._get_packed_spin_systems().site_offsets, [0, 2, 3, 5, 6]
+    )
+
+    sim.spin_systems.append(SpinSystem(sites=[Site(isotope="1H")]))
+    assert len(sim._get_packed_spin_systems()) == 5
+
+
+def test_packed_cache_across_runs():
+    method = BlochDecaySpectrum(channels=["13C"])
+    sim = Simulator(spin_systems=setup_spin_systems(), methods=[method])
+    sim.run()
+    packed = sim._get_packed_spin_systems()
+
+    # the run only modifies the method, and the packed spin systems are reused.
+    sim.run()
+    assert sim._get_packed_spin_systems() is packed
+    sim.run(pack_as_csdm=False)
+    assert sim._get_packed_spin_systems() is packed
+
+    sim.spin_systems[0].abundance = 50
+    assert sim._get_packed_spin_systems() is not packed
@@ -29,6 +29,18 @@ class Parseable(BaseModel):
 
     property_units: Dict = {}
 
+    # The number of attribute assignments over the Parseable objects of the classes
+    # with `counts_modifications`, that is, the spin systems, sites, couplings, and
+    # tensors. Cached data derived from the spin systems, such as the packed spin
+    # systems, is invalidated when the count changes.
+    modification_count: ClassVar[int] = 0
+    counts_modifications: ClassVar[bool] = False
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if self.counts_modifications:
+            Parseable.modification_count += 1
+
     @classmethod
     def parse_dict_with_units(cls, json_dict: dict):
         """Parse the physical quantity from a dictionary representation of the class
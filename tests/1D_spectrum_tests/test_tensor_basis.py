@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Test the spectra from the rotated tensors reused between the events and the
+transition pathways of a spin system against the rotation of every event."""
+import numpy as np
+import pytest
+from mrsimulator import Coupling
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.methods import Method1D
+from mrsimulator.methods import Method2D
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+O17 = Site(
+    isotope="17O",
+    isotropic_chemical_shift=20,
+    shielding_symmetric={"zeta": 80, "eta": 0.5, "beta": 0.3, "gamma": 0.2},
+    quadrupolar={"Cq": 1.5e6, "eta": 0.4, "alpha": 0.3, "beta": 0.5, "gamma": 0.9},
+)
+H1 = [
+    Site(
+        isotope="1H",
+        isotropic_chemical_shift=i,
+        shielding_symmetric={"zeta": 8 + 2 * i, "eta": 0.3, "beta": 0.4 * i},
+    )
+    for i in range(2)
+]
+COUPLING = Coupling(
+    site_index=[0, 1],
+    isotropic_j=15,
+    j_symmetric={"zeta": 10, "eta": 0.1, "beta": 0.5},
+    dipolar={"D": 3000, "alpha": 0.4, "beta": 0.2},
+)
+
+
+def simulate(spin_system, events, rotor_frequency, count=1024):
+    for event in events:
+        event.update(magnetic_flux_density=9.4, rotor_frequency=rotor_frequency)
+    method = Method1D(
+        channels=[spin_system.sites[0].isotope.symbol],
+        spectral_dimensions=[{"count": count, "spectral_width": 2e5, "events": events}],
+    )
+    sim = Simulator(spin_systems=[spin_system], methods=[method])
+    sim.config.integration_volume = "hemisphere"
+    sim.config.number_of_sidebands = 16
+    sim.run()
+    return sim.methods[0].simulation.y[0].components[0].real
+
+
+@pytest.mark.parametrize("rotor_frequency", [0, 10000])
+def test_tensor_basis_transition_pathways(rotor_frequency):
+    # The spectrum from the five single-quantum transitions of a spin 5/2 is the sum of
+    # the spectra from every transition on its own.
+    query = {"P": {"channel-1": [[-1]]}}
+    spectrum = simulate(
+        SpinSystem(sites=[O17]), [{"transition_query": query}], rotor_frequency
+    )
+    expected = sum(
+        simulate(
+            SpinSystem(sites=[O17]),
+            [{"transition_query": {**query, "D": {"channel-1": [[d]]}}}],
+            rotor_frequency,
+        )
+        for d in [-4, -2, 0, 2, 4]
+    )
+    np.testing.assert_allclose(spectrum, expected, atol=1e-10 * expected.max())
+
+
+def test_tensor_basis_events():
+    # The projections of a correlation of the central transition with itself are the
+    # spectrum of the central transition.
+    rotor_frequency = 10000
+    query = {"P": {"channel-1": [[-1]]}, "D": {"channel-1": [[0]]}}
+    event = {
+        "magnetic_flux_density": 9.4,
+        "rotor_frequency": rotor_frequency,
+        "transition_query": query,
+    }
+    method = Method2D(
+        channels=["17O"],
+        spectral_dimensions=[
+            {"count": count, "spectral_width": 2e5, "events": [event]}
+            for count in [256, 512]
+        ],
+    )
+    sim = Simulator(spin_systems=[SpinSystem(sites=[O17])], methods=[method])
+    sim.config.integration_volume = "hemisphere"
+    sim.config.number_of_sidebands = 16
+    sim.run()
+    spectrum = sim.methods[0].simulation.y[0].components[0].real
+
+    for projection, count in zip(
+        [spectrum.sum(axis=1), spectrum.sum(axis=0)], [256, 512]
+    ):
+        expected = simulate(
+            SpinSystem(sites=[O17]),
+            [{"transition_query": query}],
+            rotor_frequency,
+            count,
+        )
+        np.testing.assert_allclose(
+            projection / projection.sum(),
+            expected / expected.sum(),
+            atol=1e-7 * expected.max() / expected.sum(),
+        )
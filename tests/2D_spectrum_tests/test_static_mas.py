@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Test the static events, alone and with spinning events in the same method."""
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.methods import BlochDecayCTSpectrum
+from mrsimulator.methods import BlochDecaySpectrum
+from mrsimulator.methods import Method1D
+from mrsimulator.methods import Method2D
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+MAGIC_ANGLE = 0.9553166181245093
+
+C13 = Site(
+    isotope="13C",
+    isotropic_chemical_shift=10,
+    shielding_symmetric={"zeta": 60, "eta": 0.3, "alpha": 0.2, "beta": 0.7},
+)
+O17 = Site(
+    isotope="17O",
+    isotropic_chemical_shift=20,
+    shielding_symmetric={"zeta": 40, "eta": 0.5, "beta": 0.3, "gamma": 0.2},
+    quadrupolar={"Cq": 4e6, "eta": 0.4, "alpha": 0.3, "beta": 0.5, "gamma": 0.9},
+)
+
+
+def simulate(site, method, integration_volume="hemisphere"):
+    sim = Simulator(spin_systems=[SpinSystem(sites=[site])])
+    sim.methods = [method]
+    sim.config.integration_volume = integration_volume
+    sim.config.number_of_sidebands = 32
+    sim.run()
+    return sim.methods[0].simulation.y[0].components[0].real.copy()
+
+
+@pytest.mark.parametrize("integration_volume", ["octant", "hemisphere"])
+def test_static_lab_frame_frequencies(integration_volume):
+    # A single sideband at a rotor angle of zero is the static lineshape, evaluated from
+    # the full rotation of the tensors.
+    for site, method in [(C13, BlochDecaySpectrum), (O17, BlochDecayCTSpectrum)]:
+        spectra = []
+        for rotor_frequency in [0, 1e12]:
+            m = method(
+                channels=[site.isotope.symbol],
+                magnetic_flux_density=9.4,
+                spectral_dimensions=[{"count": 1024, "spectral_width": 1e5}],
+            )
+            m.spectral_dimensions[0].events[0].rotor_frequency = rotor_frequency
+            m.spectral_dimensions[0].events[0].rotor_angle = 0
+            sim = Simulator(spin_systems=[SpinSystem(sites=[site])], methods=[m])
+            sim.config.integration_volume = integration_volume
+            sim.config.number_of_sidebands = 1
+            sim.run()
+            spectra.append(sim.methods[0].simulation.y[0].components[0].real)
+        np.testing.assert_allclose(
+            spectra[0], spectra[1], atol=1e-12 * spectra[1].max()
+        )
+
+
+def test_static_event_with_spinning_event():
+    # A static event without a frequency contribution leaves the spinning sidebands.
+    spinning = {"rotor_frequency": 2000, "rotor_angle": MAGIC_ANGLE}
+    method = Method1D(
+        channels=["13C"],
+        spectral_dimensions=[
+            {
+                "count": 512,
+                "spectral_width": 4e4,
+                "events": [
+                    {"fraction": 0.0, "rotor_frequency": 0},
+                    {"fraction": 1.0, **spinning},
+                ],
+            }
+        ],
+    )
+    mas = BlochDecaySpectrum(
+        channels=["13C"],
+        rotor_frequency=2000,
+        spectral_dimensions=[{"count": 512, "spectral_width": 4e4}],
+    )
+    spectrum, expected = simulate(C13, method), simulate(C13, mas)
+    np.testing.assert_allclose(spectrum, expected, atol=1e-7 * expected.max())
+
+
+@pytest.mark.parametrize("static_dimension", [0, 1])
+def test_static_mas_correlation(static_dimension):
+    # The projections of the static-MAS correlation are the static and MAS spectra.
+    counts, rotor_frequencies = [256, 512], [0, 2000]
+    if static_dimension == 1:
+        counts, rotor_frequencies = counts[::-1], rotor_frequencies[::-1]
+    method = Method2D(
+        channels=["13C"],
+        spectral_dimensions=[
+            {"count": count, "spectral_width": 4e4} for count in counts
+        ],
+    )
+    for dim, rotor_frequency in zip(method.spectral_dimensions, rotor_frequencies):
+        dim.events[0].rotor_frequency = rotor_frequency
+        dim.events[0].rotor_angle = MAGIC_ANGLE
+    spectrum = simulate(C13, method)
+
+    static, mas = [
+        simulate(
+            C13,
+            BlochDecaySpectrum(
+                channels=["13C"],
+                rotor_frequency=rotor_frequency,
+                spectral_dimensions=[{"count": count, "spectral_width": 4e4}],
+            ),
+        )
+        for count, rotor_frequency in zip([256, 512], [0, 2000])
+    ]
+    projections = [spectrum.sum(axis=1), spectrum.sum(axis=0)]
+    if static_dimension == 1:
+        projections = projections[::-1]
+
+    for projection, expected in zip(projections, [static, mas]):
+        np.testing.assert_allclose(
+            projection / projection.sum(),
+            expected / expected.sum(),
+            atol=1e-7 * expected.max() / expected.sum(),
+        )
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Accuracy per orientation of the powder averaging schemes. The spectra from every
+averaging scheme are compared against a converged octahedron spectrum, as the relative
+L1 error, at a few integration densities.
+
+Run as ``python -m tests.spectral_integration_tests.benchmark_powder_schemes`` from
+the repository root.
+"""
+from timeit import default_timer
+
+import numpy as np
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.methods import BlochDecayCTSpectrum
+from mrsimulator.methods import BlochDecaySpectrum
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+SCHEMES = ["octahedron", "zcw", "lebedev", "repulsion"]
+
+
+def cases():
+    csa = SpinSystem(
+        sites=[Site(isotope="13C", shielding_symmetric={"zeta": 80, "eta": 0.4})]
+    )
+    quad = SpinSystem(sites=[Site(isotope="27Al", quadrupolar={"Cq": 3e6, "eta": 0.3})])
+    dim = {"count": 1024, "spectral_width": 40000}
+    return {
+        "13C CSA, 2 kHz MAS": (
+            BlochDecaySpectrum(
+                channels=["13C"], rotor_frequency=2000, spectral_dimensions=[dim]
+            ),
+            csa,
+        ),
+        "13C CSA, static": (
+            BlochDecaySpectrum(
+                channels=["13C"], rotor_frequency=0, spectral_dimensions=[dim]
+            ),
+            csa,
+        ),
+        "27Al central transition, 15 kHz MAS": (
+            BlochDecayCTSpectrum(
+                channels=["27Al"], rotor_frequency=15000, spectral_dimensions=[dim]
+            ),
+            quad,
+        ),
+    }
+
+
+def simulate(method, spin_system, averaging_scheme, density):
+    sim = Simulator(spin_systems=[spin_system], methods=[method])
+    sim.config.integration_density = density
+    sim.config.integration_volume = "hemisphere"
+    sim.config.averaging_scheme = averaging_scheme
+    start = default_timer()
+    sim.run(pack_as_csdm=False)
+    elapsed = default_timer() - start
+    return sim.methods[0].simulation.real, sim.config.get_orientations_count(), elapsed
+
+
+def main(densities=(10, 19, 40)):
+    for name, (method, spin_system) in cases().items():
+        reference, *_ = simulate(method, spin_system, "octahedron", 200)
+        print(name)
+        print(f"    {'scheme':>10} {'density':>8} {'orientations':>13} {'L1 error':>9}")
+        for scheme in SCHEMES:
+            for density in densities:
+                try:
+                    spectrum, count, elapsed = simulate(
+                        method, spin_system, scheme, density
+                    )
+                except ValueError:
+                    continue
+                error = np.abs(spectrum - reference).sum() / np.abs(reference).sum()
+                print(
+                    f"    {scheme:>10} {density:8d} {count:13d} {error:9.5f}"
+                    f"  {elapsed * 1e3:7.2f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
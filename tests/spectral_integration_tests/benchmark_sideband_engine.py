@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Simulation time of a spinning sideband spectrum with the Fourier transform and the
+Bessel series sideband engines, and the engine chosen by the ``auto`` selection. The
+spectra are a set of 13C shielding tensors, where the ratio of the anisotropy to the
+rotor frequency sets the largest order of the Bessel series.
+
+Run as ``python -m tests.spectral_integration_tests.benchmark_sideband_engine`` from
+the repository root.
+"""
+from timeit import default_timer
+
+import numpy as np
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.base_model import set_sideband_engine
+from mrsimulator.methods import BlochDecaySpectrum
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def simulator(rotor_frequency, zeta, number_of_sidebands, count=20):
+    sites = [
+        Site(
+            isotope="13C",
+            isotropic_chemical_shift=i,
+            shielding_symmetric={
+                "zeta": zeta,
+                "eta": 0.3,
+                "alpha": 0.1 * i,
+                "beta": 0.5,
+                "gamma": 0.2,
+            },
+        )
+        for i in range(count)
+    ]
+    sim = Simulator()
+    sim.spin_systems = [SpinSystem(sites=[site]) for site in sites]
+    sim.methods = [
+        BlochDecaySpectrum(
+            channels=["13C"],
+            rotor_frequency=rotor_frequency,
+            spectral_dimensions=[{"count": 2048, "spectral_width": 2e5}],
+        )
+    ]
+    sim.config.number_of_sidebands = number_of_sidebands
+    return sim
+
+
+def elapsed(sim, engine, repeat=3):
+    set_sideband_engine(engine)
+    sim.run()
+    best = np.inf
+    for _ in range(repeat):
+        start = default_timer()
+        sim.run()
+        best = min(best, default_timer() - start)
+    return best, sim.methods[0].simulation.y[0].components[0].real.copy()
+
+
+def main(
+    cases=(
+        (25000, 10, 16),
+        (25000, 50, 64),
+        (10000, 50, 64),
+        (5000, 100, 64),
+        (2000, 100, 128),
+        (1000, 100, 256),
+    )
+):
+    print(
+        f"    {'rotor (Hz)':>10} {'zeta':>6} {'sidebands':>9} {'fft (s)':>9} "
+        f"{'bessel (s)':>10} {'auto (s)':>9} {'max rel diff':>12}"
+    )
+    try:
+        for rotor_frequency, zeta, number_of_sidebands in cases:
+            sim = simulator(rotor_frequency, zeta, number_of_sidebands)
+            times, spectra = zip(
+                *[elapsed(sim, engine) for engine in ["fft", "bessel", "auto"]]
+            )
+            diff = np.abs(spectra[1] - spectra[0]).max() / np.abs(spectra[0]).max()
+            print(
+                f"    {rotor_frequency:10d} {zeta:6d} {number_of_sidebands:9d} "
+                f"{times[0]:9.4f} {times[1]:10.4f} {times[2]:9.4f} {diff:12.3e}"
+            )
+    finally:
+        set_sideband_engine()
+
+
+if __name__ == "__main__":
+    main()
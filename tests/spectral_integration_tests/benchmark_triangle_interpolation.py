@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Throughput of the 1D triangle interpolation over the face of the octahedron, in
+triangles per second. The frequencies are an axially symmetric lineshape over the
+orientations of an octant, where the span of the lineshape, in units of the spectral
+increment, sets the fraction of the triangles within a single bin.
+
+Run as ``python -m tests.spectral_integration_tests.benchmark_triangle_interpolation``
+from the repository root.
+"""
+from timeit import default_timer
+
+import numpy as np
+from mrsimulator.tests.tests import cosine_of_polar_angles_and_amplitudes
+from mrsimulator.tests.tests import octahedronInterpolation
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def frequencies(density, span, number_of_sidebands, points):
+    _, exp_I_beta, amp = cosine_of_polar_angles_and_amplitudes(density)
+    cos_beta = exp_I_beta.real
+    lineshape = span * (3 * cos_beta**2 - 1) / 2
+    offsets = np.linspace(-0.25, 0.25, number_of_sidebands) * points
+    freq = points / 2 + lineshape[None, :] + offsets[:, None]
+    amp = np.repeat(amp[None, :], number_of_sidebands, axis=0)
+    return np.ascontiguousarray(freq), np.ascontiguousarray(amp)
+
+
+def throughput(density, span, number_of_sidebands=32, points=4096, repeat=5):
+    freq, amp = frequencies(density, span, number_of_sidebands, points)
+    spec = np.zeros(points)
+    elapsed = np.inf
+    for _ in range(repeat):
+        start = default_timer()
+        octahedronInterpolation(spec, freq, density, amp)
+        elapsed = min(elapsed, default_timer() - start)
+    return number_of_sidebands * density**2 / elapsed
+
+
+def main(densities=(70, 200), spans=(2, 50, 1000)):
+    print(f"    {'density':>8} {'span':>6} {'triangles/s':>12}")
+    for density in densities:
+        for span in spans:
+            rate = throughput(density, span)
+            print(f"    {density:8d} {span:6d} {rate:12.4g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Test the Bessel series sideband engine against the Fourier transform engine."""
+from os import path
+
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.base_model import get_sideband_engine
+from mrsimulator.base_model import set_sideband_engine
+from mrsimulator.methods import SSB2D
+
+from .utils import c_setup
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+SIMPSON_TEST_PATH = path.join(
+    "tests", "spectral_integration_tests", "simpson_simulated_lineshapes"
+)
+SPECTRA = [
+    ("shielding_sidebands", 8, "octant"),
+    ("quad_sidebands", 2, "hemisphere"),
+    ("csa_quad", 6, "hemisphere"),
+    ("j-coupling", 19, "hemisphere"),
+    ("dipolar-coupling", 7, "hemisphere"),
+]
+
+
+def engine_spectra(run):
+    """Return the spectra of `run` with the fft and the bessel sideband engines."""
+    try:
+        spectra = []
+        for engine in ["fft", "bessel"]:
+            set_sideband_engine(engine)
+            spectra.append(run())
+    finally:
+        set_sideband_engine()
+    return spectra
+
+
+@pytest.mark.parametrize("folder, count, integration_volume", SPECTRA)
+def test_bessel_engine_simpson_spectra(folder, count, integration_volume):
+    for i in range(count):
+        filename = path.join(
+            SIMPSON_TEST_PATH, folder, f"test{i:02d}", f"test{i:02d}.json"
+        )
+        fft, bessel = engine_spectra(
+            lambda: c_setup(filename, integration_volume=integration_volume)[0]
+        )
+        np.testing.assert_allclose(
+            bessel, fft, atol=1e-10, err_msg=f"{folder} test{i:02d}.json"
+        )
+
+
+def test_bessel_engine_ssb2d():
+    site = Site(
+        isotope="13C",
+        isotropic_chemical_shift=20,
+        shielding_symmetric={"zeta": 80, "eta": 0.4, "beta": 0.3},
+    )
+    sim = Simulator(spin_systems=[SpinSystem(sites=[site])])
+    sim.methods = [
+        SSB2D(
+            channels=["13C"],
+            rotor_frequency=1500,
+            spectral_dimensions=[
+                {"count": 32, "spectral_width": 48000},
+                {"count": 256, "spectral_width": 30000},
+            ],
+        )
+    ]
+    sim.config.number_of_sidebands = 32
+
+    def run():
+        sim.run()
+        return sim.methods[0].simulation.y[0].components[0].real.copy()
+
+    fft, bessel = engine_spectra(run)
+    np.testing.assert_allclose(bessel, fft, atol=1e-10 * np.abs(fft).max())
+
+
+def test_sideband_engine():
+    assert get_sideband_engine() == "auto"
+    try:
+        assert set_sideband_engine("bessel") == "bessel"
+        assert get_sideband_engine() == "bessel"
+        assert set_sideband_engine("fft") == "fft"
+    finally:
+        assert set_sideband_engine() == "auto"
+
+    with pytest.raises(ValueError, match="Expecting the sideband engine"):
+        set_sideband_engine("hankel")
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Micro-benchmark of the batch wigner rotation at every supported SIMD level.
+
+Run as ``python -m tests.wigner.benchmark_wigner_rotation`` from the repository root.
+"""
+from timeit import repeat
+
+import mrsimulator.tests.tests as clib
+import numpy as np
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+LEVELS = ["scalar", "avx2", "avx512"]
+
+
+def setup(integration_density=72):
+    n = int((integration_density + 1) * (integration_density + 2) / 2)
+    alpha = np.random.rand(n) * np.pi / 2.0
+    cos_beta = np.cos(np.random.rand(n) * np.pi / 2.0)
+    exp_I_beta = cos_beta + 1j * np.sqrt(1.0 - cos_beta**2)
+    args = (
+        clib.wigner_d_matrices_from_exp_I_beta(2, exp_I_beta).ravel(),
+        np.random.rand(5) + 1j * np.random.rand(5),
+        clib.wigner_d_matrices_from_exp_I_beta(4, exp_I_beta).ravel(),
+        np.random.rand(9) + 1j * np.random.rand(9),
+        clib.get_exp_Im_alpha(n, np.cos(alpha), True).ravel(),
+    )
+    return n, args
+
+
+def main(number=200):
+    for n_octants, volume in [(1, "octant"), (4, "hemisphere")]:
+        n, args = setup()
+        print(f"{volume}, {n * n_octants} orientations")
+        for level in range(clib.simd_supported_level() + 1):
+            clib.set_simd_level(level)
+            times = repeat(
+                lambda: clib.__batch_wigner_rotation(n, n_octants, *args),
+                number=number,
+                repeat=5,
+            )
+            print(f"    {LEVELS[level]:>6}: {min(times) / number * 1e6:8.2f} µs")
+    clib.set_simd_level(-1)
+
+
+if __name__ == "__main__":
+    main()
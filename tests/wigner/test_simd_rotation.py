@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Test for the SIMD kernels of the batch wigner rotation."""
+import mrsimulator.tests.tests as clib
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator.base_model import get_simd_level
+from mrsimulator.base_model import set_simd_level
+from mrsimulator.methods import BlochDecayCTSpectrum
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+LEVELS = ["scalar", "avx2", "avx512"]
+
+
+def batch_rotation(n, n_octants):
+    rng = np.random.default_rng(42)
+    alpha = rng.random(n) * np.pi / 2.0
+    cos_beta = np.cos(rng.random(n) * np.pi / 2.0)
+    exp_I_beta = cos_beta + 1j * np.sqrt(1.0 - cos_beta**2)
+    wigner_2j = clib.wigner_d_matrices_from_exp_I_beta(2, exp_I_beta).ravel()
+    wigner_4j = clib.wigner_d_matrices_from_exp_I_beta(4, exp_I_beta).ravel()
+    exp_im_alpha = clib.get_exp_Im_alpha(n, np.cos(alpha), True).ravel()
+
+    R2 = rng.random(5) + 1j * rng.random(5)
+    R4 = rng.random(9) + 1j * rng.random(9)
+    return clib.__batch_wigner_rotation(
+        n, n_octants, wigner_2j, R2, wigner_4j, R4, exp_im_alpha
+    )
+
+
+@pytest.mark.parametrize("level", [1, 2])
+@pytest.mark.parametrize("n_octants", [1, 4])
+@pytest.mark.parametrize("n", [1, 7, 64])
+def test_batch_wigner_rotation_simd(level, n_octants, n):
+    if clib.simd_supported_level() < level:
+        pytest.skip("The SIMD level is not supported by the CPU.")
+    try:
+        assert clib.set_simd_level(0) == 0
+        w2_ref, w4_ref = batch_rotation(n, n_octants)
+        assert clib.set_simd_level(level) == level
+        w2, w4 = batch_rotation(n, n_octants)
+    finally:
+        clib.set_simd_level(-1)
+
+    np.testing.assert_allclose(w2, w2_ref, rtol=1e-13, atol=1e-15)
+    np.testing.assert_allclose(w4, w4_ref, rtol=1e-13, atol=1e-15)
+
+
+def test_simd_level():
+    supported = clib.simd_supported_level()
+    assert get_simd_level() == LEVELS[supported]
+    assert set_simd_level("scalar") == "scalar"
+    assert set_simd_level("avx512") == LEVELS[supported]
+    assert set_simd_level() == LEVELS[supported]
+
+    error = "Expecting the SIMD level to be one of"
+    with pytest.raises(ValueError, match=error):
+        set_simd_level("sse")
+
+
+@pytest.mark.parametrize("volume", ["octant", "hemisphere"])
+def test_simulation_simd(volume):
+    sys = SpinSystem(
+        sites=[
+            Site(
+                isotope="27Al",
+                isotropic_chemical_shift=20,
+                shielding_symmetric={"zeta": 50, "eta": 0.3},
+                quadrupolar={"Cq": 3e6, "eta": 0.4, "beta": 0.5},
+            )
+        ]
+    )
+    method = BlochDecayCTSpectrum(
+        channels=["27Al"],
+        rotor_frequency=1000,
+        spectral_dimensions=[{"count": 512, "spectral_width": 50000}],
+    )
+    sim = Simulator(spin_systems=[sys], methods=[method])
+    sim.config.integration_volume = volume
+
+    spectra = []
+    try:
+        for level in LEVELS[: clib.simd_supported_level() + 1]:
+            set_simd_level(level)
+            sim.run(pack_as_csdm=False)
+            spectra.append(sim.methods[0].simulation)
+    finally:
+        set_simd_level()
+
+    for spectrum in spectra[1:]:
+        np.testing.assert_allclose(spectrum, spectra[0], rtol=1e-10, atol=1e-12)